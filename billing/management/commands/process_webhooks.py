@@ -0,0 +1,39 @@
+# billing/management/commands/process_webhooks.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from billing.webhooks import BATCH_SIZE, MAX_ATTEMPTS, process_batch, replay_fixture
+
+
+class Command(BaseCommand):
+    help = "Process stored webhook events in batches (run from cron, or with --loop as a worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Events per batch.")
+        parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                            help="Give up on an event after this many failed attempts.")
+        parser.add_argument("--loop", type=float, metavar="SECONDS",
+                            help="Keep running, sleeping this long whenever the queue is empty.")
+        parser.add_argument("--replay", metavar="FILE",
+                            help="Ingest recorded callbacks from a JSON fixture before processing.")
+
+    def handle(self, *args, **opts):
+        if opts.get("replay"):
+            results = replay_fixture(opts["replay"])
+            new = sum(1 for _, created in results if created)
+            self.stdout.write(f"Replayed {len(results)} event(s): {new} new, {len(results) - new} duplicate.")
+
+        total: dict[str, int] = {}
+        while True:
+            counts = process_batch(opts["batch"], max_attempts=opts["max_attempts"])
+            for k, v in counts.items():
+                total[k] = total.get(k, 0) + v
+            if sum(counts.values()) >= opts["batch"]:
+                continue  # more may be waiting
+            if not opts.get("loop"):
+                break
+            time.sleep(opts["loop"])
+
+        summary = ", ".join(f"{k}={v}" for k, v in sorted(total.items())) or "nothing due"
+        self.stdout.write(self.style.SUCCESS(f"Processed webhooks: {summary}"))
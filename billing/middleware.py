@@ -4,6 +4,7 @@ from __future__ import annotations
 from datetime import timedelta
 from typing import Iterable
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect
@@ -61,8 +62,14 @@ class SubscriptionGateMiddleware:
       â€¢ SAFE_PREFIXES are always allowed to avoid loops (login, billing, static, etc.).
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self._async_mode = iscoroutinefunction(get_response)
+        if self._async_mode:
+            markcoroutinefunction(self)
         self._enforce = bool(getattr(settings, "FEATURES", {}).get("BILLING_ENFORCE", False))
         # Settings knobs with sensible defaults
         self._trial_days = int(getattr(settings, "BILLING_TRIAL_DAYS", 30))
@@ -97,22 +104,33 @@ class SubscriptionGateMiddleware:
 
     # --------------- main ----------------
     def __call__(self, request: HttpRequest) -> HttpResponse:
-        path = request.path or "/"
-
-        # Always let safe URLs through
-        if _is_safe(path, SAFE_PREFIXES):
+        if self._async_mode:
+            return self.__acall__(request)
+        if _is_safe(request.path or "/", SAFE_PREFIXES):
             return self.get_response(request)
-
+        blocked = self._gate(request)
+        return blocked if blocked is not None else self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        # Safe URLs skip the thread hop; the gate itself reads the DB
+        if not _is_safe(request.path or "/", SAFE_PREFIXES):
+            blocked = await sync_to_async(self._gate)(request)
+            if blocked is not None:
+                return blocked
+        return await self.get_response(request)
+
+    def _gate(self, request: HttpRequest) -> HttpResponse | None:
+        """None to let the request through, else the redirect to subscribe."""
         # If staff/superuser, never block (they need access to administer)
         user = getattr(request, "user", None)
         if getattr(user, "is_authenticated", False) and (user.is_superuser or user.is_staff):
-            return self.get_response(request)
+            return None
 
         # Resolve tenant (set earlier by TenantResolutionMiddleware)
         biz: Business | None = getattr(request, "business", None)
         if not biz:
             # No active tenant -> skip enforcement; other middlewares/guards handle this
-            return self.get_response(request)
+            return None
 
         # Ensure a subscription exists
         sub: BusinessSubscription | None = getattr(biz, "subscription", None)
@@ -121,17 +139,17 @@ class SubscriptionGateMiddleware:
 
         # If we're not enforcing yet, just pass through (but with seeded trial above)
         if not self._enforce:
-            return self.get_response(request)
+            return None
 
         # Live enforcement
         # Allow while subscription considers itself active (ACTIVE/TRIAL/GRACE)
         if sub.is_active_now():
-            return self.get_response(request)
+            return None
 
         # If not active but still within our computed grace window, allow
         # (BusinessSubscription.in_grace already computes based on next_billing_date/trial_end)
         if sub.in_grace():
-            return self.get_response(request)
+            return None
 
         # Past grace â†’ expired
         if not sub.is_expired():
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def settle_legacy_events(apps, schema_editor):
+    # Rows stored before the worker existed were audit-only; never replay them.
+    WebhookEvent = apps.get_model("billing", "WebhookEvent")
+    WebhookEvent.objects.filter(processed=True).update(status="done")
+    WebhookEvent.objects.filter(processed=False).update(status="ignored")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0004_businesssubscription_canceled_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookevent',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='webhookevent',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=200, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='webhookevent',
+            name='last_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='webhookevent',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='webhookevent',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='webhookevent',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='webhookevent',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed (will retry)'), ('dead', 'Dead (gave up)'), ('ignored', 'Ignored (no handler)')], default='pending', max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='webhookevent',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='webhook_status_due_idx'),
+        ),
+        migrations.RunPython(settle_legacy_events, migrations.RunPython.noop),
+    ]
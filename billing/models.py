@@ -626,19 +626,40 @@ class PaymentMethod(models.Model):
 class WebhookEvent(models.Model):
     """
     Store raw webhook posts for auditing/idempotency.
+
+    Requests only persist + acknowledge (billing.webhooks.ingest); the
+    process_webhooks worker drains pending rows in batches with retries.
     """
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed (will retry)"
+        DEAD = "dead", "Dead (gave up)"
+        IGNORED = "ignored", "Ignored (no handler)"
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     provider = models.CharField(max_length=32)       # e.g., 'airtel'
     event_type = models.CharField(max_length=64, blank=True, default="")
     external_id = models.CharField(max_length=128, blank=True, default="")
+    # provider:external_id, or provider:sha256(body) when the provider sends no id
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
     payload = models.JSONField(default=dict, blank=True)
     received_at = models.DateTimeField(auto_now_add=True)
     processed = models.BooleanField(default=False)
 
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
     class Meta:
         indexes = [
             models.Index(fields=["provider", "external_id"]),
             models.Index(fields=["processed"]),
+            models.Index(fields=["status", "next_attempt_at"], name="webhook_status_due_idx"),
         ]
 
     def __str__(self):
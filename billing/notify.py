@@ -1,9 +1,11 @@
 ﻿# billing/notify.py
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from typing import Optional, Any
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
@@ -52,23 +54,27 @@ def _send_whatsapp_twilio(to: str, body: str) -> None:
     client.messages.create(from_=from_num, to=to, body=body)
 
 
-def _send_whatsapp_meta(to: str, body: str) -> None:
-    """
-    Meta (WhatsApp Cloud API) simple text message.
-    Expects WHATSAPP_TOKEN, WHATSAPP_PHONE_NUMBER_ID; `to` must be MSISDN (e.g., +265...).
-    """
-    import json, urllib.request
-    token = settings.WHATSAPP_TOKEN
-    phone_id = settings.WHATSAPP_PHONE_NUMBER_ID
-    url = f"https://graph.facebook.com/v18.0/{phone_id}/messages"
+def _meta_message(to: str, body: str) -> tuple[str, dict, dict]:
+    """(url, payload, headers) for a WhatsApp Cloud API text message."""
+    url = f"https://graph.facebook.com/v18.0/{settings.WHATSAPP_PHONE_NUMBER_ID}/messages"
     payload = {
         "messaging_product": "whatsapp",
         "to": to,
         "type": "text",
         "text": {"body": body},
     }
+    return url, payload, {"Authorization": f"Bearer {settings.WHATSAPP_TOKEN}"}
+
+
+def _send_whatsapp_meta(to: str, body: str) -> None:
+    """
+    Meta (WhatsApp Cloud API) simple text message.
+    Expects WHATSAPP_TOKEN, WHATSAPP_PHONE_NUMBER_ID; `to` must be MSISDN (e.g., +265...).
+    """
+    import json, urllib.request
+    url, payload, headers = _meta_message(to, body)
     req = urllib.request.Request(url, method="POST")
-    req.add_header("Authorization", f"Bearer {token}")
+    req.add_header("Authorization", headers["Authorization"])
     req.add_header("Content-Type", "application/json")
     try:
         urllib.request.urlopen(req, data=json.dumps(payload).encode("utf-8"), timeout=10)
@@ -92,6 +98,21 @@ def send_whatsapp(to: Optional[str], body: str) -> None:
         print(f"[WA] error: {e}")
 
 
+async def asend_whatsapp(to: Optional[str], body: str) -> None:
+    """send_whatsapp for async views: the Meta API call awaits instead of blocking."""
+    if not to:
+        return
+    if getattr(settings, "WHATSAPP_BACKEND", "console").lower() != "meta":
+        await sync_to_async(send_whatsapp, thread_sensitive=False)(to, body)
+        return
+    from cc.http import apost_json
+
+    url, payload, headers = _meta_message(to, body)
+    status, _data = await apost_json(url, payload, headers=headers, timeout=10)
+    if not 200 <= status < 300:
+        print(f"[WA/meta] send error: HTTP {status}")
+
+
 # ---- Email helpers ------------------------------------------------------
 def send_email(subject: str, body: str, to_email: Optional[str], html_template: Optional[str] = None, ctx: Optional[dict] = None):
     if not to_email:
@@ -160,3 +181,26 @@ def fanout(*, business, title: str, body: str, ntype: str = "billing", url: str
         print(f"[billing.inapp] error: {e}")
 
 
+async def afanout(*, business, title: str, body: str, ntype: str = "billing", url: str = "", to_email: Optional[str] = None, to_whatsapp: Optional[str] = None) -> None:
+    """
+    fanout() for async views: email and WhatsApp go out concurrently, and the
+    request waits on the event loop rather than holding a worker.
+    """
+    c = business_contact(business)
+    email = to_email or c.email
+    wa = to_whatsapp or c.whatsapp
+
+    results = await asyncio.gather(
+        # SMTP has no async client here; it gets its own thread
+        sync_to_async(send_email, thread_sensitive=False)(subject=title, body=body, to_email=email),
+        asend_whatsapp(wa, body),
+        return_exceptions=True,
+    )
+    for channel, result in zip(("email", "wa"), results):
+        if isinstance(result, Exception):
+            print(f"[billing.{channel}] error: {result}")
+
+    try:
+        await sync_to_async(_notify_in_app)(title=title, body=body, ntype=ntype, business=business, url=url)
+    except Exception as e:
+        print(f"[billing.inapp] error: {e}")
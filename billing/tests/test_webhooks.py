@@ -0,0 +1,88 @@
+# billing/tests/test_webhooks.py
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from billing import webhooks
+from billing.models import WebhookEvent
+from layby.api import api_payment_webhook
+from layby.models import LaybyOrder, LaybyPayment
+
+FIXTURES = Path(__file__).parent / "fixtures"
+Status = WebhookEvent.Status
+
+_calls = []
+
+
+def flaky_handler(event):
+    _calls.append(event.pk)
+    if len(_calls) == 1:
+        raise RuntimeError("provider API timeout")
+
+
+@override_settings(LAYBY_WEBHOOK_SECRET="s3cret")
+class WebhookPipelineTests(TestCase):
+    def setUp(self):
+        self.order = LaybyOrder.objects.create(
+            ref="AHTEST01", customer_name="Chikondi", item_name="Phone", total_price=Decimal("300.00"),
+        )
+
+    def test_replayed_burst_is_deduped_and_processed_in_batches(self):
+        results = webhooks.replay_fixture(FIXTURES / "layby_payment_burst.json")
+        self.assertEqual([created for _, created in results], [True, False, True, True, True])
+        self.assertEqual(WebhookEvent.objects.count(), 4)
+
+        self.assertEqual(webhooks.process_batch(limit=2), {"done": 2})
+        self.assertEqual(webhooks.process_batch(), {"dead": 1, "ignored": 1})
+        self.assertEqual(webhooks.process_batch(), {})
+
+        self.assertEqual(sorted(LaybyPayment.objects.values_list("tx_ref", flat=True)), ["AM-1001", "AM-1002"])
+        dead = WebhookEvent.objects.get(status=Status.DEAD)
+        self.assertIn("Unknown order", dead.last_error)
+        self.assertTrue(WebhookEvent.objects.get(external_id="AM-1001").processed)
+
+    @override_settings(WEBHOOK_HANDLERS={"flaky": "billing.tests.test_webhooks.flaky_handler"})
+    def test_failures_are_retried_with_backoff(self):
+        _calls.clear()
+        event, _ = webhooks.ingest("flaky", {"n": 1}, external_id="f-1")
+        self.assertEqual(webhooks.process_batch(), {"failed": 1})
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (Status.FAILED, 1))
+        self.assertGreater(event.next_attempt_at, timezone.now())
+        self.assertEqual(webhooks.process_batch(), {})  # not due yet
+
+        WebhookEvent.objects.filter(pk=event.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(webhooks.process_batch(), {"done": 1})
+        self.assertEqual(len(_calls), 2)
+
+    def test_layby_endpoint_only_persists_and_acknowledges(self):
+        rf = RequestFactory()
+
+        def post():
+            return api_payment_webhook(rf.post(
+                "/layby/api/webhook/", data=b'{"order_ref": "AHTEST01", "amount": "20", "provider_ref": "AM-9"}',
+                content_type="application/json", HTTP_X_LAYBY_SIGNATURE="s3cret",
+            ))
+
+        with self.assertNumQueries(3):  # savepoint + insert + release
+            first = post()
+        second = post()
+        self.assertEqual((first.status_code, second.status_code), (202, 202))
+        self.assertIn(b'"duplicate": true', second.content)
+        self.assertFalse(LaybyPayment.objects.exists())
+        self.assertEqual(WebhookEvent.objects.get().status, Status.PENDING)
+
+    def test_generic_collector_cannot_claim_verified_provider_keys(self):
+        for provider, external_id in (("airtel", "TX-77:SUCCESS"), ("layby", "AM-9")):
+            res = self.client.post(f"/billing/webhook/?provider={provider}&id={external_id}", data=b"{}",
+                                   content_type="application/json")
+            self.assertEqual(res.json(), {"ok": True, "duplicate": False})
+            forged = WebhookEvent.objects.get(external_id=external_id)
+            self.assertEqual(forged.provider, f"billing:{provider}")
+            self.assertIsNone(webhooks.resolve_handler(forged.provider))
+
+            _, created = webhooks.ingest(provider, {"verified": True}, external_id=external_id)
+            self.assertTrue(created)
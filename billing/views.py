@@ -5,12 +5,13 @@ from datetime import date, timedelta
 from decimal import Decimal
 from io import BytesIO
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.http import FileResponse, JsonResponse, HttpRequest, HttpResponse, HttpResponseBadRequest
-from django.shortcuts import get_object_or_404, redirect, render
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
 from django.template import TemplateDoesNotExist
 from django.urls import reverse
 from django.utils import timezone
@@ -28,10 +29,12 @@ from .models import (
     InvoiceItem,
     Payment,
 )
+from .notify import afanout
 
 # Optional (guarded) import to avoid hard dependency during bootstrap
 try:
     from .models import WebhookEvent  # type: ignore
+    from .webhooks import collector_provider, ingest as ingest_webhook
 except Exception:
     WebhookEvent = None  # type: ignore
 
@@ -394,16 +397,21 @@ def success(request: HttpRequest) -> HttpResponse:
 # ---------------- Invoice send/download endpoints ----------------------
 @login_required
 @require_business
-def invoice_send(request: HttpRequest, pk: str) -> HttpResponse:
+async def invoice_send(request: HttpRequest, pk: str) -> HttpResponse:
     """
     Sends invoice via email/WhatsApp and marks it sent.
     Works with either UUID or INT pk based on your URL conf.
+    Async: both sends go out together and, under ASGI, wait without a worker.
     """
     biz: Business = request.business
-    inv = get_object_or_404(Invoice, id=pk, business=biz)
-    _send_invoice_email(inv)
-    _send_invoice_whatsapp(inv)
-    inv.mark_sent()
+    inv = await aget_object_or_404(Invoice, id=pk, business=biz)
+    body = (
+        f"Invoice {inv.number} for {getattr(biz, 'name', 'your business')}\n"
+        f"Amount: {inv.currency} {inv.total}\n"
+        f"Due date: {inv.due_date or inv.issue_date}"
+    )
+    await afanout(business=biz, title=f"Invoice {inv.number}", body=body, ntype="invoice")
+    await sync_to_async(inv.mark_sent)()
     messages.success(request, f"Invoice {inv.number} sent.")
     # bounce back to checkout or subscribe
     return redirect(request.META.get("HTTP_REFERER") or reverse("billing:checkout"))
@@ -464,28 +472,29 @@ def _plain_text_to_minimal_pdf(text: str) -> bytes:
 def webhook(request: HttpRequest) -> JsonResponse:
     """
     Minimal idempotent webhook collector.
-    Stores raw payload + headers into WebhookEvent.payload (if model is available).
+    Stores raw payload + headers and acknowledges; processing happens in the
+    process_webhooks worker (billing.webhooks). Repeats of the same
+    provider/id are acknowledged as duplicates without a second row.
+    The caller is not verified, so ?provider= is stored in the collector's
+    own namespace ("billing:<name>") and never reaches a provider handler.
     """
-    raw = request.body.decode("utf-8", errors="ignore")
+    raw = request.body
     if WebhookEvent:
         try:
-            provider = request.GET.get("provider", "unknown")
-            event_type = request.GET.get("event", "unknown")
-            external_id = request.GET.get("id", "")
-
             # Store headers inside payload for auditing; model has no separate headers field
             payload = {
-                "raw": raw,
+                "raw": raw.decode("utf-8", errors="ignore"),
                 "headers": {k: v for k, v in request.headers.items() },
                 "query": dict(request.GET),
             }
-
-            WebhookEvent.objects.create(
-                provider=provider,
-                event_type=event_type,
-                external_id=external_id,
-                payload=payload,
+            _, created = ingest_webhook(
+                collector_provider(request.GET.get("provider", "unknown")),
+                payload,
+                raw=raw,
+                external_id=request.GET.get("id", ""),
+                event_type=request.GET.get("event", "unknown"),
             )
+            return JsonResponse({"ok": True, "duplicate": not created})
         except Exception:
             # Never crash a webhook
             pass
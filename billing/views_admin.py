@@ -4,10 +4,13 @@ from django.db.models import Q
 from django.shortcuts import render
 from django.utils import timezone
 
+from cc.db_router import read_replica
+
 from .models import BusinessSubscription
 
 @login_required
 @permission_required("billing.view_businesssubscription", raise_exception=True)
+@read_replica
 def hq_subscriptions(request):
     """
     Superusers (and staff with the view permission) see ALL subscriptions.
@@ -0,0 +1,184 @@
+# billing/webhooks.py
+"""
+Webhook ingestion and background processing.
+
+- Endpoints only verify the caller, then `ingest()`: one INSERT of the raw
+  event keyed by a unique idempotency key (provider + external id, or a hash
+  of the body when the provider sends no id). Replays and provider retries
+  hit the unique key and are acknowledged without a second row.
+- `python manage.py process_webhooks` drains due events in batches. Each
+  event is claimed with a conditional UPDATE (safe with several workers),
+  handled in its own transaction, and retried with exponential backoff.
+- Handlers are looked up per provider by dotted path (DEFAULT_HANDLERS,
+  overridable via settings.WEBHOOK_HANDLERS) and imported on first use, so
+  providers whose app is not installed cost nothing until an event arrives.
+  A handler raises PermanentWebhookError for events that can never succeed.
+- The unauthenticated generic collector (billing.views.webhook) stores its
+  events under `collector_provider()` names. They can never take the key of
+  a verified provider's event or be dispatched to its handler.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import WebhookEvent
+
+log = logging.getLogger(__name__)
+
+Status = WebhookEvent.Status
+
+DEFAULT_HANDLERS = {
+    "layby": "layby.webhooks.apply_payment",
+    "airtel": "cfo.payments.apply_airtel_event",
+}
+
+# Namespace for providers named by the caller of the generic collector
+COLLECTOR_PREFIX = "billing:"
+
+BATCH_SIZE = int(getattr(settings, "WEBHOOK_BATCH_SIZE", 100))
+MAX_ATTEMPTS = int(getattr(settings, "WEBHOOK_MAX_ATTEMPTS", 8))
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+# A claim older than this is assumed to belong to a crashed worker
+STALE_CLAIM = timedelta(minutes=10)
+
+
+class PermanentWebhookError(Exception):
+    """Raised by handlers for events that will never succeed (no retries)."""
+
+
+# ---------------------------------------------------------------------
+# Ingestion (request path)
+# ---------------------------------------------------------------------
+def collector_provider(name: str) -> str:
+    """Provider name for an unverified collector event, e.g. "billing:airtel"."""
+    return f"{COLLECTOR_PREFIX}{name or 'unknown'}"[:32]
+
+
+def idempotency_key(provider: str, external_id: str = "", raw: bytes = b"") -> str:
+    if external_id:
+        return f"{provider}:{external_id}"[:200]
+    return f"{provider}:sha256:{hashlib.sha256(raw or b'').hexdigest()}"
+
+
+def ingest(
+    provider: str,
+    payload: dict,
+    *,
+    raw: bytes = b"",
+    external_id: str = "",
+    event_type: str = "",
+) -> tuple[WebhookEvent, bool]:
+    """Persist an event once; returns (event, created). created=False for a duplicate."""
+    provider = (provider or "unknown")[:32]
+    external_id = (external_id or "")[:128]
+    key = idempotency_key(provider, external_id, raw or json.dumps(payload, sort_keys=True).encode())
+    try:
+        with transaction.atomic():
+            event = WebhookEvent.objects.create(
+                provider=provider,
+                event_type=(event_type or "")[:64],
+                external_id=external_id,
+                idempotency_key=key,
+                payload=payload,
+            )
+        return event, True
+    except IntegrityError:
+        return WebhookEvent.objects.get(idempotency_key=key), False
+
+
+def replay_fixture(path: str | Path) -> list[tuple[WebhookEvent, bool]]:
+    """
+    Ingest recorded callbacks from a JSON file: a list of
+    {"provider", "payload", "external_id"?, "event_type"?} objects.
+    """
+    rows = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [
+        ingest(r["provider"], r.get("payload") or {},
+               external_id=str(r.get("external_id") or ""), event_type=r.get("event_type") or "")
+        for r in rows
+    ]
+
+
+# ---------------------------------------------------------------------
+# Processing (worker)
+# ---------------------------------------------------------------------
+def resolve_handler(provider: str) -> Optional[Callable[[WebhookEvent], None]]:
+    path = {**DEFAULT_HANDLERS, **getattr(settings, "WEBHOOK_HANDLERS", {})}.get(provider)
+    return import_string(path) if path else None
+
+
+def _due(now) -> Q:
+    return (
+        Q(status__in=[Status.PENDING, Status.FAILED], next_attempt_at__lte=now)
+        | Q(status=Status.PROCESSING, locked_at__lt=now - STALE_CLAIM)
+    )
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS))
+
+
+def _finish(event: WebhookEvent, **fields) -> None:
+    WebhookEvent.objects.filter(pk=event.pk).update(locked_at=None, **fields)
+
+
+def process_event(event: WebhookEvent, *, max_attempts: int = MAX_ATTEMPTS) -> str:
+    """Run the provider handler for a claimed event; returns the resulting status."""
+    now = timezone.now()
+    try:
+        handler = resolve_handler(event.provider)
+    except ImportError as exc:
+        handler, event.last_error = None, str(exc)
+    if handler is None:
+        _finish(event, status=Status.IGNORED, last_error=event.last_error or "no handler")
+        return Status.IGNORED
+
+    try:
+        with transaction.atomic():
+            handler(event)
+    except PermanentWebhookError as exc:
+        _finish(event, status=Status.DEAD, last_error=str(exc)[:2000])
+        return Status.DEAD
+    except Exception as exc:
+        log.warning("Webhook %s (%s) attempt %s failed: %s", event.pk, event.provider, event.attempts, exc)
+        if event.attempts >= max_attempts:
+            _finish(event, status=Status.DEAD, last_error=repr(exc)[:2000])
+            return Status.DEAD
+        _finish(event, status=Status.FAILED, last_error=repr(exc)[:2000],
+                next_attempt_at=now + _backoff(event.attempts))
+        return Status.FAILED
+
+    _finish(event, status=Status.DONE, processed=True, processed_at=now, last_error="")
+    return Status.DONE
+
+
+def process_batch(limit: int = BATCH_SIZE, *, max_attempts: int = MAX_ATTEMPTS) -> dict[str, int]:
+    """Claim and process up to `limit` due events (oldest first). Returns counts per status."""
+    now = timezone.now()
+    counts: dict[str, int] = {}
+    ids = list(
+        WebhookEvent.objects.filter(_due(now)).order_by("received_at").values_list("pk", flat=True)[:limit]
+    )
+    for pk in ids:
+        # Conditional claim: only one worker wins an event
+        claimed = WebhookEvent.objects.filter(_due(now), pk=pk).update(
+            status=Status.PROCESSING, locked_at=now, attempts=F("attempts") + 1,
+        )
+        if not claimed:
+            continue
+        event = WebhookEvent.objects.get(pk=pk)
+        status = process_event(event, max_attempts=max_attempts)
+        counts[str(status)] = counts.get(str(status), 0) + 1
+    return counts
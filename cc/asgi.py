@@ -1,8 +1,18 @@
-﻿import os
+﻿"""
+ASGI entry point (async serving mode).
+
+    uvicorn cc.asgi:application --workers 3 --host 0.0.0.0 --port $PORT
+
+Under ASGI, async views (long-poll, outbound HTTP) wait on the event loop
+instead of holding a worker. Sync views and middleware still run, each
+request in its own thread. The CC_ASGI flag tells settings which mode the
+process is in (see ASGI_MODE).
+"""
+import os
+
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cc.settings')
+os.environ.setdefault('CC_ASGI', '1')
 
 application = get_asgi_application()
-
-
@@ -0,0 +1,69 @@
+# cc/db_pool.py
+"""
+Usage of the per-process PostgreSQL connection pools (settings.DB_POOL).
+
+Django opens one psycopg pool per alias and process on first use. The pool
+size is bounded (DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE), connections are
+checked on checkout and replaced after DB_POOL_MAX_LIFETIME.
+`pool_stats()` reports the pools' counters next to what matters for
+sizing:
+
+- in_use: connections checked out right now;
+- overflow: connections open above DB_POOL_MIN_SIZE;
+- waited / timeouts: requests that found no free connection, and those
+  that gave up after DB_POOL_TIMEOUT. Steady growth here means the pool is
+  too small for the worker's threads.
+
+The counters are this worker process's only (like cc.perf); HQ reads them
+through cc.views.perf_report.
+"""
+from __future__ import annotations
+
+from django.db import connections
+
+
+def _pool(conn):
+    # Only the PostgreSQL backend has pools; it returns None when not pooled
+    if conn.vendor != "postgresql" or not (conn.settings_dict.get("OPTIONS") or {}).get("pool"):
+        return None
+    return conn.pool
+
+
+def pool_stats() -> dict[str, dict]:
+    """{alias: stats} for every pooled alias that has opened its pool."""
+    out = {}
+    for conn in connections.all(initialized_only=True):
+        pool = _pool(conn)
+        if pool is None or pool.closed:
+            continue
+        stats = pool.get_stats()
+        size, available = stats.get("pool_size", 0), stats.get("pool_available", 0)
+        out[conn.alias] = {
+            "min_size": stats.get("pool_min", 0),
+            "max_size": stats.get("pool_max", 0),
+            "size": size,
+            "available": available,
+            "in_use": max(0, size - available),
+            "overflow": max(0, size - stats.get("pool_min", 0)),
+            "waiting": stats.get("requests_waiting", 0),
+            "requests": stats.get("requests_num", 0),
+            "waited": stats.get("requests_queued", 0),
+            "wait_ms": stats.get("requests_wait_ms", 0),
+            "timeouts": stats.get("requests_errors", 0),
+            "connections_opened": stats.get("connections_num", 0),
+            "connections_lost": stats.get("connections_lost", 0),
+            "returned_bad": stats.get("returns_bad", 0),
+        }
+    return out
+
+
+def close_pools() -> None:
+    """
+    Close this process's connections and pools. Run before forking (gunicorn
+    --preload): a pool's background threads do not survive the fork, so each
+    worker must open its own.
+    """
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+        if _pool(conn) is not None:
+            conn.close_pool()
@@ -0,0 +1,198 @@
+# cc/db_router.py
+"""
+Read-replica routing for report-style reads.
+
+Writes always go to the primary ("default"). Reads go to the replica
+(DATABASES[READ_REPLICA_ALIAS], switched on by READ_REPLICA) only inside
+an opt-in:
+
+- `@read_replica` on a view: chart APIs, dashboards, CSV exports;
+- `with replica_reads():` (or `@replica_reads()`) in commands and report code.
+
+All other reads stay on the primary. Even inside an opt-in, reads use the
+primary when:
+
+- the session wrote recently. ReplicaPinMiddleware pins a session to the
+  primary for REPLICA_PIN_SECONDS after an unsafe request or a model write,
+  so the report after a sale shows that sale (read-your-writes);
+- this request, or the command within REPLICA_PIN_SECONDS, has written; or
+  a transaction is open on the primary;
+- the replica is more than REPLICA_MAX_LAG seconds behind, or cannot be
+  reached. Each process checks this at most every REPLICA_CHECK_INTERVAL
+  seconds.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable
+
+from asgiref.local import Local
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_SESSION_KEY = "_db_pin_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+WRITE_VERBS = ("INSERT", "UPDATE", "DELETE")
+# Writes that do not change anything a report shows
+PIN_EXEMPT_TABLES = ('"django_session"',)
+
+# Zero when the replica has replayed everything it received (an idle primary
+# sends nothing, so the replay timestamp alone would look like growing lag).
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Per request (or per command): opt-in depth, session pin, time of the last write
+_state = Local()
+
+# alias -> (monotonic time of the check, usable)
+_health: dict[str, tuple[float, bool]] = {}
+
+
+def replica_alias() -> str:
+    """The replica alias when routing is on and configured, else ''."""
+    alias = getattr(settings, "READ_REPLICA_ALIAS", "replica")
+    if not getattr(settings, "READ_REPLICA", False) or alias == DEFAULT_DB_ALIAS:
+        return ""
+    return alias if alias in connections.settings else ""
+
+
+# ---------------------------------------------------------------------
+# Lag
+# ---------------------------------------------------------------------
+def replica_lag(alias: str) -> float:
+    """Seconds the replica is behind; raises DatabaseError when unreachable."""
+    conn = connections[alias]
+    if conn.vendor != "postgresql":
+        return 0.0
+    with conn.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        row = cursor.fetchone()
+    return float(row[0] or 0) if row else 0.0
+
+
+def replica_usable(alias: str) -> bool:
+    now = time.monotonic()
+    checked = _health.get(alias)
+    if checked and now - checked[0] < float(getattr(settings, "REPLICA_CHECK_INTERVAL", 5)):
+        return checked[1]
+    max_lag = float(getattr(settings, "REPLICA_MAX_LAG", 10))
+    try:
+        lag = replica_lag(alias)
+        usable = lag <= max_lag
+        if not usable:
+            logger.warning("replica %s is %.1fs behind (max %ss); reading from the primary", alias, lag, max_lag)
+    except DatabaseError as exc:
+        usable = False
+        logger.warning("replica %s unavailable (%s); reading from the primary", alias, exc)
+    _health[alias] = (now, usable)
+    return usable
+
+
+# ---------------------------------------------------------------------
+# Opt-in and stickiness
+# ---------------------------------------------------------------------
+@contextmanager
+def replica_reads():
+    """Let reads in this block use the replica (nests; also a decorator)."""
+    _state.depth = getattr(_state, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _state.depth -= 1
+
+
+def read_replica(view_func: Callable) -> Callable:
+    """View decorator: the view's reads may use the replica."""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_wrapped(request, *args, **kwargs):
+            with replica_reads():
+                return await view_func(request, *args, **kwargs)
+
+        return _async_wrapped
+
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        with replica_reads():
+            return view_func(request, *args, **kwargs)
+
+    return _wrapped
+
+
+def _record_writes(execute, sql, params, many, context):
+    """Execute wrapper on the primary: note when a statement really writes."""
+    head = sql.lstrip()[:6].upper()
+    if head in WRITE_VERBS and not any(table in sql for table in PIN_EXEMPT_TABLES):
+        _state.wrote_at = time.monotonic()
+    return execute(sql, params, many, context)
+
+
+def _wrote_recently() -> bool:
+    wrote_at = getattr(_state, "wrote_at", 0.0)
+    return bool(wrote_at) and time.monotonic() - wrote_at < float(getattr(settings, "REPLICA_PIN_SECONDS", 15))
+
+
+def begin_request(request) -> None:
+    """Reset per-request state and apply the session's pin."""
+    _state.wrote_at = 0.0
+    pinned = request.method not in SAFE_METHODS
+    session = getattr(request, "session", None)
+    if not pinned and session is not None and replica_alias():
+        pinned = float(session.get(PIN_SESSION_KEY) or 0) > time.time()
+    _state.pinned = pinned
+
+
+def end_request(request) -> None:
+    """Pin the session to the primary if this request wrote."""
+    wrote = bool(getattr(_state, "wrote_at", 0.0)) or request.method not in SAFE_METHODS
+    session = getattr(request, "session", None)
+    if wrote and session is not None and replica_alias():
+        session[PIN_SESSION_KEY] = time.time() + float(getattr(settings, "REPLICA_PIN_SECONDS", 15))
+    _state.pinned, _state.wrote_at = False, 0.0
+
+
+def _primary_only() -> bool:
+    if getattr(_state, "pinned", False) or _wrote_recently():
+        return True
+    return connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+class ReplicaRouter:
+    """Opted-in reads to the replica; everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if not alias or not getattr(_state, "depth", 0) or _primary_only():
+            return DEFAULT_DB_ALIAS
+        return alias if replica_usable(alias) else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # get_or_create() and friends ask for the write alias before they know
+        # whether they will write, so the writes are noted when they execute.
+        conn = connections[DEFAULT_DB_ALIAS]
+        if _record_writes not in conn.execute_wrappers:
+            conn.execute_wrappers.append(_record_writes)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, getattr(settings, "READ_REPLICA_ALIAS", "replica")}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == getattr(settings, "READ_REPLICA_ALIAS", "replica"):
+            return False
+        return None
@@ -0,0 +1,77 @@
+# cc/http.py
+"""
+Outbound HTTP for async code (views under ASGI, async services).
+
+`arequest_json()` uses httpx.AsyncClient when httpx is installed, so a slow
+provider only parks a coroutine. Without httpx it falls back to urllib in
+a worker thread: still off the event loop, but one thread per call.
+
+Errors never raise: the result is (status, parsed JSON or None), with
+status 0 when the request did not complete.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Optional
+
+try:  # optional dependency
+    import httpx
+except Exception:  # pragma: no cover
+    httpx = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+def _decode(body: bytes) -> Any:
+    try:
+        return json.loads(body.decode("utf-8")) if body else None
+    except ValueError:
+        return None
+
+
+def _urllib_call(method: str, url: str, params, payload, headers, timeout: float) -> tuple[int, Any]:
+    if params:
+        url = f"{url}{'&' if '?' in url else '?'}{urllib.parse.urlencode(params)}"
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    for key, value in {**({"Content-Type": "application/json"} if data else {}), **(headers or {})}.items():
+        req.add_header(key, value)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec - server-to-server
+            return resp.status, _decode(resp.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, _decode(exc.read() or b"")
+
+
+async def arequest_json(
+    method: str,
+    url: str,
+    *,
+    params: Optional[dict] = None,
+    json_body: Any = None,
+    headers: Optional[dict] = None,
+    timeout: float = 10.0,
+) -> tuple[int, Any]:
+    """(HTTP status, decoded JSON body or None); status 0 on network errors."""
+    try:
+        if httpx is not None:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                resp = await client.request(method, url, params=params, json=json_body, headers=headers)
+            return resp.status_code, _decode(resp.content)
+        return await asyncio.to_thread(_urllib_call, method, url, params, json_body, headers, timeout)
+    except Exception as exc:
+        logger.warning("%s %s failed: %s", method, url, exc)
+        return 0, None
+
+
+async def aget_json(url: str, **kwargs) -> tuple[int, Any]:
+    return await arequest_json("GET", url, **kwargs)
+
+
+async def apost_json(url: str, payload: Any, **kwargs) -> tuple[int, Any]:
+    return await arequest_json("POST", url, json_body=payload, **kwargs)
@@ -0,0 +1,66 @@
+# cc/lazy_views.py
+"""
+URLconf helpers that defer importing a view module until its first request.
+
+URL modules used to import every view module while the URLconf loaded, so
+worker boot (and `manage.py` commands that touch URLs) paid for modules such
+as simulator.views_api, which pull in NumPy. `lazy_view()` returns a plain
+callable for `path()` that imports its target on first call and then
+delegates to it.
+
+CsrfViewMiddleware inspects the callback before it runs, so a target
+decorated with @csrf_exempt must be declared with `csrf_exempt=True` here.
+"""
+from __future__ import annotations
+
+import threading
+from importlib import import_module
+from typing import Callable, Optional
+
+from django.http import JsonResponse
+
+
+def _stub(msg: str) -> Callable:
+    def _fn(_request, *args, **kwargs):
+        return JsonResponse({"ok": False, "error": msg}, status=501)
+    return _fn
+
+
+def lazy_view(
+    modpath: str,
+    attr: str,
+    msg: Optional[str] = None,
+    *,
+    fallback: Optional[Callable] = None,
+    csrf_exempt: bool = False,
+) -> Callable:
+    """
+    A view that resolves `modpath.attr` on first request. If the module or
+    attribute is missing it serves `fallback`, or a 501 JSON stub.
+    """
+    lock = threading.Lock()
+    resolved: list[Callable] = []
+
+    def _resolve() -> Callable:
+        with lock:
+            if not resolved:
+                try:
+                    target = getattr(import_module(modpath), attr, None)
+                except Exception:
+                    target = None
+                if target is not None and hasattr(target, "as_view"):
+                    target = target.as_view()
+                if not callable(target):
+                    target = fallback or _stub(msg or f"{attr} not implemented")
+                resolved.append(target)
+        return resolved[0]
+
+    def view(request, *args, **kwargs):
+        return (resolved[0] if resolved else _resolve())(request, *args, **kwargs)
+
+    view.__name__ = view.__qualname__ = attr
+    view.__module__ = modpath
+    view.resolve = _resolve
+    if csrf_exempt:
+        view.csrf_exempt = True
+    return view
@@ -7,6 +7,7 @@ import logging
 from importlib import import_module
 from typing import Any, Optional
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 from django.utils import timezone
@@ -15,6 +16,10 @@ from django.core.exceptions import PermissionDenied, SuspiciousOperation
 from django.shortcuts import render, redirect
 from django.urls import reverse, NoReverseMatch
 
+from whitenoise.middleware import WhiteNoiseMiddleware as _WhiteNoiseMiddleware
+
+from cc import db_router, perf
+
 
 # ------------------------------------------------------------------
 # Loggers
@@ -56,6 +61,21 @@ def _safe_is_authenticated(user: Any) -> bool:
         return False
 
 
+def _session_will_save(request: HttpRequest) -> bool:
+    """
+    Mirrors SessionMiddleware (which responds after us): a modified,
+    non-empty session is written at the end of the request.
+    """
+    session = getattr(request, "session", None)
+    if session is None:
+        return False
+    try:
+        dirty = session.modified or getattr(settings, "SESSION_SAVE_EVERY_REQUEST", False)
+        return bool(dirty and not session.is_empty())
+    except Exception:
+        return False
+
+
 def _safe_user_id(user: Any) -> Optional[int]:
     """Resolve user.id without forcing auth if it errors; return None on failure."""
     try:
@@ -94,44 +114,134 @@ class RequestIDMiddleware(MiddlewareMixin):
         return response
 
 
+# ------------------------------------------------------------------
+# Static files
+# ------------------------------------------------------------------
+class WhiteNoiseMiddleware(_WhiteNoiseMiddleware):
+    """
+    WhiteNoise that can sit in an async middleware chain. The stock class is
+    sync-only, which makes Django run every request below it through a
+    thread under ASGI. The file lookup is an in-memory dict (a stat with
+    autorefresh), so it runs inline either way.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if not iscoroutinefunction(self):
+            return super().__call__(request)
+        return self.__acall__(request)
+
+    async def __acall__(self, request):
+        path = request.path_info
+        static_file = self.find_file(path) if self.autorefresh else self.files.get(path)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
 # ------------------------------------------------------------------
 # Access log
 # ------------------------------------------------------------------
+def _may_force_timing(request: HttpRequest) -> bool:
+    if settings.DEBUG:
+        return True
+    user = getattr(request, "user", None)
+    return _safe_is_authenticated(user) and (getattr(user, "is_staff", False) or _is_hq_admin(user))
+
+
 class AccessLogMiddleware(MiddlewareMixin):
     """
     Lightweight structured access logging with latency and user id.
+    Every request logs `session_write` and is counted in cc.perf, so session
+    writes per request show up in the HQ perf report.
+    Sampled requests (settings.PERF_SAMPLE_RATE) also carry DB/cache/template
+    fields from cc.perf and feed the per-endpoint report at /hq/api/perf/.
+    `Server-Timing` is added when settings.PERF_SERVER_TIMING is on, or when
+    staff/HQ (any user under DEBUG) send `X-Server-Timing: 1`, which also
+    forces sampling. The user is known only after AuthenticationMiddleware,
+    so a forced profile starts in process_view.
     Safe: never blocks responses even if logging fails.
     """
 
     def process_request(self, request: HttpRequest):
         request._start_ts = time.perf_counter()
+        request._perf = None
+        try:
+            request._perf_timing_requested = request.META.get("HTTP_X_SERVER_TIMING") == "1"
+            if perf.should_sample():
+                request._perf = perf.start()
+        except Exception:
+            request._perf = None
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        try:
+            if request._perf is None and request._perf_timing_requested and _may_force_timing(request):
+                request._perf = perf.start()
+        except Exception:
+            request._perf = None
+        return None
 
     def process_response(self, request: HttpRequest, response: HttpResponse):
+        prof = getattr(request, "_perf", None)
+        if prof is not None:
+            perf.stop(prof)
         try:
-            latency_ms = int(
-                (time.perf_counter() - getattr(request, "_start_ts", time.perf_counter())) * 1000
-            )
+            elapsed = (time.perf_counter() - getattr(request, "_start_ts", time.perf_counter())) * 1000
+            latency_ms = int(elapsed)
             user = getattr(request, "user", None)
             user_id = _safe_user_id(user)
-            access_logger.info(
-                "http_request",
-                extra={
-                    "ts": timezone.now().isoformat(),
-                    "request_id": getattr(request, "request_id", None),
-                    "method": getattr(request, "method", None),
-                    "path": request.get_full_path() if hasattr(request, "get_full_path") else None,
-                    "status": getattr(response, "status_code", None),
-                    "latency_ms": latency_ms,
-                    "user_id": user_id,
-                    "ip": request.META.get("REMOTE_ADDR") if hasattr(request, "META") else None,
-                },
-            )
+            match = getattr(request, "resolver_match", None)
+            view = (getattr(match, "view_name", None) or getattr(match, "_func_path", None)) if match else None
+            session_write = _session_will_save(request)
+            perf.count_request(session_write)
+            extra = {
+                "ts": timezone.now().isoformat(),
+                "request_id": getattr(request, "request_id", None),
+                "method": getattr(request, "method", None),
+                "path": request.get_full_path() if hasattr(request, "get_full_path") else None,
+                "status": getattr(response, "status_code", None),
+                "latency_ms": latency_ms,
+                "user_id": user_id,
+                "ip": request.META.get("REMOTE_ADDR") if hasattr(request, "META") else None,
+                "view": view,
+                "sampled": prof is not None,
+                "session_write": session_write,
+            }
+            if prof is not None:
+                extra.update(prof.fields())
+                perf.record(f"{request.method} {view or '<unresolved>'}", elapsed, prof, session_write)
+                if getattr(settings, "PERF_SERVER_TIMING", False) or (
+                    request._perf_timing_requested and _may_force_timing(request)
+                ):
+                    response["Server-Timing"] = prof.server_timing(elapsed)
+            access_logger.info("http_request", extra=extra)
         except Exception:
             # Never block the response on logging errors
             pass
         return response
 
 
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """
+    Read-your-writes for the read replica (cc.db_router): after a request
+    that writes, the session reads from the primary for REPLICA_PIN_SECONDS.
+    Place after SessionMiddleware.
+    """
+
+    def process_request(self, request: HttpRequest):
+        db_router.begin_request(request)
+
+    def process_response(self, request: HttpRequest, response: HttpResponse):
+        db_router.end_request(request)
+        return response
+
+
 # ------------------------------------------------------------------
 # HQ guard — keep HQ admins out of tenant/store UIs
 # Place this middleware in settings.py immediately AFTER
@@ -0,0 +1,50 @@
+# cc/on_commit.py
+"""
+Per-transaction batches for signal handlers that do their work after commit.
+
+`defer(tag, keys, flush)` collects keys in the current transaction of the
+current connection (connections are per thread) and calls `flush(keys)`
+once, after that transaction commits. A bulk write that fires a signal per
+row is handled once per transaction. Another thread's uncommitted keys are
+never seen, and a rolled-back transaction drops its batch with its on_commit
+callback. (Keys from a rolled-back savepoint inside a batch stay in it;
+flush callbacks re-read current state, so that only costs a re-check.)
+
+Outside a transaction Django runs on_commit callbacks at once, so `flush`
+runs immediately.
+"""
+from __future__ import annotations
+
+from typing import Callable, Hashable, Iterable, Optional
+
+from django.db import transaction
+
+_ATTR = "_cc_on_commit_batches"
+
+
+def _registered(conn, callback) -> bool:
+    # Callbacks of a rolled-back transaction or savepoint are discarded
+    return any(entry[1] is callback for entry in conn.run_on_commit)
+
+
+def defer(tag: str, keys: Iterable[Hashable], flush: Callable[[set], None], *, using: Optional[str] = None) -> None:
+    """Add `keys` to the transaction's `tag` batch; `flush(batch)` runs once after commit."""
+    keys = {k for k in keys if k}
+    if not keys:
+        return
+    conn = transaction.get_connection(using)
+    batches = conn.__dict__.setdefault(_ATTR, {})
+    entry = batches.get(tag)
+    if entry is not None and _registered(conn, entry[1]):
+        entry[0].update(keys)
+        return
+
+    batch: set = set(keys)
+
+    def run() -> None:
+        if batches.get(tag, (None,))[0] is batch:
+            del batches[tag]
+        flush(batch)
+
+    batches[tag] = (batch, run)
+    transaction.on_commit(run, using=using)
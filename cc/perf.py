@@ -0,0 +1,253 @@
+# cc/perf.py
+"""
+Per-request profiling used by cc.middleware.AccessLogMiddleware.
+
+- SQL: count, total time and repeated statements (N+1) via DB execute wrappers.
+- Cache: hits/misses on every configured cache backend.
+- Templates: time spent in top-level template renders.
+- Per-endpoint p50/p95/max kept in small per-process ring buffers and served
+  to HQ by cc.views.perf_report.
+- Session writes: every request (sampled or not) is counted, with whether
+  it ends in a session save, so writes per request can be watched.
+
+Only sampled requests are profiled (settings.PERF_SAMPLE_RATE, default 5%
+outside DEBUG); the rest pay one random() call.
+"""
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Optional
+
+from asgiref.local import Local
+from django.conf import settings
+from django.db import connections
+
+_local = Local()  # follows the request across sync_to_async hops under ASGI
+
+# A statement repeated this many times in one request is reported as N+1
+DUP_THRESHOLD = int(getattr(settings, "PERF_DUP_THRESHOLD", 5))
+WINDOW = int(getattr(settings, "PERF_WINDOW", 500))  # samples kept per endpoint
+
+
+def sample_rate() -> float:
+    return float(getattr(settings, "PERF_SAMPLE_RATE", 1.0 if settings.DEBUG else 0.05))
+
+
+class RequestProfile:
+    __slots__ = ("started", "queries", "db_s", "sql", "cache_hits", "cache_misses", "tpl_s", "_tpl_depth")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_s = 0.0
+        self.sql: Counter = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.tpl_s = 0.0
+        self._tpl_depth = 0
+
+    # -- DB execute wrapper --
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_s += time.perf_counter() - t0
+            self.queries += 1
+            self.sql[sql] += 1
+
+    def duplicates(self) -> list[tuple[str, int]]:
+        return [(s, n) for s, n in self.sql.most_common(3) if n >= DUP_THRESHOLD]
+
+    def fields(self) -> dict:
+        dups = self.duplicates()
+        return {
+            "db_queries": self.queries,
+            "db_ms": round(self.db_s * 1000, 1),
+            "db_dup_max": max(self.sql.values(), default=0),
+            "n_plus_one": [{"sql": s[:200], "count": n} for s, n in dups],
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "tpl_ms": round(self.tpl_s * 1000, 1),
+        }
+
+    def server_timing(self, total_ms: float) -> str:
+        return ", ".join([
+            f'db;dur={self.db_s * 1000:.1f};desc="{self.queries} queries"',
+            f"tpl;dur={self.tpl_s * 1000:.1f}",
+            f'cache;desc="{self.cache_hits} hit / {self.cache_misses} miss"',
+            f"total;dur={total_ms:.1f}",
+        ])
+
+
+def current() -> Optional[RequestProfile]:
+    return getattr(_local, "profile", None)
+
+
+def should_sample() -> bool:
+    rate = sample_rate()
+    return rate > 0 and (rate >= 1 or random.random() < rate)
+
+
+def start() -> RequestProfile:
+    _install_hooks()
+    prof = RequestProfile()
+    _local.profile = prof
+    # all() builds the (lazy) wrapper for every alias; no connection is opened here
+    for conn in connections.all():
+        conn.execute_wrappers.append(prof)
+    return prof
+
+
+def stop(prof: RequestProfile) -> None:
+    for conn in connections.all():
+        try:
+            conn.execute_wrappers.remove(prof)
+        except ValueError:
+            pass
+    _local.profile = None
+
+
+# ---------------------------------------------------------------------
+# Cache / template hooks (installed once, no-ops unless a profile is active)
+# ---------------------------------------------------------------------
+_hooks_installed = False
+_hooks_lock = threading.Lock()
+_MISSING = object()
+
+
+def _wrap_cache_class(cls) -> None:
+    if getattr(cls, "_cc_perf_wrapped", False):
+        return
+    orig_get, orig_get_many = cls.get, cls.get_many
+
+    # Backends take extra arguments (django-redis: client=); pass them through
+    def get(self, key, default=None, *args, **kwargs):
+        prof = current()
+        if prof is None:
+            return orig_get(self, key, default, *args, **kwargs)
+        val = orig_get(self, key, _MISSING, *args, **kwargs)
+        if val is _MISSING:
+            prof.cache_misses += 1
+            return default
+        prof.cache_hits += 1
+        return val
+
+    def get_many(self, keys, *args, **kwargs):
+        prof = current()
+        res = orig_get_many(self, keys, *args, **kwargs)
+        if prof is not None:
+            keys = list(keys)
+            prof.cache_hits += len(res)
+            prof.cache_misses += len(keys) - len(res)
+        return res
+
+    cls.get, cls.get_many = get, get_many
+    cls._cc_perf_wrapped = True
+
+
+def _wrap_templates() -> None:
+    from django.template.backends.django import Template
+
+    if getattr(Template, "_cc_perf_wrapped", False):
+        return
+    orig_render = Template.render
+
+    def render(self, context=None, request=None):
+        prof = current()
+        if prof is None:
+            return orig_render(self, context, request)
+        prof._tpl_depth += 1
+        t0 = time.perf_counter()
+        try:
+            return orig_render(self, context, request)
+        finally:
+            prof._tpl_depth -= 1
+            if prof._tpl_depth == 0:
+                prof.tpl_s += time.perf_counter() - t0
+
+    Template.render = render
+    Template._cc_perf_wrapped = True
+
+
+def _install_hooks() -> None:
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    with _hooks_lock:
+        if _hooks_installed:
+            return
+        from django.core.cache import caches
+
+        for alias in settings.CACHES:
+            try:
+                _wrap_cache_class(type(caches[alias]))
+            except Exception:
+                pass
+        try:
+            _wrap_templates()
+        except Exception:
+            pass
+        _hooks_installed = True
+
+
+# ---------------------------------------------------------------------
+# Per-endpoint aggregates (per process)
+# ---------------------------------------------------------------------
+_stats: dict[str, deque] = defaultdict(lambda: deque(maxlen=WINDOW))
+_stats_lock = threading.Lock()
+
+
+_session_counts = {"requests": 0, "session_writes": 0}
+
+
+def count_request(session_write: bool) -> None:
+    with _stats_lock:
+        _session_counts["requests"] += 1
+        _session_counts["session_writes"] += int(session_write)
+
+
+def record(endpoint: str, total_ms: float, prof: RequestProfile, session_write: bool = False) -> None:
+    with _stats_lock:
+        _stats[endpoint].append((total_ms, prof.db_s * 1000, prof.queries, int(session_write)))
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(round(p * (len(values) - 1))))], 1)
+
+
+def endpoint_report() -> dict:
+    with _stats_lock:
+        snap = {k: list(v) for k, v in _stats.items()}
+        counts = dict(_session_counts)
+    rows = []
+    for endpoint, samples in snap.items():
+        lat = [s[0] for s in samples]
+        db = [s[1] for s in samples]
+        q = [s[2] for s in samples]
+        rows.append({
+            "endpoint": endpoint,
+            "samples": len(samples),
+            "p50_ms": _pct(lat, 0.50),
+            "p95_ms": _pct(lat, 0.95),
+            "max_ms": round(max(lat), 1),
+            "db_p95_ms": _pct(db, 0.95),
+            "queries_p95": _pct(q, 0.95),
+            "session_writes_per_req": round(sum(s[3] for s in samples) / len(samples), 2),
+        })
+    rows.sort(key=lambda r: r["p95_ms"], reverse=True)
+    counts["session_writes_per_req"] = round(counts["session_writes"] / counts["requests"], 3) if counts["requests"] else 0.0
+    return {"pid": os.getpid(), "sample_rate": sample_rate(), "window": WINDOW, "sessions": counts, "endpoints": rows}
+
+
+def reset() -> None:
+    with _stats_lock:
+        _stats.clear()
+        _session_counts.update(requests=0, session_writes=0)
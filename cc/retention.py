@@ -0,0 +1,448 @@
+# cc/retention.py
+"""
+Tiered retention for append-only log tables (used by `manage.py archive_cold_rows`).
+
+Tiers:
+- hot:     rows newer than the table's `hot_days` stay in the database.
+- archive: older rows move to gzip JSONL segments under RETENTION_ARCHIVE_DIR,
+           partitioned by day: <table>/<YYYY-MM>/<YYYY-MM-DD>.<seq>.jsonl.gz.
+           The directory must be set explicitly and already exist (a
+           mounted persistent disk); nothing is archived or deleted without
+           it, since segments on an ephemeral filesystem vanish on deploy.
+           Each segment has a small `.idx.json` sidecar with its row count,
+           date span, business ids and entity_id -> line numbers.
+- expired: segments older than `keep_days` (None = forever) are deleted.
+
+Segments are written (tmp file + rename) before their rows are deleted, so
+a crash leaves rows duplicated in both tiers, never lost; `search()` drops
+archived copies of rows that are still hot.
+
+Tables marked `chain` (inventory audits) are archived into a hash chain: each
+line stores sha256(prev hash + row) and each segment records the chain hash
+it starts from and ends on, continuing from the table's HEAD file.
+`verify()` re-walks the chain across all remaining segments.
+
+`search()` reads the hot table and, when the requested range reaches past the
+hot horizon, the archive segments whose index matches (by day, business and
+entity id), and merges them newest first. Its reader is the inventory audit
+CSV export (inventory.views_export, ?include_archive=1).
+
+Per-table horizons can be overridden in settings:
+    RETENTION_POLICIES = {"webhook_event": {"hot_days": 30, "keep_days": 365}}
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class Policy:
+    table: str
+    model: str  # "app_label.ModelName"
+    date_field: str
+    entity_field: str  # attname indexed for entity lookups
+    hot_days: int
+    keep_days: Optional[int] = None
+    chain: bool = False
+    text_fields: tuple[str, ...] = ()
+    # Only rows matching this stay eligible (e.g. finished webhooks, read notices)
+    eligible: dict = field(default_factory=dict)
+
+
+DEFAULT_POLICIES = (
+    Policy("inventory_audit", "inventory.InventoryAudit", "at", "item_id", hot_days=180, chain=True,
+           text_fields=("action", "details")),
+    Policy("warranty_check", "inventory.WarrantyCheckLog", "created_at", "imei", hot_days=90,
+           text_fields=("imei", "result", "notes")),
+    # Archived webhooks lose their idempotency key; providers stop retrying long before this
+    Policy("webhook_event", "billing.WebhookEvent", "received_at", "external_id", hot_days=90, keep_days=730,
+           text_fields=("provider", "event_type", "external_id"),
+           eligible={"status__in": ("done", "ignored", "dead")}),
+    Policy("time_log", "inventory.TimeLog", "ts", "user_id", hot_days=400),
+    # Unread notices stay hot so InboxCounter totals keep matching the table
+    Policy("notification", "notifications.Notification", "created_at", "user_id", hot_days=90, keep_days=365,
+           text_fields=("message",), eligible={"read_at__isnull": False}),
+)
+
+
+def policies() -> dict[str, Policy]:
+    """Policies for installed models, with RETENTION_POLICIES overrides applied."""
+    overrides = getattr(settings, "RETENTION_POLICIES", {}) or {}
+    out = {}
+    for p in DEFAULT_POLICIES:
+        try:
+            apps.get_model(p.model)
+        except LookupError:
+            continue
+        out[p.table] = replace(p, **{k: v for k, v in overrides.get(p.table, {}).items()
+                                     if k in ("hot_days", "keep_days")})
+    return out
+
+
+def _model(policy: Policy):
+    return apps.get_model(policy.model)
+
+
+def _root() -> Path:
+    root = getattr(settings, "RETENTION_ARCHIVE_DIR", None)
+    if not root:
+        raise RuntimeError("RETENTION_ARCHIVE_DIR is not set; point it at persistent storage to archive rows")
+    root = Path(root)
+    if not root.is_dir():
+        raise RuntimeError(f"RETENTION_ARCHIVE_DIR {root} does not exist; mount persistent storage there first")
+    return root
+
+
+def archive_configured() -> bool:
+    try:
+        _root()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _cutoff(policy: Policy, now: Optional[datetime] = None) -> datetime:
+    return (now or timezone.now()) - timedelta(days=policy.hot_days)
+
+
+def _attnames(model) -> list[str]:
+    return [f.attname for f in model._meta.concrete_fields]
+
+
+def _encode(row: dict) -> dict:
+    """JSON-safe copy of a values() row (datetimes, decimals and UUIDs as strings)."""
+    return json.loads(json.dumps(row, cls=DjangoJSONEncoder))
+
+
+def _canonical(row: dict) -> bytes:
+    return json.dumps(row, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _link(prev: str, row: dict) -> str:
+    return hashlib.sha256(prev.encode() + _canonical(row)).hexdigest()
+
+
+def _row_day(value) -> date:
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+# ---------------------------------------------------------------------
+# Segments on disk
+# ---------------------------------------------------------------------
+def _table_dir(policy: Policy) -> Path:
+    return _root() / policy.table
+
+
+def _head_path(policy: Policy) -> Path:
+    return _table_dir(policy) / "HEAD.json"
+
+
+def _read_head(policy: Policy) -> dict:
+    try:
+        return json.loads(_head_path(policy).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"seq": 0, "hash": ""}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def _segment_paths(policy: Policy, day: date, seq: int) -> tuple[Path, Path]:
+    base = _table_dir(policy) / f"{day:%Y-%m}" / f"{day.isoformat()}.{seq:06d}"
+    return base.with_name(base.name + ".jsonl.gz"), base.with_name(base.name + ".idx.json")
+
+
+def _indexes(policy: Policy) -> list[dict]:
+    """Segment indexes for a table, in chain (sequence) order."""
+    out = []
+    for path in _table_dir(policy).glob("*/*.idx.json"):
+        idx = json.loads(path.read_text(encoding="utf-8"))
+        idx["_path"] = str(path.with_name(path.name[: -len(".idx.json")] + ".jsonl.gz"))
+        idx["_index_path"] = str(path)
+        out.append(idx)
+    return sorted(out, key=lambda i: i["seq"])
+
+
+def _write_segment(policy: Policy, day: date, seq: int, rows: list[dict], prev: str) -> dict:
+    start = prev
+    lines, entities, businesses = [], {}, set()
+    for n, row in enumerate(rows):
+        record = {"row": row}
+        if policy.chain:
+            prev = _link(prev, row)
+            record["hash"] = prev
+        lines.append(json.dumps(record, sort_keys=True, separators=(",", ":")))
+        key = row.get(policy.entity_field)
+        if key not in (None, ""):
+            entities.setdefault(str(key), []).append(n)
+        if row.get("business_id") is not None:
+            businesses.add(row["business_id"])
+    data, index_path = _segment_paths(policy, day, seq)
+    blob = gzip.compress(("\n".join(lines) + "\n").encode(), mtime=0)
+    dates = [r[policy.date_field] for r in rows]
+    index = {
+        "table": policy.table,
+        "seq": seq,
+        "day": day.isoformat(),
+        "count": len(rows),
+        "first": min(dates),
+        "last": max(dates),
+        "businesses": sorted(businesses),
+        "entities": entities,
+        "sha256": hashlib.sha256(blob).hexdigest(),
+    }
+    if policy.chain:
+        index["prev"], index["head"] = start, prev
+    _write_atomic(data, blob)
+    _write_atomic(index_path, json.dumps(index, sort_keys=True).encode())
+    index["_path"], index["_index_path"] = str(data), str(index_path)
+    return index
+
+
+def _read_segment(index: dict) -> Iterator[dict]:
+    with gzip.open(index["_path"], "rt", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _unlink(index: dict) -> None:
+    for key in ("_path", "_index_path"):
+        try:
+            os.remove(index[key])
+        except (KeyError, FileNotFoundError):
+            pass
+
+
+# ---------------------------------------------------------------------
+# Archive / expire / verify
+# ---------------------------------------------------------------------
+@dataclass
+class RunResult:
+    table: str
+    archived: int = 0
+    segments: int = 0
+    expired: int = 0
+
+
+def archive_table(
+    policy: Policy,
+    *,
+    now: Optional[datetime] = None,
+    batch_size: int = BATCH_SIZE,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+) -> RunResult:
+    """Move rows past the hot horizon into day segments, then delete them."""
+    from django.core.cache import cache
+
+    model = _model(policy)
+    pk = model._meta.pk.attname
+    qs = model._base_manager.filter(**{f"{policy.date_field}__lt": _cutoff(policy, now)}, **policy.eligible)
+    result = RunResult(policy.table)
+    if dry_run:
+        result.archived = qs.count() if limit is None else min(qs.count(), limit)
+        return result
+
+    _root()  # before anything is deleted
+    lock = f"retention:lock:{policy.table}"
+    if not cache.add(lock, 1, 3600):
+        raise RuntimeError(f"{policy.table}: another archive run holds the lock")
+    try:
+        head = _read_head(policy)
+        attnames = _attnames(model)
+        while limit is None or result.archived < limit:
+            take = batch_size if limit is None else min(batch_size, limit - result.archived)
+            batch = list(qs.order_by(policy.date_field, pk).values(*attnames)[:take])
+            if not batch:
+                break
+            by_day: dict[date, list[dict]] = {}
+            for raw in batch:
+                by_day.setdefault(_row_day(raw[policy.date_field]), []).append(_encode(raw))
+
+            before, written = dict(head), []
+            try:
+                for day in sorted(by_day):
+                    head["seq"] += 1
+                    index = _write_segment(policy, day, head["seq"], by_day[day], head["hash"])
+                    written.append(index)
+                    head["hash"] = index.get("head", head["hash"])
+                _write_atomic(_head_path(policy), json.dumps(head).encode())
+                with transaction.atomic():
+                    model._base_manager.filter(pk__in=[raw[pk] for raw in batch]).delete()
+            except Exception:
+                for index in written:
+                    _unlink(index)
+                _write_atomic(_head_path(policy), json.dumps(before).encode())
+                raise
+            result.archived += len(batch)
+            result.segments += len(written)
+    finally:
+        cache.delete(lock)
+    return result
+
+
+def expire_table(policy: Policy, *, now: Optional[datetime] = None, dry_run: bool = False) -> int:
+    """Delete archive segments older than `keep_days`; returns how many."""
+    if policy.keep_days is None:
+        return 0
+    horizon = timezone.localdate(now or timezone.now()) - timedelta(days=policy.keep_days)
+    expired = [i for i in _indexes(policy) if date.fromisoformat(i["day"]) < horizon]
+    if not dry_run:
+        for index in expired:
+            _unlink(index)
+    return len(expired)
+
+
+def verify(policy: Policy) -> dict:
+    """
+    Check every remaining segment against its recorded digest and, for chain
+    tables, recompute the hash chain across segments. The first remaining
+    segment's starting hash is taken as given (earlier ones may have expired).
+    """
+    checked, prev = 0, None
+    for index in _indexes(policy):
+        where = f"{policy.table} segment {index['seq']} ({index['day']})"
+        with open(index["_path"], "rb") as fh:
+            if hashlib.sha256(fh.read()).hexdigest() != index["sha256"]:
+                return {"ok": False, "checked": checked, "broken_at": where, "reason": "digest mismatch"}
+        if policy.chain:
+            if prev is not None and index["prev"] != prev:
+                return {"ok": False, "checked": checked, "broken_at": where, "reason": "chain gap"}
+            h = index["prev"]
+            for n, record in enumerate(_read_segment(index)):
+                h = _link(h, record["row"])
+                if h != record.get("hash"):
+                    return {"ok": False, "checked": checked, "broken_at": f"{where} line {n}",
+                            "reason": "hash mismatch"}
+                checked += 1
+            if h != index["head"]:
+                return {"ok": False, "checked": checked, "broken_at": where, "reason": "head mismatch"}
+            prev = h
+        else:
+            checked += index["count"]
+    if policy.chain and prev is not None and _read_head(policy)["hash"] != prev:
+        return {"ok": False, "checked": checked, "broken_at": f"{policy.table} HEAD", "reason": "head mismatch"}
+    return {"ok": True, "checked": checked, "broken_at": None, "reason": ""}
+
+
+# ---------------------------------------------------------------------
+# Query both tiers
+# ---------------------------------------------------------------------
+def _aware(value, *, end: bool = False) -> Optional[datetime]:
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.max.time() if end else datetime.min.time())
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _when(value) -> datetime:
+    from django.utils.dateparse import parse_datetime
+
+    return _aware(parse_datetime(value) if isinstance(value, str) else value)
+
+
+def search(
+    table: str,
+    *,
+    business_id: Optional[int] = None,
+    entity_id=None,
+    start=None,
+    end=None,
+    q: Optional[str] = None,
+    limit: int = 100,
+) -> list[dict]:
+    """
+    Newest-first rows from the hot table and the archive, as JSON-safe dicts
+    with a `_tier` key ("hot" or "archive"). `start`/`end` are inclusive
+    dates or datetimes; `q` is a case-insensitive match on the table's text
+    fields.
+    """
+    policy = policies()[table]
+    model = _model(policy)
+    df, pk = policy.date_field, model._meta.pk.attname
+    attnames = _attnames(model)
+    start, end = _aware(start), _aware(end, end=True)
+    if business_id is not None and "business_id" not in attnames:
+        business_id = None
+    needle = (q or "").strip().lower()
+
+    qs = model._base_manager.all()
+    if business_id is not None:
+        qs = qs.filter(business_id=business_id)
+    if entity_id not in (None, ""):
+        qs = qs.filter(**{policy.entity_field: entity_id})
+    if start:
+        qs = qs.filter(**{f"{df}__gte": start})
+    if end:
+        qs = qs.filter(**{f"{df}__lte": end})
+    if needle and policy.text_fields:
+        cond = Q()
+        for name in policy.text_fields:
+            cond |= Q(**{f"{name}__icontains": needle})
+        qs = qs.filter(cond)
+    rows = [{**_encode(r), "_tier": "hot"} for r in qs.order_by(f"-{df}", f"-{pk}").values(*attnames)[:limit]]
+    hot_pks = {r[pk] for r in rows}
+
+    # Archived rows are all older than the hot horizon; no archive, hot rows only
+    if (start is None or start < _cutoff(policy)) and archive_configured():
+        found: list[dict] = []
+        first_day = timezone.localdate(start) if start else None
+        last_day = timezone.localdate(end) if end else None
+        for index in sorted(_indexes(policy), key=lambda i: (i["day"], i["seq"]), reverse=True):
+            day = date.fromisoformat(index["day"])
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            if len(found) >= limit and day < _when(found[-1][df]).date():
+                break
+            if business_id is not None and business_id not in index["businesses"]:
+                continue
+            lines = None
+            if entity_id not in (None, ""):
+                lines = set(index["entities"].get(str(entity_id), ()))
+                if not lines:
+                    continue
+            for n, record in enumerate(_read_segment(index)):
+                row = record["row"]
+                if lines is not None and n not in lines:
+                    continue
+                if business_id is not None and row.get("business_id") != business_id:
+                    continue
+                when = _when(row[df])
+                if (start and when < start) or (end and when > end):
+                    continue
+                if needle and not any(needle in str(row.get(f) or "").lower() for f in policy.text_fields):
+                    continue
+                if row[pk] not in hot_pks:
+                    found.append({**row, "_tier": "archive"})
+            found.sort(key=lambda r: (_when(r[df]), str(r[pk])), reverse=True)
+        rows.extend(found)
+
+    rows.sort(key=lambda r: (_when(r[df]), str(r[pk])), reverse=True)
+    return rows[:limit]
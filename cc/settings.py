@@ -68,6 +68,8 @@ SECRET_KEY = os.environ.get(
 IS_RUNSERVER = any(arg in sys.argv for arg in ("runserver", "runserver_plus"))
 DEBUG = env_bool("DEBUG", IS_RUNSERVER)
 TESTING = any(arg in sys.argv for arg in ("test", "pytest"))
+# Set by cc/asgi.py: the process is serving ASGI (uvicorn), not sync workers
+ASGI_MODE = env_bool("CC_ASGI", False)
 ON_RENDER = env_bool("RENDER", False) or ("RENDER" in os.environ)
 
 # Allow from env first, else sane defaults (Render host, localhost, etc.)
@@ -135,7 +137,7 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 SESSION_COOKIE_SAMESITE = os.environ.get("SESSION_COOKIE_SAMESITE", "Lax")
 CSRF_COOKIE_SAMESITE = os.environ.get("CSRF_COOKIE_SAMESITE", "Lax")
 SESSION_COOKIE_AGE = 60 * 60 * 4
-SESSION_ENGINE = "django.contrib.sessions.backends.db"
+# SESSION_ENGINE is chosen with the cache below
 
 # Canonical session key for active tenant (used by middleware/utils)
 TENANT_SESSION_KEY = os.environ.get("TENANT_SESSION_KEY", "active_business_id")
@@ -171,18 +173,18 @@ INSTALLED_APPS += [a for a in (
     _optional_app("django_extensions"),
 ) if a]
 
-print("[cc.settings] Final INSTALLED_APPS:", INSTALLED_APPS)
-
 # --------------------------- middleware ---------------------------
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "cc.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "cc.middleware.RequestIDMiddleware",
     "cc.middleware.AccessLogMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "cc.middleware.ReplicaPinMiddleware",
+    "tenants.middleware.PrincipalMiddleware",
 
     # HQ admins stay in HQ
     "cc.middleware.PreventHQFromClientUI",
@@ -194,9 +196,13 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
-print("[cc.settings] Final MIDDLEWARE:", MIDDLEWARE)
-print(f"[cc.settings] SSL flags → DEBUG={DEBUG} RUNSERVER={IS_RUNSERVER} "
-      f"SECURE_SSL_REDIRECT={SECURE_SSL_REDIRECT} SESSION_COOKIE_SECURE={SESSION_COOKIE_SECURE} CSRF_COOKIE_SECURE={CSRF_COOKIE_SECURE}")
+
+# Startup diagnostics are opt-in: settings load on every worker boot and cron run
+if env_bool("SETTINGS_VERBOSE", False):
+    print("[cc.settings] Final INSTALLED_APPS:", INSTALLED_APPS)
+    print("[cc.settings] Final MIDDLEWARE:", MIDDLEWARE)
+    print(f"[cc.settings] SSL flags → DEBUG={DEBUG} RUNSERVER={IS_RUNSERVER} "
+          f"SECURE_SSL_REDIRECT={SECURE_SSL_REDIRECT} SESSION_COOKIE_SECURE={SESSION_COOKIE_SECURE} CSRF_COOKIE_SECURE={CSRF_COOKIE_SECURE}")
 
 ROOT_URLCONF = "cc.urls"
 
@@ -236,9 +242,45 @@ REQUIRE_DATABASE_URL = env_bool("REQUIRE_DATABASE_URL", False)
 PGCONNECT_TIMEOUT = env_int("PGCONNECT_TIMEOUT", 5)
 
 # DB connection resiliency
-DB_CONN_MAX_AGE = env_int("DB_CONN_MAX_AGE", 120)  # seconds
+# ASGI runs each request's sync code in its own thread, so a persistent
+# connection would be left open per thread; close them per request instead.
+DB_CONN_MAX_AGE = env_int("DB_CONN_MAX_AGE", 0 if ASGI_MODE else 120)  # seconds
 DB_CONN_HEALTH_CHECKS = env_bool("DB_CONN_HEALTH_CHECKS", True)
 
+# Pooled mode (DB_POOL=1; PostgreSQL with psycopg 3): each process keeps one
+# bounded pool shared by its threads, so threaded workers (GUNICORN_THREADS)
+# or ASGI do not hold a connection per thread. Connections are checked on
+# checkout (DB_CONN_HEALTH_CHECKS) and replaced after DB_POOL_MAX_LIFETIME;
+# a request waits up to DB_POOL_TIMEOUT for a free one. Usage and overflow
+# per process: cc.db_pool.pool_stats() (HQ perf report).
+DB_POOL = env_bool("DB_POOL", False)
+DB_POOL_MIN_SIZE = env_int("DB_POOL_MIN_SIZE", 1)
+DB_POOL_MAX_SIZE = env_int("DB_POOL_MAX_SIZE", 4)
+DB_POOL_TIMEOUT = env_int("DB_POOL_TIMEOUT", 10)             # seconds
+DB_POOL_MAX_LIFETIME = env_int("DB_POOL_MAX_LIFETIME", 1800)  # seconds
+DB_POOL_MAX_IDLE = env_int("DB_POOL_MAX_IDLE", 300)           # seconds before shrinking back to min
+
+
+def db_connection_settings(cfg: dict, *, pool: bool = DB_POOL) -> dict:
+    """Connection handling for a PostgreSQL DATABASES entry: persistent or pooled."""
+    if not cfg.get("ENGINE", "").endswith("postgresql"):
+        return cfg
+    opts = dict(cfg.get("OPTIONS") or {})
+    opts.setdefault("connect_timeout", PGCONNECT_TIMEOUT)
+    if pool:
+        opts["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": max(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE),
+            "timeout": DB_POOL_TIMEOUT,
+            "max_lifetime": DB_POOL_MAX_LIFETIME,
+            "max_idle": DB_POOL_MAX_IDLE,
+        }
+        cfg["CONN_MAX_AGE"] = 0  # the pool keeps connections, not the thread
+    cfg["OPTIONS"] = opts
+    cfg["CONN_HEALTH_CHECKS"] = DB_CONN_HEALTH_CHECKS
+    return cfg
+
+
 if TESTING:
     DATABASES["default"] = {
         "ENGINE": "django.db.backends.sqlite3",
@@ -256,12 +298,8 @@ elif DATABASE_URL:
         conn_max_age=DB_CONN_MAX_AGE,
         ssl_require=not DEBUG,
     )
-    # OPTIONS & health checks
-    opts = dict(cfg.get("OPTIONS") or {})
-    opts.setdefault("connect_timeout", PGCONNECT_TIMEOUT)
-    cfg["OPTIONS"] = opts
-    cfg["CONN_HEALTH_CHECKS"] = DB_CONN_HEALTH_CHECKS
-    DATABASES["default"] = cfg
+    # OPTIONS, health checks and pooling
+    DATABASES["default"] = db_connection_settings(cfg)
 elif USE_LOCAL_SQLITE:
     sqlite_path = str(BASE_DIR / "db.sqlite3")
     DATABASES["default"] = {"ENGINE": "django.db.backends.sqlite3", "NAME": sqlite_path}
@@ -271,7 +309,7 @@ else:
     PASSWORD = os.environ.get("POSTGRES_PASSWORD") or os.environ.get("DB_PASSWORD", "")
     HOST = os.environ.get("POSTGRES_HOST") or os.environ.get("DB_HOST", "127.0.0.1")
     PORT = os.environ.get("POSTGRES_PORT") or os.environ.get("DB_PORT", "5432")
-    DATABASES["default"] = {
+    DATABASES["default"] = db_connection_settings({
         "ENGINE": "django.db.backends.postgresql",
         "NAME": NAME,
         "USER": USER,
@@ -284,7 +322,32 @@ else:
             "connect_timeout": PGCONNECT_TIMEOUT,
             **({"sslmode": "require"} if not DEBUG else {}),
         },
-    }
+    })
+
+# --------------------------- read replica ---------------------------
+# Opted-in report reads (cc.db_router.read_replica / replica_reads) go to this
+# alias; writes, pinned sessions and a lagging replica use "default".
+READ_REPLICA_ALIAS = "replica"
+DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL", "").strip()
+READ_REPLICA = env_bool("READ_REPLICA", bool(DATABASE_REPLICA_URL))
+REPLICA_MAX_LAG = env_int("REPLICA_MAX_LAG", 10)              # seconds behind before falling back
+REPLICA_CHECK_INTERVAL = env_int("REPLICA_CHECK_INTERVAL", 5)  # seconds between lag checks
+REPLICA_PIN_SECONDS = env_int("REPLICA_PIN_SECONDS", 15)       # primary-only after a session writes
+
+if DATABASE_REPLICA_URL:
+    import dj_database_url  # type: ignore
+
+    _replica = db_connection_settings(
+        dj_database_url.parse(DATABASE_REPLICA_URL, conn_max_age=DB_CONN_MAX_AGE, ssl_require=not DEBUG)
+    )
+else:
+    # No replica: the alias is a second connection to the primary, so
+    # READ_REPLICA=1 can be tried locally and tests can exercise routing
+    _replica = dict(DATABASES["default"])
+_replica["TEST"] = {"MIRROR": "default"}
+DATABASES[READ_REPLICA_ALIAS] = _replica
+
+DATABASE_ROUTERS = ["cc.db_router.ReplicaRouter"]
 
 # --------------------------- cache ---------------------------
 CACHE_TTL_DEFAULT = env_int("CACHE_TTL_DEFAULT", 60)
@@ -307,6 +370,48 @@ else:
         }
     }
 
+# Sessions: with a shared cache, reads come from the cache and writes go to
+# both (DB stays the fallback). A per-process locmem cache would serve stale
+# sessions across workers, so without Redis we stay on the plain DB backend.
+SESSION_ENGINE = os.environ.get(
+    "SESSION_ENGINE",
+    "django.contrib.sessions.backends.cached_db" if REDIS_URL else "django.contrib.sessions.backends.db",
+)
+
+# Dashboard/chart JSON APIs answer 304 when the tenant's data version is
+# unchanged. The version lives in the cache, so this needs a shared cache;
+# responses are at most DASHBOARD_ETAG_MAX_AGE seconds behind writes that
+# bypass model signals (queryset.update(), raw SQL).
+DASHBOARD_CONDITIONAL_GET = env_bool("DASHBOARD_CONDITIONAL_GET", bool(REDIS_URL))
+DASHBOARD_ETAG_MAX_AGE = env_int("DASHBOARD_ETAG_MAX_AGE", 300)
+
+# IMEI lookups (inventory.imei_lookup) keep a per-process LRU that other
+# workers invalidate through a token in the cache; without a shared cache
+# they would serve stale hits and misses, so every lookup reads the DB.
+IMEI_LOOKUP_CACHE = env_bool("IMEI_LOOKUP_CACHE", bool(REDIS_URL))
+
+# Scan catalog snapshots (inventory.catalog) are keyed by tokens that writes
+# rotate in the cache; without a shared cache other workers never see the
+# rotation, so the snapshot key is checked against the DB version instead.
+CATALOG_CACHE = env_bool("CATALOG_CACHE", bool(REDIS_URL))
+
+# Roles and memberships (tenants.principal) are cached across requests only
+# in a shared cache: invalidation from one worker must reach every worker,
+# or a revoked membership keeps access for PRINCIPAL_CACHE_TTL elsewhere.
+PRINCIPAL_CACHE = env_bool("PRINCIPAL_CACHE", bool(REDIS_URL))
+
+# Agent leaderboards (sales.leaderboard): boards are reused per process for
+# at most LEADERBOARD_CACHE_SECONDS; agents within LEADERBOARD_NUDGE_GAP
+# weekly sales of #1 get a nudge.
+LEADERBOARD_CACHE_SECONDS = env_int("LEADERBOARD_CACHE_SECONDS", 30)
+LEADERBOARD_NUDGE_GAP = env_int("LEADERBOARD_NUDGE_GAP", 2)
+
+# Long-poll (inventory api/changes/): how long a request may wait for new
+# data, and how often it re-reads the DB watermark meanwhile. Only under
+# ASGI; a sync worker answers at once instead of blocking.
+LONGPOLL_MAX_WAIT = env_int("LONGPOLL_MAX_WAIT", 25)
+LONGPOLL_INTERVAL = float(os.environ.get("LONGPOLL_INTERVAL", "2.0"))
+
 # --------------------------- auth / i18n ---------------------------
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -419,6 +524,30 @@ DISABLE_SALES_AUTOCREATE = env_bool("DISABLE_SALES_AUTOCREATE", True)
 DEBUG_PROPAGATE_EXCEPTIONS = DEBUG
 DEFAULT_EXCEPTION_REPORTER_FILTER = "django.views.debug.SafeExceptionReporterFilter"
 
+# Request profiling (cc.perf via AccessLogMiddleware); 0 disables sampling
+PERF_SAMPLE_RATE = float(os.environ.get("PERF_SAMPLE_RATE", "1.0" if DEBUG else "0.05"))
+PERF_SERVER_TIMING = env_bool("PERF_SERVER_TIMING", False)
+
+# Numbers each worker reserves per round trip for invoice/quote/layby sequences
+# (tenants.services.sequences); 1 keeps numbers strictly ordered across workers
+SEQUENCE_BLOCK_SIZE = env_int("SEQUENCE_BLOCK_SIZE", 1)
+
+# Webhook worker (billing.webhooks / manage.py process_webhooks)
+WEBHOOK_BATCH_SIZE = env_int("WEBHOOK_BATCH_SIZE", 100)
+WEBHOOK_MAX_ATTEMPTS = env_int("WEBHOOK_MAX_ATTEMPTS", 8)
+
+# Process pool size for simulator policy sweeps run from the web API. 1 keeps
+# a sweep inside the request's worker; 0 = one spawned process per CPU, which
+# only makes sense on a host sized for it.
+SIMULATOR_SWEEP_WORKERS = env_int("SIMULATOR_SWEEP_WORKERS", 1)
+
+# Cold-row archive for log tables (cc.retention / manage.py archive_cold_rows).
+# Must be an existing directory on persistent storage (e.g. a mounted disk;
+# the app's own filesystem is replaced on every deploy). Unset, nothing is
+# archived or purged. Per-table horizons go in RETENTION_POLICIES.
+RETENTION_ARCHIVE_DIR = Path(os.environ["RETENTION_ARCHIVE_DIR"]) if os.environ.get("RETENTION_ARCHIVE_DIR") else None
+RETENTION_POLICIES = {}
+
 # Minimal logging so template errors are obvious in console
 LOGGING = {
     "version": 1,
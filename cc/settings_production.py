@@ -16,9 +16,15 @@ _csrf_hosts = {f"https://{_render_host}"} if _render_host else set()
 _csrf_hosts.update({f"https://{h}" for h in ALLOWED_HOSTS if h and not h.startswith("http")})
 CSRF_TRUSTED_ORIGINS = sorted(_csrf_hosts | {"https://*.onrender.com"})
 
-# DB (Render gives DATABASE_URL); SSL & pooling
+# DB (Render gives DATABASE_URL); SSL & pooling (DB_POOL=1: see settings.db_connection_settings)
 DATABASES = {
-    "default": dj_database_url.config(conn_max_age=600, ssl_require=True)
+    "default": db_connection_settings(dj_database_url.config(conn_max_age=0 if ASGI_MODE else 600, ssl_require=True))
+}
+DATABASES[READ_REPLICA_ALIAS] = {
+    **(db_connection_settings(
+        dj_database_url.parse(DATABASE_REPLICA_URL, conn_max_age=0 if ASGI_MODE else 600, ssl_require=True)
+    ) if DATABASE_REPLICA_URL else DATABASES["default"]),
+    "TEST": {"MIRROR": "default"},
 }
 
 # Static files via WhiteNoise (no code changes needed)
@@ -27,12 +33,12 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 # Insert WhiteNoise middleware right after SecurityMiddleware if not already there
-if "whitenoise.middleware.WhiteNoiseMiddleware" not in MIDDLEWARE:
+if not any(m.endswith(".WhiteNoiseMiddleware") for m in MIDDLEWARE):
     try:
         idx = MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1
     except ValueError:
         idx = 0
-    MIDDLEWARE.insert(idx, "whitenoise.middleware.WhiteNoiseMiddleware")
+    MIDDLEWARE.insert(idx, "cc.middleware.WhiteNoiseMiddleware")
 
 # Render runs behind a proxy
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
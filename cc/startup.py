@@ -0,0 +1,136 @@
+# cc/startup.py
+"""
+Startup benchmark (used by `python manage.py bench_startup`).
+
+- `measure()` boots Django in fresh interpreters under `python -X importtime`,
+  loads the URLconf (what a gunicorn --preload worker does) and times it.
+- `attribute()` charges every imported module's own time to the project
+  app that first imported it, so a third-party library counts against the
+  app that pulled it in at startup.
+- Analytics libraries (HEAVY_MODULES) must not load during startup at all;
+  forecasting and simulation paths import them when they run.
+- `compare()` checks results against a stored baseline: any heavy module,
+  or total / per-app import time above baseline x tolerance plus a small
+  absolute slack (timings depend on the machine).
+"""
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "sklearn", "statsmodels", "matplotlib")
+TOTAL_SLACK_MS = 50.0
+APP_SLACK_MS = 10.0
+FRAMEWORK = "(framework)"
+
+PROBE = (
+    "import time; t0 = time.perf_counter(); import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns; "
+    "print(round((time.perf_counter() - t0) * 1000, 1))"
+)
+
+
+def project_modules() -> list[str]:
+    """Import paths of the project's own apps (plus the `cc` project package)."""
+    base = str(Path(settings.BASE_DIR).resolve())
+    names = [c.name for c in apps.get_app_configs() if str(Path(c.path).resolve()).startswith(base)]
+    return sorted(set(names) | {"cc"}, key=len, reverse=True)
+
+
+def _owner(module: str, local: list[str]) -> Optional[str]:
+    for name in local:
+        if module == name or module.startswith(name + "."):
+            return name
+    return None
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, str, int]]:
+    """(depth, module, self_us) rows from `-X importtime` output, in print order."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, rest = line.split("|", 2)
+        raw = rest[1:]  # one separator space, then two spaces per nesting level
+        rows.append(((len(raw) - len(raw.lstrip())) // 2, raw.strip(), int(self_us.split(":")[-1])))
+    return rows
+
+
+def attribute(rows: list[tuple[int, str, int]], local: list[str]) -> tuple[dict[str, float], list[str]]:
+    """({app: ms}, heavy modules seen). Rows print children before parents."""
+    per_app: dict[str, float] = {}
+    heavy = set()
+    owners: list[Optional[str]] = []
+    for depth, module, self_us in reversed(rows):
+        del owners[depth:]
+        owner = _owner(module, local) or (owners[-1] if owners else None)
+        owners.append(owner)
+        key = owner or FRAMEWORK
+        per_app[key] = per_app.get(key, 0.0) + self_us / 1000.0
+        top = module.split(".", 1)[0]
+        if top in HEAVY_MODULES:
+            heavy.add(top)
+    return {k: round(v, 1) for k, v in per_app.items()}, sorted(heavy)
+
+
+def _run_once(local: list[str]) -> tuple[float, dict[str, float], list[str]]:
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "cc.settings")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup probe failed:\n{proc.stderr[-2000:]}")
+    total = float(proc.stdout.strip().splitlines()[-1])
+    per_app, heavy = attribute(parse_importtime(proc.stderr), local)
+    return total, per_app, heavy
+
+
+def measure(repeat: int = 3) -> dict:
+    """Median total and per-app startup import time over `repeat` fresh interpreters."""
+    local = project_modules()
+    runs = [_run_once(local) for _ in range(max(1, repeat))]
+    labels = {k for _, per_app, _ in runs for k in per_app}
+    return {
+        "total_ms": round(statistics.median(t for t, _, _ in runs), 1),
+        "apps": {k: round(statistics.median(p.get(k, 0.0) for _, p, _ in runs), 1) for k in sorted(labels)},
+        "heavy": sorted({m for _, _, h in runs for m in h}),
+    }
+
+
+def compare(results: dict, baseline: dict, *, tolerance: float = 1.5) -> list[str]:
+    """Human-readable regression messages (empty list = no regressions)."""
+    problems = [f"heavy module loaded at startup: {m}" for m in results.get("heavy", [])]
+    if not baseline:
+        return problems
+    limit = baseline["total_ms"] * tolerance + TOTAL_SLACK_MS
+    if results["total_ms"] > limit:
+        problems.append(f"total: {baseline['total_ms']}ms -> {results['total_ms']}ms (limit {limit:.1f}ms)")
+    for app, ms in results["apps"].items():
+        if app == FRAMEWORK:
+            continue
+        limit = baseline.get("apps", {}).get(app, 0.0) * tolerance + APP_SLACK_MS
+        if ms > limit:
+            problems.append(f"{app}: {baseline.get('apps', {}).get(app, 0.0)}ms -> {ms}ms (limit {limit:.1f}ms)")
+    return problems
+
+
+def load_baseline(path: Path) -> dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8")).get("results", {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path: Path, results: dict) -> None:
+    payload = {"generated_at": timezone.now().isoformat(), "results": results}
+    Path(path).write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
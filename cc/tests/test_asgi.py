@@ -0,0 +1,99 @@
+# cc/tests/test_asgi.py
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.module_loading import import_string
+
+from billing.middleware import SubscriptionGateMiddleware
+from inventory.models import InventoryItem, Location, Product
+from inventory.views_poll import watermark
+from tenants.models import Business, Membership
+
+User = get_user_model()
+URL = "/inventory/api/changes/"
+
+
+class MiddlewareStackTests(SimpleTestCase):
+    def test_every_middleware_runs_without_a_thread_hop(self):
+        sync_only = [path for path in settings.MIDDLEWARE if not getattr(import_string(path), "async_capable", False)]
+        self.assertEqual(sync_only, [])
+
+    async def test_subscription_gate_is_async_under_asgi(self):
+        async def get_response(request):
+            return HttpResponse("ok")
+
+        gate = SubscriptionGateMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(gate))
+        response = await gate(RequestFactory().get("/static/app.css"))
+        self.assertEqual(response.content, b"ok")
+
+
+class LongPollTests(TestCase):
+    def setUp(self):
+        self.biz = Business.objects.create(name="Poll A", slug="poll-a", status="ACTIVE")
+        self.other = Business.objects.create(name="Poll B", slug="poll-b", status="ACTIVE")
+        self.loc = Location.objects.create(business=self.biz, name="Shop A")
+        self.other_loc = Location.objects.create(business=self.other, name="Shop B")
+        self.product = Product.objects.create(code="POLL-1", brand="Tecno", model="Spark 10")
+        self.user = User.objects.create_user("poll_manager", password="pass12345")
+        Membership.objects.create(user=self.user, business=self.biz, role="MANAGER", status="ACTIVE")
+
+    def _stock_in(self, biz=None, loc=None):
+        return InventoryItem._base_manager.create(
+            business=biz or self.biz, product=self.product, current_location=loc or self.loc
+        )
+
+    async def _poll(self, **params):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_watermark_moves_on_own_writes_only(self):
+        self.assertEqual(watermark(self.biz.id), "0-0")
+        item = self._stock_in()
+        first = watermark(self.biz.id)
+        self._stock_in(self.other, self.other_loc)
+        self.assertEqual(watermark(self.biz.id), first)
+        item.save()
+        self.assertNotEqual(watermark(self.biz.id), first)
+
+    def test_watermark_catches_a_late_commit_with_an_older_timestamp(self):
+        newest = self._stock_in()
+        before = watermark(self.biz.id)
+        late = self._stock_in()
+        InventoryItem._base_manager.filter(pk=late.pk).update(updated_at=newest.updated_at - timedelta(seconds=5))
+        self.assertNotEqual(watermark(self.biz.id), before)
+
+    async def test_first_call_returns_the_stamp(self):
+        body = await self._poll()
+        self.assertTrue(body["changed"])
+        self.assertIsInstance(body["stamp"], str)
+
+    async def test_sync_mode_answers_at_once(self):
+        stamp = (await self._poll())["stamp"]
+        body = await self._poll(since=stamp, wait=30)
+        self.assertEqual(body, {"stamp": stamp, "changed": False})
+
+    @override_settings(ASGI_MODE=True, LONGPOLL_MAX_WAIT=5, LONGPOLL_INTERVAL=0.02)
+    async def test_asgi_mode_wakes_on_a_tenant_write(self):
+        stamp = (await self._poll())["stamp"]
+
+        async def write_later():
+            await asyncio.sleep(0.1)
+            await sync_to_async(self._stock_in)()
+
+        loop = asyncio.get_running_loop()
+        writer = asyncio.create_task(write_later())
+        started = loop.time()
+        body = await self._poll(since=stamp)
+        await writer
+        self.assertTrue(body["changed"])
+        self.assertNotEqual(body["stamp"], stamp)
+        self.assertLess(loop.time() - started, 4)
+        self.assertEqual(body["stamp"], await sync_to_async(watermark)(self.biz.id))
@@ -0,0 +1,51 @@
+# cc/tests/test_db_pool.py
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from cc import db_pool
+from cc.settings import db_connection_settings
+
+PG = "django.db.backends.postgresql"
+
+
+class ConnectionModeTests(SimpleTestCase):
+    def test_pooled_mode_bounds_the_pool_and_drops_persistent_connections(self):
+        cfg = db_connection_settings({"ENGINE": PG, "NAME": "cc", "CONN_MAX_AGE": 120}, pool=True)
+        self.assertEqual(cfg["CONN_MAX_AGE"], 0)
+        self.assertEqual(set(cfg["OPTIONS"]["pool"]), {"min_size", "max_size", "timeout", "max_lifetime", "max_idle"})
+        self.assertGreaterEqual(cfg["OPTIONS"]["pool"]["max_size"], cfg["OPTIONS"]["pool"]["min_size"])
+        self.assertIn("connect_timeout", cfg["OPTIONS"])
+        self.assertIn("CONN_HEALTH_CHECKS", cfg)
+
+    def test_default_mode_keeps_persistent_connections(self):
+        cfg = db_connection_settings({"ENGINE": PG, "NAME": "cc", "CONN_MAX_AGE": 120}, pool=False)
+        self.assertEqual(cfg["CONN_MAX_AGE"], 120)
+        self.assertNotIn("pool", cfg["OPTIONS"])
+        sqlite = {"ENGINE": "django.db.backends.sqlite3", "NAME": "db.sqlite3"}
+        self.assertEqual(db_connection_settings(dict(sqlite), pool=True), sqlite)
+
+
+class PoolStatsTests(SimpleTestCase):
+    def _conn(self, stats):
+        pool = mock.Mock(closed=False, get_stats=mock.Mock(return_value=stats))
+        return mock.Mock(alias="default", vendor="postgresql", settings_dict={"OPTIONS": {"pool": True}}, pool=pool)
+
+    def test_stats_report_usage_and_overflow(self):
+        conn = self._conn({"pool_min": 1, "pool_max": 4, "pool_size": 4, "pool_available": 1,
+                           "requests_num": 50, "requests_queued": 7, "requests_errors": 2})
+        with mock.patch.object(db_pool.connections, "all", return_value=[conn]):
+            stats = db_pool.pool_stats()["default"]
+            db_pool.close_pools()
+        self.assertEqual((stats["in_use"], stats["overflow"]), (3, 3))
+        self.assertEqual((stats["waited"], stats["timeouts"]), (7, 2))
+        conn.close.assert_called_once()
+        conn.close_pool.assert_called_once()
+
+    def test_unpooled_connections_are_skipped(self):
+        conn = self._conn({})
+        conn.settings_dict = {"OPTIONS": {}}
+        with mock.patch.object(db_pool.connections, "all", return_value=[conn]):
+            self.assertEqual(db_pool.pool_stats(), {})
+            db_pool.close_pools()
+        conn.close_pool.assert_not_called()
@@ -0,0 +1,75 @@
+# cc/tests/test_db_router.py
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, router
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from cc import db_router
+from cc.db_router import replica_reads
+from inventory.models import Product
+from tenants.models import Business, Membership
+
+User = get_user_model()
+REPLICA = "replica"
+
+
+@override_settings(READ_REPLICA=True, READ_REPLICA_ALIAS=REPLICA, REPLICA_CHECK_INTERVAL=60)
+class ReplicaRouterTests(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        db_router._health.clear()
+        self.product = Product.objects.create(code="SPARK-20", brand="Tecno", model="Spark 20")
+        db_router._state.pinned, db_router._state.wrote_at = False, 0.0
+
+    def test_only_opted_in_reads_use_the_replica(self):
+        self.assertEqual(router.db_for_read(Product), DEFAULT_DB_ALIAS)
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Product), REPLICA)
+            product = Product.objects.get(pk=self.product.pk)
+            self.assertEqual(product._state.db, REPLICA)
+        # Objects read from the replica still save to the primary
+        self.assertEqual(router.db_for_write(Product, instance=product), DEFAULT_DB_ALIAS)
+        with override_settings(READ_REPLICA=False), replica_reads():
+            self.assertEqual(router.db_for_read(Product), DEFAULT_DB_ALIAS)
+
+    def test_lagging_or_unreachable_replica_falls_back(self):
+        with mock.patch.object(db_router, "replica_lag", return_value=60.0), replica_reads():
+            self.assertEqual(router.db_for_read(Product), DEFAULT_DB_ALIAS)
+        db_router._health.clear()
+        with mock.patch.object(db_router, "replica_lag", side_effect=OperationalError("down")), replica_reads():
+            self.assertEqual(router.db_for_read(Product), DEFAULT_DB_ALIAS)
+        db_router._health.clear()
+        with mock.patch.object(db_router, "replica_lag", return_value=2.0) as lag, replica_reads():
+            self.assertEqual(router.db_for_read(Product), REPLICA)
+            self.assertEqual(router.db_for_read(Product), REPLICA)
+        self.assertEqual(lag.call_count, 1)  # cached for REPLICA_CHECK_INTERVAL
+
+    def test_a_write_keeps_the_rest_of_the_block_on_the_primary(self):
+        with replica_reads():
+            Product.objects.create(code="POP-8", brand="Tecno", model="Pop 8")
+            self.assertEqual(router.db_for_read(Product), DEFAULT_DB_ALIAS)
+
+    def test_session_reads_its_own_writes(self):
+        biz = Business.objects.create(name="Replica A", slug="replica-a", status="ACTIVE")
+        user = User.objects.create_user("replica_manager", password="pass12345")
+        Membership.objects.create(user=user, business=biz, role="MANAGER", status="ACTIVE")
+        self.client.force_login(user)
+
+        def replica_queries():
+            cache.clear()  # the summary is cached between calls
+            with CaptureQueriesContext(connections[REPLICA]) as ctx:
+                self.assertEqual(self.client.get("/inventory/api/summary/").status_code, 200)
+            return ctx.captured_queries
+
+        self.assertTrue(replica_queries())
+        self.client.post("/inventory/api/summary/")  # any unsafe request pins the session
+        self.assertFalse(replica_queries())
+
+        session = self.client.session
+        session[db_router.PIN_SESSION_KEY] = 0
+        session.save()
+        self.assertTrue(replica_queries())
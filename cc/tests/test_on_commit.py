@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.test import TestCase
+
+from cc.on_commit import defer
+
+
+class DeferTests(TestCase):
+    def test_keys_are_batched_per_transaction_and_dropped_on_rollback(self):
+        flushed = []
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            defer("t", [1, 2], flushed.append)
+            defer("t", [2, 3, None], flushed.append)
+            try:
+                with transaction.atomic():
+                    defer("other", ["x"], flushed.append)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(flushed, [{1, 2, 3}])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            defer("t", [4], flushed.append)  # a new transaction starts a new batch
+        self.assertEqual(flushed, [{1, 2, 3}, {4}])
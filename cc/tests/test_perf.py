@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+
+from cc import perf
+
+User = get_user_model()
+
+
+class PerfProfileTests(TestCase):
+    def setUp(self):
+        perf.reset()
+
+    def test_profile_counts_queries_duplicates_and_cache(self):
+        prof = perf.start()
+        try:
+            for _ in range(perf.DUP_THRESHOLD):
+                with connection.cursor() as c:
+                    c.execute("SELECT 1")
+            cache.set("perf-test", 1)
+            cache.get("perf-test")
+            cache.get("perf-test-missing")
+        finally:
+            perf.stop(prof)
+
+        fields = prof.fields()
+        self.assertEqual(fields["db_queries"], perf.DUP_THRESHOLD)
+        self.assertEqual(fields["n_plus_one"][0]["count"], perf.DUP_THRESHOLD)
+        self.assertEqual((fields["cache_hits"], fields["cache_misses"]), (1, 1))
+        self.assertIsNone(perf.current())
+
+    def test_cache_wrapper_passes_backend_arguments_through(self):
+        class Backend:  # django-redis style: extra client= argument
+            def get(self, key, default=None, version=None, client=None):
+                return (key, version, client)
+
+            def get_many(self, keys, version=None, client=None):
+                return {k: client for k in keys}
+
+        perf._wrap_cache_class(Backend)
+        prof = perf.start()
+        try:
+            self.assertEqual(Backend().get("k", None, 2, client="replica"), ("k", 2, "replica"))
+            self.assertEqual(Backend().get_many(["k"], client="replica"), {"k": "replica"})
+        finally:
+            perf.stop(prof)
+        self.assertEqual(prof.cache_hits, 2)
+
+    @override_settings(PERF_SAMPLE_RATE=1.0, PERF_SERVER_TIMING=True)
+    def test_sampled_requests_feed_hq_report(self):
+        resp = self.client.get("/healthz/")
+        self.assertIn("db;dur=", resp["Server-Timing"])
+
+        self.assertEqual(self.client.get("/hq/api/perf/").status_code, 403)
+        User.objects.create_superuser("hq", "hq@example.com", "pass12345")
+        self.client.login(username="hq", password="pass12345")
+        data = self.client.get("/hq/api/perf/").json()
+        healthz = [r for r in data["endpoints"] if r["endpoint"] == "GET healthz"]
+        self.assertEqual(healthz[0]["samples"], 1)
+        self.assertEqual(data["db_pools"], {})  # SQLite: no pools
+
+    @override_settings(PERF_SAMPLE_RATE=1.0)
+    def test_hq_report_resets_only_on_csrf_checked_post(self):
+        client = Client(enforce_csrf_checks=True)
+        client.get("/healthz/")
+        User.objects.create_superuser("hq", "hq@example.com", "pass12345")
+        client.login(username="hq", password="pass12345")
+
+        client.get("/hq/api/perf/", {"reset": "1"})
+        self.assertTrue(perf.endpoint_report()["endpoints"])
+        self.assertEqual(client.post("/hq/api/perf/", {"reset": "1"}).status_code, 403)
+        self.assertTrue(perf.endpoint_report()["endpoints"])
+
+        token = client.cookies[settings.CSRF_COOKIE_NAME].value  # set by the report GET
+        resp = client.post("/hq/api/perf/", {"reset": "1", "csrfmiddlewaretoken": token})
+        self.assertEqual(resp.status_code, 200)
+        endpoints = {r["endpoint"] for r in perf.endpoint_report()["endpoints"]}
+        self.assertEqual(endpoints, {"POST hq_perf_report"})  # only the reset itself, sampled after it
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_unsampled_requests_have_no_timing_header(self):
+        resp = self.client.get("/healthz/")
+        self.assertNotIn("Server-Timing", resp)
+
+    @override_settings(PERF_SAMPLE_RATE=0, DEBUG=False)
+    def test_timing_header_is_honoured_for_staff_only(self):
+        resp = self.client.get("/healthz/", HTTP_X_SERVER_TIMING="1")
+        self.assertNotIn("Server-Timing", resp)
+        self.assertEqual(perf.endpoint_report()["endpoints"], [])
+
+        User.objects.create_user("perf_staff", password="pass12345", is_staff=True)
+        self.client.login(username="perf_staff", password="pass12345")
+        resp = self.client.get("/healthz/", HTTP_X_SERVER_TIMING="1")
+        self.assertIn("db;dur=", resp["Server-Timing"])
@@ -0,0 +1,98 @@
+# cc/tests/test_retention.py
+import gzip
+import io
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from billing.models import WebhookEvent
+from cc import retention
+from inventory.models import InventoryAudit
+from tenants.models import Business, Membership
+
+
+def archived(policy, key):
+    return sorted(r["row"][key] for index in retention._indexes(policy) for r in retention._read_segment(index))
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        override = override_settings(RETENTION_ARCHIVE_DIR=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.policy = retention.policies()["inventory_audit"]
+
+        self.biz = Business.objects.create(name="Retain A", slug="retain-a", status="ACTIVE")
+        self.other = Business.objects.create(name="Retain B", slug="retain-b", status="ACTIVE")
+        now = timezone.now()
+        for days, biz, details in ((400, self.biz, "old stock in"), (300, self.biz, "old sale"),
+                                   (300, self.other, "other tenant"), (5, self.biz, "recent sale")):
+            row = InventoryAudit.objects.create(business=biz, action="SOLD", details=details)
+            InventoryAudit.objects.filter(pk=row.pk).update(at=now - timedelta(days=days))
+
+    def test_archive_moves_cold_rows_and_search_spans_both_tiers(self):
+        result = retention.archive_table(self.policy)
+        self.assertEqual((result.archived, result.segments), (3, 2))  # two distinct days
+        self.assertEqual(list(InventoryAudit.objects.values_list("details", flat=True)), ["recent sale"])
+        self.assertEqual(retention.archive_table(self.policy).archived, 0)
+        self.assertEqual(archived(self.policy, "details"), ["old sale", "old stock in", "other tenant"])
+
+        rows = retention.search("inventory_audit", business_id=self.biz.id)
+        self.assertEqual([(r["details"], r["_tier"]) for r in rows],
+                         [("recent sale", "hot"), ("old sale", "archive"), ("old stock in", "archive")])
+        self.assertEqual([r["details"] for r in retention.search("inventory_audit", q="OTHER")], ["other tenant"])
+        recent_only = retention.search("inventory_audit", start=timezone.now() - timedelta(days=30))
+        self.assertEqual([r["_tier"] for r in recent_only], ["hot"])
+        with override_settings(RETENTION_ARCHIVE_DIR=None):
+            self.assertEqual([r["_tier"] for r in retention.search("inventory_audit")], ["hot"])
+
+    def test_audit_export_reads_the_archive_for_managers(self):
+        retention.archive_table(self.policy)
+        manager = get_user_model().objects.create_user("retain_mgr", password="x", is_staff=True)
+        Membership.objects.create(user=manager, business=self.biz, role="MANAGER", status="ACTIVE")
+        self.client.force_login(manager)
+        session = self.client.session
+        session["active_business_id"] = self.biz.id
+        session.save()
+
+        res = self.client.get("/exports/audits.csv", {"include_archive": "1"})
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[-1], "tier")
+        self.assertEqual([(line.split(",")[-2], line.split(",")[-1]) for line in lines[1:]],
+                         [("recent sale", "hot"), ("old sale", "archive"), ("old stock in", "archive")])
+
+    def test_refuses_to_purge_without_a_persistent_archive_dir(self):
+        for root in (None, self.root / "not-mounted"):
+            with self.subTest(root=root), override_settings(RETENTION_ARCHIVE_DIR=root):
+                with self.assertRaisesMessage(RuntimeError, "RETENTION_ARCHIVE_DIR"):
+                    retention.archive_table(self.policy)
+                with self.assertRaises(CommandError):
+                    call_command("archive_cold_rows", table=["inventory_audit"], stdout=io.StringIO())
+        self.assertEqual(InventoryAudit.objects.count(), 4)
+        self.assertEqual(retention.archive_table(self.policy, dry_run=True).archived, 3)
+
+    def test_archived_chain_verifies_and_detects_tampering(self):
+        retention.archive_table(self.policy, batch_size=2)  # chain continues across batches
+        self.assertEqual(retention.verify(self.policy), {"ok": True, "checked": 3, "broken_at": None, "reason": ""})
+
+        index = retention._indexes(self.policy)[0]
+        path = Path(index["_path"])
+        path.write_bytes(gzip.compress(gzip.decompress(path.read_bytes()).replace(b"old stock in", b"edited")))
+        self.assertEqual(retention.verify(self.policy)["reason"], "digest mismatch")
+
+    def test_only_finished_webhooks_are_archived(self):
+        old = timezone.now() - timedelta(days=200)
+        for status in ("done", "failed"):
+            ev = WebhookEvent.objects.create(provider="airtel", external_id=status, status=status)
+            WebhookEvent.objects.filter(pk=ev.pk).update(received_at=old)
+        call_command("archive_cold_rows", table=["webhook_event"], stdout=io.StringIO())
+        self.assertEqual(list(WebhookEvent.objects.values_list("status", flat=True)), ["failed"])
+        self.assertEqual(archived(retention.policies()["webhook_event"], "external_id"), ["done"])
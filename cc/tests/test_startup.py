@@ -0,0 +1,43 @@
+# cc/tests/test_startup.py
+from django.test import RequestFactory, SimpleTestCase
+
+from cc import startup
+from cc.lazy_views import lazy_view
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       900 |        900 |     numpy
+import time:       300 |       1200 |   simulator.views_api
+import time:       100 |       1300 | simulator.urls
+import time:       500 |        500 |   json
+import time:       200 |        700 | django.urls
+"""
+
+
+class StartupBenchTests(SimpleTestCase):
+    def test_third_party_time_is_charged_to_the_importing_app(self):
+        rows = startup.parse_importtime(IMPORTTIME)
+        self.assertEqual(rows[0], (2, "numpy", 900))
+        per_app, heavy = startup.attribute(rows, ["simulator"])
+        self.assertEqual(per_app, {"simulator": 1.3, startup.FRAMEWORK: 0.7})
+        self.assertEqual(heavy, ["numpy"])
+
+    def test_compare_flags_heavy_modules_and_slow_apps(self):
+        baseline = {"total_ms": 400.0, "apps": {"inventory": 20.0}}
+        ok = {"total_ms": 420.0, "apps": {"inventory": 35.0, startup.FRAMEWORK: 900.0}, "heavy": []}
+        self.assertEqual(startup.compare(ok, baseline), [])
+        slow = {"total_ms": 420.0, "apps": {"inventory": 45.0, "billing": 30.0}, "heavy": ["pandas"]}
+        problems = startup.compare(slow, baseline)
+        self.assertEqual(len(problems), 3)
+        self.assertIn("pandas", problems[0])
+
+    def test_lazy_view_resolves_on_first_call(self):
+        view = lazy_view("cc.tests.test_startup", "_target", csrf_exempt=True)
+        self.assertTrue(view.csrf_exempt)
+        self.assertEqual(view(RequestFactory().get("/")), "hit")
+        missing = lazy_view("cc.tests.test_startup", "_nope")
+        self.assertEqual(missing(RequestFactory().get("/")).status_code, 501)
+
+
+def _target(request):
+    return "hit"
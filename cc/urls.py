@@ -308,6 +308,7 @@ urlpatterns += [
     path("robots.txt", robots_txt, name="robots_txt"),
     path("favicon.ico", RedirectView.as_view(url=f"{settings.STATIC_URL}favicon.ico", permanent=False)),
     path("temporary/", core_views.temporary_ok, name="temporary_ok"),
+    path("hq/api/perf/", core_views.perf_report, name="hq_perf_report"),
 ]
 
 # Legacy static -> brand icons
@@ -18,6 +18,7 @@ from django.views.decorators.csrf import ensure_csrf_cookie, csrf_protect
 
 from inventory.models import InventoryItem, TimeLog, WalletTxn
 from sales.models import Sale
+from tenants.principal import get_principal
 
 User = get_user_model()
 
@@ -65,6 +66,28 @@ def healthz(_request: HttpRequest) -> JsonResponse:
     return JsonResponse({"ok": db_ok}, status=status)
 
 
+@require_http_methods(["GET", "POST"])
+@csrf_protect
+@ensure_csrf_cookie  # the GET hands out the token the reset POST needs
+def perf_report(request: HttpRequest) -> JsonResponse:
+    """
+    HQ-only: per-endpoint latency p50/p95/max from sampled requests and
+    DB pool usage (this worker process only; see cc.perf, cc.db_pool).
+    POST `reset=1` returns the report and then clears the latency window;
+    a GET never changes it.
+    """
+    from cc.middleware import _is_hq_admin, _safe_is_authenticated
+    from cc import db_pool, perf
+
+    user = getattr(request, "user", None)
+    if not _safe_is_authenticated(user) or not _is_hq_admin(user):
+        return JsonResponse({"ok": False, "error": "Forbidden"}, status=403)
+    data = perf.endpoint_report()
+    if request.method == "POST" and request.POST.get("reset") == "1":
+        perf.reset()
+    return JsonResponse({"ok": True, **data, "db_pools": db_pool.pool_stats()})
+
+
 def temporary_ok(_request: HttpRequest) -> HttpResponse:
     """Tiny page to verify URLConf & server are wired correctly."""
     return HttpResponse(
@@ -78,7 +101,7 @@ def temporary_ok(_request: HttpRequest) -> HttpResponse:
 
 
 def user_in_group(user: User, group_name: str) -> bool:
-    return user.is_authenticated and user.groups.filter(name=group_name).exists()
+    return user.is_authenticated and get_principal(user).in_groups([group_name])
 
 
 def is_admin(user: User) -> bool:
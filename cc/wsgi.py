@@ -5,4 +5,9 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cc.settings')
 
 application = get_wsgi_application()
 
+# gunicorn --preload imports this in the master before forking workers
+from cc.db_pool import close_pools  # noqa: E402
+
+close_pools()
+
 
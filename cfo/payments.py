@@ -26,18 +26,27 @@ def approve_intent(intent: PaymentIntent, approver):
     intent.save()
     return intent
 
-def handle_airtel_webhook(payload: bytes, signature: str):
+def verify_airtel_signature(payload: bytes, signature: str) -> bool:
     secret = settings.AIRTEL_WEBHOOK_SECRET.encode()
     expected = hmac.new(secret, payload, hashlib.sha256).hexdigest()
-    if not hmac.compare_digest(expected, signature):
-        return False
+    return hmac.compare_digest(expected, signature or "")
 
-    data = json.loads(payload.decode())
+
+def apply_airtel_event(event):
+    """
+    Worker side of airtel_webhook (billing.webhooks handler for "airtel"):
+    the callback was verified and stored by the view; apply it here.
+    """
+    from billing.webhooks import PermanentWebhookError
+
+    data = event.payload or {}
     ext = data.get("external_ref")
     status = data.get("status")  # "PAID" or "FAILED"
     intent = PaymentIntent.objects.filter(external_ref=ext).first()
     if not intent:
-        return False
+        raise PermanentWebhookError(f"Unknown payment intent {ext!r}")
+    if intent.status == status:
+        return  # provider retry of an event already applied
 
     intent.status = status
     intent.save()
@@ -54,6 +63,5 @@ def handle_airtel_webhook(payload: bytes, signature: str):
             body=f"Payout {intent.amount} {intent.currency} successful.",
             attachments=[pdf_path]
         )
-    return True
 
 
@@ -1,10 +1,14 @@
-﻿from rest_framework import viewsets, mixins, status
+﻿import json
+
+from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
+from billing.webhooks import ingest as ingest_webhook
+
 from .models import ExpenseCategory, Expense, Budget, CashLedger, PaymentIntent, ForecastSnapshot, Alert, Recommendation, PersonalExpense
 from .serializers import (
     ExpenseCategorySerializer, ExpenseSerializer, BudgetSerializer, CashLedgerSerializer,
@@ -15,7 +19,7 @@ from .permissions import IsAdminOrReadOnly
 from .services.forecast import compute_forecast
 from .services.rules import run_rules
 from .services.recommend import recommend_affordability
-from .payments import create_or_get_intent, approve_intent, handle_airtel_webhook
+from .payments import create_or_get_intent, approve_intent, verify_airtel_signature
 
 class ExpenseCategoryViewSet(viewsets.ModelViewSet):
     queryset = ExpenseCategory.objects.all()
@@ -93,8 +97,19 @@ class PersonalExpenseViewSet(viewsets.ModelViewSet):
 @api_view(["POST"])
 @permission_classes([])
 def airtel_webhook(request):
+    # Verify + persist only; billing's process_webhooks worker applies it
     sig = request.headers.get("X-Airtel-Signature","")
-    ok = handle_airtel_webhook(request.body, sig)
-    return Response({"ok": ok})
+    if not verify_airtel_signature(request.body, sig):
+        return Response({"ok": False})
+    try:
+        data = json.loads(request.body.decode())
+    except ValueError:
+        return Response({"ok": False})
+    _, created = ingest_webhook(
+        "airtel", data, raw=request.body,
+        external_id=f"{data.get('external_ref') or ''}:{data.get('status') or ''}",
+        event_type=str(data.get("status") or ""),
+    )
+    return Response({"ok": True, "duplicate": not created})
 
 
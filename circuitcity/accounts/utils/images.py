@@ -3,19 +3,18 @@
 from io import BytesIO
 from django.core.files.base import ContentFile
 
-try:
-    from PIL import Image  # optional; if missing we just pass through
-except Exception:
-    Image = None
-
 
 def process_avatar(uploaded_file, max_px: int = 512):
     """
     Best-effort avatar processor:
       - If Pillow is available: convert to RGB JPEG, max side <= max_px.
       - If anything fails (or Pillow not installed), return the original file.
+    Pillow is imported here, not at module load: the accounts URLconf imports
+    this module and workers should not pay for Pillow at boot.
     """
-    if Image is None:
+    try:
+        from PIL import Image  # optional; if missing we just pass through
+    except Exception:
         return uploaded_file
 
     try:
@@ -40,8 +40,8 @@ def _safe_getattr(obj, name: str, default=None):
 
 def _user_in_any_group(user, names) -> bool:
     try:
-        user_groups = set(g.name for g in user.groups.all())  # type: ignore[attr-defined]
-        return any(n in user_groups for n in names)
+        from tenants.principal import get_principal
+        return get_principal(user).in_groups(names)
     except Exception:
         return False
 
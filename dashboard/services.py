@@ -1,8 +1,10 @@
 ﻿import datetime as dt
 from django.utils.timezone import now
-from inventory.models import StockLedger, Sku, Sale
 
 def _predicted_stockouts(business_id, horizon_days=7):
+    from django.db.models import Sum
+    from inventory.models import Sku, Sale  # legacy SKU models; not in every install
+
     # naive: daily avg sales last 30 days vs current qty
     cutoff = now() - dt.timedelta(days=30)
     qs = (Sale.objects.filter(business_id=business_id, ts__gte=cutoff)
@@ -27,20 +29,27 @@ def cfo_alerts(business_id):
     return alerts
 
 def gamified_messages(business_id):
-    today = now().date()
-    best_day = (Sale.objects.filter(business_id=business_id)
-               .values('ts__date').annotate(total=Sum('amount'))
-               .order_by('-total').first())
+    """Highlights from this week's leaderboard (kept current by sales.leaderboard)."""
+    from django.contrib.auth import get_user_model
+    from sales.leaderboard import Board, nudge_gap
+
+    units = [r for r in Board(business_id, "week", metric="units").top(2) if r["units"]]
+    revenue = [r for r in Board(business_id, "week", metric="revenue").top(1) if r["revenue"]]
+    ids = {r["agent_id"] for r in units + revenue}
+    names = {u.pk: (u.get_full_name() or u.username) for u in get_user_model().objects.filter(pk__in=ids)}
+
     msgs = []
-    if best_day:
-        msgs.append({"title":"ðŸ”¥ Best Day Ever",
-                     "text": f"You smashed {best_day['total']:,} MK on {best_day['ts__date']}!"})
-    streak = (Sale.objects.filter(business_id=business_id, ts__date__gte=today-dt.timedelta(days=6))
-              .values('ts__date').distinct().count())
-    if streak >= 3:
-        msgs.append({"title":"âš¡ Streak On", "text": f"{streak} selling days this week. Keep it going!"})
+    if units:
+        lead = units[0]
+        msgs.append({"title": "🏆 Leading this week",
+                     "text": f"{names.get(lead['agent_id'], 'An agent')} with {lead['units']} sale(s)."})
+        if len(units) > 1 and 0 < lead["units"] - units[1]["units"] <= nudge_gap():
+            msgs.append({"title": "⚡ Close race",
+                         "text": f"{names.get(units[1]['agent_id'], 'Runner-up')} is "
+                                 f"{lead['units'] - units[1]['units']} sale(s) behind."})
+    if revenue:
+        msgs.append({"title": "💰 Top revenue",
+                     "text": f"{names.get(revenue[0]['agent_id'], 'An agent')}: {revenue[0]['revenue']:,} MK this week."})
     if not msgs:
-        msgs = [{"title":"OK", "text":"Youâ€™re on track. Aim for +10% this week."}]
+        msgs = [{"title": "OK", "text": "No sales yet this week. First sale takes the lead!"}]
     return msgs[:5]
-
-
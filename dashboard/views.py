@@ -19,6 +19,7 @@ from django.views.decorators.http import require_GET
 from django.views.decorators.cache import never_cache
 
 from tenants.utils import require_business  # ✅ tenant guard
+from cc.db_router import read_replica
 
 from inventory.models import InventoryItem
 from sales.models import Sale
@@ -124,22 +125,24 @@ def _wallet_summary_for(user):
             output_field=DecimalField(max_digits=14, decimal_places=2),
         )
 
-    # Lifetime balance
-    balance = qs.aggregate(v=Sum(signed_expr))["v"] or 0
+    # Lifetime balance + this-month splits in a single aggregate
+    month_q = Q(created_at__date__gte=month_start, created_at__date__lte=today)
 
-    # This-month aggregates
-    month_qs = qs.filter(created_at__date__gte=month_start, created_at__date__lte=today)
+    def _reason_q(code: str):
+        return month_q & Q(reason=code) if "reason" in fields else month_q
 
-    def _sum_reason(code: str):
-        q = month_qs
-        if "reason" in fields:
-            q = q.filter(reason=code)
-        return q.aggregate(v=Sum(signed_expr))["v"] or 0
-
-    month_commission = _sum_reason("COMMISSION")
-    month_advance = _sum_reason("ADVANCE")
-    month_adjustment = _sum_reason("ADJUSTMENT")
-    month_total = month_qs.aggregate(v=Sum(signed_expr))["v"] or 0
+    agg = qs.aggregate(
+        balance=Sum(signed_expr),
+        month_commission=Sum(signed_expr, filter=_reason_q("COMMISSION")),
+        month_advance=Sum(signed_expr, filter=_reason_q("ADVANCE")),
+        month_adjustment=Sum(signed_expr, filter=_reason_q("ADJUSTMENT")),
+        month_total=Sum(signed_expr, filter=month_q),
+    )
+    balance = agg["balance"] or 0
+    month_commission = agg["month_commission"] or 0
+    month_advance = agg["month_advance"] or 0
+    month_adjustment = agg["month_adjustment"] or 0
+    month_total = agg["month_total"] or 0
 
     return {
         "balance": balance,
@@ -616,6 +619,7 @@ def cfo_panel(request):
 @never_cache
 @login_required
 @require_GET
+@read_replica
 def profit_data(request):
     biz = getattr(request, "business", None)
     month_str = request.GET.get("month")
@@ -679,6 +683,7 @@ def profit_data(request):
 @never_cache
 @login_required
 @require_GET
+@read_replica
 def agent_trend_data(request):
     biz = getattr(request, "business", None)
     months = int(request.GET.get("months", 6))
@@ -0,0 +1,126 @@
+# insights/currency.py
+"""
+Process-local, version-stamped cache of the CurrencySetting singleton.
+
+- Chart APIs call `currency_snapshot()` as often as they like; the row is only
+  re-read when its version (the row's updated_at, read from the DB) changes.
+  The version lives in the DB rather than the cache so every worker sees a
+  change even when the cache is per-process.
+- CurrencySetting.save() (including update_rates()) moves updated_at, so
+  other workers pick up new rates on their next version check, and resets
+  the writing process's snapshot at once.
+- The version is checked at most every VERSION_CHECK_SECONDS per process.
+- `CurrencySnapshot.convert_series()` converts a whole value series with one
+  precomputed factor instead of a per-point lookup.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+
+VERSION_CHECK_SECONDS = 5.0
+
+CURRENCY_SIGNS = {
+    "MWK": "MK", "USD": "$", "EUR": "€", "GBP": "£", "ZAR": "R",
+    "ZMW": "K", "TZS": "TSh", "KES": "KSh", "NGN": "₦",
+}
+
+
+def normalize_ccy(code: str | None) -> str:
+    if not code:
+        return "MWK"
+    code = code.strip().upper()
+    return "MWK" if code in ("MKW", "MWK") else code
+
+
+@dataclass(frozen=True)
+class CurrencySnapshot:
+    base: str = "MWK"
+    display: str = "MWK"
+    rates: dict = field(default_factory=dict)
+    version: int = 0
+
+    @property
+    def factor(self) -> float:
+        """Multiplier from base to display amounts (1.0 when no usable rate)."""
+        if self.base == self.display:
+            return 1.0
+        try:
+            r = float(self.rates.get(self.display) or 0)
+        except (TypeError, ValueError):
+            return 1.0
+        return r if r > 0 else 1.0
+
+    @property
+    def sign(self) -> str:
+        return CURRENCY_SIGNS.get(self.display, self.display)
+
+    def payload(self) -> dict:
+        return {"base": self.base, "display": self.display, "sign": self.sign}
+
+    def convert(self, amount) -> float:
+        return float(amount or 0) * self.factor
+
+    def convert_series(self, values: Iterable, *, ndigits: int | None = 2) -> list[float]:
+        f = self.factor
+        if ndigits is None:
+            return [float(v or 0) * f for v in values]
+        return [round(float(v or 0) * f, ndigits) for v in values]
+
+
+_lock = threading.Lock()
+_snapshot: CurrencySnapshot | None = None
+_checked_at = 0.0
+
+
+def _db_version() -> int:
+    """The setting row's updated_at in microseconds (0 when there is no row)."""
+    try:
+        from .models import CurrencySetting
+
+        stamp = CurrencySetting.objects.filter(pk=1).values_list("updated_at", flat=True).first()
+    except Exception:
+        return 0
+    return int(stamp.timestamp() * 1_000_000) if stamp else 0
+
+
+def _load(version: int) -> CurrencySnapshot:
+    try:
+        from .models import CurrencySetting
+
+        obj = CurrencySetting.get()
+    except Exception:
+        # insights not installed / table missing: amounts stay in MWK
+        return CurrencySnapshot(version=version)
+    base = normalize_ccy(getattr(obj, "base_currency", "MWK"))
+    return CurrencySnapshot(
+        base=base,
+        display=normalize_ccy(getattr(obj, "display_currency", base)),
+        rates=dict(getattr(obj, "rates", {}) or {}),
+        version=version,
+    )
+
+
+def currency_snapshot() -> CurrencySnapshot:
+    global _snapshot, _checked_at
+    snap, now = _snapshot, time.monotonic()
+    if snap is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+        return snap
+    with _lock:
+        version = _db_version()
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = _load(version)
+        _checked_at = now
+        return _snapshot
+
+
+def bump_currency_version() -> None:
+    """
+    Call after writing CurrencySetting. Other processes see the new
+    updated_at on their next check; this one reloads at once.
+    """
+    global _snapshot
+    with _lock:
+        _snapshot = None  # this process reloads immediately
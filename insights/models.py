@@ -1,4 +1,4 @@
-﻿from django.db import models
+﻿from django.db import models, transaction
 from django.conf import settings
 
 # ============================
@@ -295,4 +295,10 @@ class CurrencySetting(models.Model):
         obj, _ = cls.objects.get_or_create(pk=1)
         return obj
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Chart APIs cache this row per process (insights.currency)
+        from .currency import bump_currency_version
+        transaction.on_commit(bump_currency_version)
+
 
@@ -1,19 +1,29 @@
-﻿import math
+﻿from __future__ import annotations
+
+import math
 from datetime import timedelta, date
 from typing import Optional, List, Tuple, Dict
 
-import pandas as pd
 from django.db.models import Sum, F, Value, DecimalField
 from django.db.models.functions import TruncDate, Coalesce
 from django.utils import timezone
 
-# Optional: statsmodels (fallback to EMA if not installed / too little data)
-try:
-    from statsmodels.tsa.holtwinters import ExponentialSmoothing  # type: ignore
-    _HAS_STATSMODELS = True
-except Exception:  # pragma: no cover
-    ExponentialSmoothing = None  # type: ignore
-    _HAS_STATSMODELS = False
+
+# pandas / statsmodels load on the first forecast, not at import: insights.tasks
+# and the cron commands import this module for its lightweight helpers.
+def _pd():
+    import pandas as pd
+
+    return pd
+
+
+def _exponential_smoothing():
+    """Holt-Winters class, or None (fallback to EMA) if statsmodels is missing."""
+    try:
+        from statsmodels.tsa.holtwinters import ExponentialSmoothing  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return ExponentialSmoothing
 
 # Models
 from .models import (
@@ -152,6 +162,7 @@ def daily_sales_qs(product: Optional[Product] = None) -> pd.DataFrame:
              .annotate(units=ann["units"], revenue=ann["revenue"])
              .order_by("d"))
 
+    pd = _pd()
     df = pd.DataFrame(list(agg))
     if df.empty:
         return pd.DataFrame(columns=["date", "units", "revenue"])
@@ -165,7 +176,8 @@ def daily_sales_qs(product: Optional[Product] = None) -> pd.DataFrame:
 
 def _forecast_series(units_series: pd.Series, horizon_days: int) -> List[float]:
     # Use Holt-Winters if available and data sufficient; else EMA flat
-    if _HAS_STATSMODELS and len(units_series) >= 7:
+    ExponentialSmoothing = _exponential_smoothing() if len(units_series) >= 7 else None
+    if ExponentialSmoothing is not None:
         seasonal = "add" if len(units_series) >= 21 else None
         model = ExponentialSmoothing(
             units_series,
@@ -191,6 +203,7 @@ def forecast_product(product: Optional[Product], horizon_days: int = 7) -> List[
         return []
 
     # Ensure daily continuity
+    pd = _pd()
     df["date"] = pd.to_datetime(df["date"])
     df = df.set_index("date").asfreq("D").fillna(0)
 
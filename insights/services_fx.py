@@ -1,6 +1,8 @@
 ﻿# insights/services_fx.py
 from __future__ import annotations
-import requests
+
+import asyncio
+
 from django.utils import timezone
 from .models import CurrencySetting
 
@@ -10,6 +12,8 @@ API_URLS = [
 ]
 
 def update_rates(base: str | None = None) -> dict:
+    import requests
+
     cfg = CurrencySetting.get()
     base = (base or cfg.base_currency or "MWK").upper()
     rates: dict = {}
@@ -40,3 +44,29 @@ def update_rates(base: str | None = None) -> dict:
     return rates
 
 
+async def aupdate_rates(base: str | None = None) -> dict:
+    """
+    update_rates() for async callers: both providers are asked at once and
+    the first one's rates win, so a slow or dead provider costs one timeout
+    on the event loop instead of a blocked worker.
+    """
+    from asgiref.sync import sync_to_async
+    from cc.http import aget_json
+
+    cfg = await sync_to_async(CurrencySetting.get)()
+    base = (base or cfg.base_currency or "MWK").upper()
+    replies = await asyncio.gather(
+        aget_json(API_URLS[0], params={"base": base}, timeout=8),
+        aget_json(API_URLS[1].format(base=base), timeout=8),
+    )
+    rates: dict = {}
+    for status, data in replies:
+        if 200 <= status < 300 and isinstance(data, dict) and data.get("rates"):
+            rates = data["rates"]
+            break
+
+    if rates:
+        cfg.base_currency = base
+        cfg.rates = rates
+        await cfg.asave(update_fields=["base_currency", "rates", "updated_at"])
+    return rates
@@ -50,43 +50,18 @@ def forecast_daily():
 
 @shared_task
 def alerts_low_stock():
-    today = timezone.localdate()
-    for adv in ReorderAdvice.objects.select_related("product","store"):
-        on_hand = current_on_hand(adv.store_id, adv.product_id)
-        if on_hand < adv.reorder_point:
-            title = f"Low stock: {adv.product.name}"
-            body = f"On-hand {on_hand} < ROP {int(adv.reorder_point)}. Recommend order: {int(adv.recommend_qty)}."
-            # send to store manager(s) â†’ adjust how you identify managers/users
-            for user in adv.store.managers.all():  # if you have M2M managers
-                Notification.objects.create(user=user, kind="low_stock", title=title, body=body, severity="warn")
+    # One grouped on-hand query per tenant against the thresholds (ReorderAdvice
+    # ROP included); only threshold crossings alert. See inventory.lowstock.
+    from inventory.lowstock import evaluate_all
+    return evaluate_all()
 
 @shared_task
 def nudges_hourly():
-    start = week_start(timezone.now())
-    rows = (Sale.objects.filter(sold_at__date__gte=start)
-            .values("agent_id","agent__name")
-            .annotate(units=Count("id"),
-                      revenue=Sum("sale_price"),
-                      profit=Sum(F("sale_price")-F("cost_price")))
-            .order_by("-units"))
-    rows = [{"agent_id":r["agent_id"], "name":r["agent__name"], "units":r["units"],
-             "revenue":float(r["revenue"] or 0), "profit":float(r["profit"] or 0)} for r in rows]
-
-    if not rows: return
-    top_units = rows[0]["units"]
-
-    for r in rows:
-        delta = max(0, top_units - r["units"])
-        if 0 < delta <= 2:
-            # notify that agent
-            try:
-                agent = Agent.objects.get(id=r["agent_id"])
-                Notification.objects.create(
-                    user=agent.user, kind="nudge", severity="info",
-                    title="ðŸ† Almost there!", body=f"Youâ€™re {delta} phones away from #1 this week!"
-                )
-            except Agent.DoesNotExist:
-                pass
+    # Nudges and badges come from leaderboard deltas as sales commit
+    # (sales.leaderboard). This is the backstop for writes that skipped
+    # signals: recompute this week's cells and let their deltas notify.
+    from sales.leaderboard import rebuild
+    return rebuild(since=week_start(timezone.now()), notify=True)
 
 @shared_task
 def weekly_reports():
@@ -0,0 +1,204 @@
+# inventory/aging.py
+"""
+Stock valuation and aging per (business, location, product).
+
+- `valuation()` computes in-stock units, cost value (order_price), retail
+  value (the item's selling_price, else the product's sale_price) and units
+  per age bucket for one tenant. It is one grouped query over the in-stock
+  items. Each bucket is a conditional COUNT on received_at, which
+  inv_received_idx covers.
+- `take_snapshot()` stores the day's rows as StockSnapshot. The
+  `snapshot_stock` command runs it once a day for every tenant, and running
+  it again on the same day replaces that day's rows.
+- Reads: `rows_for()` and `value_series()` read snapshot rows for past days
+  and always compute the current day with a live `valuation()`, so a
+  snapshot taken during the day never freezes today's figures.
+  `slow_movers()` reads the latest snapshot.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import InventoryItem, StockSnapshot
+
+log = logging.getLogger(__name__)
+
+# (field, min age, max age) in whole days since received_at; None = no limit
+BUCKETS = (
+    ("age_0_30", 0, 30),
+    ("age_31_60", 31, 60),
+    ("age_61_90", 61, 90),
+    ("age_over_90", 91, None),
+)
+BUCKET_LABELS = {"age_0_30": "0-30 days", "age_31_60": "31-60 days", "age_61_90": "61-90 days", "age_over_90": "90+ days"}
+VALUE_FIELDS = ("on_hand", "cost_value", "retail_value", *(b[0] for b in BUCKETS))
+# Buckets counted as slow-moving stock
+SLOW_BUCKETS = ("age_61_90", "age_over_90")
+
+ZERO = Decimal("0.00")
+
+# Cron jobs and report views run without an active tenant
+_items = InventoryItem._base_manager
+_snaps = StockSnapshot._base_manager
+
+
+def _bucket_filter(as_of: date, low: int, high: Optional[int]) -> Q:
+    # Items dated after as_of count as new stock
+    q = Q() if low == 0 else Q(received_at__lte=as_of - timedelta(days=low))
+    if high is not None:
+        q &= Q(received_at__gte=as_of - timedelta(days=high))
+    return q
+
+
+# ---------------------------------------------------------------------
+# Compute
+# ---------------------------------------------------------------------
+def valuation(business_id: int, *, as_of: Optional[date] = None, location_id: Optional[int] = None) -> list[dict]:
+    """
+    One row per (location, product) with stock: location_id, product_id,
+    on_hand, cost_value, retail_value, the age buckets and oldest_received.
+    """
+    as_of = as_of or timezone.localdate()
+    dec = DecimalField(max_digits=14, decimal_places=2)
+    qs = _items.filter(business_id=business_id, is_active=True, status="IN_STOCK")
+    if location_id:
+        qs = qs.filter(current_location_id=location_id)
+    buckets = {name: Count("id", filter=_bucket_filter(as_of, low, high)) for name, low, high in BUCKETS}
+    rows = (
+        qs.order_by()
+        .values("current_location_id", "product_id")
+        .annotate(
+            on_hand=Count("id"),
+            cost_value=Coalesce(Sum("order_price"), Value(ZERO), output_field=dec),
+            retail_value=Coalesce(
+                Sum(Coalesce(F("selling_price"), F("product__sale_price"))), Value(ZERO), output_field=dec
+            ),
+            oldest_received=Min("received_at"),
+            **buckets,
+        )
+    )
+    return [{"location_id": r.pop("current_location_id"), **r} for r in rows]
+
+
+def totals(rows: Iterable[dict]) -> dict:
+    """Sum the value and bucket columns of valuation()/snapshot rows."""
+    out = {f: 0 for f in VALUE_FIELDS}
+    out["cost_value"] = out["retail_value"] = ZERO
+    for r in rows:
+        for f in VALUE_FIELDS:
+            out[f] += r.get(f) or 0
+    return out
+
+
+def take_snapshot(business_id: int, day: Optional[date] = None) -> int:
+    """Store (or replace) a tenant's rows for `day` (today); returns the row count."""
+    day = day or timezone.localdate()
+    rows = valuation(business_id, as_of=day)
+    with transaction.atomic():
+        _snaps.filter(business_id=business_id, day=day).delete()
+        _snaps.bulk_create(
+            [StockSnapshot(business_id=business_id, day=day, **r) for r in rows],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def snapshot_all(business_id: Optional[int] = None, day: Optional[date] = None) -> dict[int, int]:
+    """Snapshot every tenant with items (or just one); {business_id: rows}."""
+    if business_id:
+        ids = [business_id]
+    else:
+        ids = sorted(_items.filter(business__isnull=False).values_list("business_id", flat=True).distinct().order_by())
+    taken = {}
+    for bid in ids:
+        try:
+            taken[bid] = take_snapshot(bid, day)
+        except Exception:
+            log.exception("Stock snapshot failed for business %s", bid)
+    return taken
+
+
+# ---------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------
+def latest_day(business_id: int, on_or_before: Optional[date] = None) -> Optional[date]:
+    qs = _snaps.filter(business_id=business_id)
+    if on_or_before is not None:
+        qs = qs.filter(day__lte=on_or_before)
+    return qs.order_by("-day").values_list("day", flat=True).first()
+
+
+def snapshot_days(business_id: int, start: date, end: date) -> list[date]:
+    """Days in [start, end] that have a snapshot."""
+    return list(
+        _snaps.filter(business_id=business_id, day__gte=start, day__lte=end)
+        .order_by("day").values_list("day", flat=True).distinct()
+    )
+
+
+def rows_for(business_id: int, day: Optional[date] = None, *, location_id: Optional[int] = None) -> tuple[Optional[date], list[dict], str]:
+    """
+    (as_of, rows, source) for a day: a live valuation for today, that day's
+    snapshot rows for a past day.
+    """
+    today = timezone.localdate()
+    day = day or today
+    if day >= today:
+        return today, valuation(business_id, as_of=today, location_id=location_id), "live"
+    qs = _snaps.filter(business_id=business_id, day=day)
+    if location_id:
+        qs = qs.filter(location_id=location_id)
+    rows = list(qs.values("location_id", "product_id", "oldest_received", *VALUE_FIELDS))
+    return (day, rows, "snapshot") if rows else (None, [], "none")
+
+
+def value_series(business_id: int, days: list[date], *, location_id: Optional[int] = None) -> dict[date, dict]:
+    """{day: totals} for the given days: past days from snapshots, today live."""
+    today = timezone.localdate()
+    qs = _snaps.filter(business_id=business_id, day__in=[d for d in days if d < today])
+    if location_id:
+        qs = qs.filter(location_id=location_id)
+    # Aliased: an annotation may not reuse a field's name
+    rows = qs.order_by().values("day").annotate(**{f"sum_{f}": Sum(f) for f in VALUE_FIELDS})
+    series = {r["day"]: {f: r[f"sum_{f}"] for f in VALUE_FIELDS} for r in rows}
+    if today in days:
+        series[today] = totals(valuation(business_id, as_of=today, location_id=location_id))
+    return series
+
+
+def slow_movers(business_id: int, day: Optional[date] = None, *, limit: int = 20,
+                location_id: Optional[int] = None) -> list[dict]:
+    """Products with stock older than 60 days in the latest snapshot, most aged units first."""
+    day = latest_day(business_id, day)
+    if day is None:
+        return []
+    qs = _snaps.filter(business_id=business_id, day=day)
+    if location_id:
+        qs = qs.filter(location_id=location_id)
+    aged = sum((F(b) for b in SLOW_BUCKETS[1:]), F(SLOW_BUCKETS[0]))
+    rows = (
+        qs.annotate(aged=aged)
+        .filter(aged__gt=0)
+        .order_by("-aged", "-cost_value", "product_id")
+        .values(
+            "product_id", "location_id", "aged", "oldest_received", *VALUE_FIELDS,
+            "product__name", "product__brand", "product__model", "product__variant", "location__name",
+        )[:limit]
+    )
+    out = []
+    for r in rows:
+        name = r.pop("product__name") or " ".join(
+            b for b in (r.pop("product__brand"), r.pop("product__model"), r.pop("product__variant")) if b
+        )
+        for k in ("product__brand", "product__model", "product__variant"):
+            r.pop(k, None)
+        out.append({**r, "product": name, "location": r.pop("location__name"), "day": day})
+    return out
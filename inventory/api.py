@@ -30,7 +30,11 @@ except Exception:  # pragma: no cover
         return getattr(request, "business", None)
 
 from .models import InventoryItem, Product, OrderPrice
+from . import imei_lookup
+from .conditional import conditional_api
+from cc.db_router import read_replica
 from sales.models import Sale
+from tenants.principal import get_principal
 
 # Optional Location import (works even if Location lives elsewhere or is absent)
 try:
@@ -127,7 +131,7 @@ def _can_view_all(user) -> bool:
     if getattr(user, "is_staff", False):
         return True
     # Manager / Admin groups
-    return user.groups.filter(name__in=["Admin", "Manager", "Auditor", "Auditors"]).exists()
+    return get_principal(user).in_groups(["Admin", "Manager", "Auditor", "Auditors"])
 
 def _scope_mode(request: HttpRequest) -> str:
     """
@@ -349,9 +353,12 @@ def _normalize_code(raw: str | None) -> str:
 def _find_instock_for_business(request: HttpRequest, raw: str) -> Optional[InventoryItem]:
     """
     Business-scoped, unsold-only lookup by IMEI (15) or code.
-    This mirrors the helper used by the UI so all flows agree.
+    With an active business this is inventory.imei_lookup, like every
+    other scan path.
     """
     biz = _get_active_business(request)
+    if biz is not None:
+        return imei_lookup.find_in_stock(biz.id, raw)[0]
     if biz is None:
         # fall back to user-scope (already applied by _scoped_stock_qs)
         base = _scoped_stock_qs(request)
@@ -430,32 +437,31 @@ def _norm_digits(s: str | None) -> str:
 # ---------- Currency helpers ----------
 
 try:
-    from insights.models import CurrencySetting  # optional singleton
+    from insights.currency import CURRENCY_SIGNS as _CURRENCY_SIGNS, currency_snapshot, normalize_ccy
 except Exception:  # pragma: no cover
-    CurrencySetting = None  # type: ignore
-
-_CURRENCY_SIGNS = {
-    "MWK": "MK","USD": "$","EUR": "€","GBP": "£","ZAR": "R",
-    "ZMW": "K","TZS": "TSh","KES": "KSh","NGN": "₦",
-}
+    currency_snapshot = None  # type: ignore
+    _CURRENCY_SIGNS = {"MWK": "MK"}
+    normalize_ccy = None  # type: ignore
 
 def _normalize_ccy(code: str | None) -> str:
-    if not code:
-        return "MWK"
-    code = code.strip().upper()
-    return "MWK" if code in ("MKW", "MWK") else code
+    if normalize_ccy:
+        return normalize_ccy(code)
+    return (code or "MWK").strip().upper() or "MWK"
 
-def _get_currency_setting():
-    base = "MWK"; display = "MWK"; rates = {}
-    if CurrencySetting:
+def _currency():
+    """Process-cached CurrencySetting snapshot (None if insights is unavailable)."""
+    if currency_snapshot:
         try:
-            obj = CurrencySetting.get()
-            base = _normalize_ccy(getattr(obj, "base_currency", "MWK"))
-            display = _normalize_ccy(getattr(obj, "display_currency", base))
-            rates = getattr(obj, "rates", {}) or {}
+            return currency_snapshot()
         except Exception:
             pass
-    return base, display, rates
+    return None
+
+def _get_currency_setting():
+    snap = _currency()
+    if snap is None:
+        return "MWK", "MWK", {}
+    return snap.base, snap.display, snap.rates
 
 def _convert_amount(amount: Decimal | float | int, base: str, display: str, rates: dict) -> float:
     if base == display:
@@ -468,10 +474,18 @@ def _convert_amount(amount: Decimal | float | int, base: str, display: str, rate
         pass
     return float(amount or 0)
 
+def _convert_series(values, ndigits: int | None = 2) -> list[float]:
+    """Convert a whole base-currency series to the display currency in one pass."""
+    snap = _currency()
+    if snap is not None:
+        return snap.convert_series(values, ndigits=ndigits)
+    return [round(float(v or 0), ndigits) if ndigits is not None else float(v or 0) for v in values]
+
 def _currency_payload():
-    base, display, rates = _get_currency_setting()
-    sign = _CURRENCY_SIGNS.get(display, display)
-    return {"base": base, "display": display, "sign": sign}
+    snap = _currency()
+    if snap is not None:
+        return snap.payload()
+    return {"base": "MWK", "display": "MWK", "sign": _CURRENCY_SIGNS.get("MWK", "MWK")}
 
 
 # ---------- date utils ----------
@@ -711,16 +725,11 @@ def _fallback_items_daily(
           .values("d").annotate(val=val_expr).order_by("d")
     )
 
-    base, display, rates = _get_currency_setting()
-    data_map: dict[date, float] = {}
-    for r in agg:
-        raw = float(r["val"] or 0)
-        if metric == "amount":
-            raw = _convert_amount(raw, base, display, rates)
-            raw = round(float(raw), 2)
-        data_map[r["d"]] = raw
-
-    return _fill_days(start, end_excl, data_map, fmt=label_fmt)
+    data_map: dict[date, float] = {r["d"]: float(r["val"] or 0) for r in agg}
+    labels, values = _fill_days(start, end_excl, data_map, fmt=label_fmt)
+    if metric == "amount":
+        values = _convert_series(values)
+    return labels, values
 
 
 # ---------- /inventory/list/ ----------
@@ -751,8 +760,9 @@ def inventory_list(request: HttpRequest):
 
 # ---------- API: AI predictions (last 14d) ----------
 
-@never_cache
 @login_required
+@conditional_api
+@read_replica
 def predictions_summary(request: HttpRequest):
     """
     Returns simple next-7-day projections and risky stock.
@@ -854,8 +864,9 @@ def predictions_summary(request: HttpRequest):
 # ---------------------------------------------
 # SAFE: api_value_trend (SQLite-safe with Python fallback)
 # ---------------------------------------------
-@never_cache
 @login_required
+@conditional_api
+@read_replica
 def api_value_trend(request: HttpRequest):
     """
     /inventory/api/value_trend/?metric=revenue|cost|profit&period=today|7d|all&model=<product_id?>
@@ -909,7 +920,6 @@ def api_value_trend(request: HttpRequest):
 
             agg = (qs.annotate(d=TruncDate(dfield)).values("d").annotate(val=expr).order_by("d"))
 
-            base, display, rates = _get_currency_setting()
             data_map: dict[date, float] = {}
             for r in agg:
                 raw = r.get("val") or 0
@@ -920,9 +930,10 @@ def api_value_trend(request: HttpRequest):
                         v = float(Decimal(str(raw)))
                     except Exception:
                         v = 0.0
-                data_map[r["d"]] = round(_convert_amount(v, base, display, rates), 2)
+                data_map[r["d"]] = v
 
             labels, values = _fill_days(start_incl, end_excl, data_map, fmt=labels_fmt)
+            values = _convert_series(values)
 
             if metric == "revenue" and sum(values) == 0:
                 flabels, fvalues = _fallback_items_daily(
@@ -963,12 +974,10 @@ def api_value_trend(request: HttpRequest):
 
         per_day[dkey] = per_day.get(dkey, Decimal(0)) + amt
 
-    base, display, rates = _get_currency_setting()
-    data_map: dict[date, float] = {
-        k: round(_convert_amount(float(v), base, display, rates), 2) for k, v in per_day.items()
-    }
+    data_map: dict[date, float] = {k: float(v) for k, v in per_day.items()}
 
     labels, values = _fill_days(start_incl, end_excl, data_map, fmt=labels_fmt)
+    values = _convert_series(values)
 
     if metric == "revenue" and sum(values) == 0:
         flabels, fvalues = _fallback_items_daily(
@@ -982,8 +991,9 @@ def api_value_trend(request: HttpRequest):
 
 # ---------- API: Sales trend (line chart) ----------
 
-@never_cache
 @login_required
+@conditional_api
+@read_replica
 def api_sales_trend(request: HttpRequest):
     """
     /inventory/api_sales_trend/?period=month|7d|all&metric=amount|count&model=<product_id?>
@@ -1018,7 +1028,6 @@ def api_sales_trend(request: HttpRequest):
         agg = (qs.annotate(d=TruncDate(dfield))
                  .values("d").annotate(val=val_expr).order_by("d"))
 
-        base, display, rates = _get_currency_setting()
         data_map: dict[date, float] = {}
         for r in agg:
             raw = r["val"] or 0
@@ -1029,12 +1038,11 @@ def api_sales_trend(request: HttpRequest):
                     raw_f = float(Decimal(str(raw)))
                 except Exception:
                     raw_f = 0.0
-            if metric == "amount":
-                raw_f = _convert_amount(raw_f, base, display, rates)
-                raw_f = round(float(raw_f), 2)
             data_map[r["d"]] = raw_f
 
         labels, values = _fill_days(start_incl, end_excl, data_map, fmt=labels_fmt)
+        if metric == "amount":
+            values = _convert_series(values)
 
         if metric == "amount" and sum(values) == 0:
             flabels, fvalues = _fallback_items_daily(
@@ -1074,12 +1082,11 @@ def api_sales_trend(request: HttpRequest):
             v = 1
         per_day[dkey] = per_day.get(dkey, Decimal(0)) + (v if isinstance(v, Decimal) else Decimal(v))
 
-    base, display, rates = _get_currency_setting()
-    data_map: dict[date, float] = {}
-    for k, v in per_day.items():
-        data_map[k] = _convert_amount(float(v), base, display, rates) if metric == "amount" else float(v)
+    data_map: dict[date, float] = {k: float(v) for k, v in per_day.items()}
 
     labels, values = _fill_days(start_incl, end_excl, data_map, fmt=labels_fmt)
+    if metric == "amount":
+        values = _convert_series(values, ndigits=None)
 
     if metric == "amount" and sum(values) == 0:
         flabels, fvalues = _fallback_items_daily(
@@ -1101,8 +1108,9 @@ def api_sales_trend(request: HttpRequest):
 
 # ---------- API: Top models (bar chart) ----------
 
-@never_cache
 @login_required
+@conditional_api
+@read_replica
 def api_top_models(request: HttpRequest):
     """
     /inventory/api_top_models/?period=today|month
@@ -1217,8 +1225,9 @@ def api_top_models(request: HttpRequest):
 
 # ---------- API: Alerts (window-aware) ----------
 
-@never_cache
 @login_required
+@conditional_api
+@read_replica
 def alerts_feed(request: HttpRequest):
     """
     Computes low-stock / near-stockout alerts using a lookback window.
@@ -1261,7 +1270,7 @@ def alerts_feed(request: HttpRequest):
     alerts = []
     for r in stock:
         brand = r["product__brand"]; model = r["product__model"]
-        name = f"{brand} {model}"]
+        name = f"{brand} {model}"
         on_hand = int(r["on_hand"] or 0)
         daily = runrate_map.get(r["product_id"], 0.0)
         need7 = daily * 7.0
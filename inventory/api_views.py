@@ -56,6 +56,9 @@ _stock_qs_for_request_func = _try_import("inventory.scope", "stock_queryset_for_
 
 # Pull the canonical tenant-aware stock queryset + scope helpers
 from .scope import stock_queryset_for_request, active_scope
+from . import imei_lookup
+from .conditional import conditional_api
+from cc.db_router import read_replica
 
 # Optional tenant helper
 _get_active_business = (
@@ -626,6 +629,16 @@ def _find_in_stock_by_code(
     biz = get_active_business(request)
     _biz_id, loc_id = _active_scope(request)
 
+    # Digit codes resolve through the shared IMEI lookup (indexed, cached per tenant)
+    if InventoryItem is not None and biz is not None and code.isdigit() and len(code) >= imei_lookup.MIN_DIGITS:
+        obj, matched = imei_lookup.find_in_stock(
+            biz.id, code, location_id=loc_id,
+            for_update=transaction.get_connection().in_atomic_block,
+        )
+        if obj is not None and not business_wide_fallback and loc_id and obj.current_location_id != loc_id:
+            return None, None
+        return obj, matched
+
     # Helper: apply a robust "IN STOCK" filter to a queryset for a particular model
     def _apply_instock_filter(qs):
         model = getattr(qs, "model", None)
@@ -1732,6 +1745,8 @@ from django.db.models import Q as _Q  # already imported models.Q above; just al
 
 @login_required
 @require_http_methods(["GET"])
+@conditional_api
+@read_replica
 def api_stock_status(request: HttpRequest) -> JsonResponse:
     # Safe imports / fallbacks already defined above in this module
 
@@ -1887,6 +1902,23 @@ def api_stock_status(request: HttpRequest) -> JsonResponse:
     biz = get_active_business(request)
     biz_id = getattr(biz, "id", None)
 
+    # InventoryItem + digit code: answer from the shared IMEI lookup (no row load)
+    if InventoryItem_local is not None and biz_id and digits == code and len(code) >= imei_lookup.MIN_DIGITS:
+        hit = imei_lookup.lookup(biz_id, code, location_id=requested_loc_id)
+        if hit is None:
+            return JsonResponse({"ok": True, "in_stock": False, "data": {"in_stock": False}}, status=200)
+        payload = {
+            "in_stock": True,
+            "id": hit.item_id,
+            "matched_field": hit.matched,
+            "status": "IN_STOCK",
+            "location_id": hit.location_id,
+            "location_name": hit.location_name,
+            "location_mismatch": bool(req_loc_str and hit.location_id and str(hit.location_id) != req_loc_str),
+            "found_location_id": hit.location_id,
+        }
+        return JsonResponse({"ok": True, "in_stock": True, "data": payload}, status=200)
+
     # PASS 1: strict within requested location
     if requested_loc_id and biz_id:
         try:
@@ -1975,6 +2007,8 @@ def restock_heatmap_api(request: HttpRequest) -> JsonResponse:
 # ──────────────────────────────────────────────────────────────────────────────
 @login_required
 @require_http_methods(["GET"])
+@conditional_api
+@read_replica
 def api_sales_trend(request: HttpRequest) -> JsonResponse:
     period_raw = (request.GET.get("period") or "month").lower().strip()
     metric = (request.GET.get("metric") or "amount").lower().strip()
@@ -2139,6 +2173,8 @@ def api_sales_trend(request: HttpRequest) -> JsonResponse:
 
 @login_required
 @require_http_methods(["GET"])
+@conditional_api
+@read_replica
 def api_top_models(request: HttpRequest) -> JsonResponse:
     from collections import defaultdict
     from decimal import Decimal
@@ -2332,8 +2368,37 @@ def api_top_models(request: HttpRequest) -> JsonResponse:
         status=200,
     )
 
+# Stock-level metrics for api_value_trend, read from daily StockSnapshot rows
+STOCK_VALUE_METRICS = {
+    "stock": ("cost_value", "Stock value (cost)"),
+    "stock_cost": ("cost_value", "Stock value (cost)"),
+    "stock_retail": ("retail_value", "Stock value (retail)"),
+    "stock_units": ("on_hand", "Units in stock"),
+}
+
+
+def _stock_value_trend(request: HttpRequest, metric: str, labels: list, bins: list) -> JsonResponse:
+    """Stock is a level, so each bin shows its latest snapshotted day (today is live)."""
+    from . import aging
+
+    field, name = STOCK_VALUE_METRICS[metric]
+    business_id = get_active_business_id(request)
+    today = timezone.localdate()
+    spans = [(timezone.localtime(start).date(), min(timezone.localtime(end).date() - timedelta(days=1), today))
+             for start, end in bins]
+    data = [0 for _ in bins]
+    if business_id and spans:
+        have = set(aging.snapshot_days(business_id, spans[0][0], spans[-1][1])) | {today}
+        picks = [max((d for d in have if lo <= d <= hi), default=None) for lo, hi in spans]
+        series = aging.value_series(business_id, [d for d in picks if d])
+        data = [round(float((series.get(d) or {}).get(field) or 0), 2) if d else 0 for d in picks]
+    return _ok({"labels": labels, "series": [{"name": name, "data": data}], "source": "stock_snapshot"})
+
+
 @login_required
 @require_http_methods(["GET"])
+@conditional_api
+@read_replica
 def api_value_trend(request: HttpRequest) -> JsonResponse:
     from django.db.models import Q
 
@@ -2365,6 +2430,9 @@ def api_value_trend(request: HttpRequest) -> JsonResponse:
     else:
         labels, bins = _rolling_days(7)
 
+    if metric in STOCK_VALUE_METRICS:
+        return _stock_value_trend(request, metric, labels, bins)
+
     try:
         qs0 = _stock_queryset_for_request(request)
         Model = qs0.model if qs0 is not None else (InventoryItem or Stock)
@@ -2742,6 +2810,8 @@ def api_geo_ping(request: HttpRequest) -> JsonResponse:
 # ──────────────────────────────────────────────────────────────────────────────
 @login_required
 @require_http_methods(["GET"])
+@conditional_api
+@read_replica
 def api_inventory_summary(request: HttpRequest) -> JsonResponse:
     try:
         return _ok(_inventory_summary(request))
@@ -23,6 +23,10 @@ class InventoryConfig(AppConfig):
     _tenant_wired = False
     _auto_loc_wired = False  # default location signal hook
     _post_migrate_wired = False
+    _attendance_wired = False
+    _lowstock_wired = False
+    _imei_lookup_wired = False
+    _catalog_wired = False
 
     # -----------------------------
     # Django entrypoint
@@ -35,11 +39,19 @@ class InventoryConfig(AppConfig):
         2) Loads inventory signals (audit hooks), honoring env/feature flags.
         3) Registers a post_save hook to auto-create a default Location for new stores.
         4) Registers a post_migrate fallback to re-run wiring once DB models are fully ready in prod.
+        5) Keeps AttendanceDay summaries in step with TimeLog writes.
+        6) Re-evaluates low-stock state for the product/location a stock change touches.
+        7) Invalidates cached IMEI lookups when a tenant's stock changes.
+        8) Versions the scan catalog on product, price and location writes.
         """
         self._wire_tenant_scope()
         self._wire_signals()
         self._wire_default_location_hook()
         self._wire_post_migrate_fallback()
+        self._wire_attendance_summary()
+        self._wire_lowstock()
+        self._wire_imei_lookup()
+        self._wire_catalog()
 
     # -----------------------------
     # 1) Multi-tenant wiring
@@ -236,3 +248,56 @@ class InventoryConfig(AppConfig):
         )
         self.__class__._post_migrate_wired = True
         logger.debug("Inventory post_migrate fallback connected.")
+
+    # -----------------------------
+    # 5) Attendance summaries (manager time overview)
+    # -----------------------------
+    def _wire_attendance_summary(self):
+        """
+        Imports inventory.attendance, whose TimeLog receivers refresh the
+        per-(user, day) AttendanceDay rows. Independent of the audit toggles:
+        the overview reads these rows, so they must never go stale.
+        """
+        if self.__class__._attendance_wired:
+            return
+        importlib.import_module("inventory.attendance")
+        self.__class__._attendance_wired = True
+
+    # -----------------------------
+    # 6) Low-stock evaluation
+    # -----------------------------
+    def _wire_lowstock(self):
+        """
+        Imports inventory.lowstock, whose InventoryItem receivers re-evaluate
+        the affected (business, product, location) pairs after commit.
+        """
+        if self.__class__._lowstock_wired:
+            return
+        importlib.import_module("inventory.lowstock")
+        self.__class__._lowstock_wired = True
+
+    # -----------------------------
+    # 7) IMEI lookup cache
+    # -----------------------------
+    def _wire_imei_lookup(self):
+        """
+        Imports inventory.imei_lookup, whose InventoryItem receivers drop the
+        tenant's cached lookups when its stock changes.
+        """
+        if self.__class__._imei_lookup_wired:
+            return
+        importlib.import_module("inventory.imei_lookup")
+        self.__class__._imei_lookup_wired = True
+
+    # -----------------------------
+    # 8) Scan catalog versions
+    # -----------------------------
+    def _wire_catalog(self):
+        """
+        Imports inventory.catalog, whose Product/OrderPrice/Location receivers
+        record a CatalogChange and drop the cached catalog after commit.
+        """
+        if self.__class__._catalog_wired:
+            return
+        importlib.import_module("inventory.catalog")
+        self.__class__._catalog_wired = True
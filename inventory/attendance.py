@@ -0,0 +1,196 @@
+# inventory/attendance.py
+"""
+Maintained per-(user, day) attendance summaries (AttendanceDay) for the
+manager time overview.
+
+- A TimeLog write re-pairs that user's events for the affected local day(s)
+  after commit; a day holds a handful of events, so this is cheap.
+- `window_summaries()` folds the daily rows of a window in day order, giving
+  the same work seconds / on-shift flag / last event as pairing the raw
+  events of the whole window (shifts crossing midnight included).
+- `python manage.py rebuild_attendance_days` rebuilds rows from TimeLog
+  (backfill after deploy, or after bulk imports that bypass signals).
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models_attendance import AttendanceDay, TimeLog
+
+log = logging.getLogger(__name__)
+
+# TimeLog/AttendanceDay get tenant-scoped default managers; signal handlers and
+# cron jobs run without an active tenant, so always go through the base manager.
+_logs = TimeLog._base_manager
+_days = AttendanceDay._base_manager
+
+
+def local_day(ts: datetime) -> date:
+    return timezone.localtime(ts).date() if timezone.is_aware(ts) else ts.date()
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz)
+
+
+# ---------------------------------------------------------------------
+# Pairing
+# ---------------------------------------------------------------------
+def _pair(events: list[TimeLog]) -> tuple[int, Optional[datetime]]:
+    """Closed work seconds and the start of a still-open shift, entering off shift."""
+    work, start = 0, None
+    for e in events:
+        if e.kind == "ARRIVAL":
+            if start is None:
+                start = e.ts
+        elif e.kind == "DEPARTURE" and start is not None:
+            work += int((e.ts - start).total_seconds())
+            start = None
+    return work, start
+
+
+def summarize_day(events: list[TimeLog]) -> dict:
+    """AttendanceDay field values for one user's events of one day (ordered by ts)."""
+    work, open_since = _pair(events)
+    first_dep = next((i for i, e in enumerate(events) if e.kind == "DEPARTURE"), None)
+    tail_work, tail_open = _pair(events[first_dep + 1:]) if first_dep is not None else (0, None)
+    last = events[-1] if events else None
+    return {
+        "work_secs": work,
+        "open_since": open_since,
+        "first_departure": events[first_dep].ts if first_dep is not None else None,
+        "tail_work_secs": tail_work,
+        "tail_open_since": tail_open,
+        "last_event": last,
+        "last_kind": last.kind if last else "",
+        "last_ts": last.ts if last else None,
+        "event_count": len(events),
+    }
+
+
+@dataclass
+class WindowSummary:
+    work_secs: int = 0
+    on_shift: bool = False
+    last_ts: Optional[datetime] = None
+    last_event: Optional[TimeLog] = None
+
+
+def fold_days(rows: Iterable[AttendanceDay], now: datetime) -> WindowSummary:
+    """Combine one user's day rows (ordered by day); an open shift runs until `now`."""
+    out = WindowSummary()
+    carry = None  # start of a shift still open at the end of the previous day
+    for r in rows:
+        if carry is None:
+            out.work_secs += r.work_secs
+            carry = r.open_since
+        elif r.first_departure is not None:
+            out.work_secs += int((r.first_departure - carry).total_seconds()) + r.tail_work_secs
+            carry = r.tail_open_since
+        if r.event_count:
+            out.last_ts, out.last_event = r.last_ts, r.last_event
+    if carry is not None:
+        out.work_secs += int((now - carry).total_seconds())
+        out.on_shift = True
+    out.work_secs = max(out.work_secs, 0)
+    return out
+
+
+def window_summaries(business_id: int, start: datetime, end: datetime, now: datetime) -> dict[int, WindowSummary]:
+    """
+    {user_id: WindowSummary} for the local-day window [start, end). Reads one
+    AttendanceDay row per user per day, with the last event's location joined.
+    """
+    first, last = local_day(start), local_day(end - timedelta(microseconds=1))
+    rows = (
+        _days.filter(business_id=business_id, day__gte=first, day__lte=last)
+        .select_related("last_event__location")
+        .order_by("user_id", "day")
+    )
+    per_user: dict[int, list[AttendanceDay]] = defaultdict(list)
+    for r in rows:
+        per_user[r.user_id].append(r)
+    return {uid: fold_days(days, now) for uid, days in per_user.items()}
+
+
+# ---------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------
+def refresh_attendance(keys: Iterable[tuple[Optional[int], int, date]]) -> int:
+    """
+    Rebuild the AttendanceDay row of each (business_id, user_id, day) from its
+    TimeLogs (deleting it when the day has none). Returns rows refreshed.
+    """
+    keys = {(bid, uid, d) for bid, uid, d in keys if uid and d is not None}
+    for bid, uid, day in keys:
+        lo, hi = _day_bounds(day)
+        events = list(_logs.filter(business_id=bid, user_id=uid, ts__gte=lo, ts__lt=hi).order_by("ts", "id"))
+        with transaction.atomic():
+            if not events:
+                _days.filter(business_id=bid, user_id=uid, day=day).delete()
+                continue
+            _days.update_or_create(business_id=bid, user_id=uid, day=day, defaults=summarize_day(events))
+    return len(keys)
+
+
+def rebuild_attendance(*, business_id: Optional[int] = None, since: Optional[date] = None) -> int:
+    """Refresh every (business, user, day) that has TimeLogs or a stale summary row."""
+    logs, stale = _logs.all(), _days.all()
+    if business_id is not None:
+        logs, stale = logs.filter(business_id=business_id), stale.filter(business_id=business_id)
+    if since is not None:
+        logs, stale = logs.filter(ts__gte=_day_bounds(since)[0]), stale.filter(day__gte=since)
+
+    keys = {(bid, uid, local_day(ts)) for bid, uid, ts in logs.order_by().values_list("business_id", "user_id", "ts")}
+    keys |= set(stale.order_by().values_list("business_id", "user_id", "day"))
+    return refresh_attendance(keys)
+
+
+# ---------------------------------------------------------------------
+# Signals
+# ---------------------------------------------------------------------
+def _key_of(row: TimeLog) -> tuple[Optional[int], int, Optional[date]]:
+    return row.business_id, row.user_id, local_day(row.ts) if row.ts else None
+
+
+def _refresh_on_commit(keys: set) -> None:
+    def _run():
+        try:
+            refresh_attendance(keys)
+        except Exception:
+            # Never fail a check-in over the overview; the rebuild command catches up
+            log.exception("Attendance summary refresh failed for %s", keys)
+
+    transaction.on_commit(_run)
+
+
+@receiver(pre_save, sender=TimeLog)
+def _remember_previous_key(sender, instance: TimeLog, **kwargs):
+    if instance.pk:
+        prev = _logs.filter(pk=instance.pk).only("business_id", "user_id", "ts").first()
+        instance._attendance_prev_key = _key_of(prev) if prev else None
+
+
+@receiver(post_save, sender=TimeLog)
+def _refresh_after_save(sender, instance: TimeLog, **kwargs):
+    keys = {_key_of(instance)}
+    prev = getattr(instance, "_attendance_prev_key", None)
+    if prev:
+        keys.add(prev)
+    _refresh_on_commit(keys)
+
+
+@receiver(post_delete, sender=TimeLog)
+def _refresh_after_delete(sender, instance: TimeLog, **kwargs):
+    _refresh_on_commit({_key_of(instance)})
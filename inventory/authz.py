@@ -1,6 +1,7 @@
 ﻿# inventory/authz.py
 from django.contrib.auth.models import Group
 from django.http import HttpResponseForbidden
+from tenants.principal import get_principal
 
 ADMIN = "Admin"
 AGENT = "Agent"
@@ -11,7 +12,7 @@ def in_group(user, name: str) -> bool:
         return False
     if user.is_superuser:
         return True
-    return user.groups.filter(name=name).exists()
+    return get_principal(user).in_groups([name])
 
 def is_admin(user): return in_group(user, ADMIN)
 def is_agent(user): return in_group(user, AGENT) and not is_admin(user)
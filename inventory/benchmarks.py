@@ -0,0 +1,255 @@
+# inventory/benchmarks.py
+"""
+Endpoint benchmark harness (used by `python manage.py bench_endpoints`).
+
+- `generate()` builds a synthetic multi-tenant world: N businesses x M
+  locations x K items per business, ~40% of them sold, plus layby orders.
+- `run_benchmarks()` creates a throwaway test database, and for every data
+  size measures latency and SQL query count of the hot endpoints through the
+  Django test client (full middleware stack).
+- `compare()` checks results against a stored baseline file. Regressions
+  are a non-2xx or changed status code, more queries than the baseline (query counts are
+  deterministic) and a median latency above baseline x tolerance plus a small
+  absolute slack (timings depend on the machine).
+"""
+from __future__ import annotations
+
+import json
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from tenants.models import Business, Membership
+from tenants.utils import TENANT_SESSION_KEY
+
+from .models import InventoryItem, Location, Product
+
+LATENCY_SLACK_MS = 5.0
+
+
+@dataclass(frozen=True)
+class DataSize:
+    businesses: int
+    locations: int
+    items: int  # per business
+
+    @classmethod
+    def parse(cls, spec: str) -> "DataSize":
+        b, l, i = (int(x) for x in spec.lower().split("x"))
+        return cls(b, l, i)
+
+    @property
+    def label(self) -> str:
+        return f"{self.businesses}x{self.locations}x{self.items}"
+
+
+@dataclass
+class World:
+    business: Business          # the tenant the benchmark user works in
+    user: object
+    location: Location
+    in_stock_imeis: list[str]
+
+
+# ---------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------
+def generate(size: DataSize, *, seed: int = 42, sold_ratio: float = 0.4) -> World:
+    from layby.models import LaybyOrder
+    from sales.models import Sale
+
+    rnd = random.Random(seed)
+    User = get_user_model()
+    today = timezone.localdate()
+
+    products = Product.objects.bulk_create([
+        Product(code=f"BENCH-{n:03d}", brand="Bench", model=f"Model {n}", variant="4+64",
+                cost_price=Decimal("100.00"), sale_price=Decimal("150.00"))
+        for n in range(20)
+    ])
+
+    first = None
+    imei_seq = 350000000000000
+    for b in range(size.businesses):
+        biz = Business.objects.create(name=f"Bench Biz {b}", slug=f"bench-biz-{b}", status="ACTIVE")
+        user = User.objects.create_user(f"bench_mgr_{b}", password="bench-pass", is_staff=True)
+        Membership.objects.create(user=user, business=biz, role="MANAGER", status="ACTIVE")
+        agents = [user] + [
+            User.objects.create_user(f"bench_agent_{b}_{a}", password="bench-pass") for a in range(3)
+        ]
+        locs = [Location.objects.create(business=biz, name=f"Store {l}", is_default=(l == 0))
+                for l in range(size.locations)]
+
+        items = []
+        for i in range(size.items):
+            imei_seq += 1
+            p = products[rnd.randrange(len(products))]
+            items.append(InventoryItem(
+                business=biz, imei=str(imei_seq), product=p,
+                received_at=today - timedelta(days=rnd.randrange(365)),
+                order_price=p.cost_price, selling_price=p.sale_price,
+                current_location=locs[i % len(locs)],
+                assigned_agent=agents[i % len(agents)],
+                status="IN_STOCK",
+            ))
+        InventoryItem.all_objects.bulk_create(items, batch_size=1000)
+        items = list(InventoryItem.all_objects.filter(business=biz).order_by("id"))
+
+        sold = items[: int(len(items) * sold_ratio)]
+        sales = []
+        for it in sold:
+            day = it.received_at + timedelta(days=rnd.randrange(30))
+            day = min(day, today)
+            it.status, it.is_active = "SOLD", False
+            it.sold_at = timezone.make_aware(datetime(day.year, day.month, day.day, 12))
+            sales.append(Sale(item=it, agent=it.assigned_agent, location=it.current_location,
+                              sold_at=day, price=it.selling_price, commission_pct=Decimal("3")))
+        InventoryItem.all_objects.bulk_update(sold, ["status", "is_active", "sold_at"], batch_size=1000)
+        Sale.objects.bulk_create(sales, batch_size=1000)
+
+        LaybyOrder.objects.bulk_create([
+            LaybyOrder(ref=f"BL{b:03d}{n:05d}", created_by=user, customer_name=f"Customer {n}",
+                       item_name="Phone", sku="BENCH", total_price=Decimal("300.00"),
+                       deposit_amount=Decimal("50.00"))
+            for n in range(max(1, size.items // 10))
+        ])
+
+        if first is None:
+            first = World(biz, user, locs[0], [it.imei for it in items[len(sold):]])
+    return first
+
+
+# ---------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------
+def _scan_sold(client: Client, world: World):
+    imei = world.in_stock_imeis.pop()
+    return client.post("/inventory/scan-sold/submit/", {
+        "imei": imei, "price": "150.00", "location_id": world.location.id,
+    })
+
+
+ENDPOINTS: dict[str, Callable[[Client, World], object]] = {
+    "stock_list": lambda c, w: c.get("/inventory/list/"),
+    "scan_sold_submit": _scan_sold,
+    "api_sales_trend": lambda c, w: c.get("/inventory/api/sales-trend/?period=month"),
+    "inventory_dashboard": lambda c, w: c.get("/inventory/dashboard/"),
+    "layby_admin_dashboard": lambda c, w: c.get("/layby/admin/dashboard/"),
+}
+
+
+def _client_for(world: World) -> Client:
+    # Errors are recorded as their status code rather than aborting the run
+    client = Client(raise_request_exception=False)
+    client.force_login(world.user)
+    session = client.session
+    session[TENANT_SESSION_KEY] = world.business.id
+    session["biz_id"] = world.business.id
+    session.save()
+    return client
+
+
+def measure(name: str, client: Client, world: World, *, repeat: int) -> dict:
+    call = ENDPOINTS[name]
+    call(client, world)  # warm-up (template/url caches)
+    timings, queries, status = [], 0, None
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            t0 = time.perf_counter()
+            resp = call(client, world)
+            timings.append((time.perf_counter() - t0) * 1000)
+        queries = len(ctx.captured_queries)
+        status = getattr(resp, "status_code", None)
+    return {
+        "status": status,
+        "queries": queries,
+        "median_ms": round(statistics.median(timings), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+def run_benchmarks(sizes: list[DataSize], *, repeat: int = 5, endpoints: list[str] | None = None,
+                   log: Callable[[str], None] = print) -> dict:
+    """Returns {size_label: {endpoint: {status, queries, median_ms, max_ms}}}."""
+    names = endpoints or list(ENDPOINTS)
+    results: dict[str, dict] = {}
+    setup_test_environment()
+    # Tables straight from models (syncdb style, like conftest.py): the migration
+    # history re-creates some indexes and does not apply cleanly to a fresh DB.
+    no_migrations = {app.label: None for app in apps.get_app_configs()}
+    with override_settings(MIGRATION_MODULES=no_migrations):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(PERF_SAMPLE_RATE=0, SECURE_SSL_REDIRECT=False, DEBUG=False,
+                               PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+                               STORAGES={**settings.STORAGES, "staticfiles": {
+                                   "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}}):
+            for size in sizes:
+                call_command("flush", interactive=False, verbosity=0)
+                t0 = time.perf_counter()
+                world = generate(size)
+                log(f"[{size.label}] generated in {time.perf_counter() - t0:.1f}s")
+                world.in_stock_imeis = world.in_stock_imeis[: (repeat + 1) * 2]
+                client = _client_for(world)
+                results[size.label] = {n: measure(n, client, world, repeat=repeat) for n in names}
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+    return results
+
+
+# ---------------------------------------------------------------------
+# Baseline
+# ---------------------------------------------------------------------
+def load_baseline(path: Path) -> dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8")).get("results", {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path: Path, results: dict) -> None:
+    payload = {"generated_at": timezone.now().isoformat(), "results": results}
+    Path(path).write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def failed_requests(results: dict) -> list[str]:
+    """Endpoints that answered non-2xx: their timings measure an error path."""
+    return [
+        f"{size} {name}: status {cur['status']} (expected 2xx)"
+        for size, eps in results.items() for name, cur in eps.items()
+        if not 200 <= (cur["status"] or 0) < 300
+    ]
+
+
+def compare(results: dict, baseline: dict, *, tolerance: float = 2.0) -> list[str]:
+    """Human-readable regression messages (empty list = no regressions)."""
+    problems = failed_requests(results)
+    for size, eps in results.items():
+        for name, cur in eps.items():
+            base = (baseline.get(size) or {}).get(name)
+            if not base:
+                continue
+            if 200 <= (cur["status"] or 0) < 300 and cur["status"] != base["status"]:
+                problems.append(f"{size} {name}: status {base['status']} -> {cur['status']}")
+            if cur["queries"] > base["queries"]:
+                problems.append(f"{size} {name}: queries {base['queries']} -> {cur['queries']}")
+            limit = base["median_ms"] * tolerance + LATENCY_SLACK_MS
+            if cur["median_ms"] > limit:
+                problems.append(f"{size} {name}: median {base['median_ms']}ms -> {cur['median_ms']}ms "
+                                f"(limit {limit:.1f}ms)")
+    return problems
@@ -1,7 +1,16 @@
 ﻿# inventory/cache_utils.py
+import time
+
 from django.core.cache import cache
+from django.db import transaction
 
 _KEY = "dash:ver"
+_ALL = "all"
+
+
+def _stamp_key(scope) -> str:
+    return f"dash:stamp:{scope}"
+
 
 def get_dashboard_cache_version() -> int:
     v = cache.get(_KEY)
@@ -10,9 +19,32 @@ def get_dashboard_cache_version() -> int:
         cache.set(_KEY, v, None)  # no TTL; bumping controls invalidation
     return int(v)
 
-def bump_dashboard_cache_version() -> int:
+
+def _touch(scope) -> None:
+    key = _stamp_key(scope)
+    cache.set(key, max(time.time_ns() // 1000, int(cache.get(key) or 0) + 1), None)
+
+
+def bump_dashboard_cache_version(business_id=None) -> int:
+    """
+    Bump the global dashboard version and, once the transaction commits, the
+    business's data stamp (every business's when business_id is None).
+    """
     v = get_dashboard_cache_version() + 1
     cache.set(_KEY, v, None)
+    transaction.on_commit(lambda: _touch(business_id or _ALL))
     return v
 
 
+def tenant_data_stamp(business_id) -> int:
+    """
+    Microsecond timestamp of the business's last data change. A stamp the
+    cache has lost is restarted at now, which reads as "changed".
+    """
+    keys = [_stamp_key(_ALL), _stamp_key(business_id or _ALL)]
+    stamps = cache.get_many(keys)
+    for key in keys:
+        if key not in stamps:
+            stamps[key] = time.time_ns() // 1000
+            cache.add(key, stamps[key], None)
+    return max(int(v) for v in stamps.values())
@@ -0,0 +1,169 @@
+# inventory/catalog.py
+"""
+Per-business scan catalog: products, active order prices and the business's
+locations, versioned so clients can sync deltas.
+
+- Every Product / OrderPrice / Location write replaces that object's
+  CatalogChange row with the next number of one platform-wide sequence.
+  The sequence row stays locked until the writing transaction ends, so
+  versions commit in order: once a client has seen version N, no write with
+  a lower version can still appear. A business's catalog version is the
+  highest version among shared rows and its own.
+- `snapshot()` builds the catalog once and caches it. With a shared cache
+  (settings.CATALOG_CACHE) the key is made of two tokens (shared catalog +
+  business) that writes rotate after commit, so a snapshot built while a
+  write was in flight lands under a key nobody reads any more. Without one
+  the key is the catalog version read from the DB, so a worker never serves
+  a snapshot older than another worker's last write.
+- `delta()` answers `since=<version>` from the snapshot: objects whose
+  version is newer, plus ids that have changed but are no longer present
+  (deleted products/locations, products that lost their active price).
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from tenants.services import sequences
+
+from .models import CatalogChange, Location, OrderPrice, Product
+
+SHARED = "shared"
+VERSION_SEQUENCE = "CATALOG"
+LISTS = (("product", "products", "id"), ("price", "prices", "product_id"), ("location", "locations", "id"))
+
+
+def _token_key(scope) -> str:
+    return f"catalog:token:{scope}"
+
+
+def _visible(business_id: int):
+    return CatalogChange.objects.filter(Q(business_id__isnull=True) | Q(business_id=business_id))
+
+
+def _cache_key(business_id: int) -> str:
+    if not getattr(settings, "CATALOG_CACHE", False):
+        version = _visible(business_id).aggregate(v=Max("version"))["v"] or 0
+        return f"catalog:{business_id}:v{version}"
+    keys = [_token_key(SHARED), _token_key(business_id)]
+    tokens = cache.get_many(keys)
+    return f"catalog:{business_id}:{tokens.get(keys[0], '0')}:{tokens.get(keys[1], '0')}"
+
+
+def _rotate(scope) -> None:
+    transaction.on_commit(lambda: cache.set(_token_key(scope), uuid.uuid4().hex, None))
+
+
+def record(kind: str, object_id: int, *, business_id: Optional[int] = None) -> None:
+    """Bump one object's version (shared when business_id is None)."""
+    with transaction.atomic():
+        # Sequence first: every writer queues on the same row before touching
+        # CatalogChange, and holds it until the row below is committed
+        version, _ = sequences.reserve(
+            VERSION_SEQUENCE, seed=lambda: CatalogChange.objects.aggregate(v=Max("version"))["v"] or 0,
+        )
+        CatalogChange.objects.filter(kind=kind, object_id=object_id).delete()
+        CatalogChange.objects.create(kind=kind, object_id=object_id, business_id=business_id, version=version)
+    _rotate(business_id or SHARED)
+
+
+# ---------------------------------------------------------------------
+# Snapshot / delta
+# ---------------------------------------------------------------------
+def _build(business_id: int) -> dict:
+    # Versions first: objects read afterwards are at least this new
+    versions, version = {}, 0
+    rows = _visible(business_id).values_list("kind", "object_id", "version")
+    for kind, object_id, cid in rows:
+        versions[(kind, object_id)] = cid
+        version = max(version, cid)
+
+    products = [
+        {
+            "id": p.id,
+            "code": p.code,
+            "label": str(p),
+            "brand": p.brand,
+            "model": p.model,
+            "variant": p.variant,
+            "sale_price": str(p.sale_price) if p.sale_price is not None else None,
+            "v": versions.get(("product", p.id), 0),
+        }
+        for p in Product.objects.order_by("id").only("id", "code", "name", "brand", "model", "variant", "sale_price")
+    ]
+    prices = [
+        {"product_id": pid, "order_price": str(price), "effective_from": eff.isoformat() if eff else None,
+         "v": versions.get(("price", pid), 0)}
+        for pid, price, eff in OrderPrice.objects.filter(active=True).order_by("product_id")
+        .values_list("product_id", "default_order_price", "effective_from")
+    ]
+    locations = [
+        {"id": lid, "name": name, "city": city, "is_default": is_default, "v": versions.get(("location", lid), 0)}
+        for lid, name, city, is_default in Location._base_manager.filter(business_id=business_id)
+        .order_by("name").values_list("id", "name", "city", "is_default")
+    ]
+    snap = {"business_id": business_id, "version": version,
+            "products": products, "prices": prices, "locations": locations, "removed": {}}
+    for kind, name, key in LISTS:
+        present = {o[key] for o in snap[name]}
+        snap["removed"][kind] = sorted(
+            [oid, cid] for (k, oid), cid in versions.items() if k == kind and oid not in present
+        )
+    return snap
+
+
+def snapshot(business_id: int) -> dict:
+    """The business's full catalog, from the cache when current."""
+    key = _cache_key(business_id)
+    snap = cache.get(key)
+    if snap is None:
+        snap = _build(business_id)
+        cache.set(key, snap, int(getattr(settings, "CATALOG_CACHE_SECONDS", 3600)))
+    return snap
+
+
+def delta(snap: dict, since: Optional[int]) -> dict:
+    """
+    Payload for a client at version `since`: everything when `since` is None
+    or not a version this catalog has reached, otherwise only what changed.
+    """
+    full = since is None or since > snap["version"]
+    out = {"business_id": snap["business_id"], "version": snap["version"], "full": full, "removed": {}}
+    for kind, name, _key in LISTS:
+        out[name] = snap[name] if full else [o for o in snap[name] if o["v"] > since]
+        out["removed"][kind] = [] if full else [oid for oid, cid in snap["removed"][kind] if cid > since]
+    return out
+
+
+def etag(business_id: int, version: int, since: Optional[int] = None) -> str:
+    return f'"cat-{business_id}-{version}' + ("" if since is None else f"-{since}") + '"'
+
+
+# ---------------------------------------------------------------------
+# Signals: product, price and location writes bump versions
+# ---------------------------------------------------------------------
+@receiver(post_save, sender=Product, dispatch_uid="catalog_product_saved")
+@receiver(post_delete, sender=Product, dispatch_uid="catalog_product_deleted")
+def _product_changed(sender, instance: Product, **kwargs):
+    record("product", instance.pk)
+
+
+@receiver(post_save, sender=OrderPrice, dispatch_uid="catalog_price_saved")
+@receiver(post_delete, sender=OrderPrice, dispatch_uid="catalog_price_deleted")
+def _price_changed(sender, instance: OrderPrice, **kwargs):
+    if instance.product_id:
+        record("price", instance.product_id)
+
+
+@receiver(post_save, sender=Location, dispatch_uid="catalog_location_saved")
+@receiver(post_delete, sender=Location, dispatch_uid="catalog_location_deleted")
+def _location_changed(sender, instance: Location, **kwargs):
+    if instance.business_id:
+        record("location", instance.pk, business_id=instance.business_id)
@@ -0,0 +1,85 @@
+# inventory/conditional.py
+"""
+Conditional GET for the dashboard and chart JSON APIs.
+
+The dashboard polls several endpoints together and almost every poll
+returns what the last one did. `conditional_api` puts an ETag and
+Last-Modified on each response and answers a matching revalidation with
+304 before the view runs, so nothing is queried.
+
+- The ETag hashes the tenant's data stamp (inventory/cache_utils: moved on
+  every item/sale write after commit), the active business and location
+  (views scope to the session's location), the user (the same URL is
+  scoped per role), the path and the query string.
+- It also includes a time bucket of DASHBOARD_ETAG_MAX_AGE seconds. Rolling
+  windows ("last 14 days") move with the clock, and writes that skip model
+  signals would otherwise never show up.
+- Responses are `private, no-cache`: the browser keeps them and revalidates
+  every poll, shared proxies never store tenant data.
+- Without DASHBOARD_CONDITIONAL_GET (no shared cache to hold the stamps),
+  views run every time with the previous never-cache headers.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from functools import wraps
+from typing import Callable
+
+from django.conf import settings
+from django.utils.cache import add_never_cache_headers, get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from tenants.utils import get_active_business_id
+
+from .cache_utils import tenant_data_stamp
+
+# Cache-busting parameters clients add to poll URLs
+IGNORED_PARAMS = {"_", "ts", "t"}
+
+
+def _enabled() -> bool:
+    return bool(getattr(settings, "DASHBOARD_CONDITIONAL_GET", False))
+
+
+def validators(request) -> tuple[str, int]:
+    """(ETag, Last-Modified epoch seconds) for this request's current data."""
+    max_age = max(1, int(getattr(settings, "DASHBOARD_ETAG_MAX_AGE", 300)))
+    bucket = int(time.time()) // max_age
+    business_id = get_active_business_id(request)
+    stamp = tenant_data_stamp(business_id)
+    location_id = getattr(request, "session", {}).get("active_location_id")
+    query = sorted((k, v) for k, values in request.GET.lists() if k not in IGNORED_PARAMS for v in values)
+    raw = f"{business_id}|{location_id}|{request.user.pk}|{request.path}|{query}|{stamp}|{bucket}"
+    etag = '"d-' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+    return etag, max(stamp // 1_000_000, bucket * max_age)
+
+
+def _private(response):
+    patch_cache_control(response, private=True, no_cache=True, must_revalidate=True)
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def conditional_api(view_func: Callable) -> Callable:
+    """Answer 304 for unchanged tenant data; mark responses private/no-cache."""
+
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or not _enabled():
+            response = view_func(request, *args, **kwargs)
+            add_never_cache_headers(response)
+            return response
+
+        etag, last_modified = validators(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200:
+                add_never_cache_headers(response)
+                return response
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(last_modified)
+        return _private(response)
+
+    return _wrapped
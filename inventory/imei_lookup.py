@@ -0,0 +1,202 @@
+# inventory/imei_lookup.py
+"""
+One in-stock IMEI lookup for scans, sell flows and stock-status probes.
+
+- Input is normalized once (digits only, last 15 kept; see
+  models.normalize_imei). A full IMEI is an exact match on the
+  (business, imei) index; 6-14 digits are a suffix match served by the
+  (business, imei_tail) index instead of an icontains scan.
+- With settings.IMEI_LOOKUP_CACHE (on by default only with a shared cache,
+  REDIS_URL), results (including misses) go into a small per-tenant LRU in
+  process memory, so repeated probes of the same code skip the database.
+  Any InventoryItem save/delete drops the tenant's entries here and, after
+  commit, rotates a per-tenant token in the shared cache; other processes
+  see the new token on their next lookup and drop their copies too.
+  Entries also expire after IMEI_LOOKUP_CACHE_SECONDS as a backstop for
+  bulk writes that bypass signals. A per-process cache would never see the
+  token, so without a shared one every lookup reads the database.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import IMEI_TAIL_DIGITS, InventoryItem, normalize_imei
+
+MIN_DIGITS = IMEI_TAIL_DIGITS
+MAX_CANDIDATES = 10
+
+# Lookups run with the business passed in explicitly
+_items = InventoryItem._base_manager
+
+
+@dataclass(frozen=True)
+class Hit:
+    item_id: int
+    location_id: Optional[int]
+    location_name: str
+    matched: str  # "imei" (exact) or "imei_tail" (suffix)
+
+
+def normalize(raw: Optional[str]) -> str:
+    return normalize_imei(raw)
+
+
+def _in_stock(business_id: int):
+    return _items.filter(business_id=business_id, is_active=True, status="IN_STOCK", sold_at__isnull=True)
+
+
+def _query(business_id: int, digits: str) -> tuple[Hit, ...]:
+    qs = _in_stock(business_id)
+    if len(digits) == 15:
+        qs, matched = qs.filter(imei=digits), "imei"
+    else:
+        qs, matched = qs.filter(imei_tail=digits[-IMEI_TAIL_DIGITS:]), "imei_tail"
+        if len(digits) > IMEI_TAIL_DIGITS:
+            qs = qs.filter(imei__endswith=digits)
+    rows = qs.order_by("-id").values_list("pk", "current_location_id", "current_location__name")
+    return tuple(Hit(pk, lid, lname or "", matched) for pk, lid, lname in rows[:MAX_CANDIDATES])
+
+
+# ---------------------------------------------------------------------
+# Per-tenant hot cache
+# ---------------------------------------------------------------------
+def _token_key(business_id: int) -> str:
+    return f"imei:lookup:token:{business_id}"
+
+
+class _TenantLRU:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tenants: dict[int, tuple[Optional[str], OrderedDict]] = {}
+
+    @staticmethod
+    def _size() -> int:
+        if not getattr(settings, "IMEI_LOOKUP_CACHE", False):
+            return 0
+        return int(getattr(settings, "IMEI_LOOKUP_CACHE_SIZE", 512))
+
+    @staticmethod
+    def _ttl() -> float:
+        return float(getattr(settings, "IMEI_LOOKUP_CACHE_SECONDS", 300))
+
+    def _entries(self, business_id: int) -> OrderedDict:
+        token = cache.get(_token_key(business_id))
+        current = self._tenants.get(business_id)
+        if current is None or current[0] != token:
+            current = (token, OrderedDict())
+            self._tenants[business_id] = current
+        return current[1]
+
+    def get(self, business_id: int, digits: str) -> Optional[tuple[Hit, ...]]:
+        if self._size() <= 0:
+            return None
+        with self._lock:
+            entries = self._entries(business_id)
+            entry = entries.get(digits)
+            if entry is None:
+                return None
+            expires, hits = entry
+            if expires < time.monotonic():
+                del entries[digits]
+                return None
+            entries.move_to_end(digits)
+            return hits
+
+    def put(self, business_id: int, digits: str, hits: tuple[Hit, ...]) -> None:
+        size = self._size()
+        if size <= 0:
+            return
+        with self._lock:
+            entries = self._entries(business_id)
+            entries[digits] = (time.monotonic() + self._ttl(), hits)
+            entries.move_to_end(digits)
+            while len(entries) > size:
+                entries.popitem(last=False)
+
+    def drop(self, business_id: Optional[int] = None) -> None:
+        with self._lock:
+            if business_id is None:
+                self._tenants.clear()
+            else:
+                self._tenants.pop(business_id, None)
+
+
+_cache = _TenantLRU()
+
+
+def invalidate(business_id: int) -> None:
+    """Forget cached lookups for a tenant, here now and everywhere after commit."""
+    _cache.drop(business_id)
+    transaction.on_commit(lambda: cache.set(_token_key(business_id), uuid.uuid4().hex, None))
+
+
+# ---------------------------------------------------------------------
+# Lookups
+# ---------------------------------------------------------------------
+def lookup(business_id: Optional[int], raw: Optional[str], *, location_id=None) -> Optional[Hit]:
+    """
+    Best in-stock match for a scanned code, preferring `location_id` when
+    several units share a suffix. None when nothing matches.
+    """
+    digits = normalize(raw)
+    if not business_id or len(digits) < MIN_DIGITS:
+        return None
+    hits = _cache.get(business_id, digits)
+    if hits is None:
+        hits = _query(business_id, digits)
+        _cache.put(business_id, digits, hits)
+    if not hits:
+        return None
+    try:
+        wanted = int(location_id) if location_id not in (None, "") else None
+    except (TypeError, ValueError):
+        wanted = None
+    for hit in hits:
+        if hit.location_id == wanted:
+            return hit
+    return hits[0]
+
+
+def find_in_stock(
+    business_id: Optional[int],
+    raw: Optional[str],
+    *,
+    location_id=None,
+    for_update: bool = False,
+) -> tuple[Optional[InventoryItem], Optional[str]]:
+    """
+    Load the unit `lookup` resolves, re-checked against the database (and
+    locked when `for_update`). Returns (item, matched_field) or (None, None).
+    """
+    hit = lookup(business_id, raw, location_id=location_id)
+    if hit is None:
+        return None, None
+    qs = _in_stock(business_id).select_related("product", "current_location").filter(pk=hit.item_id)
+    if for_update:
+        qs = qs.select_for_update(of=("self",))
+    item = qs.first()
+    if item is None:  # changed under us; the next lookup re-queries
+        _cache.drop(business_id)
+        return None, None
+    return item, hit.matched
+
+
+# ---------------------------------------------------------------------
+# Signals: any stock change invalidates the tenant's lookups
+# ---------------------------------------------------------------------
+@receiver(post_save, sender=InventoryItem, dispatch_uid="imei_lookup_after_save")
+@receiver(post_delete, sender=InventoryItem, dispatch_uid="imei_lookup_after_delete")
+def _item_changed(sender, instance: InventoryItem, **kwargs):
+    if instance.business_id:
+        invalidate(instance.business_id)
@@ -7,6 +7,8 @@ from typing import Iterable, Tuple, Optional
 from django.db import models
 from django.db.models import Q
 
+from . import imei_lookup
+
 # ---- Lazy imports (no hard crashes at import time) ---------------------------
 try:
     from tenants.utils import get_active_business  # canonical if available
@@ -261,6 +263,14 @@ def _first_match(qs: models.QuerySet, model, code: str, digits: str) -> Tuple[Op
     return None, None
 
 
+def _from_imei_lookup(biz, code: str, requested_location_id, business_wide_fallback: bool):
+    obj, matched = imei_lookup.find_in_stock(getattr(biz, "id", biz), code, location_id=requested_location_id)
+    if (obj is not None and not business_wide_fallback and requested_location_id
+            and str(obj.current_location_id) != str(requested_location_id)):
+        return None, None
+    return obj, matched
+
+
 def find_in_stock_by_code(
     request,
     raw_code: str,
@@ -283,6 +293,11 @@ def find_in_stock_by_code(
     code = _normalize_code(raw_code)
     digits = _digits(code)
 
+    # Digit codes: shared IMEI lookup (exact or indexed suffix, cached per tenant)
+    biz = get_active_business(request)
+    if biz is not None and code.isdigit() and len(code) >= imei_lookup.MIN_DIGITS:
+        return _from_imei_lookup(biz, code, requested_location_id, business_wide_fallback)
+
     # ---------- PASS 1: strictly within requested location ----------
     qs = scoped_stock_queryset(request)
     if qs is not None:
@@ -331,6 +346,10 @@ def find_in_stock_by_imei(request, imei_raw: str, *, requested_location_id: Opti
     if len(digits) != 15:
         return None, None
 
+    biz = get_active_business(request)
+    if biz is not None:
+        return _from_imei_lookup(biz, digits, requested_location_id, True)
+
     # Pass 1 — strict + location
     qs = scoped_stock_queryset(request)
     if qs is not None:
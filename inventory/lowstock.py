@@ -0,0 +1,258 @@
+# inventory/lowstock.py
+"""
+Low-stock engine: per-tenant on-hand vs threshold, alerting on crossings.
+
+- On-hand comes from one grouped query per tenant (in-stock, non-archived
+  items counted by product and location), optionally narrowed to the pairs
+  a stock change touched.
+- Thresholds: Product.low_stock_threshold, overridden by the latest
+  ReorderAdvice.reorder_point for the (location, product) when the insights
+  app is installed.
+- LowStockState keeps the last verdict per (business, product, location).
+  Only a flip to low is an alert; staying low is silent, and recovering
+  re-arms the pair. Crossings are pushed to the notifications inbox (when
+  installed) and collected into a per-tenant digest.
+- InventoryItem saves/deletes re-evaluate just the affected pairs after
+  commit, batched per transaction (cc.on_commit). The pair an item had when
+  loaded is kept from post_init, so a move re-checks the old pair without
+  a query. `send_low_stock_digest --full` re-scans tenants as a backstop
+  for bulk updates that bypass signals.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from cc.on_commit import defer
+
+from .models import InventoryItem, LowStockState, Product
+
+log = logging.getLogger(__name__)
+
+Pair = tuple  # (product_id, location_id)
+
+# Signal handlers and cron jobs run without an active tenant
+_items = InventoryItem._base_manager
+_states = LowStockState._base_manager
+
+
+# ---------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------
+def on_hand(business_id: int, pairs: Optional[Iterable[Pair]] = None) -> dict[Pair, int]:
+    """In-stock unit counts per (product, location) for one tenant."""
+    qs = _items.filter(business_id=business_id, is_active=True, status="IN_STOCK")
+    if pairs is not None:
+        pairs = set(pairs)
+        qs = qs.filter(product_id__in={p for p, _ in pairs}, current_location_id__in={l for _, l in pairs})
+    rows = qs.values_list("product_id", "current_location_id").annotate(qty=Count("id")).order_by()
+    counts = {(pid, lid): qty for pid, lid, qty in rows}
+    if pairs is not None:
+        counts = {k: v for k, v in counts.items() if k in pairs}
+    return counts
+
+
+def thresholds(pairs: Iterable[Pair]) -> dict[Pair, int]:
+    pairs = set(pairs)
+    product_ids = {p for p, _ in pairs}
+    base = dict(Product.objects.filter(pk__in=product_ids).values_list("pk", "low_stock_threshold"))
+    result = {(p, l): int(base.get(p) or 0) for p, l in pairs}
+
+    if apps.is_installed("insights"):
+        ReorderAdvice = apps.get_model("insights", "ReorderAdvice")
+        advice = (
+            ReorderAdvice.objects
+            .filter(product_id__in=product_ids, store_id__in={l for _, l in pairs})
+            .order_by("store_id", "product_id", "created_at")
+            .values_list("product_id", "store_id", "reorder_point")
+        )
+        for pid, lid, rop in advice:  # latest row per pair wins
+            if (pid, lid) in result:
+                result[(pid, lid)] = max(0, math.ceil(rop))
+    return result
+
+
+# ---------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------
+def evaluate(business_id: int, pairs: Optional[Iterable[Pair]] = None, *, notify: bool = True) -> list[LowStockState]:
+    """
+    Re-evaluate the given pairs (or the whole tenant) and persist verdicts.
+    Returns the states that crossed into low stock during this call.
+    """
+    now = timezone.now()
+    counts = on_hand(business_id, pairs)
+    existing_qs = _states.filter(business_id=business_id)
+    if pairs is not None:
+        pairs = set(pairs)
+        existing_qs = existing_qs.filter(product_id__in={p for p, _ in pairs},
+                                         location_id__in={l for _, l in pairs})
+    existing = {(s.product_id, s.location_id): s for s in existing_qs}
+    keys = set(pairs) if pairs is not None else set(counts) | set(existing)
+    # A pair that never had stock here and has none now is not "low"
+    keys = {k for k in keys if k in counts or k in existing}
+    limits = thresholds(keys)
+
+    created, changed, crossed = [], [], []
+    for key in keys:
+        qty, limit = counts.get(key, 0), limits.get(key, 0)
+        low = qty < limit
+        state = existing.get(key)
+        if state is None:
+            state = LowStockState(business_id=business_id, product_id=key[0], location_id=key[1])
+            created.append(state)
+        elif (state.on_hand, state.threshold, state.is_low) == (qty, limit, low):
+            continue
+        else:
+            changed.append(state)
+        if low and not state.is_low:
+            state.crossed_at, state.digested_at = now, None
+            crossed.append(state)
+        state.on_hand, state.threshold, state.is_low, state.updated_at = qty, limit, low, now
+
+    with transaction.atomic():
+        _states.bulk_create(created, ignore_conflicts=True)
+        _states.bulk_update(changed, ["on_hand", "threshold", "is_low", "crossed_at", "digested_at", "updated_at"])
+    if notify and crossed:
+        _notify(business_id, crossed)
+    return crossed
+
+
+def evaluate_all(business_id: Optional[int] = None, *, notify: bool = True) -> int:
+    """Full re-scan (one grouped query per tenant); returns the number of crossings."""
+    if business_id:
+        ids = {business_id}
+    else:
+        ids = set(_items.filter(business__isnull=False).values_list("business_id", flat=True).distinct().order_by())
+        ids |= set(_states.values_list("business_id", flat=True).distinct().order_by())
+    return sum(len(evaluate(bid, notify=notify)) for bid in sorted(ids))
+
+
+def _notify(business_id: int, crossed: list[LowStockState]) -> None:
+    if not apps.is_installed("notifications"):
+        return
+    from notifications.utils import create_notification
+
+    names = dict(Product.objects.filter(pk__in={s.product_id for s in crossed}).values_list("pk", "name"))
+    for s in crossed:
+        create_notification(
+            audience="ADMIN",
+            business=business_id,
+            message=f"Low stock: {names.get(s.product_id) or 'Product'} - {s.on_hand} left "
+                    f"(threshold {s.threshold}).",
+            level="warning",
+            meta={"type": "low_stock", "product_id": s.product_id, "location_id": s.location_id},
+            email=False,
+            whatsapp=False,
+        )
+
+
+# ---------------------------------------------------------------------
+# Digest
+# ---------------------------------------------------------------------
+def _recipients(business_id: int) -> list[str]:
+    from tenants.models import Membership
+
+    return sorted(set(
+        Membership.objects.filter(business_id=business_id, role="MANAGER", status="ACTIVE")
+        .exclude(user__email="").values_list("user__email", flat=True)
+    ))
+
+
+def build_digest(business_id: int) -> tuple[list[LowStockState], str]:
+    """Undigested crossings that are still low, and the digest body listing them."""
+    rows = list(
+        _states.filter(business_id=business_id, is_low=True, digested_at__isnull=True)
+        .select_related("product", "location")
+        .order_by("location__name", "product__name", "product__model")
+    )
+    by_location = defaultdict(list)
+    for s in rows:
+        by_location[s.location.name].append(s)
+    lines = []
+    for loc_name, states in by_location.items():
+        lines.append(f"Location: {loc_name}")
+        for s in states:
+            p = s.product
+            pname = p.name or f"{p.brand} {p.model} {p.variant}".strip()
+            lines.append(f"  - {p.code} | {pname}  -> Qty: {s.on_hand}  (threshold: {s.threshold})")
+        lines.append("")
+    still_low = _states.filter(business_id=business_id, is_low=True, digested_at__isnull=False).count()
+    if still_low:
+        lines.append(f"{still_low} other item(s) from earlier digests are still below threshold.")
+    return rows, "\n".join(lines).rstrip()
+
+
+def send_digests(business_id: Optional[int] = None, *, dry_run: bool = False) -> dict[int, int]:
+    """One email per tenant with new crossings; returns {business_id: rows listed}."""
+    pending = _states.filter(is_low=True, digested_at__isnull=True)
+    if business_id:
+        pending = pending.filter(business_id=business_id)
+    sent = {}
+    for bid in sorted(set(pending.values_list("business_id", flat=True))):
+        rows, body = build_digest(bid)
+        recips = _recipients(bid)
+        if not rows or not recips:
+            continue
+        if not dry_run:
+            send_mail("Low stock digest", body, getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@example.com"),
+                      recips, fail_silently=False)
+            _states.filter(pk__in=[s.pk for s in rows]).update(digested_at=timezone.now())
+        sent[bid] = len(rows)
+    return sent
+
+
+# ---------------------------------------------------------------------
+# Signals: re-evaluate only what a stock change touched
+# ---------------------------------------------------------------------
+def _key_of(item: InventoryItem) -> Optional[tuple[int, Pair]]:
+    # __dict__: reading a deferred field would load it with a query
+    bid, pid, lid = (item.__dict__.get(f) for f in ("business_id", "product_id", "current_location_id"))
+    if not (bid and pid and lid):
+        return None
+    return bid, (pid, lid)
+
+
+def _flush(keys: set) -> None:
+    batch: dict[int, set] = defaultdict(set)
+    for bid, pair in keys:
+        batch[bid].add(pair)
+    for bid, pairs in batch.items():
+        try:
+            evaluate(bid, pairs)
+        except Exception:
+            # Never fail a stock movement over alerts; the --full scan catches up
+            log.exception("Low-stock evaluation failed for business %s", bid)
+
+
+def _queue(keys: Iterable) -> None:
+    # One evaluation per transaction: a bulk stock-in is checked once, not per item
+    defer("lowstock", keys, _flush)
+
+
+@receiver(post_init, sender=InventoryItem, dispatch_uid="lowstock_prev_key")
+def _remember_previous_pair(sender, instance: InventoryItem, **kwargs):
+    instance._lowstock_prev_key = _key_of(instance)
+
+
+@receiver(post_save, sender=InventoryItem, dispatch_uid="lowstock_after_save")
+def _after_save(sender, instance: InventoryItem, **kwargs):
+    key = _key_of(instance)
+    _queue([key, getattr(instance, "_lowstock_prev_key", None)])
+    instance._lowstock_prev_key = key
+
+
+@receiver(post_delete, sender=InventoryItem, dispatch_uid="lowstock_after_delete")
+def _after_delete(sender, instance: InventoryItem, **kwargs):
+    _queue([_key_of(instance)])
@@ -0,0 +1,73 @@
+# inventory/management/commands/bench_endpoints.py
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.benchmarks import (
+    ENDPOINTS,
+    DataSize,
+    compare,
+    failed_requests,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "tools" / "bench_baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark hot endpoints (latency + SQL queries) on synthetic multi-tenant data "
+        "in a throwaway test database, and compare against a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1x2x100,3x3x1000",
+                            help="Comma-separated BUSINESSESxLOCATIONSxITEMS sizes.")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed calls per endpoint.")
+        parser.add_argument("--endpoint", action="append", dest="endpoints", choices=sorted(ENDPOINTS),
+                            help="Only this endpoint (repeatable).")
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file.")
+        parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline.")
+        parser.add_argument("--tolerance", type=float, default=2.0,
+                            help="Allowed median latency ratio vs baseline.")
+
+    def handle(self, *args, **opts):
+        try:
+            sizes = [DataSize.parse(s) for s in opts["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes must look like 1x2x100,3x3x1000")
+
+        results = run_benchmarks(sizes, repeat=max(1, opts["repeat"]), endpoints=opts.get("endpoints"),
+                                 log=self.stdout.write)
+
+        self.stdout.write(f"\n{'size':<14}{'endpoint':<24}{'status':>7}{'queries':>9}{'median ms':>11}{'max ms':>9}")
+        for size, eps in results.items():
+            for name, r in eps.items():
+                self.stdout.write(
+                    f"{size:<14}{name:<24}{r['status']!s:>7}{r['queries']:>9}{r['median_ms']:>11}{r['max_ms']:>9}"
+                )
+
+        path = Path(opts["baseline"])
+        if opts["update_baseline"]:
+            failed = failed_requests(results)
+            if failed:
+                for p in failed:
+                    self.stdout.write(self.style.ERROR(p))
+                raise CommandError("Not writing a baseline from failed requests.")
+            save_baseline(path, results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {path}"))
+            return
+
+        baseline = load_baseline(path)
+        if not baseline:
+            self.stdout.write(self.style.WARNING(f"No baseline at {path}; run with --update-baseline."))
+            return
+        problems = compare(results, baseline, tolerance=opts["tolerance"])
+        if problems:
+            for p in problems:
+                self.stdout.write(self.style.ERROR(p))
+            raise CommandError(f"{len(problems)} benchmark regression(s).")
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
@@ -0,0 +1,52 @@
+# inventory/management/commands/bench_startup.py
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from cc.startup import compare, load_baseline, measure, save_baseline
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "tools" / "startup_baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure Django startup (settings, app registry, URLconf) in fresh interpreters, "
+        "report import time per app and compare against a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to time (median is kept).")
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file.")
+        parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline.")
+        parser.add_argument("--tolerance", type=float, default=1.5,
+                            help="Allowed import time ratio vs baseline (plus a small absolute slack).")
+
+    def handle(self, *args, **opts):
+        try:
+            results = measure(repeat=max(1, opts["repeat"]))
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f"\n{'app':<28}{'import ms':>11}")
+        for app, ms in sorted(results["apps"].items(), key=lambda kv: kv[1], reverse=True):
+            self.stdout.write(f"{app:<28}{ms:>11}")
+        self.stdout.write(f"{'total (wall)':<28}{results['total_ms']:>11}")
+        if results["heavy"]:
+            self.stdout.write(f"heavy modules loaded: {', '.join(results['heavy'])}")
+
+        path = Path(opts["baseline"])
+        if opts["update_baseline"]:
+            save_baseline(path, results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {path}"))
+
+        baseline = {} if opts["update_baseline"] else load_baseline(path)
+        if not baseline and not opts["update_baseline"]:
+            self.stdout.write(self.style.WARNING(f"No baseline at {path}; run with --update-baseline."))
+        problems = compare(results, baseline, tolerance=opts["tolerance"])
+        if problems:
+            for p in problems:
+                self.stdout.write(self.style.ERROR(p))
+            raise CommandError(f"{len(problems)} startup regression(s).")
+        if baseline:
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
@@ -0,0 +1,22 @@
+# inventory/management/commands/rebuild_attendance_days.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory.attendance import rebuild_attendance
+
+
+class Command(BaseCommand):
+    help = "Rebuild AttendanceDay summaries (manager time overview) from TimeLog rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business", type=int, help="Only this business id.")
+        parser.add_argument("--days", type=int, help="Only the last N days (default: full history).")
+
+    def handle(self, *args, **opts):
+        since = None
+        if opts.get("days"):
+            since = timezone.localdate() - timedelta(days=opts["days"])
+        n = rebuild_attendance(business_id=opts.get("business"), since=since)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {n} attendance day row(s)."))
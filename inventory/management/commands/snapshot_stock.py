@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from inventory.aging import snapshot_all
+
+
+class Command(BaseCommand):
+    help = "Store today's stock valuation and aging per location and product (StockSnapshot); safe to re-run."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business", type=int, help="Only this business id.")
+
+    def handle(self, *args, **opts):
+        taken = snapshot_all(opts.get("business"))
+        rows = sum(taken.values())
+        self.stdout.write(self.style.SUCCESS(f"Stock snapshot: {rows} row(s) for {len(taken)} business(es)."))
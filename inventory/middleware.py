@@ -2,6 +2,7 @@
 from django.conf import settings
 from django.http import HttpResponseForbidden
 from django.utils.deprecation import MiddlewareMixin
+from tenants.principal import get_principal
 from inventory.helpers.request_ctx import ensure_request_defaults, _get_active_business
 
 SAFE_METHODS = {"GET", "HEAD", "OPTIONS", "TRACE"}
@@ -57,7 +58,7 @@ class AuditorReadOnlyMiddleware:
 
         # Group: "Auditors"
         try:
-            if user.groups.filter(name__iexact="Auditors").exists():
+            if get_principal(user).in_groups(["Auditors"], ignore_case=True):
                 is_auditor = True
         except Exception:
             pass
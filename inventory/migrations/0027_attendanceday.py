@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0026_remove_inventoryitem_uniq_imei_per_business_and_more'),
+        ('tenants', '0009_remove_old_business_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('work_secs', models.IntegerField(default=0)),
+                ('open_since', models.DateTimeField(blank=True, null=True)),
+                ('first_departure', models.DateTimeField(blank=True, null=True)),
+                ('tail_work_secs', models.IntegerField(default=0)),
+                ('tail_open_since', models.DateTimeField(blank=True, null=True)),
+                ('last_kind', models.CharField(blank=True, choices=[('ARRIVAL', 'Arrival'), ('DEPARTURE', 'Departure')], default='', max_length=10)),
+                ('last_ts', models.DateTimeField(blank=True, null=True)),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_days', to='tenants.business')),
+                ('last_event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='inventory.timelog')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('user_id', 'day'),
+                'indexes': [models.Index(fields=['business', 'day'], name='attday_biz_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('business', 'user', 'day'), name='attday_biz_user_day_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0027_attendanceday'),
+        ('tenants', '0010_numbersequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('on_hand', models.PositiveIntegerField(default=0)),
+                ('threshold', models.PositiveIntegerField(default=0)),
+                ('is_low', models.BooleanField(default=False)),
+                ('crossed_at', models.DateTimeField(blank=True, null=True)),
+                ('digested_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tenants.business')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.location')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['business', 'is_low'], name='lowstock_biz_low_idx')],
+                'constraints': [models.UniqueConstraint(fields=('business', 'product', 'location'), name='lowstock_biz_prod_loc_uniq')],
+            },
+        ),
+    ]
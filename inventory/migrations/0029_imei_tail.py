@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:01
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0028_lowstockstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='imei_tail',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Right('imei', 6), output_field=models.CharField(max_length=6, null=True)),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['business', 'imei_tail'], name='inv_biz_imei_tail_idx'),
+        ),
+    ]
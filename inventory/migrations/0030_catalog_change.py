@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0029_imei_tail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('kind', models.CharField(choices=[('product', 'Product'), ('price', 'Order price'), ('location', 'Location')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('changed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'object_id'], name='catchg_kind_obj_idx'), models.Index(fields=['business_id', 'id'], name='catchg_biz_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0030_catalog_change'),
+        ('tenants', '0010_numbersequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncOp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.UUIDField()),
+                ('kind', models.CharField(max_length=16)),
+                ('status', models.CharField(choices=[('applied', 'Applied'), ('conflict', 'Conflict')], max_length=10)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('client_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('business', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tenants.business')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'client_id'), name='syncop_user_client_uniq')],
+            },
+        ),
+    ]
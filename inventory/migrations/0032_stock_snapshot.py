@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0031_sync_op'),
+        ('tenants', '0010_numbersequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('on_hand', models.PositiveIntegerField(default=0)),
+                ('cost_value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('retail_value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('age_0_30', models.PositiveIntegerField(default=0)),
+                ('age_31_60', models.PositiveIntegerField(default=0)),
+                ('age_61_90', models.PositiveIntegerField(default=0)),
+                ('age_over_90', models.PositiveIntegerField(default=0)),
+                ('oldest_received', models.DateField(blank=True, null=True)),
+                ('taken_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tenants.business')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.location')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('business', 'day', 'location', 'product'), name='stocksnap_cell_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:23
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def versions_from_ids(apps, schema_editor):
+    # Existing rows keep their order; the counter is seeded from MAX(version)
+    apps.get_model("inventory", "CatalogChange").objects.update(version=F("id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0032_stock_snapshot'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='catalogchange',
+            name='catchg_biz_id_idx',
+        ),
+        migrations.AddField(
+            model_name='catalogchange',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='catalogchange',
+            index=models.Index(fields=['business_id', 'version'], name='catchg_biz_version_idx'),
+        ),
+        migrations.RunPython(versions_from_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0033_catalog_change_version'),
+        ('tenants', '0010_numbersequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['business', 'updated_at'], name='inv_biz_updated_idx'),
+        ),
+    ]
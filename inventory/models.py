@@ -14,7 +14,7 @@ from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models
 from django.db.models import Q, Sum, Count
-from django.db.models.functions import TruncDate
+from django.db.models.functions import Right, TruncDate
 from django.utils import timezone
 
 # --- Tenancy imports (explicit) ---
@@ -36,6 +36,9 @@ except Exception:
 # ==========================================================
 # SINGLE SOURCE OF TRUTH: IMEI normalization (15 digits)
 # ==========================================================
+IMEI_TAIL_DIGITS = 6  # suffix length indexed for partial IMEI scans
+
+
 def normalize_imei(raw: Optional[str]) -> str:
     """Keep digits only and enforce 15-digit IMEI semantics (prefer the LAST 15 digits)."""
     if not raw:
@@ -387,16 +390,16 @@ class InventoryItemQuerySet(models.QuerySet):
         Normalized, tenant-aware, 'in stock' lookup for an IMEI.
         This is the ONE place views (scan_in / scan_sold / APIs) should use.
         """
+        from .imei_lookup import lookup  # imei_lookup imports this module
+
         imei = normalize_imei(imei_raw)
         if len(imei) != 15:
             return None
         biz_id = business.id if isinstance(business, Business) else business
-        return (
-            self.in_stock()
-            .filter(business_id=biz_id, imei=imei)
-            .with_related()
-            .first()
-        )
+        hit = lookup(biz_id, imei)
+        if hit is None:
+            return None
+        return self.in_stock().filter(pk=hit.item_id).with_related().first()
 
     # ---------- filters for analytics ----------
     def by_agent(self, user_or_id):
@@ -485,6 +488,13 @@ class InventoryItem(models.Model):
         validators=[RegexValidator(r"^\d{15}$", "IMEI must be exactly 15 digits.")],
         help_text="15-digit IMEI. Unique per business when provided.",
     )
+    # Last digits of the IMEI, computed by the database so bulk writes keep it
+    # in step; indexed with business for partial scans (inventory.imei_lookup).
+    imei_tail = models.GeneratedField(
+        expression=Right("imei", IMEI_TAIL_DIGITS),
+        output_field=models.CharField(max_length=IMEI_TAIL_DIGITS, null=True),
+        db_persist=True,
+    )
     product = models.ForeignKey("Product", on_delete=models.PROTECT)
 
     # default today
@@ -539,6 +549,7 @@ class InventoryItem(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["business", "imei"], name="inv_biz_imei_idx"),
+            models.Index(fields=["business", "imei_tail"], name="inv_biz_imei_tail_idx"),
             # Composite for inventory lists — name <= 30 chars
             models.Index(
                 fields=["business", "product", "current_location", "status"],
@@ -550,6 +561,8 @@ class InventoryItem(models.Model):
             models.Index(fields=["warranty_status", "warranty_expires_at"], name="inv_wty_stat_exp_idx"),
             # Stock aging
             models.Index(fields=["received_at"], name="inv_received_idx"),
+            # Dashboard change watermark (inventory.views_poll)
+            models.Index(fields=["business", "updated_at"], name="inv_biz_updated_idx"),
         ]
         constraints = [
             # Per-tenant IMEI uniqueness (only when IMEI present and non-empty)
@@ -1096,3 +1109,133 @@ class PhoneProduct(Product):
         proxy = True
         verbose_name = "Phone Product"
         verbose_name_plural = "Phone Products"
+
+
+# ---- Low-stock state per (business, product, location) (inventory.lowstock) ----
+class LowStockState(models.Model):
+    """
+    Last evaluated on-hand vs threshold for one product at one location.
+    A row flipping to is_low is a threshold crossing: it alerts once and is
+    listed in the next digest (digested_at stays NULL until then).
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name="+")
+    product = models.ForeignKey("Product", on_delete=models.CASCADE, related_name="+")
+    location = models.ForeignKey("Location", on_delete=models.CASCADE, related_name="+")
+    on_hand = models.PositiveIntegerField(default=0)
+    threshold = models.PositiveIntegerField(default=0)
+    is_low = models.BooleanField(default=False)
+    crossed_at = models.DateTimeField(null=True, blank=True)
+    digested_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["business", "product", "location"], name="lowstock_biz_prod_loc_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["business", "is_low"], name="lowstock_biz_low_idx"),
+        ]
+
+    def __str__(self):
+        flag = "LOW" if self.is_low else "ok"
+        return f"{self.business_id}:{self.product_id}@{self.location_id} {self.on_hand}/{self.threshold} {flag}"
+
+
+
+# ---- Catalog change log for scan-page sync (inventory.catalog) ----
+class CatalogChange(models.Model):
+    """
+    Latest change to one catalog object (product, its active order price, or
+    a location). Rows are replaced on every write with a new `version` from
+    one platform-wide counter, taken under the counter's row lock, so versions
+    become visible in commit order and MAX(version) visible to a business is
+    that business's catalog version. business is NULL for the shared
+    product/price catalog.
+    """
+    KIND_CHOICES = (
+        ("product", "Product"),
+        ("price", "Order price"),
+        ("location", "Location"),
+    )
+
+    # Plain id, not a FK: location deletes cascading from a business still record
+    business_id = models.PositiveBigIntegerField(null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "object_id"], name="catchg_kind_obj_idx"),
+            models.Index(fields=["business_id", "version"], name="catchg_biz_version_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} v{self.version} ({self.business_id or 'shared'})"
+
+
+# ---- Offline op-log idempotency keys (inventory.oplog) ----
+class SyncOp(models.Model):
+    """
+    One client operation the offline sync API has answered. The op is
+    inserted in the same savepoint as its effect, so the (user, client_id)
+    unique key guarantees a re-sent op is never applied twice; replays get
+    the stored status and result back.
+    """
+    STATUS_CHOICES = (
+        ("applied", "Applied"),
+        ("conflict", "Conflict"),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    client_id = models.UUIDField()
+    kind = models.CharField(max_length=16)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    result = models.JSONField(default=dict, blank=True)
+    client_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "client_id"], name="syncop_user_client_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.client_id} {self.status}"
+
+
+# ---- Daily stock valuation and aging (inventory.aging) ----
+class StockSnapshot(models.Model):
+    """
+    In-stock units of one product at one location at the end of a day:
+    cost and retail value, and units per age bucket (days since received_at).
+    Value-trend charts and slow-mover reports read these rows instead of
+    scanning items.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name="+")
+    location = models.ForeignKey("Location", on_delete=models.CASCADE, related_name="+")
+    product = models.ForeignKey("Product", on_delete=models.CASCADE, related_name="+")
+    day = models.DateField()
+    on_hand = models.PositiveIntegerField(default=0)
+    cost_value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    retail_value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    age_0_30 = models.PositiveIntegerField(default=0)
+    age_31_60 = models.PositiveIntegerField(default=0)
+    age_61_90 = models.PositiveIntegerField(default=0)
+    age_over_90 = models.PositiveIntegerField(default=0)
+    oldest_received = models.DateField(null=True, blank=True)
+    taken_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["business", "day", "location", "product"], name="stocksnap_cell_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id}:{self.product_id}@{self.location_id} {self.day} x{self.on_hand}"
+
+# Invoice/quotation models live in their own module; import them here so the
+# app registry sees them even when the docs views have not been loaded.
+from .models_docs import Doc, DocItem  # noqa: E402,F401
@@ -77,6 +77,64 @@ class TimeLog(models.Model):
     def __str__(self):
         return f"{self.ts:%Y-%m-%d %H:%M} {self.user} {self.kind}"
 
+# ---------------------------------------------------------------------
+# AttendanceDay — maintained per-(user, day) summary of TimeLog
+# ---------------------------------------------------------------------
+class AttendanceDay(models.Model):
+    """
+    One row per (business, user, local day), rebuilt from that day's TimeLogs
+    whenever one is written (see inventory.attendance). The manager overview
+    reads these instead of pairing raw events on every poll.
+
+    Pairing depends on whether the agent was already on shift when the day
+    began (a shift crossing midnight), so both cases are stored:
+      - entered off shift:  work_secs / open_since
+      - entered on shift:   first_departure closes the carried shift, then
+                            tail_work_secs / tail_open_since cover the rest
+    An open shift is stored as its start; the running part is added at read time.
+    """
+    business = models.ForeignKey(
+        Business,
+        on_delete=models.CASCADE,
+        related_name="attendance_days",
+        null=True, blank=True,
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="attendance_days",
+    )
+    day = models.DateField()
+
+    work_secs = models.IntegerField(default=0)
+    open_since = models.DateTimeField(null=True, blank=True)
+    first_departure = models.DateTimeField(null=True, blank=True)
+    tail_work_secs = models.IntegerField(default=0)
+    tail_open_since = models.DateTimeField(null=True, blank=True)
+
+    last_event = models.ForeignKey(
+        TimeLog,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name="+",
+    )
+    last_kind = models.CharField(max_length=10, choices=CHECKIN_TYPES, blank=True, default="")
+    last_ts = models.DateTimeField(null=True, blank=True)
+    event_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("user_id", "day")
+        constraints = [
+            models.UniqueConstraint(fields=["business", "user", "day"], name="attday_biz_user_day_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["business", "day"], name="attday_biz_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.user} {self.work_secs}s"
+
 # ---------------------------------------------------------------------
 # Attendance policy (defaults)
 # ---------------------------------------------------------------------
@@ -85,8 +85,9 @@ class Doc(models.Model):
         self.total = total if total >= Decimal("0.00") else Decimal("0.00")
 
     def save(self, *args, **kwargs):
-        # If not explicitly set (e.g., during import), recompute totals
-        if kwargs.pop("recompute", True):
+        # If not explicitly set (e.g., during import), recompute totals; a new
+        # doc has no items yet
+        if kwargs.pop("recompute", True) and self.pk:
             self.compute_totals()
         # Autopopulate issued_at when moving out of draft
         if self.issued_at is None and self.status in {"SENT", "PAID"}:
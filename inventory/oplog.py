@@ -0,0 +1,282 @@
+# inventory/oplog.py
+"""
+Offline op-log sync: apply an ordered batch of client operations once each.
+
+Phones queue scan-in / sell / price / check-in operations while offline,
+each tagged with a client-generated UUID, and flush the queue in one
+request (POST /inventory/api/sync/). For a batch:
+
+- Everything runs in one transaction. Each op gets its own savepoint, so a
+  conflict or failure in one op does not undo the others.
+- The op's effect and its SyncOp row are written in the same savepoint.
+  The (user, client_id) unique key therefore makes a re-sent op (after a
+  dropped response, or from two overlapping flushes) a no-op that returns
+  the stored answer with status "duplicate".
+- Business-rule refusals (already sold, unknown product, not a manager)
+  are conflicts. They are recorded too, so a replay gets the same answer.
+  Malformed ops are "rejected" and unexpected failures are "error"; neither
+  is recorded, so the client can fix or retry them.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from tenants.principal import get_principal
+
+from . import imei_lookup
+from .models import InventoryItem, Location, Product, SyncOp, normalize_imei
+from .models_attendance import TimeLog
+
+logger = logging.getLogger(__name__)
+
+MANAGER_ROLES = {"OWNER", "ADMIN", "MANAGER", "SUPERVISOR"}
+
+
+def max_ops() -> int:
+    return int(getattr(settings, "SYNC_MAX_OPS", 500))
+
+
+class Conflict(Exception):
+    """The op is well-formed but cannot apply to the current state."""
+
+    def __init__(self, code: str, message: str, **detail):
+        super().__init__(message)
+        self.code, self.message, self.detail = code, message, detail
+
+    def as_dict(self) -> dict:
+        return {"code": self.code, "message": self.message, **self.detail}
+
+
+@dataclass(frozen=True)
+class Op:
+    id: uuid.UUID
+    type: str
+    at: datetime
+    data: dict
+
+
+@dataclass
+class Context:
+    request: Any
+    business: Any
+    user: Any
+
+
+# ---------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------
+def _client_time(raw) -> datetime:
+    """Client timestamp, made aware and clamped to now (phone clocks drift)."""
+    now = timezone.now()
+    when = parse_datetime(str(raw)) if raw else None
+    if when is None:
+        return now
+    if timezone.is_naive(when):
+        when = timezone.make_aware(when)
+    return min(when, now)
+
+
+def parse_op(raw) -> Op:
+    """An Op from one JSON entry; ValueError explains what is wrong with it."""
+    if not isinstance(raw, dict):
+        raise ValueError("op must be an object")
+    try:
+        op_id = uuid.UUID(str(raw.get("id")))
+    except ValueError:
+        raise ValueError("id must be a UUID")
+    kind = str(raw.get("type") or "")
+    if kind not in HANDLERS:
+        raise ValueError(f"unknown type '{kind}'")
+    data = raw.get("data") or {}
+    if not isinstance(data, dict):
+        raise ValueError("data must be an object")
+    return Op(op_id, kind, _client_time(raw.get("at")), data)
+
+
+def _money(value, field: str = "price") -> Decimal:
+    try:
+        amount = Decimal(str(value).replace(",", "").strip())
+    except (InvalidOperation, TypeError):
+        raise Conflict("bad_price", f"{field} must be a number")
+    if amount < 0:
+        raise Conflict("bad_price", f"{field} cannot be negative")
+    return amount.quantize(Decimal("0.01"))
+
+
+def _imei(value) -> str:
+    imei = normalize_imei(value)
+    if len(imei) != 15:
+        raise Conflict("bad_imei", "IMEI must be 15 digits")
+    return imei
+
+
+def _location_id(ctx: Context, raw) -> Optional[int]:
+    """The requested location if it is the business's, else the agent's or the default one."""
+    locations = Location._base_manager.filter(business=ctx.business)
+    try:
+        if raw not in (None, "") and locations.filter(pk=int(raw)).exists():
+            return int(raw)
+    except (TypeError, ValueError):
+        pass
+    for grant in get_principal(ctx.user).memberships:
+        if grant.active and grant.business_id == ctx.business.id and grant.location_id:
+            return grant.location_id
+    return locations.order_by("-is_default", "id").values_list("id", flat=True).first()
+
+
+# ---------------------------------------------------------------------
+# Handlers: raise Conflict before writing anything
+# ---------------------------------------------------------------------
+def _scan_in(ctx: Context, op: Op) -> dict:
+    imei = _imei(op.data.get("imei"))
+    try:
+        product = Product.objects.get(pk=int(op.data.get("product_id")))
+    except (Product.DoesNotExist, TypeError, ValueError):
+        raise Conflict("bad_product", "Unknown product")
+    existing = InventoryItem._base_manager.filter(business=ctx.business, imei=imei).first()
+    if existing is not None:
+        code = "already_sold" if existing.status == "SOLD" or existing.sold_at else "already_in_stock"
+        raise Conflict(code, "This IMEI is already recorded.", item_id=existing.pk)
+    location_id = _location_id(ctx, op.data.get("location_id"))
+    if location_id is None:
+        raise Conflict("no_location", "The business has no location to receive stock.")
+
+    item = InventoryItem._base_manager.create(
+        business=ctx.business,
+        imei=imei,
+        product=product,
+        current_location_id=location_id,
+        order_price=_money(op.data.get("order_price") or 0, "order_price"),
+        received_at=timezone.localdate(op.at),
+        status="IN_STOCK",
+    )
+    return {"item_id": item.pk, "location_id": location_id}
+
+
+def _sell(ctx: Context, op: Op) -> dict:
+    from .utils_status import mark_item_sold
+
+    imei = _imei(op.data.get("imei"))
+    price = _money(op.data.get("price"))
+    item, _matched = imei_lookup.find_in_stock(ctx.business.id, imei, for_update=True)
+    if item is None:
+        sold = InventoryItem._base_manager.filter(business=ctx.business, imei=imei).exclude(sold_at=None).first()
+        if sold is not None:
+            raise Conflict("already_sold", "This IMEI was already sold.", item_id=sold.pk)
+        raise Conflict("not_found", "Item not found in stock.")
+    location_id = _location_id(ctx, op.data.get("location_id"))
+    mark_item_sold(item, price=price, sold_date=op.at, user=ctx.user, loc_id=location_id)
+    return {"item_id": item.pk, "price": str(price), "sold_at": op.at.isoformat()}
+
+
+def _price(ctx: Context, op: Op) -> dict:
+    principal = get_principal(ctx.user)
+    if not (principal.is_superuser or principal.is_staff or principal.roles_in(ctx.business.id) & MANAGER_ROLES):
+        raise Conflict("forbidden", "Only managers can change prices.")
+    price = _money(op.data.get("price"))
+    item, _matched = imei_lookup.find_in_stock(ctx.business.id, op.data.get("imei"), for_update=True)
+    if item is None:
+        raise Conflict("not_found", "Item not found in stock.")
+    item.selling_price = price
+    item.save(update_fields=["selling_price", "updated_at"])
+    return {"item_id": item.pk, "price": str(price)}
+
+
+def _checkin(ctx: Context, op: Op) -> dict:
+    kind = str(op.data.get("kind") or "ARRIVAL").upper()
+    if kind not in ("ARRIVAL", "DEPARTURE"):
+        raise Conflict("bad_kind", "kind must be ARRIVAL or DEPARTURE")
+    coords = {}
+    for field in ("lat", "lon"):
+        raw = op.data.get(field)
+        try:
+            coords[field] = Decimal(str(raw)).quantize(Decimal("0.000001")) if raw not in (None, "") else None
+        except InvalidOperation:
+            raise Conflict("bad_coords", f"{field} must be a number")
+    log = TimeLog.objects.create(
+        business=ctx.business,
+        user=ctx.user,
+        location_id=_location_id(ctx, op.data.get("location_id")),
+        kind=kind,
+        ts=op.at,
+        **coords,
+    )
+    return {"timelog_id": log.pk, "ts": log.ts.isoformat()}
+
+
+HANDLERS: dict[str, Callable[[Context, Op], dict]] = {
+    "scan_in": _scan_in,
+    "sell": _sell,
+    "price": _price,
+    "checkin": _checkin,
+}
+
+
+# ---------------------------------------------------------------------
+# Batch
+# ---------------------------------------------------------------------
+def _stored(row: SyncOp) -> dict:
+    return {"id": str(row.client_id), "status": "duplicate", "original_status": row.status, "result": row.result}
+
+
+def apply_batch(request, business, raw_ops: list) -> list[dict]:
+    """Apply ops in order; one result dict per op, in the same order."""
+    ctx = Context(request=request, business=business, user=request.user)
+    parsed: list[Any] = []
+    for raw in raw_ops:
+        try:
+            parsed.append(parse_op(raw))
+        except ValueError as exc:
+            parsed.append({"id": str(raw.get("id")) if isinstance(raw, dict) else None,
+                           "status": "rejected", "error": str(exc)})
+
+    ids = [op.id for op in parsed if isinstance(op, Op)]
+    seen = {row.client_id: row for row in SyncOp._base_manager.filter(user=ctx.user, client_id__in=ids)}
+
+    results = []
+    with transaction.atomic():
+        for op in parsed:
+            if not isinstance(op, Op):
+                results.append(op)
+            elif op.id in seen:
+                results.append(_stored(seen[op.id]))
+            else:
+                results.append(_apply_one(ctx, op, seen))
+    return results
+
+
+def _apply_one(ctx: Context, op: Op, seen: dict) -> dict:
+    try:
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    status, result = "applied", HANDLERS[op.type](ctx, op)
+            except Conflict as exc:
+                status, result = "conflict", exc.as_dict()
+            except ValidationError as exc:
+                status, result = "conflict", {"code": "invalid", "message": "; ".join(exc.messages)}
+            row = SyncOp._base_manager.create(user=ctx.user, business=ctx.business, client_id=op.id,
+                                              kind=op.type, status=status, result=result, client_at=op.at)
+    except IntegrityError:
+        # Another flush of the same queue committed this op first
+        row = SyncOp._base_manager.filter(user=ctx.user, client_id=op.id).first()
+        if row is None:
+            logger.exception("sync op %s failed", op.id)
+            return {"id": str(op.id), "status": "error", "error": "could not apply; retry later"}
+        return _stored(row)
+    except Exception:
+        logger.exception("sync op %s failed", op.id)
+        return {"id": str(op.id), "status": "error", "error": "could not apply; retry later"}
+    seen[op.id] = row
+    return {"id": str(op.id), "status": status, "result": result}
@@ -1,9 +1,12 @@
 # inventory/perm_utils.py
+from tenants.principal import get_principal
+
+
 def is_business_manager(user):
     if not user.is_authenticated: return False
     return (
         user.is_superuser
-        or user.groups.filter(name__in=["Business Manager", "Admin"]).exists()
+        or get_principal(user).in_groups(["Business Manager", "Admin"])
         or user.has_perm("inventory.change_stock")
         or user.has_perm("inventory.delete_stock")
     )
@@ -8,7 +8,7 @@ from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import InventoryItem
+from .models import InventoryItem, Product
 try:
     from .models import InventoryAudit  # optional in some setups
 except Exception:  # pragma: no cover
@@ -59,7 +59,7 @@ class RequestMiddleware:
 try:
     from .cache_utils import bump_dashboard_cache_version as _bump_cache
 except Exception:  # pragma: no cover
-    def _bump_cache() -> None:
+    def _bump_cache(business_id=None) -> None:
         pass
 
 # ---------------------------------------------------------------------
@@ -165,7 +165,7 @@ def _invitem_audit(sender, instance: InventoryItem, created: bool, **kwargs):
             except Exception:
                 pass
 
-        _bump_cache()
+        _bump_cache(getattr(instance, "business_id", None))
         return
 
     # UPDATE
@@ -197,7 +197,7 @@ def _invitem_audit(sender, instance: InventoryItem, created: bool, **kwargs):
             except Exception:
                 pass
 
-        _bump_cache()
+        _bump_cache(getattr(instance, "business_id", None))
 
 
 @receiver(post_delete, sender=InventoryItem)
@@ -217,12 +217,27 @@ def _invitem_deleted(sender, instance: InventoryItem, **kwargs):
         except Exception:
             pass
 
+    _bump_cache(getattr(instance, "business_id", None))
+
+
+# Products are shared by every business: renames show on all dashboards
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def _product_changed(sender, instance: Product, **kwargs):
     _bump_cache()
 
 # ---------------------------------------------------------------------
 # Sale hooks (guarded if sales app not present)
 # ---------------------------------------------------------------------
 
+def _sale_business_id(sale: Any) -> Optional[int]:
+    bid = getattr(sale, "business_id", None)
+    if bid is None:
+        item = getattr(sale, "item", None) or getattr(sale, "inventory_item", None)
+        bid = getattr(item, "business_id", None)
+    return bid
+
+
 def _wallet_fields() -> Dict[str, Optional[str]]:
     """
     Build a tolerant map of wallet field names. If WalletTxn is missing,
@@ -283,13 +298,13 @@ if Sale is not None:
         """
         # If API created the Sale and already finalized the item, skip heavy work
         if getattr(instance, "_skip_finalize", False):
-            _bump_cache()
+            _bump_cache(_sale_business_id(instance))
             return
 
         # Some projects name the FK "item", others "inventory_item"
         item = getattr(instance, "item", None) or getattr(instance, "inventory_item", None)
         if item is None:
-            _bump_cache()
+            _bump_cache(_sale_business_id(instance))
             return
 
         if created:
@@ -430,7 +445,7 @@ if Sale is not None:
             except Exception:
                 pass
 
-        _bump_cache()
+        _bump_cache(_sale_business_id(instance))
 
 
 if Sale is not None:
@@ -449,4 +464,4 @@ if Sale is not None:
                 )
             except Exception:
                 pass
-        _bump_cache()
+        _bump_cache(_sale_business_id(instance))
@@ -4,15 +4,12 @@ from typing import Optional, Tuple
 from django.db import transaction
 from django.utils import timezone
 
-try:
-    # Adjust this import to your actual model
-    from .models import InventoryItem  # fields: business, code, location, sold_at, order_price, selling_price, status
-except Exception as e:
-    raise RuntimeError("Update the model import in inventory/stock_lookup.py to match your project") from e
+from .imei_lookup import find_in_stock, normalize
+from .models import InventoryItem
 
 
 def normalize_code(raw: str) -> str:
-    return "".join(ch for ch in (raw or "").strip() if ch.isdigit())[:15]
+    return normalize(raw)
 
 
 def find_unsold_unit(
@@ -22,22 +19,10 @@ def find_unsold_unit(
     Find an UNSOLD unit for this business, regardless of location.
     Returns (item, location_id_if_found)
     """
-    code = normalize_code(code)
-    if not code:
+    item, _matched = find_in_stock(business_id, code)
+    if item is None:
         return None, None
-
-    qs = (InventoryItem.objects
-          .select_related("location")
-          .filter(business_id=business_id, code=code)
-          .order_by("id"))
-
-    # Prefer truly unsold rows
-    item = qs.filter(sold_at__isnull=True).first()
-    if item:
-        return item, (item.location_id if hasattr(item, "location_id") else None)
-
-    # Nothing to sell
-    return None, None
+    return item, item.current_location_id
 
 
 @transaction.atomic
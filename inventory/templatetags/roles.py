@@ -1,15 +1,16 @@
 ﻿# inventory/templatetags/roles.py
 from django import template
+from tenants.principal import get_principal
 register = template.Library()
 
 @register.simple_tag(takes_context=True)
 def in_group(context, name: str):
     user = context.get("request").user
-    return getattr(user, "is_superuser", False) or user.groups.filter(name=name).exists()
+    return getattr(user, "is_superuser", False) or get_principal(user).in_groups([name])
 
 @register.simple_tag(takes_context=True)
 def is_auditor(context):
     user = context.get("request").user
-    return user.groups.filter(name="Auditor").exists()
+    return get_principal(user).in_groups(["Auditor"])
 
 
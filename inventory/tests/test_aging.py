@@ -0,0 +1,101 @@
+# inventory/tests/test_aging.py
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from inventory import aging
+from inventory.models import InventoryItem, Location, Product, StockSnapshot
+from tenants.models import Business, Membership
+
+User = get_user_model()
+
+
+class StockAgingTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.biz = Business.objects.create(name="Aging A", slug="aging-a", status="ACTIVE")
+        self.other = Business.objects.create(name="Aging B", slug="aging-b", status="ACTIVE")
+        self.loc = Location.objects.create(business=self.biz, name="Shop A")
+        self.other_loc = Location.objects.create(business=self.other, name="Shop B")
+        self.spark = Product.objects.create(code="AG-1", brand="Tecno", model="Spark 20", sale_price=Decimal("300.00"))
+        self.pop = Product.objects.create(code="AG-2", brand="Tecno", model="Pop 8", sale_price=Decimal("150.00"))
+        self.manager = User.objects.create_user("aging_mgr", password="pass12345")
+        Membership.objects.create(user=self.manager, business=self.biz, role="MANAGER", status="ACTIVE")
+
+        for age in (0, 30, 31, 75, 120):
+            self._stock_in(self.spark, age)
+        self._stock_in(self.spark, 5, selling_price="280.00")
+        self._stock_in(self.pop, 100)
+        self._stock_in(self.pop, 10, status="SOLD")
+        self._stock_in(self.spark, 10, business=self.other, loc=self.other_loc)
+
+    def _stock_in(self, product, age, *, business=None, loc=None, status="IN_STOCK", selling_price=None):
+        return InventoryItem._base_manager.create(
+            business=business or self.biz, product=product, current_location=loc or self.loc,
+            received_at=self.today - timedelta(days=age), order_price=Decimal("200.00"), status=status,
+            selling_price=Decimal(selling_price) if selling_price else None,
+        )
+
+    def test_valuation_groups_values_and_age_buckets(self):
+        rows = {r["product_id"]: r for r in aging.valuation(self.biz.id)}
+        spark = rows[self.spark.id]
+        self.assertEqual(spark["on_hand"], 6)
+        self.assertEqual(spark["cost_value"], Decimal("1200.00"))
+        self.assertEqual(spark["retail_value"], Decimal("1780.00"))  # 5 x 300 + 280
+        self.assertEqual([spark[k] for k, _lo, _hi in aging.BUCKETS], [3, 1, 1, 1])
+        self.assertEqual(spark["oldest_received"], self.today - timedelta(days=120))
+        self.assertEqual((rows[self.pop.id]["on_hand"], rows[self.pop.id]["age_over_90"]), (1, 1))
+
+        total = aging.totals(rows.values())
+        self.assertEqual((total["on_hand"], total["cost_value"]), (7, Decimal("1400.00")))
+
+    def test_snapshot_is_replaced_and_feeds_series_and_slow_movers(self):
+        call_command("snapshot_stock", stdout=StringIO())
+        call_command("snapshot_stock", "--business", str(self.biz.id), stdout=StringIO())
+        self.assertEqual(StockSnapshot.objects.filter(business=self.biz, day=self.today).count(), 2)
+        self.assertEqual(StockSnapshot.objects.filter(business=self.other).count(), 1)
+
+        yesterday = self.today - timedelta(days=1)
+        StockSnapshot.objects.filter(business=self.biz).update(day=yesterday)
+        self._stock_in(self.pop, 0)
+
+        series = aging.value_series(self.biz.id, [yesterday, self.today])
+        self.assertEqual(series[yesterday]["on_hand"], 7)
+        self.assertEqual(series[self.today]["on_hand"], 8)
+
+        # A snapshot taken during the day does not freeze today
+        aging.take_snapshot(self.biz.id)
+        self._stock_in(self.pop, 0)
+        self.assertEqual(aging.value_series(self.biz.id, [self.today])[self.today]["on_hand"], 9)
+
+        movers = aging.slow_movers(self.biz.id)
+        self.assertEqual([(m["product"], m["aged"]) for m in movers], [("Tecno Spark 20", 2), ("Tecno Pop 8", 1)])
+        self.assertEqual(movers[0]["location"], "Shop A")
+
+    def test_endpoints_read_snapshots_for_past_days_and_today_live(self):
+        yesterday = self.today - timedelta(days=1)
+        aging.take_snapshot(self.biz.id)
+        StockSnapshot.objects.filter(business=self.biz).update(day=yesterday)
+        aging.take_snapshot(self.biz.id)
+        self._stock_in(self.pop, 0)
+        self.client.force_login(self.manager)
+        session = self.client.session
+        session["active_business_id"] = self.biz.id
+        session.save()
+
+        today = self.client.get("/inventory/api/stock-aging/").json()
+        self.assertEqual((today["source"], today["totals"]["on_hand"]), ("live", 8))
+
+        body = self.client.get("/inventory/api/stock-aging/", {"on": yesterday.isoformat()}).json()
+        self.assertEqual(body["source"], "snapshot")
+        self.assertEqual(body["totals"]["on_hand"], 7)
+        self.assertEqual([b["units"] for b in body["buckets"]], [3, 1, 1, 2])
+        self.assertEqual(body["rows"][0]["product"], "Tecno Spark 20")
+
+        trend = self.client.get("/inventory/api/value-trend/", {"metric": "stock", "period": "7d"}).json()
+        self.assertEqual(trend["data"]["series"][0]["data"][-2:], [1400.0, 1600.0])
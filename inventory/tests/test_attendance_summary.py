@@ -0,0 +1,87 @@
+# inventory/tests/test_attendance_summary.py
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from inventory.attendance import rebuild_attendance, window_summaries
+from inventory.models import Location
+from inventory.models_attendance import AttendanceDay, TimeLog
+from inventory.views_time import _collect_manager_overview, _pair_work_seconds
+from tenants.models import Business, Membership
+
+User = get_user_model()
+
+
+def _at(day, hour, minute=0):
+    return timezone.make_aware(datetime(2025, 3, day, hour, minute))
+
+
+class AttendanceSummaryTests(TestCase):
+    def setUp(self):
+        self.biz = Business.objects.create(name="Time A", slug="time-a", status="ACTIVE")
+        self.loc = Location.objects.create(business=self.biz, name="Front desk")
+        self.agent = User.objects.create_user("time_agent", password="x")
+        Membership.objects.create(user=self.agent, business=self.biz, role="AGENT", status="ACTIVE",
+                                  location=self.loc)
+        self.now = _at(6, 12)
+
+    def _log(self, kind, ts):
+        with self.captureOnCommitCallbacks(execute=True):
+            return TimeLog._base_manager.create(
+                business=self.biz, user=self.agent, location=self.loc, kind=kind, ts=ts,
+            )
+
+    def _raw(self, start, end):
+        events = list(TimeLog._base_manager.filter(user=self.agent, ts__gte=start, ts__lt=end).order_by("ts"))
+        return _pair_work_seconds(events, self.now)
+
+    def test_daily_rows_match_raw_pairing_across_midnight(self):
+        self._log("ARRIVAL", _at(1, 8))
+        self._log("DEPARTURE", _at(1, 12))
+        self._log("ARRIVAL", _at(1, 22))        # night shift, closes on the 2nd
+        self._log("ARRIVAL", _at(2, 1))         # ignored: already on shift
+        self._log("DEPARTURE", _at(2, 6))
+        self._log("ARRIVAL", _at(2, 9))
+        self._log("DEPARTURE", _at(2, 10))
+        self._log("DEPARTURE", _at(4, 7))       # stray departure
+        self._log("ARRIVAL", _at(5, 20))        # still open at "now"
+
+        self.assertEqual(AttendanceDay._base_manager.filter(user=self.agent).count(), 4)
+        for first, last in [(1, 1), (1, 2), (2, 2), (1, 5), (3, 4), (2, 6)]:
+            start, end = _at(first, 0), _at(last, 0) + timedelta(days=1)
+            summary = window_summaries(self.biz.id, start, end, self.now).get(self.agent.id)
+            work, on_shift, last_iso = self._raw(start, end)
+            self.assertIsNotNone(summary, (first, last))
+            self.assertEqual((summary.work_secs, summary.on_shift), (work, on_shift), (first, last))
+            self.assertEqual(timezone.localtime(summary.last_ts).isoformat(), last_iso)
+
+    def test_edits_and_deletes_refresh_the_day(self):
+        arrival = self._log("ARRIVAL", _at(3, 8))
+        departure = self._log("DEPARTURE", _at(3, 10))
+        row = AttendanceDay._base_manager.get(user=self.agent, day=_at(3, 0).date())
+        self.assertEqual((row.work_secs, row.last_kind, row.event_count), (7200, "DEPARTURE", 2))
+
+        departure.ts = _at(4, 9)  # moved to the next day
+        with self.captureOnCommitCallbacks(execute=True):
+            departure.save()
+        row.refresh_from_db()
+        self.assertEqual((row.work_secs, row.open_since, row.event_count), (0, arrival.ts, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            arrival.delete()
+        self.assertFalse(AttendanceDay._base_manager.filter(day=_at(3, 0).date()).exists())
+
+        AttendanceDay._base_manager.all().delete()
+        self.assertEqual(rebuild_attendance(business_id=self.biz.id), 1)
+
+    def test_overview_reads_summary_rows(self):
+        self._log("ARRIVAL", _at(5, 8))
+        self._log("DEPARTURE", _at(5, 16))
+        start, end = _at(5, 0), _at(6, 0)
+        with self.assertNumQueries(2):  # members + summary rows (last event/location joined)
+            data = _collect_manager_overview(self.biz.id, start, end, 8 * 3600)
+        agent = data["agents"][0]
+        self.assertEqual((agent["work_secs"], agent["on_shift"], agent["pct"]), (8 * 3600, False, 100))
+        self.assertEqual((agent["latest_kind"], agent["latest_location"]), ("DEPARTURE", "Front desk"))
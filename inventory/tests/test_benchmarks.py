@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from inventory.benchmarks import ENDPOINTS, DataSize, _client_for, compare, generate
+from inventory.models import InventoryItem
+from sales.models import Sale
+
+
+class BenchmarkHarnessTests(TestCase):
+    def test_generate_builds_every_tenant(self):
+        world = generate(DataSize.parse("2x2x10"))
+        self.assertEqual(InventoryItem.all_objects.count(), 20)
+        self.assertEqual(Sale.objects.count(), 8)
+        self.assertEqual(len(world.in_stock_imeis), 6)
+        self.assertEqual(
+            InventoryItem.all_objects.filter(business=world.business, current_location=world.location).count(), 5
+        )
+
+    def test_compare_flags_query_status_and_latency_regressions(self):
+        base = {"1x1x10": {"stock_list": {"status": 200, "queries": 10, "median_ms": 20.0, "max_ms": 25.0}}}
+        same = {"1x1x10": {"stock_list": {"status": 200, "queries": 10, "median_ms": 44.0, "max_ms": 60.0}}}
+        self.assertEqual(compare(same, base, tolerance=2.0), [])
+
+        worse = {"1x1x10": {"stock_list": {"status": 500, "queries": 11, "median_ms": 46.0, "max_ms": 60.0}}}
+        problems = compare(worse, base, tolerance=2.0)
+        self.assertEqual(len(problems), 3)
+
+        # An error baseline does not make an error pass
+        self.assertEqual(compare(worse, worse), ["1x1x10 stock_list: status 500 (expected 2xx)"])
+
+    def test_scan_sold_scenario_submits_a_valid_sale(self):
+        world = generate(DataSize.parse("1x2x10"))
+        imei = world.in_stock_imeis[-1]
+        resp = ENDPOINTS["scan_sold_submit"](_client_for(world), world)
+        self.assertEqual(resp.status_code, 200)
+        item = InventoryItem.all_objects.get(imei=imei)
+        self.assertEqual(item.status, "SOLD")
+        self.assertTrue(Sale.objects.filter(item=item).exists())
@@ -0,0 +1,87 @@
+# inventory/tests/test_catalog.py
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from inventory import catalog
+from inventory.models import CatalogChange, Location, OrderPrice, Product
+from tenants.models import Business, Membership, NumberSequence
+
+User = get_user_model()
+URL = "/inventory/api/catalog/"
+
+
+class CatalogSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.biz = Business.objects.create(name="Cat A", slug="cat-a", status="ACTIVE")
+            self.other = Business.objects.create(name="Cat B", slug="cat-b", status="ACTIVE")
+            self.shop = Location.objects.create(business=self.biz, name="Shop")
+            self.product = Product.objects.create(code="SPK-20", brand="Tecno", model="Spark 20")
+            self.price = OrderPrice.objects.create(product=self.product, default_order_price=Decimal("150000"))
+        user = User.objects.create_user("cat_agent", password="pass12345")
+        Membership.objects.create(user=user, business=self.biz, role="AGENT", status="ACTIVE", location=self.shop)
+        self.client.login(username="cat_agent", password="pass12345")
+
+    def _write(self, fn):
+        with self.captureOnCommitCallbacks(execute=True):
+            return fn()
+
+    def test_full_fetch_then_etag_and_deltas(self):
+        res = self.client.get(URL)
+        data = res.json()
+        self.assertTrue(data["full"])
+        self.assertEqual([loc["id"] for loc in data["locations"]], [self.shop.id])
+        self.assertEqual(data["prices"][0]["order_price"], "150000.00")
+        self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=res["ETag"]).status_code, 304)
+
+        version = data["version"]
+        up_to_date = self.client.get(URL, {"since": version}).json()
+        self.assertEqual((up_to_date["products"], up_to_date["prices"], up_to_date["locations"]), ([], [], []))
+
+        # Another tenant's location does not move this catalog
+        self._write(lambda: Location.objects.create(business=self.other, name="Elsewhere"))
+        self.assertEqual(self.client.get(URL, {"since": version}).json()["version"], version)
+
+        def reprice():
+            OrderPrice.objects.filter(pk=self.price.pk).update(active=False)
+            OrderPrice.objects.create(product=self.product, default_order_price=Decimal("155000"))
+        self._write(reprice)
+        shop_id = self.shop.id
+        self._write(self.shop.delete)
+        delta = self.client.get(URL, {"since": version}).json()
+        self.assertFalse(delta["full"])
+        self.assertEqual([p["order_price"] for p in delta["prices"]], ["155000.00"])
+        self.assertEqual((delta["products"], delta["removed"]["location"]), ([], [shop_id]))
+
+    @override_settings(CATALOG_CACHE=True)
+    def test_snapshot_is_served_from_cache_until_a_write(self):
+        first = catalog.snapshot(self.biz.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.snapshot(self.biz.id), first)
+        self._write(lambda: Product.objects.create(code="POP-8", brand="Tecno", model="Pop 8"))
+        self.assertGreater(catalog.snapshot(self.biz.id)["version"], first["version"])
+
+    @override_settings(CATALOG_CACHE=False)
+    def test_without_shared_cache_snapshot_follows_the_db_version(self):
+        first = catalog.snapshot(self.biz.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(catalog.snapshot(self.biz.id), first)
+
+        # Written by another worker: this process never rotates its token
+        pop = Product.objects.create(code="POP-8", brand="Tecno", model="Pop 8")
+        snap = catalog.snapshot(self.biz.id)
+        self.assertIn(pop.id, [p["id"] for p in snap["products"]])
+        self.assertEqual([p["id"] for p in catalog.delta(snap, first["version"])["products"]], [pop.id])
+
+    def test_versions_come_from_one_sequence_not_row_ids(self):
+        counter = NumberSequence.objects.get(business=None, prefix=catalog.VERSION_SEQUENCE)
+        self._write(lambda: Location.objects.create(business=self.other, name="Elsewhere"))
+        self._write(lambda: self.product.save())
+        counter.refresh_from_db()
+        change = CatalogChange.objects.get(kind="product", object_id=self.product.id)
+        self.assertEqual(change.version, counter.last_value)
+        self.assertEqual(catalog.snapshot(self.biz.id)["version"], counter.last_value)
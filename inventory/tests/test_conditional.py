@@ -0,0 +1,78 @@
+# inventory/tests/test_conditional.py
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from inventory.models import InventoryItem, Location, Product
+from tenants.models import Business, Membership
+
+User = get_user_model()
+URL = "/inventory/api/summary/"
+
+
+@override_settings(DASHBOARD_CONDITIONAL_GET=True)
+class ConditionalApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.biz = Business.objects.create(name="Cond A", slug="cond-a", status="ACTIVE")
+        self.other = Business.objects.create(name="Cond B", slug="cond-b", status="ACTIVE")
+        self.shop = Location.objects.create(business=self.biz, name="Shop")
+        self.far = Location.objects.create(business=self.other, name="Far")
+        self.product = Product.objects.create(code="HOT-40", brand="Infinix", model="Hot 40")
+        user = User.objects.create_user("cond_manager", password="pass12345")
+        Membership.objects.create(user=user, business=self.biz, role="MANAGER", status="ACTIVE")
+        self.client.login(username="cond_manager", password="pass12345")
+
+    def _item(self, business, location, imei):
+        with self.captureOnCommitCallbacks(execute=True):
+            return InventoryItem._base_manager.create(
+                business=business, current_location=location, product=self.product, imei=imei,
+                order_price=Decimal("100"), received_at=date.today(), status="IN_STOCK",
+            )
+
+    def test_revalidation_skips_the_view_until_the_tenant_writes(self):
+        self._item(self.biz, self.shop, "356000000000011")
+        first = self.client.get(URL)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("private", first["Cache-Control"])
+        self.assertNotIn("no-store", first["Cache-Control"])
+        etag = first["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertFalse([q for q in ctx.captured_queries if "inventory_inventoryitem" in q["sql"]])
+
+        # Cache-busting params do not change the tag; other tenants' writes do not either
+        self.assertEqual(self.client.get(URL, {"_": "123"}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self._item(self.other, self.far, "356000000000029")
+        self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self._item(self.biz, self.shop, "356000000000037")
+        fresh = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh["ETag"], etag)
+
+    def test_switching_location_changes_the_tag(self):
+        warehouse = Location.objects.create(business=self.biz, name="Warehouse")
+        etag = self.client.get(URL)["ETag"]
+        self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        session = self.client.session
+        session["active_location_id"] = warehouse.id
+        session.save()
+        switched = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(switched.status_code, 200)
+        self.assertNotEqual(switched["ETag"], etag)
+
+    @override_settings(DASHBOARD_CONDITIONAL_GET=False)
+    def test_disabled_keeps_never_cache(self):
+        res = self.client.get(URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(res.has_header("ETag"))
+        self.assertIn("no-store", res["Cache-Control"])
@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from insights import currency
+from insights.currency import CurrencySnapshot
+
+
+class CurrencyCacheTests(SimpleTestCase):
+    def setUp(self):
+        currency._snapshot = None
+        self.addCleanup(setattr, currency, "_snapshot", None)
+
+    def test_snapshot_is_reused_until_the_db_version_moves(self):
+        load = mock.Mock(side_effect=lambda v: CurrencySnapshot(display="USD", rates={"USD": 0.0005}, version=v))
+        with mock.patch.object(currency, "_load", load), \
+                mock.patch.object(currency, "_db_version", return_value=1) as db_version, \
+                mock.patch.object(currency, "VERSION_CHECK_SECONDS", 0):
+            for _ in range(5):
+                currency.currency_snapshot()
+            self.assertEqual(load.call_count, 1)
+
+            # Saved by another worker: nothing in this process was told
+            db_version.return_value = 2
+            self.assertEqual(currency.currency_snapshot().version, 2)
+            self.assertEqual(load.call_count, 2)
+
+            currency.bump_currency_version()
+            currency.currency_snapshot()
+            self.assertEqual(load.call_count, 3)
+
+    def test_convert_series_uses_one_factor(self):
+        snap = CurrencySnapshot(base="MWK", display="USD", rates={"USD": 0.5})
+        self.assertEqual(snap.convert_series([10, None, "3"]), [5.0, 0.0, 1.5])
+        self.assertEqual(CurrencySnapshot(display="ZAR").convert_series([2]), [2.0])  # no rate -> unchanged
+        self.assertEqual(snap.payload(), {"base": "MWK", "display": "USD", "sign": "$"})
@@ -0,0 +1,55 @@
+# inventory/tests/test_docs.py
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from inventory.models_docs import Doc
+from tenants.models import Business, Membership
+from tenants.services import sequences
+
+User = get_user_model()
+
+
+class DocNumberTests(TestCase):
+    def setUp(self):
+        sequences.reset_blocks()
+        self.year = timezone.localdate().year
+
+    def tearDown(self):
+        sequences.reset_blocks()
+
+    def _manager_of(self, slug):
+        biz = Business.objects.create(name=slug.title(), slug=slug, status="ACTIVE")
+        user = User.objects.create_user(f"{slug}_mgr", password="pass12345", is_staff=True)
+        Membership.objects.create(user=user, business=biz, role="MANAGER", status="ACTIVE")
+        self.client.force_login(user)
+        session = self.client.session
+        session["active_business_id"] = biz.id
+        session.save()
+        return biz
+
+    def _new_invoice(self, price):
+        resp = self.client.post("/inventory/docs/new/invoice/", {
+            "customer_name": "Walk-in", "description": "Screen repair", "quantity": "2",
+            "unit_price": price, "tax_rate_pct": "10",
+        })
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def test_each_business_numbers_from_one_without_reference_clashes(self):
+        biz_a = self._manager_of("docs-a")
+        first = self._new_invoice("50.00")
+        biz_b = self._manager_of("docs-b")
+        second = self._new_invoice("70.00")
+
+        self.assertEqual(first["number"], f"INV-{biz_a.id}-{self.year}-00001")
+        self.assertEqual(second["number"], f"INV-{biz_b.id}-{self.year}-00001")
+        doc = Doc.objects.get(pk=second["id"])
+        self.assertEqual((doc.business_id, doc.subtotal, doc.tax, doc.total),
+                         (biz_b.id, Decimal("140.00"), Decimal("14.00"), Decimal("154.00")))
+
+        # Documents stay inside their business
+        self.assertEqual(self.client.get(second["detail_url"]).status_code, 200)
+        self.assertEqual(self.client.get(f"/inventory/docs/{first['id']}/").status_code, 404)
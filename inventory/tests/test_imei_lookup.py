@@ -0,0 +1,78 @@
+# inventory/tests/test_imei_lookup.py
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from inventory import imei_lookup
+from inventory.api_views import api_stock_status
+from inventory.models import InventoryItem, Location, Product
+from tenants.models import Business
+
+User = get_user_model()
+
+
+class ImeiLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        imei_lookup._cache.drop()
+        self.biz = Business.objects.create(name="Scan A", slug="scan-a", status="ACTIVE")
+        self.other = Business.objects.create(name="Scan B", slug="scan-b", status="ACTIVE")
+        self.shop = Location.objects.create(business=self.biz, name="Shop")
+        self.depot = Location.objects.create(business=self.biz, name="Depot")
+        self.product = Product.objects.create(code="HOT-40", brand="Infinix", model="Hot 40")
+        self.unit = self._stock_in(self.biz, self.shop, "356938035643809")
+        self.twin = self._stock_in(self.biz, self.depot, "356938099643809")  # same last 6 digits
+        self._stock_in(self.other, Location.objects.create(business=self.other, name="B"), "356938035643809")
+
+    def _stock_in(self, biz, loc, imei):
+        with self.captureOnCommitCallbacks(execute=True):
+            return InventoryItem._base_manager.create(business=biz, product=self.product,
+                                                      current_location=loc, imei=imei)
+
+    def test_exact_and_suffix_matches_are_tenant_scoped(self):
+        item, matched = imei_lookup.find_in_stock(self.biz.id, "35-6938 0356 43809")
+        self.assertEqual((item, matched), (self.unit, "imei"))
+
+        hit = imei_lookup.lookup(self.biz.id, "35643809")
+        self.assertEqual((hit.item_id, hit.matched), (self.unit.id, "imei_tail"))
+        # Ambiguous suffixes prefer the requested location
+        self.assertEqual(imei_lookup.lookup(self.biz.id, "643809", location_id=self.shop.id).item_id, self.unit.id)
+        self.assertEqual(imei_lookup.lookup(self.biz.id, "643809", location_id=self.depot.id).item_id, self.twin.id)
+        self.assertIsNone(imei_lookup.lookup(self.biz.id, "99643"))  # too short to scan
+        self.assertIsNone(imei_lookup.lookup(self.biz.id, "999999"))
+
+    @override_settings(IMEI_LOOKUP_CACHE=True)
+    def test_cache_serves_repeats_and_sales_invalidate(self):
+        imei_lookup.lookup(self.biz.id, "356938035643809")
+        with self.assertNumQueries(0):
+            self.assertEqual(imei_lookup.lookup(self.biz.id, "356938035643809").item_id, self.unit.id)
+
+        self.unit.status = "SOLD"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.unit.save()
+        self.assertIsNone(imei_lookup.lookup(self.biz.id, "356938035643809"))
+        self.assertIsNotNone(imei_lookup.lookup(self.other.id, "356938035643809"))
+
+        # Another process rotating the tenant's token drops this process's copy
+        imei_lookup._cache.put(self.biz.id, "099643809", ())
+        cache.set(imei_lookup._token_key(self.biz.id), "rotated-elsewhere")
+        self.assertEqual(imei_lookup.lookup(self.biz.id, "099643809").item_id, self.twin.id)
+
+    @override_settings(IMEI_LOOKUP_CACHE=False)
+    def test_without_shared_cache_every_lookup_reads_the_database(self):
+        self.assertIsNone(imei_lookup.lookup(self.biz.id, "356938011111111"))
+        # Stocked by another worker: no signal reached this process
+        InventoryItem._base_manager.filter(pk=self.twin.pk).update(imei="356938011111111")
+        with self.assertNumQueries(1):
+            self.assertEqual(imei_lookup.lookup(self.biz.id, "356938011111111").item_id, self.twin.id)
+
+    def test_stock_status_reports_location_mismatch(self):
+        request = RequestFactory().get("/inventory/api/stock-status/",
+                                       {"code": "356938035643809", "location_id": self.depot.id})
+        request.user = User.objects.create_user("scanner", password="x")
+        request.business = self.biz
+        data = json.loads(api_stock_status(request).content)["data"]
+        self.assertEqual((data["id"], data["location_name"], data["location_mismatch"]),
+                         (self.unit.id, "Shop", True))
@@ -0,0 +1,92 @@
+# inventory/tests/test_lowstock.py
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+
+from inventory import lowstock
+from inventory.lowstock import evaluate, send_digests
+from inventory.models import InventoryItem, Location, LowStockState, Product
+from tenants.models import Business, Membership
+
+User = get_user_model()
+
+
+class LowStockEngineTests(TestCase):
+    def setUp(self):
+        self.biz = Business.objects.create(name="Stock A", slug="stock-a", status="ACTIVE")
+        self.other = Business.objects.create(name="Stock B", slug="stock-b", status="ACTIVE")
+        self.loc = Location.objects.create(business=self.biz, name="Shop A")
+        self.other_loc = Location.objects.create(business=self.other, name="Shop B")
+        self.product = Product.objects.create(code="SPK-10", brand="Tecno", model="Spark 10", low_stock_threshold=2)
+        manager = User.objects.create_user("stock_mgr", email="mgr@a.test", password="x")
+        Membership.objects.create(user=manager, business=self.biz, role="MANAGER", status="ACTIVE")
+        self.units = [self._stock_in(self.biz, self.loc) for _ in range(3)]
+        self._stock_in(self.other, self.other_loc)  # below threshold, different tenant
+
+    def _stock_in(self, biz, loc):
+        with self.captureOnCommitCallbacks(execute=True):
+            return InventoryItem._base_manager.create(business=biz, product=self.product, current_location=loc)
+
+    def _sell(self, item):
+        item.status = "SOLD"
+        with self.captureOnCommitCallbacks(execute=True):
+            item.save()
+
+    def _state(self, biz=None):
+        return LowStockState._base_manager.get(business=biz or self.biz, product=self.product)
+
+    def test_stock_changes_alert_once_per_crossing(self):
+        self.assertEqual((self._state().on_hand, self._state().is_low), (3, False))
+
+        self._sell(self.units[0])
+        self._sell(self.units[1])  # 1 left < 2: crossing
+        crossed_at = self._state().crossed_at
+        self.assertTrue(self._state().is_low)
+        self.assertIsNotNone(crossed_at)
+
+        self._sell(self.units[2])  # still low: no new crossing
+        self.assertEqual((self._state().on_hand, self._state().crossed_at), (0, crossed_at))
+        self.assertEqual(evaluate(self.biz.id), [])
+
+        self.units[0].status = "IN_STOCK"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.units[0].save()
+        self._stock_in(self.biz, self.loc)
+        self.assertFalse(self._state().is_low)  # recovered, re-armed
+
+    def test_digest_is_per_tenant_and_sent_once(self):
+        for item in self.units[:2]:
+            self._sell(item)
+        self.assertTrue(self._state(self.other).is_low)
+
+        self.assertEqual(send_digests(), {self.biz.id: 1})  # the other tenant has no managers
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["mgr@a.test"])
+        self.assertIn("Spark 10", mail.outbox[0].body)
+        self.assertNotIn("Shop B", mail.outbox[0].body)
+
+        call_command("send_low_stock_digest", "--full", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)  # nothing new crossed
+
+    def test_full_scan_uses_one_grouped_query_per_tenant(self):
+        LowStockState._base_manager.all().delete()
+        with self.assertNumQueries(6):  # on-hand, states, thresholds, savepoint + insert + release
+            crossed = evaluate(self.other.id, notify=False)
+        self.assertEqual([s.location_id for s in crossed], [self.other_loc.id])
+
+    def test_move_rechecks_both_pairs_once_per_transaction(self):
+        shop2 = Location.objects.create(business=self.biz, name="Shop A2")
+        items = list(InventoryItem._base_manager.filter(pk__in=[u.pk for u in self.units[:2]]))
+        with mock.patch.object(lowstock, "evaluate", wraps=lowstock.evaluate) as spy:
+            with self.captureOnCommitCallbacks(execute=True):
+                for item in items:
+                    item.current_location = shop2
+                    with self.assertNumQueries(1):  # the UPDATE; the old pair comes from post_init
+                        item.save(update_fields=["current_location"])
+        spy.assert_called_once_with(self.biz.id, {(self.product.id, self.loc.id), (self.product.id, shop2.id)})
+        states = LowStockState._base_manager.filter(business=self.biz, product=self.product)
+        self.assertEqual({s.location_id: s.is_low for s in states}, {self.loc.id: True, shop2.id: False})
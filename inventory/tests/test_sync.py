@@ -0,0 +1,70 @@
+# inventory/tests/test_sync.py
+import json
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from inventory.models import InventoryItem, Location, Product, SyncOp
+from inventory.models_attendance import TimeLog
+from tenants.models import Business, Membership
+
+User = get_user_model()
+URL = "/inventory/api/sync/"
+IMEI = "356938035643809"
+
+
+class OpLogSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.biz = Business.objects.create(name="Sync A", slug="sync-a", status="ACTIVE")
+        self.shop = Location.objects.create(business=self.biz, name="Shop")
+        self.product = Product.objects.create(code="NOTE-30", brand="Infinix", model="Note 30")
+        self.user = User.objects.create_user("sync_agent", password="pass12345")
+        Membership.objects.create(user=self.user, business=self.biz, role="AGENT", status="ACTIVE",
+                                  location=self.shop)
+        self.client.login(username="sync_agent", password="pass12345")
+
+    def _flush(self, ops):
+        res = self.client.post(URL, json.dumps({"ops": ops}), content_type="application/json")
+        self.assertEqual(res.status_code, 200, res.content)
+        return res.json()
+
+    def test_batch_applies_in_order_and_replays_are_no_ops(self):
+        ops = [
+            {"id": str(uuid.uuid4()), "type": "scan_in", "at": "2026-10-01T08:00:00Z",
+             "data": {"imei": IMEI, "product_id": self.product.id, "order_price": "120000"}},
+            {"id": str(uuid.uuid4()), "type": "sell", "at": "2026-10-01T09:30:00Z",
+             "data": {"imei": IMEI, "price": "150000"}},
+            {"id": str(uuid.uuid4()), "type": "checkin", "data": {"kind": "ARRIVAL", "lat": "-13.96", "lon": "33.78"}},
+            {"id": str(uuid.uuid4()), "type": "price", "data": {"imei": IMEI, "price": "1"}},
+            {"id": "not-a-uuid", "type": "sell", "data": {}},
+        ]
+        data = self._flush(ops)
+        self.assertEqual([r["status"] for r in data["results"]],
+                         ["applied", "applied", "applied", "conflict", "rejected"])
+        self.assertEqual(data["conflicts"], [ops[3]["id"]])
+        self.assertEqual(data["results"][3]["result"]["code"], "forbidden")
+
+        item = InventoryItem._base_manager.get(business=self.biz, imei=IMEI)
+        self.assertEqual((item.status, item.current_location_id, str(item.selling_price)),
+                         ("SOLD", self.shop.id, "150000.00"))
+        self.assertEqual(TimeLog.objects.filter(user=self.user).count(), 1)
+
+        # The phone never saw the response and sends the whole queue again
+        again = self._flush(ops)
+        self.assertEqual([r["status"] for r in again["results"]],
+                         ["duplicate", "duplicate", "duplicate", "duplicate", "rejected"])
+        self.assertEqual(again["results"][1]["original_status"], "applied")
+        self.assertEqual(SyncOp._base_manager.count(), 4)
+        self.assertEqual(TimeLog.objects.filter(user=self.user).count(), 1)
+
+    def test_conflicting_op_does_not_undo_the_rest(self):
+        sell = {"id": str(uuid.uuid4()), "type": "sell", "data": {"imei": IMEI, "price": "100"}}
+        scan = {"id": str(uuid.uuid4()), "type": "scan_in",
+                "data": {"imei": IMEI, "product_id": self.product.id}}
+        data = self._flush([sell, scan])
+        self.assertEqual([r["status"] for r in data["results"]], ["conflict", "applied"])
+        self.assertEqual(data["results"][0]["result"]["code"], "not_found")
+        self.assertTrue(InventoryItem._base_manager.filter(imei=IMEI, status="IN_STOCK").exists())
@@ -27,6 +27,12 @@ try:
 except Exception:
     views_dashboard = SimpleNamespace()
 
+# Versioned scan catalog (products, order prices, locations)
+from .views_catalog import api_catalog as _api_catalog
+from .views_sync import api_sync as _api_sync
+from .views_poll import api_changes as _api_changes
+from .views_aging import api_stock_aging as _api_stock_aging
+
 # NEW: optional quick-sell page view
 try:
     from .views_sell import sell_quick_page as _sell_quick_page
@@ -58,17 +64,8 @@ try:
 except Exception:
     _api_legacy = SimpleNamespace()
 
-# Optional audit views
-try:
-    from . import views_audit as _views_audit
-except Exception:
-    _views_audit = SimpleNamespace()
-
-# Optional Docs (Invoices/Quotations) module
-try:
-    from . import views_docs as _docs
-except Exception:
-    _docs = SimpleNamespace()
+# Optional Docs (Invoices/Quotations) views are resolved on first request
+from cc.lazy_views import lazy_view
 
 # ---------------------------------------------------------------------
 # Guards (role / tenant)
@@ -816,18 +813,21 @@ def _html_fallback(title: str, tip: str):
         )
     return _view
 
-_docs_home_view = getattr(_docs, "docs_home", None) or _html_fallback("Business Docs", "Docs module not loaded yet.")
-_doc_new_invoice = getattr(_docs, "doc_new_invoice", None) or _html_fallback(
+_DOCS = "inventory.views_docs"
+_docs_home_view = lazy_view(_DOCS, "docs_home",
+                            fallback=_html_fallback("Business Docs", "Docs module not loaded yet."))
+_doc_new_invoice = lazy_view(_DOCS, "doc_new_invoice", fallback=_html_fallback(
     "New Invoice", "Template missing. Create templates/inventory/doc_edit.html"
-)
-_doc_new_quote = getattr(_docs, "doc_new_quote", None) or _html_fallback(
+))
+_doc_new_quote = lazy_view(_DOCS, "doc_new_quote", fallback=_html_fallback(
     "New Quotation", "Coming soon — wire views_docs.doc_new_quote to enable."
-)
-_doc_detail = getattr(_docs, "doc_detail", None) or _html_fallback("Document", "Detail page not implemented yet.")
-_doc_download_pdf = getattr(_docs, "doc_download_pdf", None) or _stub("doc_download_pdf not implemented")
-_doc_download_excel = getattr(_docs, "doc_download_excel", None) or _stub("doc_download_excel not implemented")
-_doc_send_email = getattr(_docs, "doc_send_email", None) or _stub("doc_send_email not implemented")
-_doc_send_whatsapp = getattr(_docs, "doc_send_whatsapp", None) or _stub("doc_send_whatsapp not implemented")
+))
+_doc_detail = lazy_view(_DOCS, "doc_detail",
+                        fallback=_html_fallback("Document", "Detail page not implemented yet."))
+_doc_download_pdf = lazy_view(_DOCS, "doc_download_pdf")
+_doc_download_excel = lazy_view(_DOCS, "doc_download_excel")
+_doc_send_email = lazy_view(_DOCS, "doc_send_email")
+_doc_send_whatsapp = lazy_view(_DOCS, "doc_send_whatsapp")
 
 # ---------------------------------------------------------------------
 # Scan-IN: direct to page
@@ -873,6 +873,11 @@ urlpatterns += [
     path("api/scan-in/", _scan_in_api, name="api_scan_in"),
     path("api/scan-sold/", _scan_sold_api, name="api_scan_sold"),
 
+    path("api/catalog/", _api_catalog, name="api_catalog"),
+    path("api/sync/", _api_sync, name="api_sync"),
+    path("api/changes/", _api_changes, name="api_changes"),
+    path("api/stock-aging/", _api_stock_aging, name="api_stock_aging"),
+
     path("api/stock-status/", _api_stock_status_view, name="api_stock_status"),
     path("api/stock_status/", _api_stock_status_view),
 
@@ -12,6 +12,8 @@ from django.db.models import Q, QuerySet
 from django.http import HttpRequest
 from django.urls import reverse  # for invite URL helper
 
+from tenants.principal import get_principal
+
 # 🔗 single-source predicates
 try:
     from .constants import IN_STOCK_Q, SOLD_Q  # predicates are Q(...) trees
@@ -37,7 +39,7 @@ def user_in_group(user, group_name: str) -> bool:
     """
     if not getattr(user, "is_authenticated", False):
         return False
-    return bool(getattr(user, "is_superuser", False) or user.groups.filter(name=group_name).exists())
+    return bool(getattr(user, "is_superuser", False) or get_principal(user).in_groups([group_name]))
 
 
 def require_groups(*group_names: str) -> Callable:
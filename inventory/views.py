@@ -54,6 +54,8 @@ from sales.models import Sale               # if not already imported
 from datetime import datetime, timedelta, time as dtime
 from django.utils import timezone
 from tenants.utils import require_business, require_role
+from cc.db_router import read_replica
+from tenants.principal import get_principal
 from django.conf import settings
 from django.contrib import messages
 from django.shortcuts import render
@@ -547,7 +549,7 @@ except Exception:  # pragma: no cover
         if getattr(user, "is_superuser", False) or getattr(user, "is_staff", False):
             return True
         try:
-            return user.groups.filter(name__in=["Manager", "Admin"]).exists()
+            return get_principal(user).in_groups(["Manager", "Admin"])
         except Exception:
             return False
 
@@ -639,7 +641,7 @@ def is_manager_like(user) -> bool:
         manager_group_names = set(getattr(settings, "ROLE_GROUP_MANAGER_NAMES", ["Manager", "Admin"]))
     except Exception:
         manager_group_names = {"Manager", "Admin"}
-    return user.groups.filter(name__in=manager_group_names).exists()
+    return get_principal(user).in_groups(manager_group_names)
 # ---- safe imports used by helpers ----
 try:
     from tenants.utils import (
@@ -801,7 +803,7 @@ def _in_groups(user, names):
         return False
     if getattr(user, "is_superuser", False):
         return True
-    return user.groups.filter(name__in=names).exists()
+    return get_principal(user).in_groups(names)
 
 try:
     # optional centralization if you created tenants/roles.py earlier
@@ -953,7 +955,7 @@ def _in_groups(user, names: list[str]) -> bool:
     # superusers always pass
     if getattr(user, "is_superuser", False):
         return True
-    return user.groups.filter(name__in=names).exists()
+    return get_principal(user).in_groups(names)
 
 try:
     # If you have a central roles module, greatâ€”use it.
@@ -3091,7 +3093,7 @@ import json
 from datetime import date
 
 def _is_manager(u):  # adjust to your own permission system
-    return getattr(u, "is_staff", False) or u.groups.filter(name__iexact="Manager").exists()
+    return getattr(u, "is_staff", False) or get_principal(u).in_groups(["Manager"], ignore_case=True)
 
 @login_required
 def api_geo_ping(request: HttpRequest) -> JsonResponse:
@@ -4296,14 +4298,14 @@ def _user_roles(user):
     is_manager = any([
         user.is_superuser,
         user.is_staff,
-        user.groups.filter(name__in=["Manager", "Managers"]).exists(),
+        get_principal(user).in_groups(["Manager", "Managers"]),
         _truthy(prof, "is_manager", "manager"),
         getattr(prof, "role", "").lower() == "manager",
     ])
 
     # Auditor heuristics (only matters when *not* manager)
     is_auditor = any([
-        user.groups.filter(name__in=["Auditor", "Auditors"]).exists(),
+        get_principal(user).in_groups(["Auditor", "Auditors"]),
         _truthy(prof, "is_auditor", "auditor"),
         getattr(prof, "role", "").lower() == "auditor",
     ]) and not is_manager
@@ -4351,9 +4353,9 @@ def _can_edit_inventory(user):
             pass
 
     try:
-        if user.groups.filter(name__in=[
+        if get_principal(user).in_groups([
             "Managers", "Inventory Managers", "Admin", "Auditors"
-        ]).exists():
+        ]):
             return True
     except Exception:
         pass
@@ -5300,6 +5302,7 @@ except Exception:
 @never_cache
 @login_required
 @require_http_methods(["GET"])
+@read_replica
 def export_csv(request):
     """
     Same filters/permissions as stock_list, but always returns CSV.
@@ -5971,7 +5974,7 @@ def scan_sold_submit(request: HttpRequest):
     Behavior:
       - Finds unsold item within the active business (row-locked).
       - If a sale location is provided (or detected), moves item there (best-effort) and logs StockMovement when model exists.
-      - Marks SOLD across common schemas: sold_at / status='sold' / is_sold / in_stock / available / qty→0 / sold_price / sold_by.
+      - Marks SOLD across common schemas: sold_at / status='SOLD' / is_sold / in_stock / available / qty→0 / sold_price / sold_by.
       - Creates a Sale row when available (best-effort).
     """
 
@@ -6154,7 +6157,7 @@ def scan_sold_submit(request: HttpRequest):
             # Exclude "sold-ish"
             not_sold = Q()
             if hasattr(InventoryItem, "status"):
-                not_sold &= ~Q(status="sold")
+                not_sold &= ~Q(status="SOLD")
             if hasattr(InventoryItem, "sold_at"):
                 not_sold &= Q(sold_at__isnull=True)
             q = q.filter(not_sold)
@@ -6228,10 +6231,7 @@ def scan_sold_submit(request: HttpRequest):
                 pass
 
         if hasattr(item, "status"):
-            try:
-                item.status = "sold"
-            except Exception:
-                item.status = "SOLD"
+            item.status = "SOLD"  # inv_status_allowed: IN_STOCK | SOLD
             updates.add("status")
 
         for f, v in (("in_stock", False), ("available", False), ("availability", False), ("is_sold", True)):
@@ -6683,33 +6683,45 @@ def inventory_dashboard(request):
     window_revenue = float(window_totals.get("window_revenue") or 0)
 
     # ---- Agent ranking (ALL agents within this business) ----
-    pct_dec = DecimalField(max_digits=5, decimal_places=2)
-    rank_base = _scoped(Sale.objects.select_related("agent"), request)
-    if model_id:
-        rank_base = rank_base.filter(item__product_id=model_id)
-    if time_q:
-        rank_base = rank_base.filter(time_q)
-    elif period == "month":
-        rank_base = rank_base.filter(sold_at__gte=month_start)
-    elif period == "7d":
-        rank_base = rank_base.filter(sold_at__gte=timezone.now() - timedelta(days=7))
-
-    commission_pct_dec = Cast(F("commission_pct"), pct_dec)
-    commission_expr = ExpressionWrapper(
-        Coalesce(F("price"), Value(0), output_field=dec2)
-        * (Coalesce(commission_pct_dec, Value(0), output_field=pct_dec) / Value(100, output_field=pct_dec)),
-        output_field=dec2,
-    )
-    agent_rank_qs = (
-        rank_base.values("agent_id", "agent__username")
-        .annotate(
-            total_sales=Count("id"),
-            earnings=Coalesce(Sum(commission_expr), Value(0), output_field=dec2),
-            revenue=Coalesce(Sum("price"), Value(0), output_field=dec2),
+    if biz_id and not model_id and range_preset == "month":
+        # This month's board is kept up to date by sales.leaderboard
+        from sales.leaderboard import Board
+
+        board = [r for r in Board(biz_id, "month", today, metric="earnings").top(500) if r["units"]]
+        usernames = dict(User.objects.filter(pk__in=[r["agent_id"] for r in board]).values_list("pk", "username"))
+        agent_rank = [
+            {"agent_id": r["agent_id"], "agent__username": usernames.get(r["agent_id"], ""),
+             "total_sales": r["units"], "earnings": r["earnings"], "revenue": r["revenue"]}
+            for r in board
+        ]
+    else:
+        pct_dec = DecimalField(max_digits=5, decimal_places=2)
+        rank_base = _scoped(Sale.objects.select_related("agent"), request)
+        if model_id:
+            rank_base = rank_base.filter(item__product_id=model_id)
+        if time_q:
+            rank_base = rank_base.filter(time_q)
+        elif period == "month":
+            rank_base = rank_base.filter(sold_at__gte=month_start)
+        elif period == "7d":
+            rank_base = rank_base.filter(sold_at__gte=timezone.now() - timedelta(days=7))
+
+        commission_pct_dec = Cast(F("commission_pct"), pct_dec)
+        commission_expr = ExpressionWrapper(
+            Coalesce(F("price"), Value(0), output_field=dec2)
+            * (Coalesce(commission_pct_dec, Value(0), output_field=pct_dec) / Value(100, output_field=pct_dec)),
+            output_field=dec2,
         )
-        .order_by("-earnings", "-total_sales", "agent__username")
-    )
-    agent_rank = list(agent_rank_qs)
+        agent_rank_qs = (
+            rank_base.values("agent_id", "agent__username")
+            .annotate(
+                total_sales=Count("id"),
+                earnings=Coalesce(Sum(commission_expr), Value(0), output_field=dec2),
+                revenue=Coalesce(Sum("price"), Value(0), output_field=dec2),
+            )
+            .order_by("-earnings", "-total_sales", "agent__username")
+        )
+        agent_rank = list(agent_rank_qs)
 
     # Wallet summaries (decimal-safe)
     agent_wallet_summaries = {}
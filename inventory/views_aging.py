@@ -0,0 +1,69 @@
+# inventory/views_aging.py
+from __future__ import annotations
+
+from datetime import date
+
+from django.contrib.auth.decorators import login_required
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.http import require_GET
+
+from cc.db_router import read_replica
+from tenants.utils import get_active_business_id, require_business
+
+from . import aging
+from .conditional import conditional_api
+from .models import Location, Product
+
+
+def _num(v):
+    return float(v) if v is not None and not isinstance(v, int) else (v or 0)
+
+
+def _plain(row: dict) -> dict:
+    return {k: (v.isoformat() if isinstance(v, date) else _num(v) if k in aging.VALUE_FIELDS or k == "aged" else v)
+            for k, v in row.items()}
+
+
+@login_required
+@require_business
+@require_GET
+@conditional_api
+@read_replica
+def api_stock_aging(request: HttpRequest) -> JsonResponse:
+    """
+    GET /inventory/api/stock-aging/?on=YYYY-MM-DD&location=<id>&limit=<n>
+
+    On-hand units, cost and retail value per location and product with age
+    buckets, read from that day's StockSnapshot (today: always live), plus
+    totals and the slow movers.
+    """
+    business_id = get_active_business_id(request)
+    try:
+        day = date.fromisoformat(request.GET["on"]) if request.GET.get("on") else None
+        location_id = int(request.GET["location"]) if request.GET.get("location") else None
+        limit = max(1, min(int(request.GET.get("limit") or 200), 1000))
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "on must be YYYY-MM-DD; location and limit must be numbers"},
+                            status=400)
+
+    as_of, rows, source = aging.rows_for(business_id, day, location_id=location_id)
+    total = aging.totals(rows)
+    rows = sorted(rows, key=lambda r: (-(r["cost_value"] or 0), r["product_id"], r["location_id"]))[:limit]
+    products = {
+        p["id"]: p["name"] or " ".join(b for b in (p["brand"], p["model"], p["variant"]) if b)
+        for p in Product.objects.filter(pk__in={r["product_id"] for r in rows}).values("id", "name", "brand", "model", "variant")
+    }
+    locations = dict(Location._base_manager.filter(pk__in={r["location_id"] for r in rows}).values_list("id", "name"))
+
+    return JsonResponse({
+        "ok": True,
+        "as_of": as_of.isoformat() if as_of else None,
+        "source": source,
+        "buckets": [{"key": k, "label": aging.BUCKET_LABELS[k], "units": total[k]} for k, _lo, _hi in aging.BUCKETS],
+        "totals": _plain(total),
+        "rows": [
+            {**_plain(r), "product": products.get(r["product_id"], ""), "location": locations.get(r["location_id"], "")}
+            for r in rows
+        ],
+        "slow_movers": [_plain(r) for r in aging.slow_movers(business_id, as_of, location_id=location_id)] if as_of else [],
+    })
@@ -0,0 +1,44 @@
+# inventory/views_catalog.py
+from __future__ import annotations
+
+from django.contrib.auth.decorators import login_required
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+
+from tenants.utils import get_active_business_id
+
+from . import catalog
+
+
+@login_required
+@require_GET
+def api_catalog(request: HttpRequest) -> HttpResponse:
+    """
+    Products, active order prices and the active business's locations.
+
+    ?since=<version> returns only what changed after that version (plus
+    removed ids); without it, or when the version is unknown, the full
+    catalog with full=true. The ETag identifies the response, so a client
+    re-sending it gets 304 while nothing has changed.
+    """
+    business_id = get_active_business_id(request)
+    if not business_id:
+        return JsonResponse({"ok": False, "error": "No active business selected"}, status=400)
+    raw = (request.GET.get("since") or "").strip()
+    try:
+        since = int(raw) if raw else None
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "since must be a catalog version"}, status=400)
+
+    snap = catalog.snapshot(business_id)
+    tag = catalog.etag(business_id, snap["version"], since)
+    if tag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse({"ok": True, **catalog.delta(snap, since)})
+    response["ETag"] = tag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Cookie",))
+    return response
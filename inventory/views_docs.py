@@ -13,20 +13,35 @@ from django.views.decorators.http import require_http_methods, require_GET, requ
 from django.template.loader import render_to_string
 from django.utils import timezone
 
-from .models_docs import Customer, Doc, DocLine
+from tenants.services.sequences import next_value
+from tenants.utils import get_active_business_id
+from .models_docs import Doc, DocItem
+
+KINDS = {"INVOICE": "INV", "QUOTE": "QUO"}
 
 # -------- Helpers ----------
-def _next_number(prefix: str) -> str:
-    y = timezone.now().year
-    base = f"{prefix}-{y}-"
-    last = Doc.objects.filter(number__startswith=f"{prefix}-{y}-").order_by("number").last()
-    next_seq = 1
-    if last:
+def _next_number(prefix: str, business_id: int | None = None) -> str:
+    """
+    Next Doc.reference, e.g. INV-12-2026-00001. Each business counts from 1,
+    and Doc.reference is unique across all businesses, so the business id is
+    part of the reference.
+    """
+    def _seed() -> int:
+        # One-off, when the year's counter row is first created: continue after
+        # references issued before sequences existed.
+        last = Doc.objects.filter(reference__startswith=base).order_by("reference").last()
         try:
-            next_seq = int(last.number.rsplit("-", 1)[-1]) + 1
+            return int(last.reference.rsplit("-", 1)[-1]) if last else 0
         except Exception:
-            pass
-    return f"{base}{next_seq:05d}"
+            return 0
+
+    y = timezone.localdate().year
+    base = f"{prefix}-{business_id}-{y}-" if business_id else f"{prefix}-{y}-"
+    seq = next_value(prefix, business_id=business_id, year=y, seed=_seed)
+    return f"{base}{seq:05d}"
+
+def _docs(request: HttpRequest):
+    return Doc.objects.filter(business_id=get_active_business_id(request))
 
 def _parse_lines(data) -> List[dict]:
     # Expect [{description, quantity, unit_price}]
@@ -37,21 +52,21 @@ def _parse_lines(data) -> List[dict]:
         desc = (row.get("description") or row.get("name") or "").strip()
         if not desc:
             continue
-        qty = Decimal(str(row.get("quantity") or 1))
+        qty = int(Decimal(str(row.get("quantity") or 1)))
         price = Decimal(str(row.get("unit_price") or row.get("price") or 0))
-        lines.append({"description": desc, "quantity": qty, "unit_price": price})
+        lines.append({"description": desc, "qty": qty, "unit_price": price})
     return lines
 
 # -------- Pages ----------
 @login_required
 @require_GET
 def docs_list(request: HttpRequest):
-    qs = Doc.objects.select_related("customer")
+    qs = _docs(request)
     q = (request.GET.get("q") or "").strip()
     dt_from = request.GET.get("from")
     dt_to = request.GET.get("to")
     if q:
-        qs = qs.filter(number__icontains=q) | qs.filter(customer__name__icontains=q)
+        qs = qs.filter(reference__icontains=q) | qs.filter(customer_name__icontains=q)
     if dt_from:
         qs = qs.filter(created_at__date__gte=dt_from)
     if dt_to:
@@ -61,7 +76,7 @@ def docs_list(request: HttpRequest):
 @login_required
 @require_http_methods(["GET", "POST"])
 def doc_new(request: HttpRequest, kind: str):
-    if kind not in (Doc.DOC_INVOICE, Doc.DOC_QUOTE):
+    if kind not in KINDS:
         raise Http404()
     if request.method == "GET":
         return render(request, "inventory/doc_edit.html", {"kind": kind})
@@ -88,37 +103,38 @@ def doc_new(request: HttpRequest, kind: str):
         }
 
     cust_data = payload.get("customer") or {}
-    customer, _ = Customer.objects.get_or_create(
-        name=(cust_data.get("name") or "Walk-in").strip()[:160],
-        defaults={"email": cust_data.get("email", ""), "phone": cust_data.get("phone", ""), "address": cust_data.get("address", "")}
-    )
-    number = _next_number("INV" if kind == Doc.DOC_INVOICE else "QUO")
+    business_id = get_active_business_id(request)
     doc = Doc.objects.create(
-        doc_type=kind, number=number, customer=customer, created_by=request.user,
-        tax_rate_pct=Decimal(str(payload.get("tax_rate_pct") or 0))
+        type=kind, reference=_next_number(KINDS[kind], business_id), business_id=business_id,
+        created_by=request.user,
+        customer_name=(cust_data.get("name") or "Walk-in").strip()[:120],
+        customer_email=cust_data.get("email") or "", customer_phone=cust_data.get("phone") or "",
+        customer_address=cust_data.get("address") or "",
     )
     for row in _parse_lines(payload.get("lines")):
-        DocLine.objects.create(doc=doc, **row)
-    doc.recalc(commit=True)
-    return JsonResponse({"ok": True, "id": doc.id, "number": doc.number, "detail_url": reverse("inventory:doc_detail", args=[doc.id])})
+        DocItem.objects.create(doc=doc, **row)
+    doc.compute_totals()
+    doc.tax = (doc.subtotal * Decimal(str(payload.get("tax_rate_pct") or 0)) / 100).quantize(Decimal("0.01"))
+    doc.save()
+    return JsonResponse({"ok": True, "id": doc.id, "number": doc.reference, "detail_url": reverse("inventory:doc_detail", args=[doc.id])})
 
 @login_required
 @require_GET
 def doc_detail(request: HttpRequest, pk: int):
-    doc = get_object_or_404(Doc.objects.select_related("customer").prefetch_related("lines"), pk=pk)
+    doc = get_object_or_404(_docs(request).prefetch_related("items"), pk=pk)
     return render(request, "inventory/doc_detail.html", {"doc": doc})
 
 # -------- Downloads ----------
 @login_required
 @require_GET
 def doc_pdf(request: HttpRequest, pk: int):
-    doc = get_object_or_404(Doc.objects.select_related("customer").prefetch_related("lines"), pk=pk)
+    doc = get_object_or_404(_docs(request).prefetch_related("items"), pk=pk)
     html = render_to_string("inventory/doc_print.html", {"doc": doc, "as_pdf": True})
     # Try WeasyPrint -> PDF. If missing, return HTML nicely.
     try:
         from weasyprint import HTML
         pdf = HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf()
-        filename = f"{doc.number}.pdf"
+        filename = f"{doc.reference}.pdf"
         return HttpResponse(pdf, content_type="application/pdf", headers={"Content-Disposition": f'attachment; filename="{filename}"'})
     except Exception:
         return HttpResponse(html)  # graceful fallback
@@ -126,33 +142,33 @@ def doc_pdf(request: HttpRequest, pk: int):
 @login_required
 @require_GET
 def doc_excel(request: HttpRequest, pk: int):
-    doc = get_object_or_404(Doc.objects.select_related("customer").prefetch_related("lines"), pk=pk)
+    doc = get_object_or_404(_docs(request).prefetch_related("items"), pk=pk)
     # Generate a simple CSV (universally openable in Excel). No external deps.
     buf = io.StringIO()
     w = csv.writer(buf)
-    w.writerow([doc.get_doc_type_display(), doc.number, doc.created_at.date(), doc.customer.name])
+    w.writerow([doc.get_type_display(), doc.reference, doc.created_at.date(), doc.customer_name])
     w.writerow(["Description", "Qty", "Unit Price", "Line Total"])
-    for li in doc.lines.all():
-        w.writerow([li.description, li.quantity, f"{li.unit_price:.2f}", f"{li.line_total:.2f}"])
+    for li in doc.items.all():
+        w.writerow([li.description, li.qty, f"{li.unit_price:.2f}", f"{li.line_total:.2f}"])
     w.writerow([])
     w.writerow(["Subtotal", "", "", f"{doc.subtotal:.2f}"])
     w.writerow(["Tax", "", "", f"{doc.tax:.2f}"])
     w.writerow(["Total", "", "", f"{doc.total:.2f}"])
     resp = HttpResponse(buf.getvalue(), content_type="text/csv")
-    resp["Content-Disposition"] = f'attachment; filename="{doc.number}.csv"'
+    resp["Content-Disposition"] = f'attachment; filename="{doc.reference}.csv"'
     return resp
 
 # -------- Send (Email / WhatsApp) ----------
 @login_required
 @require_POST
 def doc_email(request: HttpRequest, pk: int):
-    doc = get_object_or_404(Doc, pk=pk)
-    to = request.POST.get("to") or getattr(doc.customer, "email", "")
+    doc = get_object_or_404(_docs(request), pk=pk)
+    to = request.POST.get("to") or doc.customer_email
     if not to:
         return JsonResponse({"ok": False, "error": "No recipient email"})
     # Render PDF (or HTML fallback) into bytes
     html = render_to_string("inventory/doc_print.html", {"doc": doc, "as_pdf": True})
-    filename = f"{doc.number}.pdf"
+    filename = f"{doc.reference}.pdf"
     content = None
     mimetype = "application/pdf"
     try:
@@ -161,27 +177,38 @@ def doc_email(request: HttpRequest, pk: int):
     except Exception:
         content = html.encode("utf-8")
         mimetype = "text/html"
-    subject = f"{doc.get_doc_type_display()} {doc.number}"
-    body = f"Hi {doc.customer.name},\n\nPlease find attached {doc.get_doc_type_display().lower()} {doc.number}.\n\nRegards,"
+    subject = f"{doc.get_type_display()} {doc.reference}"
+    body = f"Hi {doc.customer_name},\n\nPlease find attached {doc.get_type_display().lower()} {doc.reference}.\n\nRegards,"
     msg = EmailMessage(subject=subject, body=body, to=[to])
     msg.attach(filename, content, mimetype)
     sent = msg.send(fail_silently=True)
     if sent:
-        doc.status = "sent"; doc.save(update_fields=["status"])
+        doc.status = "SENT"; doc.save(update_fields=["status", "issued_at"])
         return JsonResponse({"ok": True, "message": "Email sent"})
     return JsonResponse({"ok": False, "error": "Email failed"})
 
 @login_required
 @require_GET
 def doc_whatsapp(request: HttpRequest, pk: int):
-    doc = get_object_or_404(Doc, pk=pk)
-    phone = request.GET.get("phone") or (doc.customer.phone or "")
+    doc = get_object_or_404(_docs(request), pk=pk)
+    phone = request.GET.get("phone") or doc.customer_phone
     if not phone:
         return JsonResponse({"ok": False, "error": "No phone provided"})
-    link = request.build_absolute_uri(reverse("inventory:doc_pdf", args=[doc.id]))
-    text = f"{doc.get_doc_type_display()} {doc.number} ({doc.total:.2f} {doc.currency})\n{link}"
+    link = request.build_absolute_uri(reverse("inventory:doc_download_pdf", args=[doc.id]))
+    text = f"{doc.get_type_display()} {doc.reference} ({doc.total:.2f} {doc.currency})\n{link}"
     # Open WhatsApp prefilled (works on mobile/desktop web)
     url = f"https://wa.me/{phone}?text=" + __import__("urllib.parse").parse.quote(text)
     return redirect(url)
 
+# -------- Names routed by inventory/urls.py ----------
+docs_home = docs_list
+doc_download_pdf = doc_pdf
+doc_download_excel = doc_excel
+doc_send_email = doc_email
+doc_send_whatsapp = doc_whatsapp
+
+def doc_new_invoice(request: HttpRequest):
+    return doc_new(request, "INVOICE")
 
+def doc_new_quote(request: HttpRequest):
+    return doc_new(request, "QUOTE")
@@ -1,21 +1,32 @@
 ﻿# inventory/views_export.py
+from datetime import date
+
+from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.http import HttpRequest
 from django.utils import timezone
 from django.db.models import Q
 from django.views.decorators.cache import never_cache
 
+from cc import retention
 from cc.csvutils import stream_csv
+from cc.db_router import read_replica
+from tenants.principal import get_principal
+from tenants.utils import get_active_business_id
 from .models import InventoryItem, InventoryAudit, Product
 
+AUDIT_HEADER = ["id", "at", "action", "item_id", "imei", "product", "location", "by_user", "details"]
+# Rows merged in memory when an audit export includes the cold archive
+ARCHIVE_EXPORT_LIMIT = 100_000
+
 
 # ---- Local permission helpers (keep lightweight & consistent with views.py) ----
 def _is_manager_or_admin(user) -> bool:
-    return bool(getattr(user, "is_staff", False)) or user.groups.filter(name__in=["Admin", "Manager"]).exists()
+    return bool(getattr(user, "is_staff", False)) or get_principal(user).in_groups(["Admin", "Manager"])
 
 
 def _is_auditor(user) -> bool:
-    return user.groups.filter(name__in=["Auditor", "Auditors"]).exists()
+    return get_principal(user).in_groups(["Auditor", "Auditors"])
 
 
 def _can_view_all(user) -> bool:
@@ -40,6 +51,7 @@ def _inv_base(show_archived: bool):
 
 @never_cache
 @login_required
+@read_replica
 def export_inventory_csv(request: HttpRequest):
     """
     CSV export of inventory items with flexible filtering and permission-aware scoping.
@@ -165,6 +177,7 @@ def export_inventory_csv(request: HttpRequest):
 
 @never_cache
 @login_required
+@read_replica
 def export_audits_csv(request: HttpRequest):
     """
     CSV export of inventory audits, permission-aware.
@@ -174,7 +187,13 @@ def export_audits_csv(request: HttpRequest):
       - action: exact action code
       - by: user id (numeric)
       - date_from, date_to: filter a.at date range (YYYY-MM-DD)
+      - include_archive=1 (managers/auditors): also rows moved to the cold
+        archive (cc.retention), for the active business; q then matches
+        action and details only
     """
+    if request.GET.get("include_archive") == "1" and _can_view_all(request.user):
+        return _export_audits_with_archive(request)
+
     qs = (InventoryAudit.objects
           .select_related("item", "by_user", "item__product", "item__current_location"))
 
@@ -214,10 +233,8 @@ def export_audits_csv(request: HttpRequest):
 
     qs = qs.order_by("-at", "-id")
 
-    header = ["id", "at", "action", "item_id", "imei", "product", "location", "by_user", "details"]
-
     def rows():
-        yield header
+        yield AUDIT_HEADER
         for a in qs.iterator():
             item = a.item
             prod = getattr(item, "product", None) if item else None
@@ -252,3 +269,50 @@ def export_audits_csv(request: HttpRequest):
     return stream_csv(rows(), fname)
 
 
+def _day_param(request: HttpRequest, name: str):
+    try:
+        return date.fromisoformat(request.GET.get(name) or "")
+    except ValueError:
+        return None
+
+
+def _export_audits_with_archive(request: HttpRequest):
+    """Audit CSV over both retention tiers (hot table + archive segments), newest first."""
+    found = retention.search(
+        "inventory_audit",
+        business_id=get_active_business_id(request),
+        entity_id=request.GET.get("item") or None,
+        start=_day_param(request, "date_from"),
+        end=_day_param(request, "date_to"),
+        q=request.GET.get("q"),
+        limit=ARCHIVE_EXPORT_LIMIT,
+    )
+    action = request.GET.get("action")
+    who = request.GET.get("by")
+    if action:
+        found = [r for r in found if r["action"] == action]
+    if who and str(who).isdigit():
+        found = [r for r in found if r["by_user_id"] == int(who)]
+
+    # Archived rows carry ids only; resolve names in bulk
+    items = {
+        it.pk: it for it in InventoryItem._base_manager.filter(pk__in={r["item_id"] for r in found if r["item_id"]})
+        .select_related("product", "current_location")
+    }
+    users = dict(get_user_model().objects.filter(pk__in={r["by_user_id"] for r in found if r["by_user_id"]})
+                 .values_list("pk", "username"))
+
+    def rows():
+        yield AUDIT_HEADER + ["tier"]
+        for r in found:
+            item = items.get(r["item_id"])
+            prod = getattr(item, "product", None)
+            loc = getattr(item, "current_location", None)
+            yield [
+                r["id"], r["at"], r["action"], r["item_id"] or "", getattr(item, "imei", "") or "",
+                str(prod) if prod else "", getattr(loc, "name", "") if loc else "",
+                users.get(r["by_user_id"], ""), r["details"] or "", r["_tier"],
+            ]
+
+    fname = f"inventory_audits_{timezone.now():%Y%m%d_%H%M}.csv"
+    return stream_csv(rows(), fname)
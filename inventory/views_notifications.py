@@ -1,52 +1,39 @@
-﻿from django.http import JsonResponse
+from django.apps import apps
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.utils import timezone
 
+from tenants.utils import get_active_business_id
+
+
+@login_required
 def inbox_json(request):
     """
-    Lightweight, always-safe feed the header can consume.
-    Return your real items here when ready.
+    Lightweight, always-safe feed the header can consume: the user's inbox
+    for the active business (notifications.inbox), empty when the
+    notifications app is not installed.
     """
-    limit = int(request.GET.get("limit", 50))
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 50)), 200))
+    except (TypeError, ValueError):
+        limit = 50
+    if not apps.is_installed("notifications"):
+        return JsonResponse({"items": [], "unread": 0})
 
-    # Example dummy items (replace with DB query later)
-    now = timezone.localtime()
-    sample = [
-        {
-            "type": "payment",  # dashboard-type
-            "title": "Payment received",
-            "body": "MK 120,000 from Walk-in customer",
-            "url": "/wallet/",
-            "created_human": now.strftime("%Y-%m-%d %H:%M"),
-        },
-        {
-            "type": "stock_in",  # inventory-type
-            "title": "Stock IN",
-            "body": "Tecno Spark 40 Â· IMEI 35599â€¦ added to Store A",
-            "url": "/inventory/list/",
-            "created_human": now.strftime("%Y-%m-%d %H:%M"),
-        },
-        {
-            "type": "stock_sold",
-            "title": "Sold",
-            "body": "Itel A50 sold by Agent Blessings (MK 95,000)",
-            "url": "/inventory/scan-sold/",
-            "created_human": now.strftime("%Y-%m-%d %H:%M"),
-        },
-        {
-            "type": "low_stock",
-            "title": "Low stock",
-            "body": "Nokia 105 (Blue) â€” 3 units left in Store B",
-            "url": "/inventory/list/?q=Nokia+105",
-            "created_human": now.strftime("%Y-%m-%d %H:%M"),
-        },
+    from notifications import inbox
+
+    business_id = get_active_business_id(request)
+    rows = inbox.items(request.user, business_id, limit=limit)
+    unread, _ = inbox.state(request.user, business_id)
+    items = [
         {
-            "type": "invoice",
-            "title": "Invoice CC-1027",
-            "body": "Overdue by 2 days (MK 340,000)",
-            "url": "/reports/",
-            "created_human": now.strftime("%Y-%m-%d %H:%M"),
-        },
+            "type": (n.meta or {}).get("type") or n.level,
+            "title": (n.meta or {}).get("title") or n.get_level_display(),
+            "body": n.message,
+            "url": (n.meta or {}).get("url", ""),
+            "created_human": timezone.localtime(n.created_at).strftime("%Y-%m-%d %H:%M"),
+            "read": n.is_read,
+        }
+        for n in rows
     ]
-    return JsonResponse({"items": sample[:limit]})
-
-
+    return JsonResponse({"items": items, "unread": unread})
@@ -0,0 +1,78 @@
+# inventory/views_poll.py
+"""
+Long-poll for dashboard refreshes: GET /inventory/api/changes/?since=<stamp>
+
+Returns {"stamp", "changed"} as soon as the tenant's stock watermark differs
+from `since`, or when the wait ends. A client keeps the returned stamp and
+asks again, and reloads its charts only when `changed` is true.
+
+The watermark is read from the DB, so every worker sees every other
+worker's writes without a shared cache. It is the newest item updated_at
+(bumped by InventoryItem.save(), which selling also goes through) plus the
+number of items updated within WATERMARK_LAG of it. A write that commits
+late with a slightly older updated_at still moves the count. Both come
+from the (business, updated_at) index.
+
+The view is async. Under ASGI (settings.ASGI_MODE) a waiting client costs
+a coroutine, and the wait is LONGPOLL_MAX_WAIT seconds. A sync worker would
+be pinned for the whole wait, so there the view answers at once and the
+client falls back to plain polling.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.db.models import Max
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from tenants.utils import get_active_business_id, require_business
+
+from .models import InventoryItem
+
+WATERMARK_LAG = timedelta(seconds=60)
+
+
+def watermark(business_id) -> str:
+    """'<newest updated_at in µs>-<items updated within WATERMARK_LAG of it>'."""
+    items = InventoryItem._base_manager.filter(business_id=business_id)
+    newest = items.aggregate(at=Max("updated_at"))["at"]
+    if newest is None:
+        return "0-0"
+    recent = items.filter(updated_at__gte=newest - WATERMARK_LAG).count()
+    return f"{int(newest.timestamp() * 1_000_000)}-{recent}"
+
+
+def _max_wait() -> float:
+    if not getattr(settings, "ASGI_MODE", False):
+        return 0.0
+    return float(getattr(settings, "LONGPOLL_MAX_WAIT", 25))
+
+
+@never_cache
+@login_required
+@require_business
+@require_GET
+async def api_changes(request: HttpRequest) -> JsonResponse:
+    since = request.GET.get("since") or None
+    try:
+        wait = min(float(request.GET.get("wait", _max_wait())), _max_wait())
+    except ValueError:
+        wait = _max_wait()
+
+    business_id = getattr(request, "business_id", None) or await sync_to_async(get_active_business_id)(request)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0.0, wait)
+    interval = float(getattr(settings, "LONGPOLL_INTERVAL", 2.0))
+    read = sync_to_async(watermark)
+    while True:
+        stamp = await read(business_id)
+        if since is None or stamp != since or loop.time() >= deadline:
+            break
+        await asyncio.sleep(min(interval, max(0.0, deadline - loop.time())))
+    return JsonResponse({"stamp": stamp, "changed": since is None or stamp != since})
@@ -14,6 +14,8 @@ from django.contrib.auth.decorators import login_required
 from django.views.generic import TemplateView
 from django.db import transaction, IntegrityError
 
+from . import catalog
+
 # ---------------------------------------------------------------------
 # Safe dynamic imports (works if your models live in different apps)
 # ---------------------------------------------------------------------
@@ -89,8 +91,11 @@ def _locations_for_active_business(request) -> list[dict[str, Any]]:
     if not Location:
         return []
     try:
-        qs = Location.objects.all()
         biz = _get_active_business(request)
+        if getattr(biz, "id", None):
+            locs = catalog.snapshot(biz.id)["locations"]
+            return [{"id": l["id"], "name": l["name"]} for l in locs[:200]]
+        qs = Location.objects.all()
         for fld in ("business", "tenant", "organization"):
             if _model_has_field(Location, fld) and biz is not None:
                 qs = qs.filter(**{fld: biz})
@@ -163,6 +168,11 @@ def _query_products(request) -> list[dict[str, Any]]:
         return []
     try:
         business = _get_active_business(request)
+        if getattr(business, "id", None):
+            snap = catalog.snapshot(business.id)
+            prices = {p["product_id"]: p["order_price"] for p in snap["prices"]}
+            rows = sorted(snap["products"], key=lambda p: p["label"].lower())[:500]
+            return [{"id": p["id"], "name": p["label"], "default_order_price": prices.get(p["id"])} for p in rows]
         qs = Product.objects.all()
 
         # If the Product model is tenant-scoped, prefer filtering to the active business
@@ -9,6 +9,10 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_GET
 
+from tenants.utils import get_active_business
+
+from . import catalog
+
 # --- Try to import a Location model (keep app import-safe) --------------------
 # Adjust the import order if your Location model lives elsewhere.
 try:
@@ -34,6 +38,11 @@ def _get_locations_for_ui(request: HttpRequest) -> List[UILocation]:
     if Location is None:
         return []
 
+    biz = get_active_business(request)
+    if getattr(biz, "id", None):
+        return [UILocation(id=loc["id"], name=f"{loc['name']} · {biz.name}")
+                for loc in catalog.snapshot(biz.id)["locations"]]
+
     qs = Location.objects.all()
 
     # If you scope locations by business/tenant, add your filters here, e.g.:
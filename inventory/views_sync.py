@@ -0,0 +1,46 @@
+# inventory/views_sync.py
+from __future__ import annotations
+
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from tenants.utils import get_active_business
+
+from . import oplog
+
+
+@login_required
+@csrf_exempt
+@require_POST
+def api_sync(request: HttpRequest) -> JsonResponse:
+    """
+    Flush an offline op queue: {"ops": [{"id": <uuid>, "type": "scan_in" |
+    "sell" | "price" | "checkin", "at": <iso time>, "data": {...}}, ...]}.
+    Returns one result per op, in order, plus the ids that conflicted.
+    """
+    business = get_active_business(request)
+    if business is None:
+        return JsonResponse({"ok": False, "error": "No active business selected"}, status=400)
+    try:
+        ops = json.loads(request.body or b"{}").get("ops")
+    except (ValueError, AttributeError):
+        return JsonResponse({"ok": False, "error": "Body must be JSON with an 'ops' list"}, status=400)
+    if not isinstance(ops, list):
+        return JsonResponse({"ok": False, "error": "Body must be JSON with an 'ops' list"}, status=400)
+    if len(ops) > oplog.max_ops():
+        return JsonResponse({"ok": False, "error": f"At most {oplog.max_ops()} ops per batch"}, status=413)
+
+    results = oplog.apply_batch(request, business, ops)
+    counts: dict[str, int] = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return JsonResponse({
+        "ok": True,
+        "results": results,
+        "counts": counts,
+        "conflicts": [r["id"] for r in results if r["status"] == "conflict"],
+    })
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 from typing import Optional, Dict, List, Tuple
-from collections import defaultdict
 from datetime import timedelta, datetime
 
 from django.contrib import messages
@@ -21,7 +20,8 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_http_methods
 
 from tenants.models import Membership
-from tenants.utils import get_active_business, require_business
+from tenants.utils import get_active_business_id, require_business
+from .attendance import WindowSummary, window_summaries
 from .models import Location
 from .models_attendance import TimeLog, compute_attendance_outcome
 
@@ -32,8 +32,7 @@ User = get_user_model()
 # ---------------------------------------------------------------------
 
 def _active_biz_id(request: HttpRequest) -> Optional[int]:
-    _, biz_id = get_active_business(request)
-    return biz_id
+    return get_active_business_id(request)
 
 def _wants_json(request: HttpRequest) -> bool:
     h = request.headers
@@ -285,6 +284,9 @@ def _collect_manager_overview(biz_id: int, start: timezone.datetime, end: timezo
     """
     Build a per-agent summary for the window [start, end), with a 'battery'.
     Also include the latest event details per user for convenience.
+
+    Reads the maintained AttendanceDay rows (one per agent per day) rather
+    than pairing raw TimeLog events; see inventory.attendance.
     """
     now_local = timezone.localtime()
     horizon_seconds = int((min(now_local, end) - start).total_seconds())
@@ -296,25 +298,15 @@ def _collect_manager_overview(biz_id: int, start: timezone.datetime, end: timezo
         .select_related("user", "location")
     )
 
-    events = (
-        TimeLog.objects
-        .filter(business_id=biz_id, ts__gte=start, ts__lt=end)
-        .select_related("user", "location")
-        .order_by("user_id", "ts")
-    )
-
-    by_user: Dict[int, List[TimeLog]] = defaultdict(list)
-    last_event: Dict[int, TimeLog] = {}
-
-    for ev in events:
-        by_user[ev.user_id].append(ev)
-        last_event[ev.user_id] = ev
+    summaries = window_summaries(biz_id, start, end, now_local)
+    empty = WindowSummary()
 
     agents: List[Dict[str, object]] = []
     for m in members:
         u = m.user
-        u_events = by_user.get(u.id, [])
-        work_secs, on_shift, last_ts_iso = _pair_work_seconds(u_events, now_local)
+        summary = summaries.get(u.id, empty)
+        work_secs, on_shift = summary.work_secs, summary.on_shift
+        last_ts_iso = timezone.localtime(summary.last_ts).isoformat() if summary.last_ts else None
         idle_secs = max(horizon_seconds - work_secs, 0)
 
         pct_of_expected = 0 if expected_shift_seconds <= 0 else min(
@@ -330,7 +322,7 @@ def _collect_manager_overview(biz_id: int, start: timezone.datetime, end: timezo
         else:
             color = "danger"
 
-        ev = last_event.get(u.id)
+        ev = summary.last_event
         loc_name = getattr(getattr(ev, "location", None), "name", None) if ev else None
 
         agents.append({
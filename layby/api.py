@@ -1,9 +1,11 @@
 ﻿from __future__ import annotations
 from django.http import JsonResponse, HttpRequest, HttpResponseBadRequest
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
-from .models import LaybyOrder, LaybyPayment, notify
+from billing.webhooks import ingest as ingest_webhook
+from .models import LaybyOrder
 
 import json
 
@@ -62,8 +64,14 @@ def _check_webhook_secret(request: HttpRequest) -> bool:
     got = request.META.get("HTTP_X_LAYBY_SIGNATURE", "")
     return bool(expected) and (got == expected)
 
+@csrf_exempt
 @require_POST
 def api_payment_webhook(request: HttpRequest):
+    """
+    Verify + persist only; the payment is applied by the process_webhooks
+    worker (layby.webhooks.apply_payment). Provider retries with the same
+    provider_ref are acknowledged as duplicates.
+    """
     if not _check_webhook_secret(request):
         return HttpResponseBadRequest("Invalid or missing X-Layby-Signature")
 
@@ -71,26 +79,14 @@ def api_payment_webhook(request: HttpRequest):
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
         return HttpResponseBadRequest("Invalid JSON")
+    if not isinstance(payload, dict) or not (payload.get("order_id") or payload.get("order_ref")):
+        return HttpResponseBadRequest("Missing order_id / order_ref")
 
-    order_id = payload.get("order_id")
-    amount = payload.get("amount")
-    method = payload.get("method", "OTHER")
-    provider_ref = payload.get("provider_ref", "")
-    note = payload.get("note", "")
-
-    try:
-        o = LaybyOrder.objects.get(pk=order_id)
-    except LaybyOrder.DoesNotExist:
-        return HttpResponseBadRequest("Unknown order")
-
-    p = LaybyPayment.objects.create(
-        order=o, amount=amount, method=method, provider_ref=provider_ref, note=note
+    _, created = ingest_webhook(
+        "layby",
+        payload,
+        raw=request.body,
+        external_id=str(payload.get("provider_ref") or ""),
+        event_type="payment",
     )
-    if o.balance <= 0 and o.status not in ["DELIVERED"]:
-        o.status = "ACTIVE"  # ready for pickup; mark delivered via UI when collected
-        o.save(update_fields=["status", "updated_at"])
-
-    notify("layby.payment", f"Webhook payment {p.amount} for {o.customer_name}", audience="AGENT", user=o.agent)
-    return JsonResponse({"ok": True})
-
-
+    return JsonResponse({"ok": True, "duplicate": not created}, status=202)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('layby', '0003_alter_laybyorder_options_alter_laybypayment_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='laybyorder',
+            name='ref',
+            field=models.CharField(editable=False, max_length=16, unique=True),
+        ),
+    ]
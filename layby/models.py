@@ -1,9 +1,7 @@
 ﻿# layby/models.py
 from __future__ import annotations
 
-import random
 from decimal import Decimal
-from django.apps import apps
 from django.conf import settings
 from django.core.validators import RegexValidator
 from django.db import models
@@ -12,16 +10,15 @@ from django.db.models import Q
 
 def _generate_ref() -> str:
     """
-    Generate a unique human-friendly reference like AH1234.
-    Retries a few times to avoid collisions.
+    Generate a unique human-friendly reference like AH2600042
+    (AH + 2-digit year + yearly sequence). Numbers come from a platform-wide
+    sequence (refs are unique across tenants), so no lookups or retries;
+    they cannot clash with the older random AH1234 refs (different length).
     """
-    Model = apps.get_model("layby", "LaybyOrder")
-    for _ in range(16):
-        ref = f"AH{random.randint(0, 9999):04d}"
-        if not Model.objects.filter(ref=ref).exists():  # type: ignore[arg-type]
-            return ref
-    # Ultra-rare fallback
-    return f"AH{random.randint(0, 9999):04d}"
+    from tenants.services.sequences import next_yearly
+
+    year, n = next_yearly("AH")
+    return f"AH{year % 100:02d}{n:05d}"
 
 
 PHONE_RE = RegexValidator(r"^[0-9+\-\s]{7,20}$", "Enter a valid phone number.")
@@ -29,11 +26,10 @@ ID8_RE = RegexValidator(r"^\d{8}$", "ID number must be exactly 8 digits.")
 
 
 class LaybyOrder(models.Model):
-    # Public identifier
+    # Public identifier; assigned on first save (see save())
     ref = models.CharField(
         max_length=16,
         unique=True,
-        default=_generate_ref,
         editable=False,
     )
 
@@ -102,6 +98,13 @@ class LaybyOrder(models.Model):
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.ref} Â· {self.customer_name}"
 
+    def save(self, *args, **kwargs):
+        # Not a field default: that would run (and burn a sequence number) on
+        # every instantiation, e.g. an unbound LaybyOrderForm on GET
+        if self._state.adding and not self.ref:
+            self.ref = _generate_ref()
+        super().save(*args, **kwargs)
+
     # --------- convenience (not stored in DB) ---------
     @property
     def amount_paid(self) -> Decimal:
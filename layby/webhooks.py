@@ -0,0 +1,39 @@
+# layby/webhooks.py
+"""
+Processing side of the layby payment webhook (see layby.api.api_payment_webhook).
+Runs in the billing process_webhooks worker, one transaction per event.
+"""
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation
+
+from billing.webhooks import PermanentWebhookError
+
+from .models import LaybyOrder, LaybyPayment
+
+
+def apply_payment(event) -> None:
+    data = event.payload or {}
+    if data.get("order_id"):
+        order = LaybyOrder.objects.filter(pk=data["order_id"]).first()
+    else:
+        order = LaybyOrder.objects.filter(ref=data.get("order_ref") or "").first()
+    if order is None:
+        raise PermanentWebhookError(f"Unknown order {data.get('order_id') or data.get('order_ref')!r}")
+    try:
+        amount = Decimal(str(data.get("amount")))
+    except (InvalidOperation, TypeError):
+        raise PermanentWebhookError(f"Invalid amount {data.get('amount')!r}")
+    if amount <= 0:
+        raise PermanentWebhookError(f"Invalid amount {amount}")
+
+    tx_ref = (event.external_id or "")[:64]
+    # A retried event whose payment was already written (e.g. crash after commit)
+    if tx_ref and LaybyPayment.objects.filter(order=order, tx_ref=tx_ref).exists():
+        return
+    LaybyPayment.objects.create(
+        order=order,
+        amount=amount,
+        method=str(data.get("method") or "OTHER")[:24],
+        tx_ref=tx_ref,
+    )
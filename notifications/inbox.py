@@ -0,0 +1,172 @@
+# notifications/inbox.py
+"""
+Tenant-scoped inbox with maintained unread counters.
+
+- Notices are fanned out on write: a broadcast to an audience inserts one
+  row per recipient with a single bulk INSERT, then bumps every recipient's
+  InboxCounter with one UPDATE. Reading an inbox is an indexed range on
+  (user, business, id) instead of filtering a platform-wide table.
+- Unread counts live on InboxCounter and change only on fan-out and
+  mark-read, so the bell never re-counts rows.
+- `latest_id` is a watermark: the highest notification id of the last
+  fan-out that reached the inbox. Clients hand it back as their cursor.
+  After commit it is published to the cache; the long-poll view waits on
+  that key rather than querying in a loop. The wait is async and only
+  happens under ASGI (settings.ASGI_MODE); a sync worker would be pinned
+  for the whole wait, so there it answers at once.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import InboxCounter, Notification
+
+LATEST_TTL = 60  # seconds; bounds staleness with a per-process cache
+POLL_INTERVAL = 0.5
+
+
+def _latest_key(user_id: int, business_id: Optional[int]) -> str:
+    return f"notif:latest:{user_id}:{business_id or 0}"
+
+
+def _counters(user_ids, business_id: Optional[int]):
+    return InboxCounter.objects.filter(user_id__in=user_ids, business_id=business_id)
+
+
+# ---------------------------------------------------------------------
+# Recipients
+# ---------------------------------------------------------------------
+def recipients(audience: str, business_id: Optional[int], user=None) -> list[int]:
+    """
+    AGENT notices go to the given user. ADMIN notices go to the business's
+    ACTIVE managers, or to platform staff when there is no business.
+    """
+    if audience == "AGENT":
+        return [user.pk] if user is not None else []
+    if business_id:
+        from tenants.models import Membership
+
+        return list(
+            Membership.objects.filter(business_id=business_id, role="MANAGER", status="ACTIVE")
+            .values_list("user_id", flat=True).distinct()
+        )
+    return list(get_user_model().objects.filter(is_staff=True, is_active=True).values_list("pk", flat=True))
+
+
+# ---------------------------------------------------------------------
+# Writes
+# ---------------------------------------------------------------------
+def fan_out(
+    user_ids: Iterable[int],
+    *,
+    audience: str,
+    message: str,
+    level: str = "info",
+    meta: Optional[dict] = None,
+    business_id: Optional[int] = None,
+) -> list[Notification]:
+    """Insert one notification per recipient and bump their counters."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return []
+    with transaction.atomic():
+        rows = Notification.objects.bulk_create([
+            Notification(audience=audience, user_id=uid, business_id=business_id,
+                         message=message, level=level, meta=meta or {})
+            for uid in user_ids
+        ])
+        if rows[-1].pk:
+            top = max(n.pk for n in rows)
+        else:  # backend did not return ids
+            top = Notification.objects.aggregate(m=Max("id"))["m"]
+        InboxCounter.objects.bulk_create(
+            [InboxCounter(user_id=uid, business_id=business_id) for uid in user_ids],
+            ignore_conflicts=True,
+        )
+        _counters(user_ids, business_id).update(
+            unread=F("unread") + 1, latest_id=Greatest(F("latest_id"), top),
+        )
+    transaction.on_commit(lambda: cache.set_many(
+        {_latest_key(uid, business_id): top for uid in user_ids}, LATEST_TTL,
+    ))
+    return rows
+
+
+def mark_read(user, business_id: Optional[int], ids: Optional[Iterable[int]] = None) -> int:
+    """Mark some (or all) unread notices read; returns how many changed."""
+    qs = Notification.objects.filter(user=user, business_id=business_id, read_at__isnull=True)
+    if ids is not None:
+        qs = qs.filter(pk__in=list(ids))
+    with transaction.atomic():
+        changed = qs.update(read_at=timezone.now())
+        if changed:
+            _counters([user.pk], business_id).update(unread=Greatest(F("unread") - changed, 0))
+    return changed
+
+
+# ---------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------
+def state(user, business_id: Optional[int]) -> tuple[int, int]:
+    """(unread, latest_id) for the inbox; (0, 0) if nothing was ever delivered."""
+    row = _counters([user.pk], business_id).values_list("unread", "latest_id").first()
+    return row or (0, 0)
+
+
+def items(user, business_id: Optional[int], *, after_id: int = 0, since=None, limit: int = 50):
+    qs = Notification.objects.filter(user=user, business_id=business_id)
+    if after_id:
+        qs = qs.filter(pk__gt=after_id)
+    if since:
+        qs = qs.filter(created_at__gt=since)
+    return list(qs.order_by("-id")[:limit])
+
+
+def wait_for_new(user, business_id: Optional[int], after_id: int, timeout: float) -> int:
+    """
+    Block until the inbox has a notification newer than `after_id` or the
+    timeout passes; returns the latest id seen. Reads the cache while
+    waiting and the counter row only when the cache has nothing.
+    """
+    key = _latest_key(user.pk, business_id)
+    deadline = time.monotonic() + max(timeout, 0)
+    while True:
+        latest = cache.get(key)
+        if latest is None:
+            latest = state(user, business_id)[1]
+            cache.add(key, latest, LATEST_TTL)
+        if latest > after_id or time.monotonic() >= deadline:
+            return latest
+        time.sleep(POLL_INTERVAL)
+
+
+async def await_new(user, business_id: Optional[int], after_id: int, timeout: float) -> int:
+    """`wait_for_new` for async views: sleeps without holding a thread."""
+    key = _latest_key(user.pk, business_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(timeout, 0)
+    while True:
+        latest = await cache.aget(key)
+        if latest is None:
+            latest = (await sync_to_async(state)(user, business_id))[1]
+            await cache.aadd(key, latest, LATEST_TTL)
+        if latest > after_id or loop.time() >= deadline:
+            return latest
+        await asyncio.sleep(min(POLL_INTERVAL, max(0.0, deadline - loop.time())))
+
+
+def longpoll_timeout() -> float:
+    if not getattr(settings, "ASGI_MODE", False):
+        return 0.0
+    return float(getattr(settings, "NOTIFICATIONS_LONGPOLL_SECONDS", 25))
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+        ('tenants', '0010_numbersequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread', models.PositiveIntegerField(default=0)),
+                ('latest_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='business',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tenants.business'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'business', 'id'], name='notif_user_biz_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='inboxcounter',
+            name='business',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tenants.business'),
+        ),
+        migrations.AddField(
+            model_name='inboxcounter',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='inboxcounter',
+            constraint=models.UniqueConstraint(fields=('user', 'business'), name='inboxctr_user_biz_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='inboxcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('business__isnull', True)), fields=('user',), name='inboxctr_user_global_uniq'),
+        ),
+    ]
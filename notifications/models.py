@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
 
@@ -26,6 +27,13 @@ class Notification(models.Model):
         on_delete=models.CASCADE,
         related_name="notifications",
     )
+    # Tenant the notice belongs to (NULL = platform-wide)
+    business = models.ForeignKey(
+        "tenants.Business",
+        null=True, blank=True,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
 
     message = models.TextField()
     level = models.CharField(max_length=10, choices=LEVELS, default="info")
@@ -38,6 +46,7 @@ class Notification(models.Model):
             models.Index(fields=["audience", "created_at"]),
             models.Index(fields=["user", "created_at"]),
             models.Index(fields=["read_at"]),
+            models.Index(fields=["user", "business", "id"], name="notif_user_biz_id_idx"),
         ]
         ordering = ["-created_at"]
 
@@ -55,3 +64,28 @@ class Notification(models.Model):
             self.save(update_fields=["read_at"])
 
 
+class InboxCounter(models.Model):
+    """
+    Per-user, per-tenant inbox state maintained by notifications.inbox on
+    fan-out and mark-read: the unread count and the newest notification id,
+    so the bell and long-poll read one row instead of counting the table.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    business = models.ForeignKey("tenants.Business", null=True, blank=True, on_delete=models.CASCADE,
+                                 related_name="+")
+    unread = models.PositiveIntegerField(default=0)
+    latest_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "business"], name="inboxctr_user_biz_uniq"),
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=Q(business__isnull=True),
+                name="inboxctr_user_global_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}@{self.business_id or '*'}: {self.unread} unread"
@@ -56,6 +56,7 @@ def _invitem_post(sender, instance: InventoryItem, created: bool, **kwargs):
             message=f"{label} stocked in.",
             level="success",
             meta={"item_id": instance.id},
+            business=instance.business_id,
         )
 
         # Agent notice (if assigned)
@@ -66,6 +67,7 @@ def _invitem_post(sender, instance: InventoryItem, created: bool, **kwargs):
                 message=f"{label} added to your stock.",
                 level="info",
                 meta={"item_id": instance.id},
+                business=instance.business_id,
             )
 
 
@@ -80,11 +82,13 @@ def _audit_post(sender, instance: InventoryAudit, created: bool, **kwargs):
     item = getattr(instance, "item", None)
     prod = getattr(getattr(item, "product", None), "model", None) or getattr(getattr(item, "product", None), "name", None) or "Item"
 
+    biz = getattr(instance, "business_id", None) or getattr(item, "business_id", None)
+
     # Examples: STOCK_IN / RECEIVED / TRANSFER_IN / SOLD
     if action in {"STOCK_IN", "RECEIVED", "TRANSFER_IN"}:
-        create_notification(audience="ADMIN", message=f"{prod} stocked in.", level="success")
+        create_notification(audience="ADMIN", message=f"{prod} stocked in.", level="success", business=biz)
     elif action in {"TRANSFER_OUT"}:
-        create_notification(audience="ADMIN", message=f"{prod} transferred out.", level="info")
+        create_notification(audience="ADMIN", message=f"{prod} transferred out.", level="info", business=biz)
 
 
 # ---------------------------
@@ -115,8 +119,10 @@ def _sale_post(sender, instance: Sale, created: bool, **kwargs):
 
     item = getattr(instance, "item", None)
     prod = getattr(getattr(item, "product", None), "model", None) or getattr(getattr(item, "product", None), "name", None) or "Item"
+    biz = getattr(instance, "business_id", None) or getattr(item, "business_id", None)
     admin_msg = f"{prod} sold"
-    create_notification(audience="ADMIN", message=admin_msg, level="info", meta={"sale_id": instance.id})
+    create_notification(audience="ADMIN", message=admin_msg, level="info", meta={"sale_id": instance.id},
+                        business=biz)
 
     # Agent notices
     agent = getattr(instance, "agent", None) or getattr(instance, "user", None)
@@ -129,6 +135,7 @@ def _sale_post(sender, instance: Sale, created: bool, **kwargs):
                 message=f"Commission earned: {commission:,.2f} on {prod}.",
                 level="success",
                 meta={"sale_id": instance.id, "commission": commission},
+                business=biz,
             )
 
         # Remaining stock for the agent
@@ -141,6 +148,7 @@ def _sale_post(sender, instance: Sale, created: bool, **kwargs):
                 message=f"{remaining} phone(s) left in your stock.",
                 level="info",
                 meta={"remaining": remaining},
+                business=biz,
             )
         except Exception:
             pass
@@ -159,6 +167,7 @@ if WalletTxn is not None:
         user = getattr(instance, "user", None)
         amount = getattr(instance, "amount", 0)
         reason = getattr(instance, "reason", "") or getattr(instance, "kind", "")
+        biz = getattr(instance, "business_id", None)
 
         # Budget request / advance
         if str(reason).upper() in {"ADVANCE", "BUDGET", "BUDGET_REQUEST"}:
@@ -167,6 +176,7 @@ if WalletTxn is not None:
                 message=f"Cash request {amount:,.2f} from {getattr(user, 'username', 'agent')}.",
                 level="warning",
                 meta={"wallet_id": instance.id},
+                business=biz,
             )
             if user:
                 create_notification(
@@ -175,6 +185,7 @@ if WalletTxn is not None:
                     message=f"Budget request submitted: {amount:,.2f}.",
                     level="info",
                     meta={"wallet_id": instance.id},
+                    business=biz,
                 )
 
         # Payday withdrawals/payouts
@@ -184,6 +195,7 @@ if WalletTxn is not None:
                 message=f"Payday withdrawal {amount:,.2f} by {getattr(user, 'username', 'agent')}.",
                 level="info",
                 meta={"wallet_id": instance.id},
+                business=biz,
             )
             if user:
                 create_notification(
@@ -192,6 +204,7 @@ if WalletTxn is not None:
                     message=f"Withdrawal processed: {amount:,.2f}.",
                     level="success",
                     meta={"wallet_id": instance.id},
+                    business=biz,
                 )
 
 
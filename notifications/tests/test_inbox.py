@@ -0,0 +1,75 @@
+# notifications/tests/test_inbox.py
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from tenants.models import Business, Membership
+
+NOTIFICATIONS = apps.is_installed("notifications")
+if NOTIFICATIONS:
+    from notifications import inbox, views
+    from notifications.models import InboxCounter, Notification
+    from notifications.utils import create_notification
+
+User = get_user_model()
+
+
+@skipUnless(NOTIFICATIONS, "notifications app is not installed")
+class InboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.biz = Business.objects.create(name="Inbox A", slug="inbox-a", status="ACTIVE")
+        self.other = Business.objects.create(name="Inbox B", slug="inbox-b", status="ACTIVE")
+        self.managers = [User.objects.create_user(f"inbox_mgr{i}", password="x") for i in range(3)]
+        for u in self.managers:
+            Membership.objects.create(user=u, business=self.biz, role="MANAGER", status="ACTIVE")
+        Membership.objects.create(user=self.managers[0], business=self.other, role="MANAGER", status="ACTIVE")
+
+    def _broadcast(self, message, business=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_notification(audience="ADMIN", message=message, business=business or self.biz,
+                                       email=False, whatsapp=False)
+
+    def test_broadcast_fans_out_and_counters_follow_reads(self):
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(7):
+            # members, savepoint, rows, counters insert + update, release, + create_notification's table check
+            create_notification(audience="ADMIN", message="Low stock", business=self.biz,
+                                email=False, whatsapp=False)
+        self._broadcast("Sold")
+        self._broadcast("Elsewhere", business=self.other)
+
+        mgr = self.managers[0]
+        self.assertEqual(Notification.objects.filter(business=self.biz).count(), 6)
+        self.assertEqual(inbox.state(mgr, self.biz.id)[0], 2)
+        self.assertEqual(inbox.state(mgr, self.other.id)[0], 1)
+        self.assertEqual([n.message for n in inbox.items(mgr, self.biz.id)], ["Sold", "Low stock"])
+
+        first = inbox.items(mgr, self.biz.id)[-1]
+        self.assertEqual(inbox.mark_read(mgr, self.biz.id, [first.pk]), 1)
+        self.assertEqual(inbox.mark_read(mgr, self.biz.id, [first.pk]), 0)  # already read
+        self.assertEqual(inbox.state(mgr, self.biz.id)[0], 1)
+        inbox.mark_read(mgr, self.biz.id)
+        self.assertEqual(InboxCounter.objects.get(user=mgr, business=self.biz).unread, 0)
+        self.assertEqual(inbox.state(self.managers[1], self.biz.id)[0], 2)
+
+    def test_wait_returns_new_items_or_times_out(self):
+        mgr = self.managers[1]
+        self._broadcast("First")
+        _, latest = inbox.state(mgr, self.biz.id)
+
+        request = RequestFactory().get("/notifications/wait/", {"after": latest, "timeout": 0})
+        request.user = mgr
+        request.auser = sync_to_async(lambda: mgr)
+        request.session = {}
+        response = async_to_sync(views.wait)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'"items": []', response.content)
+
+        self._broadcast("Second")
+        self.assertGreater(inbox.wait_for_new(mgr, self.biz.id, latest, timeout=0), latest)
+        self.assertEqual([n.message for n in inbox.items(mgr, self.biz.id, after_id=latest)], ["Second"])
@@ -11,6 +11,9 @@ urlpatterns = [
     # Alternate feed URL (kept for compatibility if referenced elsewhere)
     path("feed/", views.feed, name="feed"),
 
+    # Long-poll: returns as soon as the inbox has something newer than ?after=
+    path("wait/", views.wait, name="wait"),
+
     # Mark notifications as read (single or bulk)
     path("read/", views.mark_read, name="mark_read"),
     path("mark-read/", views.mark_read, name="mark_read_alt"),
@@ -162,15 +162,17 @@ def create_notification(
     level: str = "info",
     user=None,                     # required for AGENT
     meta: Optional[dict] = None,
+    business=None,                 # Business or id; None = platform-wide
     email: bool = True,
     whatsapp: bool = True,
 ) -> Optional["Notification"]:
     """
-    Create a Notification row if the model/table exists and notifications are enabled.
-    If the table isn't ready (e.g., dev without migrations), we **gracefully no-op**
-    on the DB write but can still send email/WhatsApp fanout.
+    Deliver a notice to its recipients' inboxes (see notifications.inbox) if
+    the model/table exists and notifications are enabled. If the table isn't
+    ready (e.g., dev without migrations), we **gracefully no-op** on the DB
+    write but can still send email/WhatsApp fanout.
 
-    Returns the Notification instance if created, else None.
+    Returns the first Notification row created, else None.
     """
     # Early feature flag
     if not _notifications_enabled():
@@ -185,13 +187,18 @@ def create_notification(
     n = None
     if Notification and _table_exists(Notification):
         try:
-            n = Notification.objects.create(
+            from .inbox import fan_out, recipients
+
+            business_id = getattr(business, "pk", business)
+            rows = fan_out(
+                recipients(audience, business_id, user),
                 audience=audience,
-                user=user if audience == "AGENT" else None,
                 message=message,
                 level=level,
-                meta=meta or {},
+                meta=meta,
+                business_id=business_id,
             )
+            n = rows[0] if rows else None
         except (OperationalError, ProgrammingError) as e:
             # Table might still be missing or mid-migration; fall through to transport only
             log.warning("Notification DB write failed (will continue without DB row): %s", e)
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from typing import Optional
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpRequest, HttpResponseBadRequest
 from django.utils.dateparse import parse_datetime
@@ -13,6 +14,7 @@ from django.db.utils import OperationalError, ProgrammingError
 # Try to import the model, but allow the app to run even if migrations aren't applied yet.
 try:
     from .models import Notification  # type: ignore
+    from . import inbox
 except Exception:  # app not ready / import error
     Notification = None  # type: ignore
 
@@ -20,25 +22,55 @@ except Exception:  # app not ready / import error
 # ---------------------------
 # Helpers
 # ---------------------------
+_TABLE_READY = False
+
+
 def _table_exists(model) -> bool:
+    # Positive answers are remembered: introspection is a query per call
+    global _TABLE_READY
+    if _TABLE_READY:
+        return True
     try:
         if not model:
             return False
-        return model._meta.db_table in connection.introspection.table_names()
+        _TABLE_READY = model._meta.db_table in connection.introspection.table_names()
+        return _TABLE_READY
     except Exception:
         return False
 
 
-def _base_qs_for_user(request) -> Optional["Notification"].__class__:
-    """
-    Returns a queryset filtered for the current user's audience,
-    or None if the table/model is unavailable.
-    """
-    if not (Notification and _table_exists(Notification)):
+def _inbox_business_id(request) -> Optional[int]:
+    """Active tenant of the request; None (platform inbox) for staff outside a tenant."""
+    try:
+        from tenants.utils import get_active_business_id
+        return get_active_business_id(request)
+    except Exception:
         return None
-    if request.user.is_staff:
-        return Notification.objects.filter(audience="ADMIN")
-    return Notification.objects.filter(audience="AGENT", user=request.user)
+
+
+def _int_param(request, name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        return max(lo, min(int(request.GET.get(name, default)), hi))
+    except (TypeError, ValueError):
+        return default
+
+
+def _payload(rows, unread: int, latest: int) -> dict:
+    return {
+        "items": [
+            {
+                "id": n.id,
+                "message": n.message,
+                "level": n.level,
+                "created_at": n.created_at.isoformat(),
+                "read": n.is_read,
+            }
+            for n in rows
+        ],
+        "unread": unread,
+        "latest": latest,
+        "now": timezone.now().isoformat(),
+    }
 
 
 # ---------------------------
@@ -47,50 +79,51 @@ def _base_qs_for_user(request) -> Optional["Notification"].__class__:
 @login_required
 def feed(request: HttpRequest):
     """
-    Returns latest notifications for the current user.
-    Admins: ADMIN audience
-    Agents: AGENT audience for self
+    Latest notifications in the current user's inbox for the active business.
     Optional:
+      - ?after=<latest> only items newer than a previous response's `latest`
       - ?since=<iso8601>
       - ?limit=<int> (default 50, max 200)
+    `unread` comes from the inbox counter, not a COUNT over the table.
     """
-    qs_all = _base_qs_for_user(request)
-    now_iso = timezone.now().isoformat()
-
-    # If notifications aren't ready, return an empty feed gracefully.
-    if qs_all is None:
-        return JsonResponse({"items": [], "unread": 0, "now": now_iso})
+    if not (Notification and _table_exists(Notification)):
+        return JsonResponse({"items": [], "unread": 0, "latest": 0, "now": timezone.now().isoformat()})
 
-    # Parse optional filters & limits (do NOT slice before computing unread)
+    business_id = _inbox_business_id(request)
     since_s = request.GET.get("since")
-    since = parse_datetime(since_s) if since_s else None
-    try:
-        limit = max(1, min(int(request.GET.get("limit", "50")), 200))
-    except (TypeError, ValueError):
-        limit = 50
+    rows = inbox.items(
+        request.user, business_id,
+        after_id=_int_param(request, "after", 0, 0, 2**62),
+        since=parse_datetime(since_s) if since_s else None,
+        limit=_int_param(request, "limit", 50, 1, 200),
+    )
+    unread, latest = inbox.state(request.user, business_id)
+    return JsonResponse(_payload(rows, unread, latest))
 
-    filtered = qs_all
-    if since:
-        filtered = filtered.filter(created_at__gt=since)
 
-    # Compute unread BEFORE any slicing to avoid the sliceâ†’filter error
-    unread = filtered.filter(read_at__isnull=True).count()
-
-    # Now fetch the page of items
-    items_qs = filtered.order_by("-created_at")[:limit]
+@login_required
+async def wait(request: HttpRequest):
+    """
+    Long-poll: hold the request until the inbox has something newer than
+    ?after=<latest> (or NOTIFICATIONS_LONGPOLL_SECONDS pass), then answer
+    like `feed` with only the new items. Clients loop on this instead of
+    polling the feed on a timer. Only ASGI workers wait (see
+    inbox.longpoll_timeout); sync workers answer at once.
+    """
+    if not (Notification and await sync_to_async(_table_exists)(Notification)):
+        return JsonResponse({"items": [], "unread": 0, "latest": 0, "now": timezone.now().isoformat()})
 
-    data = [
-        {
-            "id": n.id,
-            "message": n.message,
-            "level": n.level,
-            "created_at": n.created_at.isoformat(),
-            "read": n.is_read,
-        }
-        for n in items_qs
-    ]
+    user = await request.auser()
+    business_id = await sync_to_async(_inbox_business_id)(request)
+    after = _int_param(request, "after", 0, 0, 2**62)
+    timeout = min(float(_int_param(request, "timeout", 25, 0, 60)), inbox.longpoll_timeout())
+    latest = await inbox.await_new(user, business_id, after, timeout)
+    if latest <= after:
+        return JsonResponse({"items": [], "unread": None, "latest": after, "now": timezone.now().isoformat()})
 
-    return JsonResponse({"items": data, "unread": unread, "now": now_iso})
+    rows = await sync_to_async(inbox.items)(user, business_id, after_id=after, limit=200)
+    unread, latest = await sync_to_async(inbox.state)(user, business_id)
+    return JsonResponse(_payload(rows, unread, latest))
 
 
 @login_required
@@ -98,25 +131,22 @@ def mark_read(request: HttpRequest):
     """
     POST:
       - id=<int>  mark one
-      - all=1     mark visible set as read
+      - all=1     mark the whole inbox as read
     """
     if request.method != "POST":
         return HttpResponseBadRequest("POST required")
 
-    qs = _base_qs_for_user(request)
-
     # If notifications aren't ready, succeed as a no-op so UI doesn't break.
-    if qs is None:
+    if not (Notification and _table_exists(Notification)):
         return JsonResponse({"ok": True, "noop": True})
 
-    n_now = timezone.now()
-
+    business_id = _inbox_business_id(request)
     if request.POST.get("all") == "1":
         try:
-            qs.filter(read_at__isnull=True).update(read_at=n_now)
+            inbox.mark_read(request.user, business_id)
             return JsonResponse({"ok": True})
         except (OperationalError, ProgrammingError):
-            # Table might be mid-migrationâ€”treat as no-op.
+            # Table might be mid-migration—treat as no-op.
             return JsonResponse({"ok": True, "noop": True})
 
     try:
@@ -125,9 +155,7 @@ def mark_read(request: HttpRequest):
         return HttpResponseBadRequest("Invalid id")
 
     try:
-        updated = qs.filter(pk=nid, read_at__isnull=True).update(read_at=n_now)
+        updated = inbox.mark_read(request.user, business_id, [nid])
         return JsonResponse({"ok": bool(updated)})
     except (OperationalError, ProgrammingError):
         return JsonResponse({"ok": True, "noop": True})
-
-
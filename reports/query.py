@@ -0,0 +1,202 @@
+# reports/query.py
+"""
+Report query layer for reports.views_api.
+
+- Always scoped to one business (the request's active business).
+- Reads the SaleDaily/SaleMonthly roll-ups, never Sale itself: whole months in
+  the range come from monthly rows and only the ragged ends from daily rows,
+  so a multi-year range costs about one row per month per agent/product.
+- Results are cached per (business, data version, filter hash); any sale
+  write for the business bumps the version (see sales.rollups).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth
+from django.http import HttpRequest
+from django.utils import timezone
+
+from sales.models import SaleDaily, SaleMonthly
+from sales.rollups import data_version, month_start, next_month
+from tenants.utils import get_active_business_id
+
+from .views import ReportFilters
+
+ZERO = Decimal("0.00")
+
+# Daily series longer than this are returned per month instead
+MAX_DAILY_POINTS = 400
+CACHE_TTL = getattr(settings, "REPORTS_CACHE_TTL", 300)
+
+
+def _local_date(dt) -> Optional[date]:
+    if dt is None:
+        return None
+    return timezone.localtime(dt).date() if timezone.is_aware(dt) else dt.date()
+
+
+@dataclass(frozen=True)
+class ReportQuery:
+    business_id: Optional[int]
+    date_from: Optional[date]
+    date_to: date
+    agent_id: Optional[int]
+    model_q: Optional[str]
+
+    @classmethod
+    def from_request(cls, request: HttpRequest) -> "ReportQuery":
+        f = ReportFilters.from_request(request)
+        return cls(
+            business_id=get_active_business_id(request),
+            date_from=_local_date(f.date_from),
+            date_to=_local_date(f.date_to) or timezone.localdate(),
+            agent_id=f.agent_id,
+            model_q=(f.model_q or "").lower() or None,
+        )
+
+    @property
+    def span_days(self) -> Optional[int]:
+        return (self.date_to - self.date_from).days + 1 if self.date_from else None
+
+    def cache_key(self, kind: str) -> str:
+        raw = json.dumps(asdict(self), sort_keys=True, default=str)
+        digest = hashlib.sha1(raw.encode()).hexdigest()[:20]
+        return f"reports:{kind}:{self.business_id or 0}:v{data_version(self.business_id)}:{digest}"
+
+
+def cached_report(kind: str, q: ReportQuery, build: Callable[[ReportQuery], dict]) -> dict:
+    key = q.cache_key(kind)
+    data = cache.get(key)
+    if data is None:
+        data = build(q)
+        cache.set(key, data, CACHE_TTL)
+    return data
+
+
+# ---------------------------------------------------------------------
+# Roll-up reads
+# ---------------------------------------------------------------------
+def _parts(q: ReportQuery, *, daily_only: bool = False) -> list[tuple[type, dict]]:
+    """(model, filter kwargs) pairs that together cover [date_from, date_to] exactly once."""
+    start, end = q.date_from, q.date_to
+    if daily_only:
+        flt = {"day__lte": end}
+        if start:
+            flt["day__gte"] = start
+        return [(SaleDaily, flt)]
+
+    # Whole months are [first_full, full_stop)
+    first_full = None if start is None else (start if start.day == 1 else next_month(start))
+    full_stop = next_month(end) if (end + timedelta(days=1)).day == 1 else month_start(end)
+    if first_full is not None and first_full >= full_stop:
+        return [(SaleDaily, {"day__gte": start, "day__lte": end})]
+
+    parts: list[tuple[type, dict]] = []
+    if start is not None and start < first_full:
+        parts.append((SaleDaily, {"day__gte": start, "day__lt": first_full}))
+    monthly = {"month__lt": full_stop}
+    if first_full is not None:
+        monthly["month__gte"] = first_full
+    parts.append((SaleMonthly, monthly))
+    if full_stop <= end:
+        parts.append((SaleDaily, {"day__gte": full_stop, "day__lte": end}))
+    return parts
+
+
+def _rows(q: ReportQuery, group_by: tuple[str, ...] = (), *, period: str | None = None) -> list[dict]:
+    """
+    Sum orders/amount/profit over the range, grouped by `group_by` fields and
+    optionally by period ("day" or "month"). Rows from the daily and monthly
+    tables are merged on the group key.
+    """
+    acc: dict[tuple, dict] = {}
+    for model, flt in _parts(q, daily_only=(period == "day")):
+        qs = model.objects.filter(business_id=q.business_id, **flt)
+        if q.agent_id:
+            qs = qs.filter(agent_id=q.agent_id)
+        if q.model_q:
+            qs = qs.filter(product__model__icontains=q.model_q)
+
+        fields = list(group_by)
+        if period:
+            if model is SaleMonthly:
+                expr = F("month")
+            else:
+                expr = TruncMonth("day") if period == "month" else F("day")
+            qs = qs.annotate(period=expr)
+            fields.insert(0, "period")
+
+        sums = dict(t_orders=Sum("orders"), t_amount=Sum("amount"), t_profit=Sum("profit"))
+        found = [qs.aggregate(**sums)] if not fields else qs.order_by().values(*fields).annotate(**sums)
+        for r in found:
+            if not fields and r["t_orders"] is None:
+                continue
+            key = tuple(r[f] for f in fields)
+            a = acc.setdefault(key, {**{f: r[f] for f in fields}, "orders": 0, "amount": ZERO, "profit": ZERO})
+            a["orders"] += r["t_orders"] or 0
+            a["amount"] += r["t_amount"] or ZERO
+            a["profit"] += r["t_profit"] or ZERO
+    return list(acc.values())
+
+
+def _totals(q: ReportQuery) -> dict:
+    rows = _rows(q)
+    return rows[0] if rows else {"orders": 0, "amount": ZERO, "profit": ZERO}
+
+
+# ---------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------
+def sales_summary(q: ReportQuery) -> dict:
+    t = _totals(q)
+    by_month = sorted(_rows(q, period="month"), key=lambda r: r["period"])
+    return {
+        "kpis": {"total_sales": t["amount"], "total_profit": t["profit"], "orders": t["orders"]},
+        "by_month": [{"m": r["period"], "amount": r["amount"]} for r in by_month],
+    }
+
+
+def profit_trend(q: ReportQuery) -> dict:
+    span = q.span_days
+    granularity = "day" if span is not None and span <= MAX_DAILY_POINTS else "month"
+    rows = sorted(_rows(q, period=granularity), key=lambda r: r["period"])
+    return {
+        "granularity": granularity,
+        "series": [{"d": r["period"], "profit": r["profit"], "amount": r["amount"]} for r in rows],
+    }
+
+
+def agent_performance(q: ReportQuery, *, limit: int = 50) -> dict:
+    rows = sorted(_rows(q, ("agent_id",)), key=lambda r: r["amount"], reverse=True)[:limit]
+    users = get_user_model().objects.in_bulk([r["agent_id"] for r in rows if r["agent_id"]])
+    out = []
+    for r in rows:
+        u = users.get(r["agent_id"])
+        name = (u.get_full_name() or u.get_username()) if u else ""
+        out.append({"agent_id": r["agent_id"], "agent__name": name,
+                    "amount": r["amount"], "profit": r["profit"], "orders": r["orders"]})
+    return {"rows": out}
+
+
+def inventory_velocity(q: ReportQuery, *, limit: int = 100) -> dict:
+    rows = sorted(_rows(q, ("product__model",)), key=lambda r: r["orders"], reverse=True)[:limit]
+    return {"rows": [{"model": r["product__model"], "sold": r["orders"], "amount": r["amount"]} for r in rows]}
+
+
+def ads_roi(q: ReportQuery) -> dict:
+    # Sales carry no ad attribution yet, so every sale counts as "without ads"
+    t = _totals(q)
+    return {
+        "with_ads": {"amount": ZERO, "profit": ZERO, "orders": 0},
+        "without_ads": {"amount": t["amount"], "profit": t["profit"], "orders": t["orders"]},
+    }
@@ -10,6 +10,7 @@ class SalesConfig(AppConfig):
     def ready(self):
         # Import signals here if you add any later, e.g.:
         # from . import signals  # noqa: F401
-        pass
+        from . import rollups  # noqa: F401  (keeps SaleDaily/SaleMonthly in step with Sale)
+        from . import leaderboard  # noqa: F401  (keeps AgentScore in step with Sale/wallet writes)
 
 
@@ -0,0 +1,460 @@
+# sales/leaderboard.py
+"""
+Agent leaderboards per (business, week | month), kept current on writes.
+
+- AgentScore stores one compact row per (business, period, period_start,
+  agent): units, revenue, profit, commission earned and agent-wallet total.
+- After commit, a Sale write recomputes only its agent's week and month
+  cells, as one indexed aggregate per board. An agent-ledger
+  WalletTransaction write does the same for the wallet column in the
+  agent's businesses. Cells touched by one transaction are refreshed
+  together, so a bulk import costs one pass, not one per row.
+- Reads go through Board: one board's rows, sorted by a metric and kept per
+  process until the board's version moves. top(n) is a slice; rank_of() is
+  a bisect, O(log n).
+- Each refresh compares the agent's standing before and after. The Delta
+  list drives nudges ("2 sales from #1") and badge awards. Neither needs
+  a periodic re-scan of the week's sales.
+- Bulk writers that skip signals call queue_wallet(txns) themselves
+  (wallet.payroll does, next to apply_txns).
+- `python manage.py refresh_leaderboards` rebuilds cells from Sale and
+  wallet history (backfill, or a backstop for bulk updates that skip
+  signals). `--snapshot` freezes closed periods into
+  insights.LeaderboardSnapshot when that app is installed.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from wallet.models import Ledger, WalletTransaction
+
+from .models import AgentScore, Sale
+from cc.on_commit import defer
+
+from .rollups import as_date, bucket_of, month_start, next_month, previous_bucket, sale_keys, sales_in_business
+
+log = logging.getLogger(__name__)
+
+PERIODS = ("week", "month")
+METRICS = ("units", "revenue", "profit", "earnings", "wallet")
+ZERO = Decimal("0.00")
+
+Cell = tuple  # (business_id, agent_id, day)
+
+
+def period_bounds(period: str, d: date) -> tuple[date, date]:
+    """[start, end) of the week (Monday first) or month containing d."""
+    if period == "week":
+        start = d - timedelta(days=d.weekday())
+        return start, start + timedelta(days=7)
+    start = month_start(d)
+    return start, next_month(start)
+
+
+# ---------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------
+def _version_key(business_id: int, period: str, start: date) -> str:
+    return f"lb:ver:{business_id}:{period}:{start.isoformat()}"
+
+
+def board_version(business_id: int, period: str, start: date) -> int:
+    return int(cache.get(_version_key(business_id, period, start)) or 0)
+
+
+def _bump(business_id: int, period: str, start: date) -> None:
+    key = _version_key(business_id, period, start)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+@dataclass(frozen=True)
+class Standing:
+    agent_id: int
+    rank: int
+    score: object
+    leader_score: object
+
+    @property
+    def gap(self):
+        return self.leader_score - self.score
+
+
+def _board_rows(business_id: int, period: str, start: date) -> dict:
+    """{"rows": [...], metric: (sorted rows, keys, scores)} for a board, shared by every metric."""
+    key = (business_id, period, start)
+    version = board_version(business_id, period, start)
+    now = time.monotonic()
+    with _boards_lock:
+        hit = _boards.get(key)
+        # The TTL bounds staleness when the version lives in a per-process cache
+        if hit and hit[0] == version and now - hit[1] < float(getattr(settings, "LEADERBOARD_CACHE_SECONDS", 30)):
+            return hit[2]
+    rows = list(
+        AgentScore.objects.filter(business_id=business_id, period=period, period_start=start)
+        .values("agent_id", *METRICS)
+    )
+    entry = {"rows": rows}
+    with _boards_lock:
+        if len(_boards) > 2048:
+            _boards.clear()
+        _boards[key] = (version, now, entry)
+    return entry
+
+
+_boards: dict = {}
+_boards_lock = threading.Lock()
+
+
+class Board:
+    """One (business, period) leaderboard sorted by `metric`; ties share a rank."""
+
+    def __init__(self, business_id: int, period: str = "week", day: Optional[date] = None, metric: str = "units"):
+        if period not in PERIODS or metric not in METRICS:
+            raise ValueError(f"unknown leaderboard {period}/{metric}")
+        self.business_id, self.period, self.metric = business_id, period, metric
+        self.start, self.end = period_bounds(period, day or timezone.localdate())
+        entry = _board_rows(business_id, period, self.start)
+        if metric not in entry:
+            ordered = sorted(entry["rows"], key=lambda r: (-r[metric], r["agent_id"]))
+            # Negated scores ascend, so bisect finds an agent's rank
+            entry[metric] = (ordered, [-r[metric] for r in ordered], {r["agent_id"]: r[metric] for r in ordered})
+        self.rows, self._keys, self._score = entry[metric]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def top(self, n: int = 10) -> list[dict]:
+        return [{**row, "rank": self._rank(row[self.metric])} for row in self.rows[:n]]
+
+    def _rank(self, score) -> int:
+        return bisect.bisect_left(self._keys, -score) + 1
+
+    def rank_of(self, agent_id: int) -> Optional[int]:
+        score = self._score.get(agent_id)
+        return None if score is None else self._rank(score)
+
+    def standing(self, agent_id: int) -> Optional[Standing]:
+        score = self._score.get(agent_id)
+        if score is None:
+            return None
+        return Standing(agent_id, self._rank(score), score, self.rows[0][self.metric])
+
+
+# ---------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------
+@dataclass(frozen=True)
+class Delta:
+    business_id: int
+    period: str
+    period_start: date
+    metric: str
+    agent_id: int
+    before: Optional[Standing]
+    after: Optional[Standing]
+
+
+def _recompute(business_id: int, period: str, start: date, end: date, agent_ids: set[int]) -> None:
+    dec = DecimalField(max_digits=14, decimal_places=2)
+    sales = {
+        r["agent_id"]: r
+        for r in sales_in_business(business_id)
+        .filter(agent_id__in=agent_ids, sold_at__gte=start, sold_at__lt=end)
+        .order_by()
+        .values("agent_id")
+        .annotate(
+            units=Count("id"),
+            revenue=Sum("price"),
+            cost=Sum("item__order_price"),
+            earnings=Sum(F("price") * F("commission_pct") / 100, output_field=dec),
+        )
+    }
+    wallet = dict(
+        WalletTransaction.objects.filter(
+            ledger=Ledger.AGENT, agent_id__in=agent_ids, effective_date__gte=start, effective_date__lt=end
+        )
+        .order_by()
+        .values("agent_id")
+        .annotate(total=Sum("amount"))
+        .values_list("agent_id", "total")
+    )
+    cells = []
+    for aid in agent_ids:
+        s = sales.get(aid) or {}
+        revenue = s.get("revenue") or ZERO
+        cells.append(AgentScore(
+            business_id=business_id, agent_id=aid, period=period, period_start=start,
+            units=s.get("units") or 0, revenue=revenue, profit=revenue - (s.get("cost") or ZERO),
+            earnings=(s.get("earnings") or ZERO).quantize(Decimal("0.01")), wallet=wallet.get(aid) or ZERO,
+        ))
+    AgentScore.objects.bulk_create(
+        cells,
+        update_conflicts=True,
+        unique_fields=["business", "period", "period_start", "agent"],
+        update_fields=[*METRICS, "updated_at"],
+    )
+
+
+def refresh(cells: Iterable[Cell], *, notify: bool = True) -> list[Delta]:
+    """
+    Recompute the week and month cells of each (business_id, agent_id, day)
+    and return how the agents' standings moved.
+    """
+    boards: dict[tuple, set[int]] = defaultdict(set)
+    for bid, aid, d in cells:
+        d = as_date(d)
+        if bid and aid and d:
+            for period in PERIODS:
+                boards[(bid, period, period_bounds(period, d))].add(aid)
+
+    deltas: list[Delta] = []
+    for (bid, period, (start, end)), agent_ids in boards.items():
+        before = {m: Board(bid, period, start, m) for m in METRICS}
+        with transaction.atomic():
+            _recompute(bid, period, start, end, agent_ids)
+        _bump(bid, period, start)
+        for m in METRICS:
+            after = Board(bid, period, start, m)
+            for aid in sorted(agent_ids):
+                old, new = before[m].standing(aid), after.standing(aid)
+                if old is None or new is None or (old.score, old.rank) != (new.score, new.rank):
+                    deltas.append(Delta(bid, period, start, m, aid, old, new))
+    if notify and deltas:
+        dispatch(deltas)
+    return deltas
+
+
+def rebuild(*, business_id: Optional[int] = None, since: Optional[date] = None, notify: bool = False) -> int:
+    """Recompute every cell that has sales or wallet activity; returns cells touched."""
+    sales = Sale.objects.annotate(biz=Coalesce(F("item__business_id"), F("location__business_id"))).exclude(biz=None)
+    if business_id is not None:
+        sales = sales.filter(biz=business_id)
+    if since is not None:
+        sales = sales.filter(sold_at__gte=since)
+    cells = set(sales.order_by().values_list("biz", "agent_id", "sold_at").distinct())
+
+    from tenants.models import Membership
+
+    members = defaultdict(set)
+    memberships = Membership.objects.filter(status="ACTIVE")
+    if business_id is not None:
+        memberships = memberships.filter(business_id=business_id)
+    for bid, uid in memberships.values_list("business_id", "user_id"):
+        members[uid].add(bid)
+    txns = WalletTransaction.objects.filter(ledger=Ledger.AGENT, agent_id__in=list(members))
+    if since is not None:
+        txns = txns.filter(effective_date__gte=since)
+    for aid, d in txns.order_by().values_list("agent_id", "effective_date").distinct():
+        cells.update((bid, aid, d) for bid in members[aid])
+
+    refresh(cells, notify=notify)
+    return len(cells)
+
+
+# ---------------------------------------------------------------------
+# Deltas -> nudges and badges
+# ---------------------------------------------------------------------
+def nudge_gap() -> int:
+    return int(getattr(settings, "LEADERBOARD_NUDGE_GAP", 2))
+
+
+def _notify(delta: Delta, message: str) -> None:
+    if not apps.is_installed("notifications"):
+        return
+    from django.contrib.auth import get_user_model
+    from notifications.utils import create_notification
+
+    user = get_user_model().objects.filter(pk=delta.agent_id).first()
+    if user is not None:
+        create_notification(
+            audience="AGENT", user=user, business=delta.business_id, message=message, level="info",
+            meta={"type": "leaderboard", "period": delta.period, "metric": delta.metric},
+            email=False, whatsapp=False,
+        )
+
+
+def nudges(deltas: Iterable[Delta]) -> list[tuple[Delta, str]]:
+    """(delta, message) for agents who just took #1 or came within the nudge gap of it."""
+    out = []
+    gap = nudge_gap()
+    for d in deltas:
+        if d.metric != "units" or d.period != "week" or d.after is None:
+            continue
+        was_rank = d.before.rank if d.before else None
+        was_gap = d.before.gap if d.before else None
+        if d.after.rank == 1 and was_rank != 1 and d.after.score:
+            out.append((d, "You're #1 on this week's leaderboard!"))
+        elif 0 < d.after.gap <= gap and (was_gap is None or was_gap > gap):
+            out.append((d, f"You're {d.after.gap} sale{'s' if d.after.gap != 1 else ''} away from #1 this week!"))
+    return out
+
+
+def award_badges(deltas: Iterable[Delta]) -> int:
+    """Award insights Badges whose simple threshold rule a delta just crossed."""
+    if not apps.is_installed("insights"):
+        return 0
+    from insights.models import AgentBadge, Badge
+
+    rules = [
+        (b, b.rule) for b in Badge.objects.all()
+        if isinstance(b.rule, dict) and b.rule.get("metric") in METRICS
+        and b.rule.get("window") in PERIODS and "gte" in b.rule
+    ]
+    awarded = 0
+    for d in deltas:
+        if d.after is None:
+            continue
+        before = d.before.score if d.before else 0
+        for badge, rule in rules:
+            if rule["metric"] == d.metric and rule["window"] == d.period and before < rule["gte"] <= d.after.score:
+                _, created = AgentBadge.objects.get_or_create(
+                    user_id=d.agent_id, badge=badge,
+                    defaults={"meta": {"business_id": d.business_id, "period_start": d.period_start.isoformat()}},
+                )
+                awarded += created
+    return awarded
+
+
+def dispatch(deltas: list[Delta]) -> None:
+    for delta, message in nudges(deltas):
+        try:
+            _notify(delta, message)
+        except Exception:
+            log.exception("Leaderboard nudge failed for agent %s", delta.agent_id)
+    try:
+        award_badges(deltas)
+    except Exception:
+        log.exception("Badge awards failed")
+
+
+# ---------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------
+def snapshot(business_id: int, period: str, day: date, metric: str = "units") -> list[dict]:
+    """Final standings of a period; stored as a LeaderboardSnapshot when insights is installed."""
+    board = Board(business_id, period, day, metric)
+    data = [
+        {"user_id": row["agent_id"], "business_id": business_id, "rank": row["rank"], "units": row["units"],
+         **{k: str(row[k]) for k in ("revenue", "profit", "earnings", "wallet")}}
+        for row in board.top(len(board))
+    ]
+    if data and apps.is_installed("insights"):
+        from insights.models import LeaderboardSnapshot
+
+        LeaderboardSnapshot.objects.create(
+            period_start=board.start, period_end=board.end - timedelta(days=1),
+            scope=period, metric=metric, data=data,
+        )
+    return data
+
+
+# ---------------------------------------------------------------------
+# Signals: queue touched cells, refresh once after commit
+# ---------------------------------------------------------------------
+def _flush(batch: set) -> None:
+    try:
+        refresh(batch)
+    except Exception:
+        # Never fail a sale over the leaderboard; refresh_leaderboards catches up
+        log.exception("Leaderboard refresh failed for %s cell(s)", len(batch))
+
+
+def _queue(cells: Iterable[Optional[Cell]]) -> None:
+    # One refresh per transaction for all the cells it touched
+    defer("leaderboard", [c for c in cells if c and all(c)], _flush)
+
+
+def _sale_cell(sale: Sale) -> Optional[Cell]:
+    bid, d = bucket_of(sale)
+    return (bid, sale.agent_id, d) if bid and d else None
+
+
+def _wallet_cells(ledger, agent_id: Optional[int], day) -> list[Cell]:
+    if ledger != Ledger.AGENT or not agent_id:
+        return []
+    from tenants.models import Membership
+
+    bids = Membership.objects.filter(user_id=agent_id, status="ACTIVE").values_list("business_id", flat=True)
+    return [(bid, agent_id, day) for bid in bids]
+
+
+def queue_wallet(txns: Iterable[WalletTransaction]) -> None:
+    """
+    Queue the wallet cells of transactions written without signals
+    (bulk_create), e.g. payroll payouts. One Membership query per call.
+    """
+    agent_days = {(t.agent_id, t.effective_date) for t in txns if t.ledger == Ledger.AGENT and t.agent_id}
+    if not agent_days:
+        return
+    from tenants.models import Membership
+
+    members = defaultdict(list)
+    for bid, uid in Membership.objects.filter(
+        user_id__in={aid for aid, _ in agent_days}, status="ACTIVE"
+    ).values_list("business_id", "user_id"):
+        members[uid].append(bid)
+    _queue([(bid, aid, d) for aid, d in agent_days for bid in members[aid]])
+
+
+def _txn_keys(txn: WalletTransaction) -> Optional[tuple]:
+    # __dict__: reading a deferred field would load it with a query
+    if txn.__dict__.get("id") is None:
+        return None
+    return tuple(txn.__dict__.get(f) for f in ("ledger", "agent_id", "effective_date"))
+
+
+# The keys a row had when loaded (post_init) give the cells it leaves on update
+@receiver(post_init, sender=Sale, dispatch_uid="leaderboard_sale_loaded")
+def _remember_loaded_sale(sender, instance: Sale, **kwargs):
+    instance._leaderboard_loaded = sale_keys(instance)
+
+
+@receiver(post_save, sender=Sale, dispatch_uid="leaderboard_sale_saved")
+def _sale_saved(sender, instance: Sale, **kwargs):
+    prev = previous_bucket(instance, getattr(instance, "_leaderboard_loaded", None))
+    instance._leaderboard_loaded = sale_keys(instance)
+    _queue([_sale_cell(instance), (prev[0], prev[2], prev[1]) if prev else None])
+
+
+@receiver(post_delete, sender=Sale, dispatch_uid="leaderboard_sale_deleted")
+def _sale_deleted(sender, instance: Sale, **kwargs):
+    _queue([_sale_cell(instance)])
+
+
+@receiver(post_init, sender=WalletTransaction, dispatch_uid="leaderboard_txn_loaded")
+def _remember_loaded_txn(sender, instance: WalletTransaction, **kwargs):
+    instance._leaderboard_loaded = _txn_keys(instance)
+
+
+@receiver(post_save, sender=WalletTransaction, dispatch_uid="leaderboard_txn_saved")
+def _txn_saved(sender, instance: WalletTransaction, **kwargs):
+    loaded, now = getattr(instance, "_leaderboard_loaded", None), _txn_keys(instance)
+    instance._leaderboard_loaded = now
+    prev = _wallet_cells(*loaded) if loaded and loaded != now else []
+    _queue([*_wallet_cells(instance.ledger, instance.agent_id, instance.effective_date), *prev])
+
+
+@receiver(post_delete, sender=WalletTransaction, dispatch_uid="leaderboard_txn_deleted")
+def _txn_deleted(sender, instance: WalletTransaction, **kwargs):
+    _queue(_wallet_cells(instance.ledger, instance.agent_id, instance.effective_date))
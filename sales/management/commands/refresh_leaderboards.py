@@ -0,0 +1,32 @@
+# sales/management/commands/refresh_leaderboards.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sales import leaderboard
+from tenants.models import Business
+
+
+class Command(BaseCommand):
+    help = "Rebuild AgentScore leaderboard cells from Sale and wallet history; optionally snapshot closed periods."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business", type=int, help="Only this business id.")
+        parser.add_argument("--days", type=int, help="Only the last N days (default: full history).")
+        parser.add_argument("--snapshot", action="store_true",
+                            help="Also snapshot last week's and last month's final standings.")
+
+    def handle(self, *args, **opts):
+        since = None
+        if opts.get("days"):
+            since = timezone.localdate() - timedelta(days=opts["days"])
+        n = leaderboard.rebuild(business_id=opts.get("business"), since=since)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {n} leaderboard cell(s)."))
+
+        if opts["snapshot"]:
+            today = timezone.localdate()
+            closed = {"week": today - timedelta(days=today.weekday() + 1), "month": today.replace(day=1) - timedelta(days=1)}
+            ids = [opts["business"]] if opts.get("business") else Business.objects.values_list("pk", flat=True)
+            rows = sum(len(leaderboard.snapshot(bid, period, day)) for bid in ids for period, day in closed.items())
+            self.stdout.write(f"Snapshotted {rows} standing(s).")
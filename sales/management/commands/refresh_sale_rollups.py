@@ -0,0 +1,22 @@
+# sales/management/commands/refresh_sale_rollups.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sales.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild SaleDaily/SaleMonthly report roll-ups from Sale rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business", type=int, help="Only this business id.")
+        parser.add_argument("--days", type=int, help="Only the last N days (default: full history).")
+
+    def handle(self, *args, **opts):
+        since = None
+        if opts.get("days"):
+            since = timezone.localdate() - timedelta(days=opts["days"])
+        n = rebuild_rollups(business_id=opts.get("business"), since=since)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {n} sales day bucket(s)."))
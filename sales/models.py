@@ -3,7 +3,7 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
-from inventory.models import InventoryItem, Location
+from inventory.models import InventoryItem, Location, Product
 
 User = get_user_model()
 
@@ -44,3 +44,74 @@ class Sale(models.Model):
         return f"Sale #{self.pk} - item {self.item_id}"
 
 
+# ---------------------------------------------------------------------
+# Pre-aggregated sales (read by the reports API; maintained by sales.rollups)
+# ---------------------------------------------------------------------
+class _SaleRollup(models.Model):
+    business = models.ForeignKey("tenants.Business", on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    agent    = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    product  = models.ForeignKey(Product, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    orders   = models.PositiveIntegerField(default=0)
+    amount   = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cost     = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    profit   = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class SaleDaily(_SaleRollup):
+    """Sales per (business, day, agent, location, product)."""
+    day = models.DateField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["business", "day"], name="saledaily_biz_day_idx"),
+            models.Index(fields=["business", "agent", "day"], name="saledaily_biz_agent_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} {self.day} agent={self.agent_id} x{self.orders}"
+
+
+class SaleMonthly(_SaleRollup):
+    """Same grain as SaleDaily, one row per month (first day of month)."""
+    month = models.DateField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["business", "month"], name="salemonthly_biz_month_idx"),
+            models.Index(fields=["business", "agent", "month"], name="salemonthly_biz_agent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} {self.month:%Y-%m} agent={self.agent_id} x{self.orders}"
+
+
+# ---------------------------------------------------------------------
+# Leaderboard cells (maintained by sales.leaderboard)
+# ---------------------------------------------------------------------
+class AgentScore(models.Model):
+    """One agent's totals in one business for one week or month."""
+    PERIOD_CHOICES = (("week", "Week"), ("month", "Month"))
+
+    business     = models.ForeignKey("tenants.Business", on_delete=models.CASCADE, related_name="+")
+    agent        = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    period       = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    units        = models.PositiveIntegerField(default=0)
+    revenue      = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    profit       = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    earnings     = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # sales commission
+    wallet       = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # agent-ledger total
+    updated_at   = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["business", "period", "period_start", "agent"],
+                                    name="agentscore_cell_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} {self.period} {self.period_start} agent={self.agent_id} x{self.units}"
@@ -0,0 +1,260 @@
+# sales/rollups.py
+"""
+Pre-aggregated sales (SaleDaily / SaleMonthly) for the reports API.
+
+- A Sale write refreshes its (business, day) bucket after commit, plus the
+  month row above it, so reports read a handful of rows per day/month instead
+  of scanning Sale. Buckets are batched per transaction (cc.on_commit); the
+  bucket a sale had when loaded comes from post_init, not a re-read.
+- Every refresh bumps a per-business data version; report caches key on it,
+  so a new sale invalidates cached results without any explicit deletes.
+- `python manage.py refresh_sale_rollups` rebuilds buckets from Sale
+  (backfill after deploy, or nightly to pick up price corrections).
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from cc.on_commit import defer
+
+from .models import Sale, SaleDaily, SaleMonthly
+
+log = logging.getLogger(__name__)
+
+ZERO = Decimal("0.00")
+_SUMS = ("orders", "amount", "cost", "profit")
+
+
+def as_date(d) -> date | None:
+    if isinstance(d, datetime):
+        return d.date()
+    return d
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def next_month(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def sales_in_business(business_id: int | None):
+    """Sales of one tenant: items carry it, legacy rows fall back to the sale's location."""
+    qs = Sale.objects.annotate(biz=Coalesce(F("item__business_id"), F("location__business_id")))
+    return qs.filter(biz=business_id) if business_id is not None else qs.filter(biz__isnull=True)
+
+
+# ---------------------------------------------------------------------
+# Data version (cache invalidation for report results)
+# ---------------------------------------------------------------------
+def _version_key(business_id: int | None) -> str:
+    return f"reports:ver:{business_id or 0}"
+
+
+def data_version(business_id: int | None) -> int:
+    key = _version_key(business_id)
+    v = cache.get(key)
+    if v is None:
+        cache.add(key, 1, None)
+        v = cache.get(key) or 1
+    return int(v)
+
+
+def bump_version(business_id: int | None) -> None:
+    key = _version_key(business_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+# ---------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------
+def _lock_business(business_id: int | None) -> None:
+    """
+    Serialize refreshes of one tenant. Each refresh deletes and re-inserts
+    its buckets, so two sales committing together would otherwise both
+    insert a day. The aggregate below runs after the lock is granted, so it
+    sees the other transaction's committed sale.
+    """
+    if business_id is not None:
+        from tenants.models import Business
+
+        list(Business._base_manager.select_for_update().filter(pk=business_id).values_list("pk", flat=True))
+
+
+def _refresh_business_days(business_id: int | None, days: set[date]) -> None:
+    _lock_business(business_id)
+    rows = (
+        sales_in_business(business_id)
+        .filter(sold_at__in=days)
+        .order_by()
+        .values("sold_at", "agent_id", "location_id", "item__product_id")
+        .annotate(orders=Count("id"), amount=Sum("price"), cost=Sum("item__order_price"))
+    )
+    daily = []
+    for r in rows:
+        amount, cost = r["amount"] or ZERO, r["cost"] or ZERO
+        daily.append(SaleDaily(
+            business_id=business_id, day=r["sold_at"], agent_id=r["agent_id"],
+            location_id=r["location_id"], product_id=r["item__product_id"],
+            orders=r["orders"], amount=amount, cost=cost, profit=amount - cost,
+        ))
+    SaleDaily.objects.filter(business_id=business_id, day__in=days).delete()
+    SaleDaily.objects.bulk_create(daily)
+
+    monthly = []
+    months = {month_start(d) for d in days}
+    for m in sorted(months):
+        for r in (
+            SaleDaily.objects.filter(business_id=business_id, day__gte=m, day__lt=next_month(m))
+            .order_by()
+            .values("agent_id", "location_id", "product_id")
+            .annotate(**{f"t_{k}": Sum(k) for k in _SUMS})
+        ):
+            monthly.append(SaleMonthly(
+                business_id=business_id, month=m, agent_id=r["agent_id"],
+                location_id=r["location_id"], product_id=r["product_id"],
+                **{k: r[f"t_{k}"] for k in _SUMS},
+            ))
+    SaleMonthly.objects.filter(business_id=business_id, month__in=months).delete()
+    SaleMonthly.objects.bulk_create(monthly)
+
+
+def refresh_days(keys: Iterable[tuple[int | None, date]]) -> int:
+    """
+    Rebuild the SaleDaily rows of each (business_id, day) and the SaleMonthly
+    rows of the months they fall in. Returns the number of buckets refreshed.
+    """
+    per_business: dict[int | None, set[date]] = defaultdict(set)
+    for bid, d in keys:
+        d = as_date(d)
+        if d is not None:
+            per_business[bid].add(d)
+
+    for bid, days in per_business.items():
+        with transaction.atomic():
+            _refresh_business_days(bid, days)
+        bump_version(bid)
+    return sum(len(d) for d in per_business.values())
+
+
+def rebuild_rollups(*, business_id: int | None = None, since: date | None = None, chunk_days: int = 31) -> int:
+    """
+    Refresh every bucket that has sales (or stale rollup rows), optionally
+    limited to one business and/or days on or after `since`.
+    """
+    sales = Sale.objects.annotate(biz=Coalesce(F("item__business_id"), F("location__business_id")))
+    stale = SaleDaily.objects.all()
+    if business_id is not None:
+        sales, stale = sales.filter(biz=business_id), stale.filter(business_id=business_id)
+    if since is not None:
+        sales, stale = sales.filter(sold_at__gte=since), stale.filter(day__gte=since)
+
+    keys = set(sales.order_by().values_list("biz", "sold_at").distinct())
+    keys |= set(stale.order_by().values_list("business_id", "day").distinct())
+
+    per_business: dict[int | None, list[date]] = defaultdict(list)
+    for bid, d in keys:
+        per_business[bid].append(d)
+    total = 0
+    for bid, days in per_business.items():
+        days.sort()
+        for i in range(0, len(days), chunk_days):
+            total += refresh_days((bid, d) for d in days[i:i + chunk_days])
+    return total
+
+
+# ---------------------------------------------------------------------
+# Signals
+# ---------------------------------------------------------------------
+def bucket_of(sale: Sale) -> tuple[int | None, date | None]:
+    """(business_id, day) a sale is counted under."""
+    bid = None
+    try:
+        bid = sale.item.business_id
+    except Exception:
+        pass
+    if bid is None:
+        try:
+            bid = sale.location.business_id
+        except Exception:
+            pass
+    return bid, as_date(sale.sold_at)
+
+
+# What a sale is bucketed by, as loaded (post_init) and as saved
+SALE_KEY_FIELDS = ("item_id", "location_id", "agent_id", "sold_at")
+
+
+def sale_keys(sale: Sale) -> tuple | None:
+    # __dict__: reading a deferred field would load it with a query
+    if sale.__dict__.get("id") is None:
+        return None
+    return tuple(sale.__dict__.get(f) for f in SALE_KEY_FIELDS)
+
+
+def previous_bucket(sale: Sale, loaded: tuple | None) -> tuple[int | None, date | None, int | None] | None:
+    """
+    (business_id, day, agent_id) of a saved sale as it was loaded, or None
+    when those keys did not change. Queries only when the item or location
+    changed, to find the old tenant.
+    """
+    if not loaded or loaded == sale_keys(sale):
+        return None
+    item_id, location_id, agent_id, sold_at = loaded
+    if (item_id, location_id) == (sale.item_id, sale.location_id):
+        bid = bucket_of(sale)[0]
+    else:
+        from inventory.models import InventoryItem, Location
+
+        bid = InventoryItem._base_manager.filter(pk=item_id).values_list("business_id", flat=True).first()
+        if bid is None and location_id:
+            bid = Location._base_manager.filter(pk=location_id).values_list("business_id", flat=True).first()
+    return bid, as_date(sold_at), agent_id
+
+
+def _refresh(keys: set) -> None:
+    try:
+        refresh_days(keys)
+    except Exception:
+        # Never fail a sale over reporting; the nightly rebuild catches up
+        log.exception("Sale rollup refresh failed for %s", keys)
+
+
+def _refresh_on_commit(keys: set) -> None:
+    # One refresh per transaction for all the buckets it touched
+    defer("sale_rollups", keys, _refresh)
+
+
+@receiver(post_init, sender=Sale, dispatch_uid="rollups_loaded_keys")
+def _remember_loaded_keys(sender, instance: Sale, **kwargs):
+    instance._rollup_loaded = sale_keys(instance)
+
+
+@receiver(post_save, sender=Sale)
+def _refresh_after_save(sender, instance: Sale, **kwargs):
+    keys = {bucket_of(instance)}
+    prev = previous_bucket(instance, getattr(instance, "_rollup_loaded", None))
+    if prev:
+        keys.add(prev[:2])
+    instance._rollup_loaded = sale_keys(instance)
+    _refresh_on_commit(keys)
+
+
+@receiver(post_delete, sender=Sale)
+def _refresh_after_delete(sender, instance: Sale, **kwargs):
+    _refresh_on_commit({bucket_of(instance)})
@@ -0,0 +1,139 @@
+# sales/tests/test_leaderboard.py
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from inventory.models import InventoryItem, Location, Product
+from sales import leaderboard
+from sales.leaderboard import Board, nudges, rebuild, refresh
+from sales.models import AgentScore, Sale
+from tenants.models import Business, Membership
+from wallet.models import Ledger, TxnType, WalletTransaction
+from wallet.payroll import process_payroll_run, start_payroll_run
+from wallet.services import add_txn, ranking
+
+User = get_user_model()
+MON = date(2025, 3, 3)  # a Monday
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard._boards.clear()
+        self.biz = Business.objects.create(name="Board A", slug="board-a", status="ACTIVE")
+        self.loc = Location.objects.create(business=self.biz, name="A1")
+        self.product = Product.objects.create(code="LB-1", brand="Tecno", model="Spark 10", variant="4+128")
+        self.a, self.b, self.c = (User.objects.create_user(f"lb_agent_{i}", password="x") for i in range(3))
+        for agent in (self.a, self.b, self.c):
+            Membership.objects.create(user=agent, business=self.biz, role="AGENT", status="ACTIVE", location=self.loc)
+        self._n = 0
+
+    def _sell(self, agent, day=MON, price="200.00", cost="150.00"):
+        self._n += 1
+        item = InventoryItem.all_objects.create(
+            business=self.biz, product=self.product, order_price=Decimal(cost),
+            current_location=self.loc, imei=f"35100000000{self._n:04d}",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            return Sale.objects.create(item=item, agent=agent, location=self.loc, sold_at=day, price=Decimal(price))
+
+    def test_sale_write_fills_week_and_month_cells(self):
+        self._sell(self.a, price="250.00")
+        self._sell(self.a, day=date(2025, 3, 9), price="300.00")
+        self._sell(self.a, day=date(2025, 3, 10), price="100.00")  # next week, same month
+
+        week = AgentScore.objects.get(agent=self.a, period="week", period_start=MON)
+        self.assertEqual((week.units, week.revenue, week.profit), (2, Decimal("550.00"), Decimal("250.00")))
+        month = AgentScore.objects.get(agent=self.a, period="month", period_start=date(2025, 3, 1))
+        self.assertEqual(month.units, 3)
+
+        sale = Sale.objects.filter(agent=self.a, sold_at=date(2025, 3, 10)).get()
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.delete()
+        self.assertEqual(AgentScore.objects.get(agent=self.a, period="month").units, 2)
+
+    def test_reassigned_sale_moves_cells_without_re_reading_it(self):
+        self._sell(self.a)
+        self._sell(self.a)
+        sales = list(Sale.objects.filter(agent=self.a).select_related("item"))
+        with mock.patch.object(leaderboard, "refresh", wraps=leaderboard.refresh) as spy:
+            with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(2):  # the two UPDATEs
+                for sale in sales:
+                    sale.agent = self.b
+                    sale.save(update_fields=["agent"])
+        spy.assert_called_once_with({(self.biz.id, self.a.id, MON), (self.biz.id, self.b.id, MON)})
+        week = {s.agent_id: s.units for s in AgentScore.objects.filter(period="week", period_start=MON)}
+        self.assertEqual(week.get(self.b.id), 2)
+        self.assertFalse(week.get(self.a.id))
+
+    def test_ranks_share_ties_and_rank_of_bisects(self):
+        for agent, n in ((self.a, 3), (self.b, 3), (self.c, 1)):
+            for _ in range(n):
+                self._sell(agent)
+
+        board = Board(self.biz.id, "week", MON)
+        self.assertEqual([(r["agent_id"], r["rank"]) for r in board.top(3)],
+                         [(self.a.id, 1), (self.b.id, 1), (self.c.id, 3)])
+        self.assertEqual(board.rank_of(self.c.id), 3)
+        self.assertIsNone(board.rank_of(999999))
+        self.assertEqual(board.standing(self.c.id).gap, 2)
+
+    def test_deltas_drive_nudges(self):
+        for _ in range(4):
+            self._sell(self.a)
+        self._sell(self.b)  # 3 behind: no nudge yet
+
+        sent = []
+        with mock.patch.object(leaderboard, "_notify", side_effect=lambda d, m: sent.append((d.agent_id, m))):
+            self._sell(self.b)  # within the gap
+            self._sell(self.b)  # still within it: not repeated
+            self._sell(self.b)
+            self._sell(self.b)  # takes #1
+        self.assertEqual(sent, [
+            (self.b.id, "You're 2 sales away from #1 this week!"),
+            (self.b.id, "You're #1 on this week's leaderboard!"),
+        ])
+
+        deltas = refresh([(self.biz.id, self.b.id, MON)], notify=False)
+        self.assertEqual(nudges(deltas), [])  # no movement, no nudge
+
+    def test_wallet_txn_updates_member_cells_and_business_ranking(self):
+        today = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            add_txn(agent=self.a, amount=Decimal("100"), type=TxnType.COMMISSION)
+        with self.captureOnCommitCallbacks(execute=True):
+            add_txn(agent=self.b, amount=Decimal("300"), type=TxnType.COMMISSION)
+
+        board = Board(self.biz.id, "month", today, metric="wallet")
+        self.assertEqual(board.rank_of(self.b.id), 1)
+        rows = ranking("month", business=self.biz)
+        self.assertEqual([r["agent__id"] for r in rows], [self.b.id, self.a.id])
+        self.assertEqual(rows[0]["total"], Decimal("300.00"))
+
+    def test_payroll_payouts_reach_the_wallet_column(self):
+        may = date(2025, 5, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletTransaction.objects.create(
+                ledger=Ledger.AGENT, agent=self.a, amount=Decimal("1000"), type=TxnType.COMMISSION,
+                effective_date=date(2025, 5, 10),
+            )
+        self.assertEqual(AgentScore.objects.get(agent=self.a, period="month", period_start=may).wallet, Decimal("1000.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_payroll_run(start_payroll_run([self.a], 2025, 5, email=False))
+        self.assertEqual(AgentScore.objects.get(agent=self.a, period="month", period_start=may).wallet, Decimal("0.00"))
+
+    def test_rebuild_restores_cells(self):
+        self._sell(self.a)
+        self._sell(self.b, price="500.00")
+        AgentScore.objects.all().delete()
+        leaderboard._boards.clear()
+
+        self.assertEqual(rebuild(business_id=self.biz.id), 2)
+        board = Board(self.biz.id, "week", MON, metric="revenue")
+        self.assertEqual([r["agent_id"] for r in board.top(2)], [self.b.id, self.a.id])
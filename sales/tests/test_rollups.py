@@ -0,0 +1,99 @@
+# sales/tests/test_rollups.py
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from inventory.models import InventoryItem, Location, Product
+from reports import query
+from reports.query import ReportQuery, cached_report
+from sales.models import Sale, SaleDaily, SaleMonthly
+from sales import rollups
+from sales.rollups import rebuild_rollups
+from tenants.models import Business
+
+User = get_user_model()
+
+
+class SaleRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.agent = User.objects.create_user("rollup_agent", password="x")
+        self.biz = Business.objects.create(name="Roll A", slug="roll-a", status="ACTIVE")
+        self.other = Business.objects.create(name="Roll B", slug="roll-b", status="ACTIVE")
+        self.loc = Location.objects.create(business=self.biz, name="A1")
+        self.other_loc = Location.objects.create(business=self.other, name="B1")
+        self.product = Product.objects.create(code="RL-1", brand="Tecno", model="Spark 10", variant="4+128")
+        self._n = 0
+
+    def _sell(self, biz, loc, day, price, cost="100.00"):
+        self._n += 1
+        item = InventoryItem.all_objects.create(
+            business=biz, product=self.product, order_price=Decimal(cost),
+            current_location=loc, imei=f"35000000000{self._n:04d}",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            return Sale.objects.create(item=item, agent=self.agent, location=loc, sold_at=day, price=Decimal(price))
+
+    def _q(self, **kw):
+        base = dict(business_id=self.biz.id, date_from=None, date_to=date(2025, 6, 30), agent_id=None, model_q=None)
+        return ReportQuery(**{**base, **kw})
+
+    def test_sale_write_refreshes_daily_and_monthly_rows(self):
+        self._sell(self.biz, self.loc, date(2025, 3, 4), "250.00")
+        self._sell(self.biz, self.loc, date(2025, 3, 4), "300.00")
+        self._sell(self.other, self.other_loc, date(2025, 3, 4), "999.00")
+
+        d = SaleDaily.objects.get(business=self.biz, day=date(2025, 3, 4))
+        self.assertEqual((d.orders, d.amount, d.profit), (2, Decimal("550.00"), Decimal("350.00")))
+        m = SaleMonthly.objects.get(business=self.biz, month=date(2025, 3, 1))
+        self.assertEqual(m.amount, Decimal("550.00"))
+
+        SaleDaily.objects.all().delete()
+        SaleMonthly.objects.all().delete()
+        rebuild_rollups()
+        self.assertEqual(SaleDaily.objects.get(business=self.biz).amount, Decimal("550.00"))
+        self.assertEqual(SaleMonthly.objects.get(business=self.other).amount, Decimal("999.00"))
+
+    def test_refresh_locks_the_business_and_never_double_counts(self):
+        self._sell(self.biz, self.loc, date(2025, 3, 4), "250.00")
+        with mock.patch.object(rollups, "_lock_business", wraps=rollups._lock_business) as lock:
+            rollups.refresh_days([(self.biz.id, date(2025, 3, 4)), (self.biz.id, date(2025, 3, 4))])
+            rollups.refresh_days([(self.biz.id, date(2025, 3, 4))])
+        lock.assert_called_with(self.biz.id)
+        self.assertEqual(SaleDaily.objects.filter(business=self.biz, day=date(2025, 3, 4)).count(), 1)
+        self.assertEqual(SaleMonthly.objects.get(business=self.biz).orders, 1)
+
+    def test_reports_are_scoped_and_split_across_daily_and_monthly_rows(self):
+        self._sell(self.biz, self.loc, date(2023, 1, 20), "100.00")   # ragged head (daily)
+        self._sell(self.biz, self.loc, date(2024, 7, 1), "200.00")    # whole month (monthly)
+        self._sell(self.biz, self.loc, date(2025, 6, 10), "400.00")   # ragged tail (daily)
+        self._sell(self.biz, self.loc, date(2025, 6, 20), "800.00")   # after date_to
+        self._sell(self.other, self.other_loc, date(2024, 7, 1), "5000.00")
+
+        q = self._q(date_from=date(2023, 1, 15), date_to=date(2025, 6, 15))
+        kpis = query.sales_summary(q)["kpis"]
+        self.assertEqual(kpis["orders"], 3)
+        self.assertEqual(kpis["total_sales"], Decimal("700.00"))
+
+        trend = query.profit_trend(q)
+        self.assertEqual(trend["granularity"], "month")
+        self.assertEqual([p["d"] for p in trend["series"]], [date(2023, 1, 1), date(2024, 7, 1), date(2025, 6, 1)])
+
+        rows = query.agent_performance(q)["rows"]
+        self.assertEqual(rows[0]["agent_id"], self.agent.id)
+        self.assertEqual(query.inventory_velocity(self._q(model_q="spark"))["rows"][0]["sold"], 4)
+
+    def test_cached_result_is_invalidated_by_new_sale(self):
+        self._sell(self.biz, self.loc, date(2025, 5, 2), "100.00")
+        q = self._q()
+        first = cached_report("sales_summary", q, query.sales_summary)
+        self.assertEqual(first["kpis"]["orders"], 1)
+        with self.assertNumQueries(0):
+            cached_report("sales_summary", q, query.sales_summary)
+
+        self._sell(self.biz, self.loc, date(2025, 5, 3), "100.00")
+        self.assertEqual(cached_report("sales_summary", q, query.sales_summary)["kpis"]["orders"], 2)
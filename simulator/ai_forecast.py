@@ -1,7 +1,4 @@
-﻿import pandas as pd
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from django.utils import timezone
+﻿from django.utils import timezone
 from datetime import timedelta
 
 from sales.models import Sale  # Assuming we track daily or monthly sales
@@ -10,6 +7,8 @@ def ai_forecast(days=90):
     """
     Predicts daily sales for the next N days using historical sales data.
     Fallback: if we don't have enough history, returns flat projections.
+    pandas, NumPy and scikit-learn load only once there is history to fit,
+    so importing this module stays cheap.
     """
     today = timezone.now().date()
     cutoff = today - timedelta(days=365)
@@ -19,6 +18,10 @@ def ai_forecast(days=90):
     if not qs.exists():
         return [{"day": i, "predicted_sales": 0} for i in range(1, days + 1)]
 
+    import numpy as np
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
     # Prepare data
     df = pd.DataFrame(list(qs))
     df["created_at"] = pd.to_datetime(df["created_at"])
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0002_alter_scenario_options_alter_simulationrun_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulationrun',
+            name='scenario_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='simulationrun',
+            name='scenario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='simulator.scenario'),
+        ),
+    ]
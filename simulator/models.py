@@ -39,13 +39,20 @@ class Scenario(models.Model):
 
 
 class SimulationRun(models.Model):
+    # Optional: ad-hoc policy sweeps are cached here without a saved scenario
     scenario = models.ForeignKey(
         Scenario,
         on_delete=models.CASCADE,
         related_name="runs",
+        null=True,
+        blank=True,
     )
     created_at = models.DateTimeField(default=timezone.now)
 
+    # sha256 of the full sweep input (simulator.sweep.SweepSpec.digest); identical
+    # requests are answered from the stored results instead of re-running
+    scenario_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
+
     # New canonical field used by views/helpers
     results_json = models.JSONField(default=dict, blank=True, null=True)
 
@@ -60,6 +67,6 @@ class SimulationRun(models.Model):
         ]
 
     def __str__(self) -> str:
-        return f"Run #{self.id} â€” {self.scenario.name}"
+        return f"Run #{self.id} â€” {self.scenario.name if self.scenario_id else 'sweep'}"
 
 
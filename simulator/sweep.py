@@ -0,0 +1,219 @@
+# simulator/sweep.py
+"""
+Reorder-policy sweep: evaluate a grid of (reorder_point, reorder_qty,
+price_change_pct) cells over many stochastic demand paths.
+
+- Same inventory/P&L rules as views_api._simulate (demand rounding, reorder
+  when stock <= reorder point, arrival after lead time, opex % of revenue,
+  tax on positive daily operating profit), vectorised with NumPy across
+  paths: one array op per day instead of a Python loop per path and day.
+- Every cell sees the same demand shocks (common random numbers from
+  `seed`), so differences between cells are policy, not noise.
+- Cells are spread over a process pool when the grid is big enough to pay
+  for it and the caller allows more than one worker (the web API passes
+  settings.SIMULATOR_SWEEP_WORKERS, 1 by default, so requests stay in
+  their worker). Pool workers are spawned, not forked: forking a threaded
+  server process can copy held locks. This module imports no Django, so
+  spawned workers start cheaply.
+- `pareto_front()` keeps the cells no other cell beats on both mean profit
+  (higher) and mean stockout days (lower).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import product
+
+import numpy as np
+
+BASE_DEMAND_PER_DAY = 10.0  # _simulate's baseline when no scenario volume is given
+ELASTICITY = 0.5            # +1% price => -0.5% demand
+
+# Below this many simulated path-days a pool costs more than it saves
+POOL_MIN_WORK = 2_000_000
+
+MAX_CELLS = 400
+MAX_PATHS = 5000
+MAX_HORIZON = 365
+
+
+@dataclass(frozen=True)
+class SweepSpec:
+    reorder_points: tuple[int, ...]
+    reorder_qtys: tuple[int, ...]
+    price_changes: tuple[float, ...]   # percent
+    paths: int = 500
+    seed: int = 7
+    demand_sigma: float = 0.2
+    # _simulate knobs
+    base_price: float = 100.0
+    unit_cost: float = 60.0
+    demand_growth_pct: float = 0.0
+    baseline_units_day: float = BASE_DEMAND_PER_DAY
+    lead_time_days: int = 7
+    initial_stock: int = 50
+    horizon_days: int = 30
+    op_ex_pct_of_revenue: float = 10.0
+    tax_rate_pct: float = 25.0
+
+    @classmethod
+    def from_payload(cls, data: dict) -> "SweepSpec":
+        """Build a spec from request JSON; raises ValueError on bad or oversized input."""
+        def ints(key, default):
+            return tuple(sorted({int(v) for v in (data.get(key) or default)}))
+
+        def floats(key, default):
+            return tuple(sorted({float(v) for v in (data.get(key) or default)}))
+
+        def num(key, default, cast=float):
+            v = data.get(key)
+            return cast(v) if v not in (None, "") else default
+
+        spec = cls(
+            reorder_points=ints("reorder_points", [data.get("reorder_point", 10)]),
+            reorder_qtys=ints("reorder_qtys", [data.get("reorder_qty", 50)]),
+            price_changes=floats("price_changes", [data.get("price_change_pct", 0.0)]),
+            paths=num("paths", 500, int),
+            seed=num("seed", 7, int),
+            demand_sigma=num("demand_sigma", 0.2),
+            base_price=num("base_price", 100.0),
+            unit_cost=num("unit_cost", 60.0),
+            demand_growth_pct=num("demand_growth_pct", 0.0),
+            baseline_units_day=num("baseline_units_day", BASE_DEMAND_PER_DAY),
+            lead_time_days=num("lead_time_days", 7, int),
+            initial_stock=num("initial_stock", 50, int),
+            horizon_days=num("horizon_days", 30, int),
+            op_ex_pct_of_revenue=num("op_ex_pct_of_revenue", 10.0),
+            tax_rate_pct=num("tax_rate_pct", 25.0),
+        )
+        if spec.cells > MAX_CELLS:
+            raise ValueError(f"Grid has {spec.cells} cells; the limit is {MAX_CELLS}.")
+        if not (1 <= spec.paths <= MAX_PATHS):
+            raise ValueError(f"paths must be between 1 and {MAX_PATHS}.")
+        if not (1 <= spec.horizon_days <= MAX_HORIZON):
+            raise ValueError(f"horizon_days must be between 1 and {MAX_HORIZON}.")
+        if spec.lead_time_days < 0 or spec.demand_sigma < 0 or min(spec.reorder_qtys) < 0:
+            raise ValueError("lead_time_days, demand_sigma and reorder_qtys must be >= 0.")
+        return spec
+
+    @property
+    def cells(self) -> int:
+        return len(self.reorder_points) * len(self.reorder_qtys) * len(self.price_changes)
+
+    def grid(self) -> list[tuple[int, int, float]]:
+        return list(product(self.reorder_points, self.reorder_qtys, self.price_changes))
+
+    def digest(self) -> str:
+        """Stable hash of everything that affects the result (the cache key)."""
+        raw = json.dumps({"v": 1, **asdict(self)}, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# ---------------------------------------------------------------------
+# Kernel
+# ---------------------------------------------------------------------
+def demand_shocks(spec: SweepSpec) -> np.ndarray:
+    """(paths, horizon) multiplicative demand shocks, identical for every cell."""
+    rng = np.random.default_rng(spec.seed)
+    return np.maximum(rng.normal(1.0, spec.demand_sigma, (spec.paths, spec.horizon_days)), 0.0)
+
+
+def simulate_cell(spec: SweepSpec, reorder_point: int, reorder_qty: int, price_change_pct: float,
+                  shocks: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-path (op_profit, net_profit, stockout_days) for one policy cell."""
+    paths, horizon = shocks.shape
+    lead = spec.lead_time_days
+    delta = price_change_pct / 100.0
+    price = spec.base_price * (1.0 + delta)
+    opex_pct = spec.op_ex_pct_of_revenue / 100.0
+    tax_rate = spec.tax_rate_pct / 100.0
+
+    curve = (spec.baseline_units_day
+             * np.power(1.0 + spec.demand_growth_pct / 100.0, np.arange(horizon))
+             * (1.0 - delta * ELASTICITY))
+    demand = np.rint(curve[None, :] * shocks).astype(np.int64)
+
+    stock = np.full(paths, spec.initial_stock, dtype=np.int64)
+    arrivals = np.zeros((paths, horizon + lead + 1), dtype=np.int64)
+    op_profit = np.zeros(paths)
+    tax = np.zeros(paths)
+    stockouts = np.zeros(paths, dtype=np.int64)
+    margin = price * (1.0 - opex_pct) - spec.unit_cost  # operating profit per unit sold
+
+    for d in range(horizon):
+        stock += arrivals[:, d]
+        want = demand[:, d]
+        sold = np.minimum(stock, want)
+        stock -= sold
+        op = sold * margin
+        op_profit += op
+        tax += np.where(op > 0, op * tax_rate, 0.0)
+        stockouts += sold < want
+        arrivals[stock <= reorder_point, d + lead] += reorder_qty
+
+    return op_profit, op_profit - tax, stockouts
+
+
+def _summarise(cell: tuple[int, int, float], op_profit, net_profit, stockouts) -> dict:
+    rp, rq, pc = cell
+    return {
+        "reorder_point": rp,
+        "reorder_qty": rq,
+        "price_change_pct": pc,
+        "profit_mean": round(float(op_profit.mean()), 2),
+        "profit_p10": round(float(np.percentile(op_profit, 10)), 2),
+        "profit_p90": round(float(np.percentile(op_profit, 90)), 2),
+        "net_profit_mean": round(float(net_profit.mean()), 2),
+        "stockout_days_mean": round(float(stockouts.mean()), 3),
+        "stockout_prob": round(float((stockouts > 0).mean()), 4),
+    }
+
+
+def _run_cells(spec: SweepSpec, cells: list[tuple[int, int, float]]) -> list[dict]:
+    shocks = demand_shocks(spec)
+    return [_summarise(c, *simulate_cell(spec, *c, shocks)) for c in cells]
+
+
+# ---------------------------------------------------------------------
+# Sweep
+# ---------------------------------------------------------------------
+def pareto_front(rows: list[dict]) -> list[dict]:
+    """Rows not dominated on (profit_mean up, stockout_days_mean down), fewest stockouts first."""
+    front, best = [], float("-inf")
+    for r in sorted(rows, key=lambda r: (r["stockout_days_mean"], -r["profit_mean"])):
+        if r["profit_mean"] > best:
+            front.append(r)
+            best = r["profit_mean"]
+    return front
+
+
+def run_sweep(spec: SweepSpec, *, workers: int | None = None) -> dict:
+    cells = spec.grid()
+    work = len(cells) * spec.paths * spec.horizon_days
+    workers = max(1, min(workers or os.cpu_count() or 1, len(cells)))
+
+    if workers == 1 or work < POOL_MIN_WORK:
+        rows = _run_cells(spec, cells)
+    else:
+        chunks = [cells[i::workers] for i in range(workers)]
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            rows = [r for part in pool.map(_run_cells, [spec] * workers, chunks) for r in part]
+
+    front = pareto_front(rows)
+    on_front = {(r["reorder_point"], r["reorder_qty"], r["price_change_pct"]) for r in front}
+    for r in rows:
+        r["pareto"] = (r["reorder_point"], r["reorder_qty"], r["price_change_pct"]) in on_front
+    rows.sort(key=lambda r: (-r["profit_mean"], r["stockout_days_mean"]))
+    return {
+        "cells": len(rows),
+        "paths": spec.paths,
+        "horizon_days": spec.horizon_days,
+        "seed": spec.seed,
+        "pareto": front,
+        "table": rows,
+    }
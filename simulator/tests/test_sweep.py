@@ -0,0 +1,82 @@
+# simulator/tests/test_sweep.py
+import json
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from simulator import sweep
+from simulator.models import SimulationRun
+from simulator.sweep import SweepSpec, pareto_front, run_sweep, simulate_cell
+from simulator.views_api import _simulate, sweep_api
+
+
+class SweepKernelTests(SimpleTestCase):
+    def test_matches_deterministic_simulator_without_noise(self):
+        knobs = {"lead_time_days": 4, "initial_stock": 30, "horizon_days": 45, "demand_growth_pct": 1.5}
+        for rp, pc in [(5, 0.0), (12, 10.0), (25, -8.0)]:
+            spec = SweepSpec.from_payload({**knobs, "paths": 3, "demand_sigma": 0})
+            op, _, stockouts = simulate_cell(spec, rp, 50, pc, np.ones((3, 45)))
+            kpis = _simulate({**knobs, "reorder_point": rp, "price_change_pct": pc})["kpis"]
+            self.assertAlmostEqual(op[0], kpis["op_profit_total"], places=2)
+            self.assertEqual(int(stockouts[0]), kpis["stockouts_days"])
+
+    def test_pareto_front(self):
+        rows = [
+            {"profit_mean": 100, "stockout_days_mean": 5},
+            {"profit_mean": 90, "stockout_days_mean": 1},
+            {"profit_mean": 80, "stockout_days_mean": 3},   # dominated by the 90/1 row
+            {"profit_mean": 120, "stockout_days_mean": 9},
+        ]
+        front = pareto_front(rows)
+        self.assertEqual([r["profit_mean"] for r in front], [90, 100, 120])
+
+    def test_pool_and_inline_results_agree(self):
+        spec = SweepSpec.from_payload({"reorder_points": [5, 15], "reorder_qtys": [40, 60],
+                                       "price_changes": [0, 5], "paths": 50})
+        inline = run_sweep(spec, workers=1)
+        with mock.patch.object(sweep, "POOL_MIN_WORK", 0):
+            pooled = run_sweep(spec, workers=2)
+        self.assertEqual(inline["table"], pooled["table"])
+        self.assertTrue(any(r["pareto"] for r in inline["table"]))
+
+    def test_pool_spawns_instead_of_forking(self):
+        spec = SweepSpec.from_payload({"reorder_points": [5, 15], "reorder_qtys": [40], "paths": 5})
+        with mock.patch.object(sweep, "POOL_MIN_WORK", 0):
+            with mock.patch.object(sweep, "ProcessPoolExecutor", wraps=sweep.ProcessPoolExecutor) as pool:
+                run_sweep(spec, workers=2)
+        self.assertEqual(pool.call_args.kwargs["mp_context"].get_start_method(), "spawn")
+
+    def test_oversized_grid_is_rejected(self):
+        with self.assertRaises(ValueError):
+            SweepSpec.from_payload({"reorder_points": list(range(50)), "reorder_qtys": list(range(10))})
+
+
+class SweepApiTests(TestCase):
+    def test_identical_request_is_served_from_cache(self):
+        user = get_user_model().objects.create_user("sweeper", password="x")
+        body = json.dumps({"reorder_points": [5, 10], "reorder_qtys": [50], "price_changes": [0, 5], "paths": 20})
+
+        def call():
+            request = RequestFactory().post("/simulator/api/sweep/", data=body, content_type="application/json")
+            request.user = user
+            return json.loads(sweep_api(request).content)
+
+        first = call()
+        with mock.patch("simulator.views_api.run_sweep") as run:
+            second = call()
+        run.assert_not_called()
+        self.assertEqual((first["cached"], second["cached"]), (False, True))
+        self.assertEqual(first["result"]["table"], second["result"]["table"])
+        self.assertEqual(SimulationRun.objects.count(), 1)
+        self.assertEqual(len(first["result"]["table"]), 4)
+
+    def test_web_sweep_stays_in_the_request_worker_by_default(self):
+        user = get_user_model().objects.create_user("sweeper", password="x")
+        body = json.dumps({"reorder_points": [5], "reorder_qtys": [50], "price_changes": [0], "paths": 5})
+        request = RequestFactory().post("/simulator/api/sweep/", data=body, content_type="application/json")
+        request.user = user
+        with mock.patch("simulator.views_api.run_sweep", wraps=run_sweep) as run:
+            sweep_api(request)
+        self.assertEqual(run.call_args.kwargs["workers"], 1)
@@ -16,10 +16,8 @@ try:
 except Exception:
     _views = SimpleNamespace()
 
-try:
-    from . import views_api as _api
-except Exception:
-    _api = SimpleNamespace()
+# The API module pulls in NumPy via simulator.sweep; resolve it on first request
+from cc.lazy_views import lazy_view
 
 app_name = "simulator"
 
@@ -41,9 +39,10 @@ _sim_run         = _get(_views, "sim_run",         "sim_run view missing")
 _sim_compare     = _get(_views, "sim_compare",     "sim_compare view missing")
 _sim_results_api = _get(_views, "sim_results_api", "results API missing")
 
-_api_run         = _get(_api,   "run_simulation",  "api_run missing")
-_api_forecast    = _get(_api,   "ai_forecast_api", "ai_forecast missing")
-_api_monte       = _get(_api,   "monte_carlo_api", "monte_carlo missing")
+_api_run         = lazy_view("simulator.views_api", "run_simulation",  "api_run missing")
+_api_forecast    = lazy_view("simulator.views_api", "ai_forecast_api", "ai_forecast missing")
+_api_monte       = lazy_view("simulator.views_api", "monte_carlo_api", "monte_carlo missing")
+_api_sweep       = lazy_view("simulator.views_api", "sweep_api",       "sweep missing")
 
 urlpatterns = [
     # ----------------------
@@ -72,6 +71,7 @@ urlpatterns = [
     path("api/runs/",  manager_required(_api_run),      name="api_runs"),  # alias used by some templates
     path("api/<int:pk>/forecast/", manager_required(_api_forecast), name="ai_forecast"),
     path("api/monte-carlo/",       manager_required(_api_monte),    name="monte_carlo"),
+    path("api/sweep/",             manager_required(_api_sweep),    name="sweep"),
 ]
 
 
@@ -2,16 +2,18 @@
 
 from math import pow
 from typing import Any, Dict, List, Tuple
-import random
 import statistics
 from datetime import timedelta
 
+import numpy as np
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpRequest
 from django.views.decorators.http import require_GET, require_POST
 from django.utils import timezone
 
 from .models import Scenario, SimulationRun
+from .sweep import SweepSpec, run_sweep
 
 
 # ============================================================
@@ -274,7 +276,7 @@ def _ai_demand_forecast(days: int = 90) -> List[Dict[str, float]]:
 
 
 # ============================================================
-# Monte Carlo risk simulation (no numpy)
+# Monte Carlo risk simulation (vectorised over iterations x days)
 # ============================================================
 def _monte_carlo(payload: Dict[str, Any], iterations: int = 500) -> Dict[str, Any]:
     """
@@ -292,43 +294,26 @@ def _monte_carlo(payload: Dict[str, Any], iterations: int = 500) -> Dict[str, An
     opex_pct = float(payload.get("op_ex_pct_of_revenue", 10.0)) / 100.0
     horizon_days = int(payload.get("horizon_days", 30))
 
-    results: List[float] = []
-
     # Reasonable volatilities (tweakable)
     demand_sigma = 0.15  # 15% std dev
     price_sigma = 0.08   # 8%
     cost_sigma = 0.05    # 5%
 
-    for _ in range(int(iterations)):
-        total_revenue = 0.0
-        total_cogs = 0.0
-        total_opex = 0.0
-
-        for _d in range(horizon_days):
-            # Gaussian multiplicative shocks
-            dm = random.gauss(1.0, demand_sigma)
-            pm = random.gauss(1.0, price_sigma)
-            cm = random.gauss(1.0, cost_sigma)
-
-            sold = max(base_units_day * dm, 0.0)
-            p = max(price * pm, 0.01)
-            c = max(unit_cost * cm, 0.0)
-
-            rev = sold * p
-            cogs = sold * c
-            opex = opex_pct * rev
-
-            total_revenue += rev
-            total_cogs += cogs
-            total_opex += opex
+    iterations = int(iterations)
+    if iterations <= 0 or horizon_days <= 0:
+        return {"p10": 0.0, "p50": 0.0, "p90": 0.0, "distribution_sample": []}
 
-        op_profit = total_revenue - total_cogs - total_opex
-        results.append(op_profit)
+    # Gaussian multiplicative shocks for every (iteration, day) at once
+    rng = np.random.default_rng()
+    shape = (iterations, horizon_days)
+    sold = np.maximum(base_units_day * rng.normal(1.0, demand_sigma, shape), 0.0)
+    p = np.maximum(price * rng.normal(1.0, price_sigma, shape), 0.01)
+    c = np.maximum(unit_cost * rng.normal(1.0, cost_sigma, shape), 0.0)
 
-    if not results:
-        return {"p10": 0.0, "p50": 0.0, "p90": 0.0, "distribution_sample": []}
+    rev = (sold * p).sum(axis=1)
+    cogs = (sold * c).sum(axis=1)
+    results_sorted = sorted((rev - cogs - opex_pct * rev).tolist())
 
-    results_sorted = sorted(results)
     def pct(p: float) -> float:
         k = max(min(int(round(p * (len(results_sorted) - 1))), len(results_sorted) - 1), 0)
         return round(results_sorted[k], 2)
@@ -341,6 +326,33 @@ def _monte_carlo(payload: Dict[str, Any], iterations: int = 500) -> Dict[str, An
     }
 
 
+# ============================================================
+# Reorder-policy sweep (see simulator.sweep)
+# ============================================================
+def _sweep_base(sc: Scenario) -> Dict[str, Any]:
+    """Sweep knobs derived from a saved scenario's monthly business figures."""
+    price = float(sc.avg_unit_price or 0.0)
+    return {
+        "base_price": price or 100.0,
+        "unit_cost": price * float(sc.variable_cost_pct or 0.0) / 100.0 if price else 60.0,
+        "baseline_units_day": (sc.baseline_monthly_units or 300) / 30.0,
+        "tax_rate_pct": float(sc.tax_rate_pct or 0.0),
+    }
+
+
+def _cached_sweep(spec: SweepSpec, scenario: Scenario | None) -> Tuple[Dict[str, Any], bool]:
+    """(result, cached): identical specs are served from the stored SimulationRun."""
+    digest = spec.digest()
+    run = SimulationRun.objects.filter(scenario_hash=digest).order_by("-created_at").first()
+    if run is not None:
+        return _get_results_json(run), True
+
+    workers = int(getattr(settings, "SIMULATOR_SWEEP_WORKERS", 1)) or None
+    result = {"kind": "sweep", "hash": digest, **run_sweep(spec, workers=workers)}
+    SimulationRun.objects.create(scenario=scenario, scenario_hash=digest, results_json=result)
+    return result, False
+
+
 # ============================================================
 # API views
 # ============================================================
@@ -526,3 +538,43 @@ def monte_carlo_api(request: HttpRequest):
     return JsonResponse({"ok": True, "bands": bands}, status=200)
 
 
+# ---------------- Policy sweep endpoint ----------------
+@require_POST
+@login_required
+def sweep_api(request: HttpRequest):
+    """
+    POST JSON with a policy grid; every cell runs over the same demand paths:
+      {
+        "scenario_id": 123,                 # optional: price/cost/volume from the scenario
+        "reorder_points": [5, 10, 20],
+        "reorder_qtys": [30, 50, 80],
+        "price_changes": [-5, 0, 5],        # percent
+        "paths": 500, "seed": 7, "demand_sigma": 0.2,
+        ... any _simulate knobs (lead_time_days, initial_stock, horizon_days, ...)
+      }
+    Responds with the full table and its Pareto front (mean profit vs stockout days).
+    Identical requests are answered from the cached SimulationRun.
+    """
+    import json
+    try:
+        body = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return JsonResponse({"error": "Invalid JSON."}, status=400)
+
+    scenario = None
+    base: Dict[str, Any] = {}
+    scenario_id = body.get("scenario_id")
+    if scenario_id:
+        try:
+            scenario = Scenario.objects.get(id=scenario_id, owner=request.user)
+        except Scenario.DoesNotExist:
+            return JsonResponse({"error": "Scenario not found."}, status=404)
+        base = _sweep_base(scenario)
+
+    try:
+        spec = SweepSpec.from_payload({**base, **body})
+    except (TypeError, ValueError) as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    result, cached = _cached_sweep(spec, scenario)
+    return JsonResponse({"ok": True, "cached": cached, "result": result}, status=200)
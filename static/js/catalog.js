@@ -0,0 +1,63 @@
+// static/js/catalog.js
+// Keeps the scan catalog (products, order prices, locations) in localStorage
+// and refreshes it from /inventory/api/catalog/ with ?since=<version> deltas,
+// so scan pages do not re-download the whole list on every visit.
+(function () {
+  const ENDPOINT = '/inventory/api/catalog/';
+  const KEY = 'cc.catalog.v1';
+  const LISTS = [['products', 'product', 'id'], ['prices', 'price', 'product_id'], ['locations', 'location', 'id']];
+
+  function load() {
+    try { return JSON.parse(localStorage.getItem(KEY)) || null; } catch (_) { return null; }
+  }
+  function save(cat) {
+    try { localStorage.setItem(KEY, JSON.stringify(cat)); } catch (_) { /* quota / private mode */ }
+  }
+
+  async function fetchCatalog(since, etag) {
+    const headers = { 'Accept': 'application/json' };
+    if (etag) headers['If-None-Match'] = etag;
+    const qs = since == null ? '' : `?since=${encodeURIComponent(since)}`;
+    return fetch(ENDPOINT + qs, { credentials: 'same-origin', headers });
+  }
+
+  async function sync() {
+    let cat = load();
+    try {
+      let res = await fetchCatalog(cat ? cat.version : null, cat ? cat.etag : null);
+      if (res.status === 304) return cat;
+      if (!res.ok) return cat;
+      let data = await res.json();
+      // Switched business: the cached versions mean nothing here
+      if (cat && !data.full && data.business_id !== cat.business_id) {
+        res = await fetchCatalog(null, null);
+        if (!res.ok) return cat;
+        data = await res.json();
+      }
+      if (data.full || !cat) {
+        cat = { business_id: data.business_id, version: data.version,
+                products: data.products, prices: data.prices, locations: data.locations };
+      } else {
+        LISTS.forEach(([name, kind, key]) => {
+          const byId = new Map(cat[name].map(o => [o[key], o]));
+          data[name].forEach(o => byId.set(o[key], o));
+          (data.removed[kind] || []).forEach(id => byId.delete(id));
+          cat[name] = Array.from(byId.values());
+        });
+        cat.version = data.version;
+      }
+      cat.etag = res.headers.get('ETag');
+      save(cat);
+    } catch (_) { /* offline: keep what we have */ }
+    return cat;
+  }
+
+  function orderPrice(productId) {
+    const cat = load();
+    if (!cat) return null;
+    const hit = cat.prices.find(p => String(p.product_id) === String(productId));
+    return hit ? Number(hit.order_price) : null;
+  }
+
+  window.CCCatalog = { sync, get: load, orderPrice };
+})();
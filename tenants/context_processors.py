@@ -5,11 +5,15 @@ from typing import Dict, Any
 
 # Defensive/lazy imports so templates never crash if utilities are missing
 try:
-    from tenants.utils import get_active_business
+    from tenants.utils import get_active_business, update_session
 except Exception:  # pragma: no cover
     def get_active_business(_request):  # type: ignore
         return None
 
+    def update_session(request, values):  # type: ignore
+        request.session.update(values)
+        return True
+
 
 # Keep aliases in sync with TenantResolutionMiddleware
 _VERTICAL_ALIASES = {
@@ -143,7 +147,7 @@ def tenant_context(request) -> Dict[str, Any]:
 
     # Persist for consistency with middleware (best effort)
     try:
-        request.session[PRODUCT_MODE_SESSION_KEY] = mode
+        update_session(request, {PRODUCT_MODE_SESSION_KEY: mode})
     except Exception:
         pass
 
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from typing import Optional, Iterable
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.utils.deprecation import MiddlewareMixin
 from django.utils.functional import cached_property
 
@@ -24,7 +25,7 @@ except Exception:  # pragma: no cover
 
 try:
     # Use the SAME utils your views use to store/read active biz
-    from tenants.utils import get_active_business, set_active_business
+    from tenants.utils import get_active_business, refresh_session_expiry, set_active_business, update_session
 except Exception:  # pragma: no cover
     def get_active_business(_request):  # type: ignore
         return None
@@ -32,6 +33,13 @@ except Exception:  # pragma: no cover
     def set_active_business(_request, _biz):  # type: ignore
         return
 
+    def update_session(request, values):  # type: ignore
+        request.session.update(values)
+        return True
+
+    def refresh_session_expiry(_request):  # type: ignore
+        return False
+
 # Optional: scope helpers (location resolution). All guarded.
 try:
     from tenants.scope import (
@@ -139,56 +147,42 @@ def _user_has_active_membership(user, business) -> bool:
     if Membership is None or business is None or not getattr(user, "is_authenticated", False):
         return False
     try:
-        qs = Membership.objects.filter(user=user, business=business)
-        if _has_field(Membership, "status"):
-            qs = qs.filter(status__iexact="ACTIVE")
-        return qs.exists()
+        from tenants.principal import get_principal
+        return get_principal(user).has_business(getattr(business, "pk", business))
     except Exception:
         return False
 
 
-def _mark_session_modified(request) -> None:
-    try:
-        request.session.modified = True
-    except Exception:
-        pass
-
-
 def _clear_tenant_session_keys(request) -> None:
     """
-    Clear canonical + legacy tenant keys from the session.
+    Clear canonical + legacy tenant keys from the session (pop() marks the
+    session modified only when a key was present).
     """
-    try:
-        for k in LEGACY_SESSION_KEYS:
-            try:
-                request.session.pop(k, None)
-            except Exception:
-                pass
-        _mark_session_modified(request)
-    except Exception:
-        pass
+    for k in LEGACY_SESSION_KEYS:
+        try:
+            request.session.pop(k, None)
+        except Exception:
+            pass
 
 
 def _activate(request, business) -> None:
     """
     Set session (via project util), request.business(+_id) and thread-local tenant id.
     Never raises. If business is None, clears selection.
+    The session is only written when the selection actually changes, so a
+    request that re-activates the same business costs no session UPDATE.
     """
     try:
         # Preferred: your canonical util writes both canonical & legacy keys
         set_active_business(request, business)
-        _mark_session_modified(request)
     except Exception:
         # Fallback to legacy session keys
         try:
             if business is not None:
                 bid = getattr(business, "pk", None)
-                request.session[CANONICAL_SESSION_KEY] = bid
-                request.session["active_business_id"] = bid
-                request.session["biz_id"] = bid
+                update_session(request, {CANONICAL_SESSION_KEY: bid, "active_business_id": bid, "biz_id": bid})
             else:
                 _clear_tenant_session_keys(request)
-            _mark_session_modified(request)
         except Exception:
             pass
 
@@ -299,8 +293,7 @@ def _set_product_mode_on_request(request, business) -> None:
 
     request.product_mode = mode or "generic"
     try:
-        request.session[PRODUCT_MODE_SESSION_KEY] = request.product_mode
-        _mark_session_modified(request)
+        update_session(request, {PRODUCT_MODE_SESSION_KEY: request.product_mode})
     except Exception:
         pass
 
@@ -469,6 +462,11 @@ class TenantResolutionMiddleware(MiddlewareMixin):
             set_current_business_id(None)
         except Exception:
             pass
+        # Runs before SessionMiddleware saves: slide the expiry when it is due
+        try:
+            refresh_session_expiry(request)
+        except Exception:
+            pass
         return response
 
 
@@ -481,3 +479,25 @@ class ActiveBusinessMiddleware(TenantResolutionMiddleware):
     in MIDDLEWARE. Inherits full behavior from TenantResolutionMiddleware.
     """
     pass
+
+
+class PrincipalMiddleware:
+    """
+    Attach `request.principal` (tenants.principal.Principal), built lazily on
+    first access. Must run after AuthenticationMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        from django.utils.functional import SimpleLazyObject
+        from tenants.principal import request_principal
+
+        request.principal = SimpleLazyObject(lambda: request_principal(request))
+        # Under ASGI this returns the next layer's coroutine for the caller to await
+        return self.get_response(request)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0009_remove_old_business_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=32)),
+                ('year', models.PositiveSmallIntegerField(default=0)),
+                ('last_value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='number_sequences', to='tenants.business')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('business', 'prefix', 'year'), name='numseq_biz_prefix_year_uniq'), models.UniqueConstraint(condition=models.Q(('business__isnull', True)), fields=('prefix', 'year'), name='numseq_global_prefix_year_uniq')],
+            },
+        ),
+    ]
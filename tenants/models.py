@@ -2,11 +2,11 @@
 from __future__ import annotations
 
 from typing import Optional
-import threading
 from contextlib import contextmanager
 import uuid
 from urllib.parse import quote
 
+from asgiref.local import Local
 from django.apps import apps
 from django.conf import settings
 from django.db import models
@@ -19,9 +19,11 @@ from django.urls import reverse, NoReverseMatch
 User = settings.AUTH_USER_MODEL
 
 # ===============================
-# Thread-local tenant context
+# Request-local tenant context
 # ===============================
-_tenant_state = threading.local()
+# asgiref's Local is per thread under WSGI and per request context under
+# ASGI, where middleware runs in a worker thread and async views on the loop.
+_tenant_state = Local()
 
 
 def get_current_business_id() -> Optional[int]:
@@ -516,3 +518,36 @@ class AgentInvite(BaseTenantModel):
             "email_text": text,
             "email_html": html,
         }
+
+
+class NumberSequence(models.Model):
+    """
+    Counter row behind tenants.services.sequences: the last number handed out
+    for one (business, prefix, year) scope. business=None is the platform-wide
+    scope (for identifiers that are unique across tenants); year=0 means the
+    sequence never resets.
+    """
+    business = models.ForeignKey(
+        Business,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="number_sequences",
+    )
+    prefix = models.CharField(max_length=32)
+    year = models.PositiveSmallIntegerField(default=0)
+    last_value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["business", "prefix", "year"], name="numseq_biz_prefix_year_uniq"),
+            models.UniqueConstraint(
+                fields=["prefix", "year"],
+                condition=Q(business__isnull=True),
+                name="numseq_global_prefix_year_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.business_id or '*'}:{self.prefix}:{self.year} @ {self.last_value}"
@@ -0,0 +1,154 @@
+# tenants/principal.py
+"""
+Per-request principal: who the user is, in one object.
+
+- Role checks (manager/admin/auditor, highest membership role, "is member of
+  this business") used to run their own `user.groups.filter(...).exists()`
+  or Membership query, several times per request. `get_principal(user)`
+  loads group names and memberships once and every helper reads from it.
+- The principal is memoised on the user instance (request.user lives for
+  one request). With a shared cache (settings.PRINCIPAL_CACHE) the
+  group/membership part is also cached per user across requests, so a warm
+  request costs no queries at all. Without one it is loaded per request: a
+  per-process copy would keep a revoked membership's access in every worker
+  but the one that saw the change.
+- Flags on the user row itself (is_superuser, is_staff) are always read
+  from the live user object; only groups and memberships are cached.
+- Group or membership changes drop the cached entry (see tenants.signals).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Membership
+
+_MEMO_ATTR = "_cc_principal"
+CACHE_TTL = int(getattr(settings, "PRINCIPAL_CACHE_TTL", 300))
+
+
+@dataclass(frozen=True)
+class Grant:
+    business_id: int
+    role: str
+    status: str
+    location_id: Optional[int]
+
+    @property
+    def active(self) -> bool:
+        return self.status == "ACTIVE"
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: Optional[int]
+    is_authenticated: bool = False
+    is_superuser: bool = False
+    is_staff: bool = False
+    groups: frozenset = frozenset()
+    memberships: tuple = ()
+
+    @property
+    def roles(self) -> frozenset:
+        """Membership roles (upper-case), across every business and status."""
+        return frozenset(g.role for g in self.memberships if g.role)
+
+    @property
+    def business_ids(self) -> frozenset:
+        """Businesses the user is an ACTIVE member of."""
+        return frozenset(g.business_id for g in self.memberships if g.active)
+
+    @property
+    def location_ids(self) -> frozenset:
+        """Locations pinned on the user's ACTIVE memberships."""
+        return frozenset(g.location_id for g in self.memberships if g.active and g.location_id)
+
+    def in_groups(self, names: Iterable[str], *, ignore_case: bool = False) -> bool:
+        if ignore_case:
+            wanted = {n.lower() for n in names}
+            return any(g.lower() in wanted for g in self.groups)
+        return not self.groups.isdisjoint(names)
+
+    def has_business(self, business_id) -> bool:
+        try:
+            return int(business_id) in self.business_ids
+        except (TypeError, ValueError):
+            return False
+
+    def roles_in(self, business_id) -> frozenset:
+        return frozenset(g.role for g in self.memberships if g.active and g.business_id == business_id)
+
+
+ANONYMOUS = Principal(user_id=None)
+
+
+def _cache_key(user_id) -> str:
+    return f"principal:v1:{user_id}"
+
+
+def _load(user_id: int) -> dict:
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    groups = list(User.groups.through.objects.filter(user_id=user_id).values_list("group__name", flat=True))
+    memberships = list(
+        Membership.objects.filter(user_id=user_id).values_list("business_id", "role", "status", "location_id")
+    )
+    return {"groups": groups, "memberships": memberships}
+
+
+def get_principal(user) -> Principal:
+    """The user's principal; built once per user instance, cached across requests when shared."""
+    if user is None or not getattr(user, "is_authenticated", False):
+        return ANONYMOUS
+    principal = getattr(user, _MEMO_ATTR, None)
+    if principal is not None:
+        return principal
+
+    if getattr(settings, "PRINCIPAL_CACHE", False):
+        key = _cache_key(user.pk)
+        data = cache.get(key)
+        if data is None:
+            data = _load(user.pk)
+            cache.set(key, data, CACHE_TTL)
+    else:
+        data = _load(user.pk)
+
+    principal = Principal(
+        user_id=user.pk,
+        is_authenticated=True,
+        is_superuser=bool(getattr(user, "is_superuser", False)),
+        is_staff=bool(getattr(user, "is_staff", False)),
+        groups=frozenset(data["groups"]),
+        memberships=tuple(
+            Grant(business_id=b, role=(r or "").upper(), status=(s or "").upper(), location_id=loc)
+            for b, r, s, loc in data["memberships"]
+        ),
+    )
+    try:
+        setattr(user, _MEMO_ATTR, principal)
+    except Exception:
+        pass
+    return principal
+
+
+def request_principal(request) -> Principal:
+    return get_principal(getattr(request, "user", None))
+
+
+def invalidate_principal(user_ids: Iterable[int], *, user=None) -> None:
+    """
+    Drop cached principals now and again after commit, so a concurrent
+    request cannot re-cache the pre-change rows in between.
+    """
+    keys = [_cache_key(pk) for pk in set(user_ids) if pk is not None]
+    if user is not None and hasattr(user, _MEMO_ATTR):
+        delattr(user, _MEMO_ATTR)
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -7,6 +7,7 @@ from django.conf import settings
 from django.utils.functional import cached_property
 
 from .models import Business, Membership, get_current_business_id
+from .utils import update_session
 
 
 # --------------------------------------------------------------------------------------
@@ -174,11 +175,13 @@ def set_scope_in_session(request, *, business_id: Optional[int] = None, location
     Persist chosen scope to session so the UI remembers selections between pages.
     Safe even if sessions are disabled (no-op).
     """
+    values = {}
     try:
         if business_id is not None:
-            request.session["active_business_id"] = int(business_id)
+            values["active_business_id"] = int(business_id)
         if location_id is not None:
-            request.session["active_location_id"] = int(location_id)
+            values["active_location_id"] = int(location_id)
+        update_session(request, values)
     except Exception:
         # Sessionless scenarios (API tokens, CLI) — ignore
         pass
@@ -0,0 +1,109 @@
+# tenants/services/sequences.py
+"""
+Gap-tolerant number sequences (invoice/quote numbers, layby refs).
+
+- One NumberSequence row per (business, prefix, year) scope. A reservation is
+  a single `UPDATE ... SET last_value = last_value + n` on that row, so
+  concurrent creators serialise on the row lock for one statement and never
+  see the same number; nothing scans the documents or retries on collision.
+- `block > 1` reserves that many numbers per round trip and hands them out
+  from a per-process buffer. Numbers stay unique but are only monotonic per
+  worker, and a worker that exits leaves a gap (which sequences tolerate).
+- A buffer reserved inside a transaction only becomes usable after commit;
+  on rollback the counter goes back and the buffer is dropped with it.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from tenants.models import NumberSequence
+
+Scope = tuple  # (business_id, prefix, year)
+
+_lock = threading.Lock()
+_blocks: dict[Scope, list[int]] = {}  # scope -> [next, last]
+
+
+def default_block_size() -> int:
+    return max(1, int(getattr(settings, "SEQUENCE_BLOCK_SIZE", 1)))
+
+
+def reserve(
+    prefix: str,
+    count: int = 1,
+    *,
+    business_id: Optional[int] = None,
+    year: int = 0,
+    seed: Optional[Callable[[], int]] = None,
+) -> tuple[int, int]:
+    """
+    Atomically reserve `count` consecutive numbers; returns (first, last).
+    `seed()` is only called when the scope's counter row does not exist yet,
+    to continue from numbers issued before the sequence was introduced.
+    """
+    if count < 1:
+        raise ValueError("count must be >= 1")
+    rows = NumberSequence.objects.filter(business_id=business_id, prefix=prefix, year=year)
+    with transaction.atomic():
+        if not rows.update(last_value=F("last_value") + count):
+            try:
+                with transaction.atomic():
+                    start = int(seed() or 0) if seed else 0
+                    NumberSequence.objects.create(
+                        business_id=business_id, prefix=prefix, year=year, last_value=start + count,
+                    )
+                return start + 1, start + count
+            except IntegrityError:
+                # Another worker created the row first; take the normal path
+                rows.update(last_value=F("last_value") + count)
+        last = rows.values_list("last_value", flat=True).get()
+    return last - count + 1, last
+
+
+def _push(scope: Scope, first: int, last: int) -> None:
+    if first <= last:
+        with _lock:
+            _blocks[scope] = [first, last]
+
+
+def next_value(
+    prefix: str,
+    *,
+    business_id: Optional[int] = None,
+    year: int = 0,
+    block: Optional[int] = None,
+    seed: Optional[Callable[[], int]] = None,
+) -> int:
+    """Next number for the scope, from this worker's buffer when `block` > 1."""
+    block = block or default_block_size()
+    scope = (business_id, prefix, year)
+    if block > 1:
+        with _lock:
+            buf = _blocks.get(scope)
+            if buf and buf[0] <= buf[1]:
+                value = buf[0]
+                buf[0] += 1
+                return value
+
+    first, last = reserve(prefix, block, business_id=business_id, year=year, seed=seed)
+    if last > first:
+        transaction.on_commit(lambda: _push(scope, first + 1, last))
+    return first
+
+
+def next_yearly(prefix: str, *, business_id: Optional[int] = None, **kwargs) -> tuple[int, int]:
+    """(year, number) for a sequence that restarts every local calendar year."""
+    year = timezone.localdate().year
+    return year, next_value(prefix, business_id=business_id, year=year, **kwargs)
+
+
+def reset_blocks() -> None:
+    """Drop this worker's buffered numbers (tests, or after a manual counter edit)."""
+    with _lock:
+        _blocks.clear()
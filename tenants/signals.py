@@ -0,0 +1,39 @@
+# tenants/signals.py
+"""Drop cached principals (tenants.principal) when groups or memberships change."""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Membership
+from .principal import invalidate_principal
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid="principal_groups_changed")
+def _groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate_principal([instance.pk], user=instance)
+    elif action == "pre_clear":
+        invalidate_principal(instance.user_set.values_list("pk", flat=True))
+    else:
+        invalidate_principal(pk_set or ())
+
+
+@receiver(post_save, sender=Group, dispatch_uid="principal_group_saved")
+@receiver(pre_delete, sender=Group, dispatch_uid="principal_group_deleted")
+def _group_changed(sender, instance, **kwargs):
+    # Renames and deletes change group names for every member
+    if instance.pk:
+        invalidate_principal(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Membership, dispatch_uid="principal_membership_saved")
+@receiver(post_delete, sender=Membership, dispatch_uid="principal_membership_deleted")
+def _membership_changed(sender, instance, **kwargs):
+    invalidate_principal([instance.user_id])
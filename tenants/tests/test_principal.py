@@ -0,0 +1,87 @@
+# tenants/tests/test_principal.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from inventory.middleware import AuditorReadOnlyMiddleware
+from inventory.models import Location
+from tenants.middleware import PrincipalMiddleware
+from tenants.models import Business, Membership
+from tenants.principal import get_principal
+from tenants.utils import user_has_membership, user_highest_role, user_is_admin, user_is_manager
+
+User = get_user_model()
+
+
+def _fresh(user):
+    """A new instance of the user, as the next request would load it."""
+    return User.objects.get(pk=user.pk)
+
+
+def _unsaved_copy(user):
+    """Like _fresh without the user-row query, so only principal queries are counted."""
+    return User(pk=user.pk, username=user.username)
+
+
+@override_settings(PRINCIPAL_CACHE=True)
+class PrincipalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.biz = Business.objects.create(name="Principal A", slug="principal-a", status="ACTIVE")
+        self.loc = Location.objects.create(business=self.biz, name="Main")
+        self.user = User.objects.create_user("principal_user", password="x")
+        self.managers = Group.objects.create(name="Manager")
+        self.user.groups.add(self.managers)
+        Membership.objects.create(user=self.user, business=self.biz, role="AGENT", status="ACTIVE",
+                                  location=self.loc)
+
+    def test_role_helpers_share_one_principal(self):
+        user = _fresh(self.user)
+        with self.assertNumQueries(2):  # groups + memberships, once
+            self.assertTrue(user_is_manager(user))
+            self.assertFalse(user_is_admin(user))
+            self.assertEqual(user_highest_role(user), "AGENT")
+            self.assertTrue(user_has_membership(user, self.biz.id))
+
+        p = get_principal(user)
+        self.assertEqual((p.business_ids, p.location_ids), ({self.biz.id}, {self.loc.id}))
+
+        with self.assertNumQueries(0):  # next request: served from the shared cache
+            self.assertTrue(user_is_manager(_unsaved_copy(self.user)))
+
+    def test_group_and_membership_changes_invalidate(self):
+        get_principal(_fresh(self.user))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.remove(self.managers)
+        self.assertFalse(user_is_manager(_fresh(self.user)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Group.objects.create(name="Auditors").user_set.add(self.user)
+        self.assertTrue(get_principal(_fresh(self.user)).in_groups(["auditors"], ignore_case=True))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Membership.objects.filter(user=self.user).get().delete()
+        self.assertFalse(user_has_membership(_fresh(self.user), self.biz.id))
+        self.assertIsNone(user_highest_role(_fresh(self.user)))
+
+    @override_settings(PRINCIPAL_CACHE=False)
+    def test_without_shared_cache_each_request_reads_current_roles(self):
+        get_principal(_fresh(self.user))
+        # Changed by another worker: this process's cache is never invalidated
+        Membership.objects.filter(user=self.user).update(status="INACTIVE")
+        with self.assertNumQueries(2):
+            self.assertFalse(user_has_membership(_unsaved_copy(self.user), self.biz.id))
+
+    def test_middleware_attaches_lazy_principal(self):
+        Group.objects.create(name="Auditors").user_set.add(self.user)
+        request = RequestFactory().post("/inventory/stock/")
+        request.user = _fresh(self.user)
+
+        def view(req):
+            self.assertEqual(req.principal.user_id, self.user.pk)
+            return AuditorReadOnlyMiddleware(lambda r: None)(req)
+
+        response = PrincipalMiddleware(view)(request)
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,61 @@
+# tenants/tests/test_sequences.py
+from django.test import TestCase
+
+from layby.forms import LaybyOrderForm
+from layby.models import LaybyOrder
+from tenants.models import Business, NumberSequence
+from tenants.services import sequences
+
+
+class NumberSequenceTests(TestCase):
+    def setUp(self):
+        sequences.reset_blocks()
+        self.biz = Business.objects.create(name="Seq A", slug="seq-a", status="ACTIVE")
+
+    def tearDown(self):
+        sequences.reset_blocks()
+
+    def test_numbers_are_scoped_and_seeded_once(self):
+        calls = []
+
+        def seed():
+            calls.append(1)
+            return 41
+
+        got = [sequences.next_value("INV", business_id=self.biz.id, year=2026, seed=seed) for _ in range(3)]
+        self.assertEqual(got, [42, 43, 44])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sequences.next_value("INV", business_id=self.biz.id, year=2027), 1)
+        self.assertEqual(sequences.next_value("INV", year=2026), 1)  # platform-wide scope
+        self.assertEqual(NumberSequence.objects.count(), 3)
+
+    def test_block_reservation_hands_out_from_buffer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sequences.next_value("QUO", business_id=self.biz.id, block=10), 1)
+        with self.assertNumQueries(0):
+            got = [sequences.next_value("QUO", business_id=self.biz.id, block=10) for _ in range(9)]
+        self.assertEqual(got, list(range(2, 11)))
+        row = NumberSequence.objects.get(prefix="QUO")
+        self.assertEqual(row.last_value, 10)
+        self.assertEqual(sequences.next_value("QUO", business_id=self.biz.id, block=10), 11)
+
+    def test_buffer_is_dropped_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            sequences.next_value("QUO", business_id=self.biz.id, block=5)
+        self.assertEqual(len(callbacks), 1)  # remainder only buffered after commit
+        self.assertEqual(sequences._blocks, {})
+
+    def test_layby_refs_come_from_sequence(self):
+        a = LaybyOrder.objects.create(customer_name="A", item_name="Phone")
+        b = LaybyOrder.objects.create(customer_name="B", item_name="Phone")
+        self.assertRegex(a.ref, r"^AH\d{7}$")
+        self.assertEqual(int(b.ref[4:]), int(a.ref[4:]) + 1)
+        a.save()
+        self.assertEqual(LaybyOrder.objects.get(pk=a.pk).ref, a.ref)
+
+    def test_unsaved_layby_does_not_take_a_ref(self):
+        with self.assertNumQueries(0):
+            order = LaybyOrder(customer_name="A", item_name="Phone")
+        LaybyOrderForm()  # the agent_new GET
+        self.assertEqual(order.ref, "")
+        self.assertFalse(NumberSequence.objects.filter(prefix="AH").exists())
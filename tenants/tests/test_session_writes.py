@@ -0,0 +1,69 @@
+# tenants/tests/test_session_writes.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from cc import perf
+from inventory.models import Location
+from tenants.models import Business, Membership
+from tenants.utils import SESSION_REFRESHED_KEY
+
+User = get_user_model()
+
+
+@override_settings(PERF_SAMPLE_RATE=1.0)
+class SessionWriteElisionTests(TestCase):
+    def setUp(self):
+        perf.reset()
+        self.biz = Business.objects.create(name="Sessions A", slug="sessions-a", status="ACTIVE")
+        self.loc = Location.objects.create(business=self.biz, name="Front")
+        self.user = User.objects.create_user("session_agent", password="pass12345")
+        Membership.objects.create(user=self.user, business=self.biz, role="AGENT", status="ACTIVE",
+                                  location=self.loc)
+        self.client.login(username="session_agent", password="pass12345")
+        perf.reset()
+
+    def test_repeat_requests_do_not_rewrite_the_session(self):
+        self.client.get("/healthz/")  # first request records the tenant selection
+        session = self.client.session
+        self.assertEqual((session["active_business_id"], session["active_location_id"]),
+                         (self.biz.id, self.loc.id))
+        self.assertEqual(perf.endpoint_report()["sessions"]["session_writes"], 1)
+
+        for _ in range(3):
+            self.client.get("/healthz/")
+        counts = perf.endpoint_report()["sessions"]
+        self.assertEqual((counts["requests"], counts["session_writes"]), (4, 1))
+        self.assertEqual(counts["session_writes_per_req"], 0.25)
+
+    def test_switching_business_writes_once(self):
+        self.client.get("/healthz/")
+        other = Business.objects.create(name="Sessions B", slug="sessions-b", status="ACTIVE")
+        Membership.objects.create(user=self.user, business=other, role="MANAGER", status="ACTIVE")
+        session = self.client.session
+        session["active_business_id"] = other.id
+        session.save()
+        perf.reset()
+
+        self.client.get("/healthz/")
+        self.client.get("/healthz/")
+        self.assertEqual(self.client.session["biz_id"], other.id)
+        self.assertEqual(perf.endpoint_report()["sessions"]["session_writes"], 1)
+
+    def test_expiry_slides_once_half_the_age_is_used(self):
+        self.client.get("/healthz/")
+        self.client.get("/healthz/")
+        self.assertEqual(perf.endpoint_report()["sessions"]["session_writes"], 1)
+
+        # Last written more than half a session age ago
+        session = self.client.session
+        stale = int(time.time()) - session.get_expiry_age() // 2 - 1
+        session[SESSION_REFRESHED_KEY] = stale
+        session.save()
+        perf.reset()
+
+        self.client.get("/healthz/")
+        self.client.get("/healthz/")
+        self.assertGreater(self.client.session[SESSION_REFRESHED_KEY], stale)
+        self.assertEqual(perf.endpoint_report()["sessions"]["session_writes"], 1)
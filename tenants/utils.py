@@ -1,10 +1,12 @@
 ﻿# tenants/utils.py
 from __future__ import annotations
 
+import time
 from functools import wraps
 from typing import Callable, Iterable, Optional
 from urllib.parse import quote_plus
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.conf import settings
 from django.db import transaction
 from django.utils.text import slugify
@@ -37,6 +39,8 @@ except Exception:  # pragma: no cover
     def set_current_business_id(_):  # type: ignore
         return None
 
+from .principal import get_principal
+
 
 # ----------------------------
 # Constants
@@ -128,7 +132,7 @@ def _superuser_home_url() -> str:
 
 def _user_group_names(user) -> set[str]:
     try:
-        return set(user.groups.values_list("name", flat=True))
+        return set(get_principal(user).groups)
     except Exception:
         return set()
 
@@ -215,6 +219,45 @@ def _single_membership_business(user):
 # ----------------------------
 # Public helpers (session / context)
 # ----------------------------
+def update_session(request: "HttpRequest", values: dict) -> bool:
+    """
+    Set session keys whose value differs; returns True if anything changed.
+    Assigning an unchanged value still marks a Django session modified and
+    costs a session UPDATE at the end of the request, so every per-request
+    tenant/scope write goes through here.
+    """
+    session = getattr(request, "session", None)
+    if session is None:
+        return False
+    changed = False
+    for key, value in values.items():
+        if key not in session or session[key] != value:
+            session[key] = value
+            changed = True
+    return changed
+
+
+SESSION_REFRESHED_KEY = "_session_refreshed_at"
+
+
+def refresh_session_expiry(request: "HttpRequest") -> bool:
+    """
+    Keep the session's expiry sliding now that unchanged requests do not
+    write it: once less than half of the session age is left since the last
+    write, touch a timestamp so the session is saved with a new expiry.
+    Returns True when the session was marked for saving.
+    """
+    session = getattr(request, "session", None)
+    if session is None or session.is_empty():
+        return False
+    now = int(time.time())
+    stamp = session.get(SESSION_REFRESHED_KEY)
+    if isinstance(stamp, int) and now - stamp < session.get_expiry_age() // 2:
+        return False
+    session[SESSION_REFRESHED_KEY] = now
+    return True
+
+
 def set_active_business(request: "HttpRequest", business) -> None:
     """
     Persist the selected business in session, attach it to the request,
@@ -222,12 +265,12 @@ def set_active_business(request: "HttpRequest", business) -> None:
     """
     try:
         if business is None:
-            # Clear session + request (canonical + legacy) and mark modified
+            # Clear session + request (canonical + legacy); pop() only marks
+            # the session modified when a key was actually present
             try:
                 request.session.pop(TENANT_SESSION_KEY, None)
                 request.session.pop("active_business_id", None)  # explicit
                 request.session.pop("biz_id", None)             # legacy
-                request.session.modified = True
             except Exception:
                 pass
             try:
@@ -241,10 +284,11 @@ def set_active_business(request: "HttpRequest", business) -> None:
         # Persist selection (write both canonical and legacy keys to be safe)
         bid = getattr(business, "pk", None)
         try:
-            request.session[TENANT_SESSION_KEY] = bid
-            request.session["active_business_id"] = bid
-            request.session["biz_id"] = bid  # legacy compatibility
-            request.session.modified = True
+            update_session(request, {
+                TENANT_SESSION_KEY: bid,
+                "active_business_id": bid,
+                "biz_id": bid,  # legacy compatibility
+            })
         except Exception:
             pass
 
@@ -391,10 +435,7 @@ def user_has_membership(user, business_id: int) -> bool:
     if Membership is None or not getattr(user, "is_authenticated", False) or not business_id:
         return False
     try:
-        base = Membership.objects.filter(user=user, business_id=business_id)
-        if _membership_has_status_field():
-            return base.filter(status__iexact="ACTIVE").exists()
-        return base.exists()
+        return get_principal(user).has_business(business_id)
     except Exception:
         return False
 
@@ -409,11 +450,7 @@ def user_highest_role(user) -> Optional[str]:
     if not _model_has_field(Membership, "role"):
         return None
     try:
-        roles = list(
-            Membership.objects.filter(user=user)
-            .values_list("role", flat=True)
-        )
-        roles_upper = {(r or "").upper() for r in roles}
+        roles_upper = get_principal(user).roles
         for pref in _ROLE_PRIORITY:
             if pref in roles_upper:
                 return pref
@@ -549,8 +586,7 @@ def user_is_admin(user) -> bool:
     """
     if getattr(user, "is_superuser", False):
         return True
-    names = _user_group_names(user)
-    return bool(names.intersection(ROLE_GROUP_ADMIN_NAMES))
+    return get_principal(user).in_groups(ROLE_GROUP_ADMIN_NAMES)
 
 
 def user_is_manager(user) -> bool:
@@ -560,8 +596,7 @@ def user_is_manager(user) -> bool:
     """
     if user_is_admin(user):
         return True
-    names = _user_group_names(user)
-    return bool(names.intersection(ROLE_GROUP_MANAGER_NAMES))
+    return get_principal(user).in_groups(ROLE_GROUP_MANAGER_NAMES)
 
 
 def user_is_agent(user) -> bool:
@@ -571,8 +606,7 @@ def user_is_agent(user) -> bool:
     """
     if user_is_admin(user) or user_is_manager(user):
         return False
-    names = _user_group_names(user)
-    return bool(names.intersection(ROLE_GROUP_AGENT_NAMES))
+    return get_principal(user).in_groups(ROLE_GROUP_AGENT_NAMES)
 
 
 # —— Aliases expected by template tags / other modules ——
@@ -585,11 +619,7 @@ def _has_active_membership(user, business) -> bool:
     if Membership is None or business is None or not getattr(user, "is_authenticated", False):
         return False
     try:
-        if _membership_has_status_field():
-            return Membership.objects.filter(
-                user=user, business=business, status__iexact="ACTIVE"
-            ).exists()
-        return Membership.objects.filter(user=user, business=business).exists()
+        return get_principal(user).has_business(getattr(business, "pk", business))
     except Exception:
         return False
 
@@ -735,58 +765,72 @@ def require_business(_fn: Optional[Callable] = None) -> Callable:
       - Try to auto-select if the user has exactly ONE membership (prefers ACTIVE).
       - SUPERUSERS: send to HQ/dashboard unless that would loop, then run the view.
       - Everyone else: redirect to activation/settings with ?next=…, avoiding loops.
-    """
-    def _decorator(view_func: Callable) -> Callable:
-        @wraps(view_func)
-        def _wrapped(request: "HttpRequest", *args, **kwargs):
-            # Already selected
-            biz = get_active_business(request)
-            if biz is not None:
-                return view_func(request, *args, **kwargs)
 
-            user = getattr(request, "user", None)
+    Async views stay async; the check itself runs in a worker thread.
+    """
+    def _gate(request: "HttpRequest") -> Optional["HttpResponse"]:
+        """None when the view should run, else the redirect to send instead."""
+        # Already selected
+        biz = get_active_business(request)
+        if biz is not None:
+            return None
 
-            # Auto-pick if they have exactly one membership
-            auto_biz = _single_membership_business(user)
-            if auto_biz is not None:
-                set_active_business(request, auto_biz)
-                return view_func(request, *args, **kwargs)
+        user = getattr(request, "user", None)
 
-            # Superusers should not be forced into tenant onboarding.
-            if getattr(user, "is_authenticated", False) and getattr(user, "is_superuser", False):
-                target = _superuser_home_url()
+        # Auto-pick if they have exactly one membership
+        auto_biz = _single_membership_business(user)
+        if auto_biz is not None:
+            set_active_business(request, auto_biz)
+            return None
 
-                # If the target resolves to the current path, DO NOT redirect: run the view.
-                if _same_path(request, target):
-                    return view_func(request, *args, **kwargs)
+        # Superusers should not be forced into tenant onboarding.
+        if getattr(user, "is_authenticated", False) and getattr(user, "is_superuser", False):
+            target = _superuser_home_url()
 
-                # If the target is empty/root or equals current route, just render.
-                if not target or target == "/" or _same_path(request, "/"):
-                    return view_func(request, *args, **kwargs)
+            # If the target resolves to the current path, DO NOT redirect: run the view.
+            if _same_path(request, target):
+                return None
 
-                return redirect(target)
+            # If the target is empty/root or equals current route, just render.
+            if not target or target == "/" or _same_path(request, "/"):
+                return None
 
-            # Normal users → activation flow with next=
-            target = _safe_reverse("tenants:activate_mine", "/tenants/activate/")
-            next_q = quote_plus(getattr(request, "get_full_path", lambda: "/")())
+            return redirect(target)
 
-            # If tenants app not mounted, nudge to unified settings
-            if target in ("/", "/tenants/activate/"):
-                target = _safe_reverse("accounts:settings_unified", "/accounts/settings/")
+        # Normal users → activation flow with next=
+        target = _safe_reverse("tenants:activate_mine", "/tenants/activate/")
+        next_q = quote_plus(getattr(request, "get_full_path", lambda: "/")())
 
-            # Avoid redirect loop: if we're already on the target, let the page render.
-            if _same_path(request, target):
-                try:
-                    messages.info(request, "Select or set up your business to continue.")
-                except Exception:
-                    pass
-                return view_func(request, *args, **kwargs)
+        # If tenants app not mounted, nudge to unified settings
+        if target in ("/", "/tenants/activate/"):
+            target = _safe_reverse("accounts:settings_unified", "/accounts/settings/")
 
+        # Avoid redirect loop: if we're already on the target, let the page render.
+        if _same_path(request, target):
             try:
                 messages.info(request, "Select or set up your business to continue.")
             except Exception:
                 pass
-            return redirect(f"{target}?next={next_q}" if next_q else target)
+            return None
+
+        try:
+            messages.info(request, "Select or set up your business to continue.")
+        except Exception:
+            pass
+        return redirect(f"{target}?next={next_q}" if next_q else target)
+
+    def _decorator(view_func: Callable) -> Callable:
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _awrapped(request: "HttpRequest", *args, **kwargs):
+                blocked = await sync_to_async(_gate)(request)
+                return blocked if blocked is not None else await view_func(request, *args, **kwargs)
+            return _awrapped
+
+        @wraps(view_func)
+        def _wrapped(request: "HttpRequest", *args, **kwargs):
+            blocked = _gate(request)
+            return blocked if blocked is not None else view_func(request, *args, **kwargs)
         return _wrapped
 
     # Support bare and called usage
@@ -18,6 +18,7 @@ from django.utils.html import escape
 
 from .forms import CreateBusinessForm, JoinAsAgentForm, InviteAgentForm
 from .models import Business, Membership, AgentInvite
+from .principal import invalidate_principal
 from .utils import (
     require_business,
     require_role,
@@ -426,13 +427,16 @@ def staff_approve_business(request: HttpRequest, pk: int) -> HttpResponse:
             Membership.objects.filter(
                 business=b, role="MANAGER", user=b.created_by
             ).update(status="ACTIVE")
+            invalidate_principal([b.created_by_id])
 
             _ensure_seed_on_switch(b)
             messages.success(request, f"Approved business {b.name}.")
         elif action == "reject":
             b.status = "SUSPENDED"
             b.save(update_fields=["status"])
-            Membership.objects.filter(business=b).update(status="REJECTED")
+            members = Membership.objects.filter(business=b)
+            invalidate_principal(members.values_list("user_id", flat=True))
+            members.update(status="REJECTED")
             messages.info(request, f"Rejected business {b.name}.")
         else:
             messages.error(request, "Unknown action.")
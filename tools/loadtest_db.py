@@ -0,0 +1,205 @@
+# tools/loadtest_db.py
+"""
+Compare DB connection modes: throughput and connections held.
+
+Each mode runs WORKERS processes (like gunicorn workers) against the same
+database for --seconds:
+
+    sync      1 thread per worker, persistent connections (DB_CONN_MAX_AGE)
+    threaded  --threads per worker, persistent connections: one per thread
+    pooled    --threads per worker sharing a pool of --pool-size (DB_POOL=1)
+
+A worker thread loops over "requests": Django's request_started signal,
+--queries statements, --io-ms of non-DB waiting (an outbound call), then
+request_finished, which returns or keeps the connection as the mode does.
+
+    python tools/loadtest_db.py --database-url postgres://user:pw@127.0.0.1/cc --no-ssl -w 2 -t 8 --pool-size 3
+    python tools/loadtest_db.py                    # SQLite stand-in; pooled needs PostgreSQL
+
+On PostgreSQL the server-side connection count (pg_stat_activity) is sampled
+while each mode runs; the peak is what counts against the plan's limit.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = ("sync", "threaded", "pooled")
+
+
+def _env(args, mode: str) -> dict:
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "cc.settings", "DEBUG": "1" if args.no_ssl else "0",
+           "PYTHONWARNINGS": "ignore::RuntimeWarning"}
+    if args.database_url:
+        env.update(DATABASE_URL=args.database_url, USE_LOCAL_SQLITE="0")
+    else:
+        env.pop("DATABASE_URL", None)
+        env["USE_LOCAL_SQLITE"] = "1"
+    env["DB_POOL"] = "1" if mode == "pooled" else "0"
+    env["DB_CONN_MAX_AGE"] = "0" if mode == "pooled" else str(args.conn_max_age)
+    env.update(DB_POOL_MIN_SIZE="1", DB_POOL_MAX_SIZE=str(args.pool_size), DB_POOL_TIMEOUT=str(args.pool_timeout))
+    return env
+
+
+def _setup() -> None:
+    sys.path.insert(0, str(ROOT))
+    import django
+
+    django.setup()
+
+
+# ---------------------------------------------------------------------
+# Child: one worker process
+# ---------------------------------------------------------------------
+def child(args) -> None:
+    _setup()
+    from django.core.signals import request_finished, request_started
+    from django.db import connection, connections
+    from django.db.backends.signals import connection_created
+
+    from cc.db_pool import pool_stats
+
+    if connections.settings["default"]["ENGINE"].endswith("sqlite3") and args.mode != "pooled":
+        # The local SQLite settings close per request; mirror the PostgreSQL mode
+        connections.settings["default"]["CONN_MAX_AGE"] = args.conn_max_age
+
+    opened = []
+    connection_created.connect(lambda sender, connection, **kw: opened.append(1), weak=False)
+    threads = 1 if args.mode == "sync" else args.threads
+    deadline = time.monotonic() + args.seconds
+    latencies: list[list[float]] = [[] for _ in range(threads)]
+    errors = [0] * threads
+
+    def loop(i: int) -> None:
+        while time.monotonic() < deadline:
+            t0 = time.perf_counter()
+            request_started.send(sender=None)
+            try:
+                with connection.cursor() as cursor:
+                    for _ in range(args.queries):
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                if args.io_ms:
+                    time.sleep(args.io_ms / 1000)
+            except Exception:
+                errors[i] += 1
+            finally:
+                request_finished.send(sender=None)
+            latencies[i].append(time.perf_counter() - t0)
+        connections.close_all()
+
+    workers = [threading.Thread(target=loop, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    print(json.dumps({
+        "requests": sum(len(l) for l in latencies),
+        "errors": sum(errors),
+        "opened": len(opened),
+        "latencies": [x for l in latencies for x in l][:: max(1, sum(len(l) for l in latencies) // 2000)],
+        "pools": pool_stats(),
+    }))
+
+
+# ---------------------------------------------------------------------
+# Parent: run each mode, sample server-side connections
+# ---------------------------------------------------------------------
+def _sampler(args, stop: threading.Event, peak: list[int]) -> None:
+    if not args.database_url:
+        return
+    from django.db import connection
+
+    sql = "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()"
+    while not stop.is_set():
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                peak[0] = max(peak[0], int(cursor.fetchone()[0]))
+        except Exception:
+            return
+        stop.wait(0.1)
+    connection.close()
+
+
+def run_mode(args, mode: str) -> dict:
+    cmd = [sys.executable, __file__, "--child", mode, "--seconds", str(args.seconds), "-t", str(args.threads),
+           "--queries", str(args.queries), "--io-ms", str(args.io_ms), "--conn-max-age", str(args.conn_max_age)]
+    stop, peak = threading.Event(), [0]
+    sampler = threading.Thread(target=_sampler, args=(args, stop, peak))
+    sampler.start()
+    procs = [subprocess.Popen(cmd, env=_env(args, mode), cwd=ROOT, stdout=subprocess.PIPE, text=True)
+             for _ in range(args.workers)]
+    outs = []
+    for p in procs:
+        out, _ = p.communicate()
+        lines = (out or "").strip().splitlines()
+        if p.returncode == 0 and lines:
+            outs.append(json.loads(lines[-1]))
+    stop.set()
+    sampler.join()
+
+    lat = [x for o in outs for x in o["latencies"]]
+    waited = sum(s.get("waited", 0) for o in outs for s in o["pools"].values())
+    return {
+        "mode": mode,
+        "workers_ok": len(outs),
+        "req_s": sum(o["requests"] for o in outs) / args.seconds,
+        "errors": sum(o["errors"] for o in outs),
+        "p95_ms": statistics.quantiles(lat, n=20)[-1] * 1000 if len(lat) > 1 else 0.0,
+        "opened": sum(o["opened"] for o in outs),
+        "server_peak": peak[0] if args.database_url else None,
+        "pool_waits": waited if mode == "pooled" else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("LOADTEST_DATABASE_URL", ""),
+                        help="PostgreSQL URL; empty runs against the local SQLite file")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("-w", "--workers", type=int, default=2, help="processes per mode")
+    parser.add_argument("-t", "--threads", type=int, default=8, help="threads per worker (threaded/pooled)")
+    parser.add_argument("--pool-size", type=int, default=3, help="DB_POOL_MAX_SIZE for pooled")
+    parser.add_argument("--pool-timeout", type=int, default=10)
+    parser.add_argument("--conn-max-age", type=int, default=120)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--queries", type=int, default=3, help="statements per request")
+    parser.add_argument("--io-ms", type=float, default=20.0, help="non-DB wait per request")
+    parser.add_argument("--no-ssl", action="store_true", help="local server without TLS (runs with DEBUG=1)")
+    parser.add_argument("--child", choices=MODES, dest="mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        child(args)
+        return 0
+
+    if args.database_url:
+        os.environ.update(_env(args, "sync"))
+        _setup()
+    rows = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        if mode == "pooled" and not args.database_url:
+            print("pooled: skipped (connection pools need PostgreSQL; pass --database-url)")
+            continue
+        rows.append(run_mode(args, mode))
+
+    print(f"{'mode':<10}{'req/s':>10}{'p95 ms':>10}{'errors':>8}{'opened':>8}{'server peak':>13}{'pool waits':>12}")
+    for r in rows:
+        peak = "-" if r["server_peak"] is None else r["server_peak"]
+        waits = "-" if r["pool_waits"] is None else r["pool_waits"]
+        print(f"{r['mode']:<10}{r['req_s']:>10.1f}{r['p95_ms']:>10.1f}{r['errors']:>8}{r['opened']:>8}{peak:>13}{waits:>12}"
+              + ("" if r["workers_ok"] == args.workers else f"  ({args.workers - r['workers_ok']} worker(s) failed)"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+# tools/loadtest_longpoll.py
+"""
+Hold N long-poll connections open and time a probe request meanwhile.
+
+Compare a sync deployment with the ASGI one (same host, same session):
+
+    gunicorn cc.wsgi -w 2                        # sync workers
+    CC_ASGI=1 uvicorn cc.asgi:application        # event loop
+    python tools/loadtest_longpoll.py http://127.0.0.1:8000 --session <sessionid> -n 200
+
+With sync workers each waiting client pins a worker (or, with ASGI_MODE off,
+the endpoint answers at once and nothing is held). Under uvicorn the waits
+park coroutines, so the probe (/healthz by default) should stay fast while
+all N are held. Stdlib only.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def _get(host: str, port: int, path: str, cookie: str, timeout: float) -> tuple[int, bytes, float]:
+    started = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        head = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+        if cookie:
+            head += f"Cookie: sessionid={cookie}\r\n"
+        writer.write((head + "\r\n").encode("latin-1"))
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    status_line, _, rest = raw.partition(b"\r\n")
+    parts = status_line.split()
+    status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+    return status, rest.partition(b"\r\n\r\n")[2], time.perf_counter() - started
+
+
+async def _stamp(host, port, cookie, timeout) -> str | None:
+    status, body, _ = await _get(host, port, "/inventory/api/changes/", cookie, timeout)
+    try:
+        return str(json.loads(body)["stamp"]) if status == 200 else None
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+async def run(args) -> int:
+    url = urlsplit(args.base_url)
+    host, port = url.hostname or "127.0.0.1", url.port or 80
+    stamp = await _stamp(host, port, args.session, args.timeout)
+    if stamp is None:
+        print("Could not read a stamp from /inventory/api/changes/ (not logged in?)")
+        return 1
+
+    poll = f"/inventory/api/changes/?since={stamp}&wait={args.wait}"
+    waiters = [asyncio.ensure_future(_get(host, port, poll, args.session, args.timeout)) for _ in range(args.n)]
+    await asyncio.sleep(args.settle)
+    held = sum(1 for w in waiters if not w.done())
+
+    probes = []
+    for _ in range(args.probes):
+        try:
+            status, _body, took = await _get(host, port, args.probe, args.session, args.timeout)
+            probes.append(took if status else None)
+        except (OSError, asyncio.TimeoutError):
+            probes.append(None)
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    ok = [r for r in results if not isinstance(r, BaseException) and r[0] == 200]
+    failed = len(results) - len(ok)
+    timings = [p for p in probes if p is not None]
+
+    print(f"long-polls: {args.n} opened, {held} still held after {args.settle:.1f}s, {len(ok)} ok, {failed} failed")
+    if ok:
+        print(f"long-poll duration: median {statistics.median(r[2] for r in ok):.2f}s")
+    if timings:
+        print(f"probe {args.probe}: median {statistics.median(timings) * 1000:.0f} ms, "
+              f"max {max(timings) * 1000:.0f} ms ({len(probes) - len(timings)} failed)")
+    else:
+        print(f"probe {args.probe}: all {len(probes)} failed")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("base_url")
+    parser.add_argument("--session", default="", help="sessionid cookie of a logged-in user")
+    parser.add_argument("-n", type=int, default=100, help="concurrent long-poll connections")
+    parser.add_argument("--wait", type=int, default=20, help="seconds each long-poll asks to wait")
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds before probing")
+    parser.add_argument("--probe", default="/healthz")
+    parser.add_argument("--probes", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
 ﻿# wallet/admin.py
 from django.contrib import admin
 from .models import (
+    AgentWalletBalance,
     WalletTransaction,
     SalesTarget,
     AttendanceLog,
@@ -8,6 +9,7 @@ from .models import (
     Payslip,
     Payment,
     PayoutSchedule,
+    PayrollRun,
     AdminPurchaseOrder,
     AdminPurchaseOrderItem,
 )
@@ -21,6 +23,13 @@ class WalletTransactionAdmin(admin.ModelAdmin):
     date_hierarchy = "created_at"
     ordering = ("-created_at",)
 
+@admin.register(AgentWalletBalance)
+class AgentWalletBalanceAdmin(admin.ModelAdmin):
+    list_display = ("agent", "balance", "month_start", "month_total", "day", "today_earnings", "txn_count", "updated_at")
+    search_fields = ("agent__username", "agent__first_name", "agent__last_name")
+    readonly_fields = [f.name for f in AgentWalletBalance._meta.fields]
+    ordering = ("-balance",)
+
 @admin.register(SalesTarget)
 class SalesTargetAdmin(admin.ModelAdmin):
     list_display = ("agent", "year", "month", "target_count", "bonus_per_extra")
@@ -69,6 +78,14 @@ class PayoutScheduleAdmin(admin.ModelAdmin):
     autocomplete_fields = ("users", "created_by")
     ordering = ("name",)
 
+@admin.register(PayrollRun)
+class PayrollRunAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "year", "month", "status", "schedule", "emailed_count", "total_net", "finished_at")
+    list_filter = ("status", "year", "month")
+    readonly_fields = ("agent_ids", "done_agent_ids", "errors", "started_at", "finished_at")
+    autocomplete_fields = ("created_by",)
+    ordering = ("-created_at",)
+
 class AdminPurchaseOrderItemInline(admin.TabularInline):
     model = AdminPurchaseOrderItem
     extra = 0
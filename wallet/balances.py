@@ -0,0 +1,246 @@
+# wallet/balances.py
+"""
+Running per-agent wallet balances (AgentWalletBalance).
+
+Every AGENT-ledger WalletTransaction is folded into its agent's row in the same
+transaction that writes it, so wallet pages and ranking() read one row per
+agent instead of re-summing the whole history. Rows carry a month bucket and a
+day bucket keyed by `effective_date`; a bucket that is not the current
+month/day simply reads as zero.
+
+`python manage.py reconcile_wallet_balances` rebuilds rows from history.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import AgentWalletBalance, Ledger, WalletTransaction, q2
+
+ZERO = Decimal("0.00")
+
+
+def _as_date(d) -> date:
+    if isinstance(d, str):
+        return date.fromisoformat(d[:10])
+    return d
+
+
+def _fold(row: AgentWalletBalance, amount: Decimal, eff: date) -> None:
+    """Add one signed amount, effective on `eff`, to an in-memory balance row."""
+    amount = q2(amount)
+    today = timezone.localdate()
+    eff = _as_date(eff) or today
+    row.balance = q2(row.balance) + amount
+    row.txn_count = (row.txn_count or 0) + 1
+    if amount < 0:
+        row.all_time_deductions = q2(row.all_time_deductions) - amount
+
+    month = eff.replace(day=1)
+    if month > today.replace(day=1):
+        # Post-dated into a later month: only the running balance moves for now
+        return
+    if row.month_start is None or month > row.month_start:
+        row.month_start, row.month_total, row.month_deductions = month, ZERO, ZERO
+    if month == row.month_start:
+        row.month_total = q2(row.month_total) + amount
+        if amount < 0:
+            row.month_deductions = q2(row.month_deductions) - amount
+
+    if eff > today:
+        return
+    if row.day is None or eff > row.day:
+        row.day, row.today_earnings, row.today_deductions = eff, ZERO, ZERO
+    if eff == row.day:
+        if amount > 0:
+            row.today_earnings = q2(row.today_earnings) + amount
+        elif amount < 0:
+            row.today_deductions = q2(row.today_deductions) - amount
+
+
+def apply_txns(txns: Iterable[WalletTransaction]) -> None:
+    """
+    Fold freshly written transactions into their agents' rows (one locking
+    read + one bulk write). Non-agent ledgers and agent-less rows are ignored.
+    """
+    per_agent: dict[int, list[WalletTransaction]] = defaultdict(list)
+    for t in txns:
+        if t.ledger == Ledger.AGENT and t.agent_id:
+            per_agent[t.agent_id].append(t)
+    if not per_agent:
+        return
+
+    with transaction.atomic():
+        rows = {
+            r.agent_id: r
+            for r in AgentWalletBalance.objects.select_for_update().filter(agent_id__in=list(per_agent))
+        }
+        missing = [aid for aid in per_agent if aid not in rows]
+        if missing:
+            # First transaction for these agents: build their rows from history instead
+            rebuild_balances(missing)
+            for aid in missing:
+                per_agent.pop(aid)
+        if not per_agent:
+            return
+        now = timezone.now()
+        for aid, t_list in per_agent.items():
+            for t in t_list:
+                _fold(rows[aid], t.amount, t.effective_date)
+            rows[aid].updated_at = now
+        AgentWalletBalance.objects.bulk_update(
+            [rows[aid] for aid in per_agent],
+            ["balance", "all_time_deductions", "month_start", "month_total", "month_deductions",
+             "day", "today_earnings", "today_deductions", "txn_count", "updated_at"],
+        )
+
+
+def apply_txn(txn: WalletTransaction) -> None:
+    apply_txns([txn])
+
+
+# ---------------------------------------------------------------------
+# Rebuild / reconcile
+# ---------------------------------------------------------------------
+def compute_balance_rows(agent_ids: Iterable[int] | None = None, *, today: date | None = None) -> dict[int, AgentWalletBalance]:
+    """
+    Build (unsaved) balance rows from WalletTransaction history with three
+    grouped queries: all-time, current month and today.
+    """
+    today = today or timezone.localdate()
+    month = today.replace(day=1)
+    next_month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    qs = WalletTransaction.objects.filter(ledger=Ledger.AGENT, agent__isnull=False).order_by()
+    if agent_ids is not None:
+        qs = qs.filter(agent_id__in=list(agent_ids))
+
+    neg = Sum("amount", filter=Q(amount__lt=0))
+    rows: dict[int, AgentWalletBalance] = {}
+    for r in qs.values("agent_id").annotate(s=Sum("amount"), n=neg, c=Count("id")):
+        rows[r["agent_id"]] = AgentWalletBalance(
+            agent_id=r["agent_id"],
+            balance=q2(r["s"]),
+            all_time_deductions=ZERO - q2(r["n"]),
+            txn_count=r["c"],
+            month_start=month,
+            month_total=ZERO,
+            month_deductions=ZERO,
+            day=today,
+            today_earnings=ZERO,
+            today_deductions=ZERO,
+        )
+    for r in (
+        qs.filter(effective_date__gte=month, effective_date__lt=next_month)
+        .values("agent_id").annotate(s=Sum("amount"), n=neg)
+    ):
+        row = rows[r["agent_id"]]
+        row.month_total, row.month_deductions = q2(r["s"]), ZERO - q2(r["n"])
+    for r in (
+        qs.filter(effective_date=today)
+        .values("agent_id").annotate(p=Sum("amount", filter=Q(amount__gt=0)), n=neg)
+    ):
+        row = rows[r["agent_id"]]
+        row.today_earnings, row.today_deductions = q2(r["p"]), ZERO - q2(r["n"])
+    return rows
+
+
+_COMPARED = (
+    "balance", "all_time_deductions", "month_total", "month_deductions",
+    "today_earnings", "today_deductions", "txn_count",
+)
+
+
+def _current_view(row: AgentWalletBalance, today: date) -> tuple:
+    """Row values as a reader on `today` would see them (stale buckets read as zero)."""
+    month_ok = row.month_start == today.replace(day=1)
+    day_ok = row.day == today
+    return (
+        q2(row.balance), q2(row.all_time_deductions),
+        q2(row.month_total) if month_ok else ZERO, q2(row.month_deductions) if month_ok else ZERO,
+        q2(row.today_earnings) if day_ok else ZERO, q2(row.today_deductions) if day_ok else ZERO,
+        row.txn_count,
+    )
+
+
+def rebuild_balances(agent_ids: Iterable[int] | None = None, *, dry_run: bool = False) -> dict:
+    """
+    Recompute rows from history and fix any that drifted (or are missing).
+    Returns {"checked": n, "fixed": [agent_id, ...]}.
+    """
+    today = timezone.localdate()
+    ids = list(agent_ids) if agent_ids is not None else None
+    fresh = compute_balance_rows(ids, today=today)
+
+    stored_qs = AgentWalletBalance.objects.all()
+    if ids is not None:
+        stored_qs = stored_qs.filter(agent_id__in=ids)
+    stored = {r.agent_id: r for r in stored_qs}
+
+    to_create, to_update, fixed = [], [], []
+    for aid, row in fresh.items():
+        cur = stored.get(aid)
+        if cur is None:
+            to_create.append(row)
+            fixed.append(aid)
+        elif _current_view(cur, today) != _current_view(row, today):
+            to_update.append(row)
+            fixed.append(aid)
+    # Rows whose transactions were all deleted
+    orphans = [aid for aid in stored if aid not in fresh]
+    fixed += orphans
+
+    if not dry_run:
+        now = timezone.now()
+        for row in to_update:
+            row.updated_at = now
+        with transaction.atomic():
+            if to_create:
+                AgentWalletBalance.objects.bulk_create(to_create, ignore_conflicts=True)
+            if to_update:
+                AgentWalletBalance.objects.bulk_update(
+                    to_update, [*_COMPARED, "month_start", "day", "updated_at"]
+                )
+            if orphans:
+                AgentWalletBalance.objects.filter(agent_id__in=orphans).delete()
+
+    return {"checked": len(set(fresh) | set(stored)), "fixed": fixed}
+
+
+# ---------------------------------------------------------------------
+# Readers
+# ---------------------------------------------------------------------
+def balance_row(agent_id: int) -> AgentWalletBalance | None:
+    row = AgentWalletBalance.objects.filter(agent_id=agent_id).first()
+    if row is None and WalletTransaction.objects.filter(ledger=Ledger.AGENT, agent_id=agent_id).exists():
+        # History predates the table (not reconciled yet): build it once
+        rebuild_balances([agent_id])
+        row = AgentWalletBalance.objects.filter(agent_id=agent_id).first()
+    return row
+
+
+def summary_from_row(row: AgentWalletBalance | None, *, today: date | None = None) -> dict:
+    """The agent_wallet_summary() dict, read from a balance row."""
+    today = today or timezone.localdate()
+    if row is None:
+        return {
+            "today_earnings": ZERO, "today_deductions": ZERO,
+            "month_total": ZERO, "month_deductions": ZERO,
+            "all_time_total": ZERO, "all_time_deductions": ZERO, "balance": ZERO,
+        }
+    bal, all_ded, m_total, m_ded, t_earn, t_ded, _ = _current_view(row, today)
+    return {
+        "today_earnings": t_earn,
+        "today_deductions": t_ded,
+        "month_total": m_total,
+        "month_deductions": m_ded,
+        "all_time_total": bal,
+        "all_time_deductions": all_ded,
+        "balance": bal,
+    }
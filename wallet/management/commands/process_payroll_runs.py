@@ -0,0 +1,43 @@
+# wallet/management/commands/process_payroll_runs.py
+from django.core.management.base import BaseCommand
+
+from wallet.models import PayrollRun, PayrollRunStatus
+from wallet.payroll import (
+    BATCH_SIZE,
+    EMAIL_BATCH_SIZE,
+    deliver_payroll_emails,
+    process_payroll_run,
+)
+
+
+class Command(BaseCommand):
+    help = "Resume unfinished payroll runs and deliver queued payslip emails (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--run", type=int, help="Only process this PayrollRun id.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Agents per transaction.")
+        parser.add_argument("--email-limit", type=int, default=EMAIL_BATCH_SIZE, help="Emails per run per pass.")
+        parser.add_argument("--retry-failed", action="store_true", help="Also resume runs marked FAILED.")
+
+    def handle(self, *args, **opts):
+        statuses = [PayrollRunStatus.PENDING, PayrollRunStatus.RUNNING, PayrollRunStatus.EMAILING]
+        if opts["retry_failed"] or opts["run"]:
+            statuses.append(PayrollRunStatus.FAILED)
+
+        runs = PayrollRun.objects.filter(status__in=statuses).order_by("created_at")
+        if opts["run"]:
+            runs = runs.filter(pk=opts["run"])
+
+        issued = emailed = 0
+        for run in runs:
+            if run.status != PayrollRunStatus.EMAILING:
+                process_payroll_run(run, batch_size=opts["batch_size"])
+                issued += 1
+            emailed += deliver_payroll_emails(run, limit=opts["email_limit"])
+            style = self.style.ERROR if run.status == PayrollRunStatus.FAILED else self.style.SUCCESS
+            self.stdout.write(style(
+                f"Run #{run.pk} {run.year}-{run.month:02d}: {run.status} "
+                f"({len(run.done_agent_ids or [])}/{len(run.agent_ids or [])} agents)"
+            ))
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {issued} run(s); sent {emailed} email(s)."))
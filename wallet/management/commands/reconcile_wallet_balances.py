@@ -0,0 +1,26 @@
+# wallet/management/commands/reconcile_wallet_balances.py
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from cc.db_router import replica_reads
+from wallet.balances import rebuild_balances
+
+
+class Command(BaseCommand):
+    help = "Rebuild AgentWalletBalance rows from WalletTransaction history and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--agent", type=int, action="append", dest="agents", help="Only this agent id (repeatable).")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report drifted rows without fixing them (reads from the replica when enabled).")
+
+    def handle(self, *args, **opts):
+        # A dry run only reads, so it can run off the replica
+        with replica_reads() if opts["dry_run"] else nullcontext():
+            res = rebuild_balances(opts.get("agents"), dry_run=opts["dry_run"])
+        fixed = res["fixed"]
+        verb = "Would fix" if opts["dry_run"] else "Fixed"
+        if fixed:
+            self.stdout.write(self.style.WARNING(f"{verb} {len(fixed)} agent(s): {', '.join(map(str, fixed[:50]))}"))
+        self.stdout.write(self.style.SUCCESS(f"Checked {res['checked']} wallet balance(s); {len(fixed)} drifted."))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:19
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0005_alter_wallettransaction_effective_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Computing'), ('EMAILING', 'Sending emails'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=12)),
+                ('email', models.BooleanField(default=True)),
+                ('post_wallet_payout', models.BooleanField(default=True)),
+                ('agent_ids', models.JSONField(blank=True, default=list)),
+                ('done_agent_ids', models.JSONField(blank=True, default=list)),
+                ('emailed_count', models.PositiveIntegerField(default=0)),
+                ('total_net', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payroll_runs_created', to=settings.AUTH_USER_MODEL)),
+                ('schedule', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='runs', to='wallet.payoutschedule')),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.AddField(
+            model_name='payslip',
+            name='payroll_run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payslips', to='wallet.payrollrun'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollrun',
+            index=models.Index(fields=['status', 'created_at'], name='wallet_payr_status_daed73_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollrun',
+            index=models.Index(fields=['year', 'month'], name='wallet_payr_year_9a00b1_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:22
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('wallet', '0006_payrollrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentWalletBalance',
+            fields=[
+                ('agent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='wallet_balance', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('all_time_deductions', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('month_start', models.DateField(blank=True, null=True)),
+                ('month_total', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('month_deductions', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('today_earnings', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('today_deductions', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('txn_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month_start', 'month_total'], name='wallet_agen_month_s_f7b98e_idx'), models.Index(fields=['balance'], name='wallet_agen_balance_98c799_idx')],
+            },
+        ),
+    ]
@@ -4,7 +4,7 @@ from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Sum
 from django.utils import timezone
 
@@ -97,7 +97,54 @@ class WalletTransaction(models.Model):
     def save(self, *args, **kwargs):
         # Normalize amount to 2dp
         self.amount = q2(self.amount)
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Keep AgentWalletBalance in step (edits fall back to a per-agent rebuild)
+            from .balances import apply_txn, rebuild_balances
+            if adding:
+                apply_txn(self)
+            elif self.ledger == Ledger.AGENT and self.agent_id:
+                rebuild_balances([self.agent_id])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            res = super().delete(*args, **kwargs)
+            if self.ledger == Ledger.AGENT and self.agent_id:
+                from .balances import rebuild_balances
+                rebuild_balances([self.agent_id])
+        return res
+
+
+class AgentWalletBalance(models.Model):
+    """
+    Running totals of an agent's AGENT-ledger transactions (one row per agent).
+    Month/day buckets are keyed by effective_date; see wallet/balances.py.
+    Rebuild with `python manage.py reconcile_wallet_balances`.
+    """
+    agent = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE, related_name="wallet_balance")
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+    all_time_deductions = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+
+    month_start = models.DateField(null=True, blank=True)
+    month_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+    month_deductions = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+
+    day = models.DateField(null=True, blank=True)
+    today_earnings = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+    today_deductions = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+
+    txn_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["month_start", "month_total"]),
+            models.Index(fields=["balance"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.agent_id} balance {self.balance}"
 
 
 # ----------------------------------------------------------------------
@@ -244,6 +291,11 @@ class Payslip(models.Model):
     # Machine info (calculation inputs, preview lines, etc.)
     meta = models.JSONField(default=dict, blank=True)
 
+    # Bulk run that last issued this payslip (emails are queued against it)
+    payroll_run = models.ForeignKey(
+        "wallet.PayrollRun", null=True, blank=True, on_delete=models.SET_NULL, related_name="payslips"
+    )
+
     class Meta:
         unique_together = [("agent", "year", "month")]
         indexes = [
@@ -342,6 +394,58 @@ class PayoutSchedule(models.Model):
         return f"{self.name} Â· day {self.day_of_month} @ {self.at_hour:02d}:00"
 
 
+class PayrollRunStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    RUNNING = "RUNNING", "Computing"
+    EMAILING = "EMAILING", "Sending emails"
+    DONE = "DONE", "Done"
+    FAILED = "FAILED", "Failed"
+
+
+class PayrollRun(models.Model):
+    """
+    One bulk payslip run for a (year, month). Progress is recorded per agent so
+    an interrupted run can be resumed by `manage.py process_payroll_runs`.
+    """
+    year = models.IntegerField()
+    month = models.IntegerField()  # 1..12
+    schedule = models.ForeignKey(
+        PayoutSchedule, null=True, blank=True, on_delete=models.SET_NULL, related_name="runs"
+    )
+    status = models.CharField(max_length=12, choices=PayrollRunStatus.choices, default=PayrollRunStatus.PENDING)
+
+    # Options
+    email = models.BooleanField(default=True)
+    post_wallet_payout = models.BooleanField(default=True)
+
+    # Progress (agent ids)
+    agent_ids = models.JSONField(default=list, blank=True)
+    done_agent_ids = models.JSONField(default=list, blank=True)
+    emailed_count = models.PositiveIntegerField(default=0)
+    total_net = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+    errors = models.JSONField(default=list, blank=True)
+
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="payroll_runs_created")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["year", "month"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Run #{self.pk} / {self.year}-{self.month:02d} / {self.status}"
+
+    @property
+    def pending_agent_ids(self) -> list[int]:
+        done = set(self.done_agent_ids or [])
+        return [a for a in (self.agent_ids or []) if a not in done]
+
+
 # ----------------------------------------------------------------------
 # Admin Purchase Orders
 # ----------------------------------------------------------------------
@@ -0,0 +1,314 @@
+# wallet/payroll.py
+"""
+Bulk payroll run engine.
+
+- One grouped query over WalletTransaction computes gross/deductions/by-type
+  for every agent in a batch (instead of three aggregates per agent).
+- Payslips and payout transactions are written with bulk_create/bulk_update
+  inside one transaction per batch; the run row records which agents are done,
+  so an interrupted run resumes where it stopped.
+- Emails are not sent inline: payslips stay queued on the run and are delivered
+  by `python manage.py process_payroll_runs` (cron).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from sales.leaderboard import queue_wallet
+
+from .balances import apply_txns
+from .models import (
+    Ledger,
+    Payslip,
+    PayslipStatus,
+    PayrollRun,
+    PayrollRunStatus,
+    TxnType,
+    WalletTransaction,
+    q2,
+)
+from .services import PayslipBreakdown, month_bounds, send_payslip_email
+
+# ---------------------------------------------------------------------
+# Tunables
+# ---------------------------------------------------------------------
+BATCH_SIZE = 500        # agents per transaction
+EMAIL_BATCH_SIZE = 100  # payslip emails per delivery pass
+
+
+def _chunks(seq: list, size: int):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+# ---------------------------------------------------------------------
+# Grouped computation
+# ---------------------------------------------------------------------
+def compute_payroll(agent_ids: Iterable[int], year: int, month: int) -> dict[int, PayslipBreakdown]:
+    """
+    Same numbers as services.compute_monthly_payslip, for many agents at once.
+    Agents without transactions get an all-zero breakdown.
+    """
+    ids = list(agent_ids)
+    first, last = month_bounds(year, month)
+    rows = (
+        WalletTransaction.objects.filter(
+            ledger=Ledger.AGENT,
+            agent_id__in=ids,
+            effective_date__gte=first,
+            effective_date__lte=last,
+        )
+        .order_by()
+        .values("agent_id", "type")
+        .annotate(
+            s=Sum("amount"),
+            pos=Sum("amount", filter=Q(amount__gt=0)),
+            neg=Sum("amount", filter=Q(amount__lt=0)),
+        )
+    )
+
+    pos: dict[int, Decimal] = defaultdict(Decimal)
+    neg: dict[int, Decimal] = defaultdict(Decimal)
+    by_type: dict[int, dict[str, Decimal]] = defaultdict(dict)
+    for r in rows:
+        aid = r["agent_id"]
+        pos[aid] += r["pos"] or Decimal("0")
+        neg[aid] += r["neg"] or Decimal("0")
+        by_type[aid][r["type"]] = r["s"] or Decimal("0")
+
+    out: dict[int, PayslipBreakdown] = {}
+    for aid in ids:
+        gross = pos[aid]
+        deductions = -neg[aid]
+        out[aid] = PayslipBreakdown(
+            gross=gross, deductions=deductions, net=gross - deductions, by_type=dict(by_type[aid])
+        )
+    return out
+
+
+# ---------------------------------------------------------------------
+# Run lifecycle
+# ---------------------------------------------------------------------
+def start_payroll_run(
+    agents: Iterable,
+    year: int,
+    month: int,
+    *,
+    created_by=None,
+    email: bool = True,
+    post_wallet_payout: bool = True,
+    schedule=None,
+) -> PayrollRun:
+    """Record a new run for the given agents (users or ids). Nothing is issued yet."""
+    ids = sorted({int(getattr(a, "id", a)) for a in agents})
+    return PayrollRun.objects.create(
+        year=year,
+        month=month,
+        schedule=schedule,
+        email=email,
+        post_wallet_payout=post_wallet_payout,
+        agent_ids=ids,
+        created_by=created_by,
+    )
+
+
+def _issue_batch(run: PayrollRun, agent_ids: list[int]) -> None:
+    """Issue payslips (+ payout txns) for one batch of agents in a single transaction."""
+    with transaction.atomic():
+        # Lock the run so two workers never issue the same batch twice
+        locked = PayrollRun.objects.select_for_update().get(pk=run.pk)
+        done = set(locked.done_agent_ids or [])
+        ids = [a for a in agent_ids if a not in done]
+        if not ids:
+            run.done_agent_ids = locked.done_agent_ids
+            return
+
+        agents = get_user_model().objects.in_bulk(ids)
+        breakdowns = compute_payroll(ids, run.year, run.month)
+        existing = {
+            p.agent_id: p
+            for p in Payslip.objects.filter(agent_id__in=ids, year=run.year, month=run.month)
+        }
+
+        last_day = month_bounds(run.year, run.month)[1]
+        label = f"{run.year}-{run.month:02d}"
+        txns: list[WalletTransaction] = []
+        to_create: list[Payslip] = []
+        to_update: list[Payslip] = []
+        batch_net = Decimal("0")
+
+        for aid in ids:
+            agent = agents.get(aid)
+            if agent is None:
+                locked.errors = [*(locked.errors or []), {"agent_id": aid, "error": "User not found."}]
+                continue
+            b = breakdowns[aid]
+            net = q2(b.net)
+            batch_net += net
+
+            if run.post_wallet_payout and net > 0:
+                meta = {"gross": str(b.gross), "deductions": str(b.deductions), "payroll_run": run.pk}
+                txns.append(WalletTransaction(
+                    ledger=Ledger.AGENT, agent_id=aid, amount=-net, type=TxnType.PAYSLIP,
+                    note=f"Payslip {label}", created_by=run.created_by,
+                    effective_date=last_day, meta=meta,
+                ))
+                txns.append(WalletTransaction(
+                    ledger=Ledger.COMPANY, agent_id=aid, amount=net, type=TxnType.PAYSLIP,
+                    note=f"[Agent {aid}] Payslip {label}", created_by=run.created_by,
+                    effective_date=last_day, meta=meta,
+                ))
+
+            # Components add up the same way Payslip.save() does (gross = base + commission + bonuses)
+            commission = q2(max(b.by_type.get(TxnType.COMMISSION, Decimal("0")), Decimal("0")))
+            fields = dict(
+                base_salary=Decimal("0.00"),
+                commission=commission,
+                bonuses_fees=q2(b.gross) - commission,
+                deductions=q2(b.deductions),
+                gross=q2(b.gross),
+                net=net,
+                status=PayslipStatus.DRAFT,
+                sent_to_email=False,
+                payroll_run=locked,
+            )
+            by_type = {k: str(v) for k, v in b.by_type.items()}
+
+            p = existing.get(aid)
+            if p is None:
+                p = Payslip(
+                    agent=agent, year=run.year, month=run.month, created_by=run.created_by,
+                    email_to=getattr(agent, "email", "") or "", meta={"by_type": by_type}, **fields,
+                )
+                p.reference = p._make_reference()
+                to_create.append(p)
+            else:
+                for k, v in fields.items():
+                    setattr(p, k, v)
+                p.email_to = p.email_to or getattr(agent, "email", "") or ""
+                p.meta = {**(p.meta or {}), "by_type": by_type}
+                to_update.append(p)
+
+        # References are timestamp+agent based; clear the (rare) clash with older rows
+        refs = {p.reference for p in to_create}
+        clashes = set(Payslip.objects.filter(reference__in=refs).values_list("reference", flat=True))
+        for p in to_create:
+            if p.reference in clashes:
+                p.reference = f"PR{run.pk}{p.agent_id:06d}"[-24:]
+
+        if txns:
+            WalletTransaction.objects.bulk_create(txns)
+            apply_txns(txns)
+            queue_wallet(txns)  # bulk_create skips the leaderboard's post_save
+        if to_create:
+            Payslip.objects.bulk_create(to_create)
+        if to_update:
+            Payslip.objects.bulk_update(
+                to_update,
+                ["base_salary", "commission", "bonuses_fees", "deductions", "gross", "net",
+                 "status", "sent_to_email", "payroll_run", "email_to", "meta"],
+            )
+
+        locked.done_agent_ids = [*(locked.done_agent_ids or []), *ids]
+        locked.total_net = q2((locked.total_net or Decimal("0")) + batch_net)
+        locked.save(update_fields=["done_agent_ids", "total_net", "errors"])
+
+    run.done_agent_ids = locked.done_agent_ids
+    run.total_net = locked.total_net
+    run.errors = locked.errors
+
+
+def process_payroll_run(run: PayrollRun, *, batch_size: int = BATCH_SIZE) -> PayrollRun:
+    """
+    Issue every pending agent of the run. Safe to call again after a crash or
+    failure: agents already issued are skipped.
+    """
+    if run.status in (PayrollRunStatus.DONE, PayrollRunStatus.EMAILING):
+        return run
+
+    run.status = PayrollRunStatus.RUNNING
+    run.started_at = run.started_at or timezone.now()
+    run.save(update_fields=["status", "started_at"])
+
+    try:
+        for chunk in _chunks(run.pending_agent_ids, max(1, int(batch_size))):
+            _issue_batch(run, chunk)
+    except Exception as e:
+        run.status = PayrollRunStatus.FAILED
+        run.errors = [*(run.errors or []), {"error": str(e), "at": timezone.now().isoformat()}]
+        run.save(update_fields=["status", "errors"])
+        return run
+
+    if run.email:
+        run.status = PayrollRunStatus.EMAILING
+    else:
+        run.status = PayrollRunStatus.DONE
+        run.finished_at = timezone.now()
+    run.save(update_fields=["status", "finished_at"])
+    return run
+
+
+def deliver_payroll_emails(run: PayrollRun, *, limit: int = EMAIL_BATCH_SIZE) -> int:
+    """
+    Send up to `limit` queued payslip emails for the run. Marks the run DONE
+    once nothing is left to send. Returns the number of emails sent.
+    """
+    if run.status != PayrollRunStatus.EMAILING:
+        return 0
+
+    queued = (
+        Payslip.objects.filter(payroll_run=run, sent_to_email=False, status=PayslipStatus.DRAFT)
+        .exclude(email_to="")
+        .select_related("agent")
+        .order_by("id")
+    )
+    sent = 0
+    for p in queued[:limit]:
+        b = PayslipBreakdown(
+            gross=p.gross,
+            deductions=p.deductions,
+            net=p.net,
+            by_type={k: Decimal(v) for k, v in ((p.meta or {}).get("by_type") or {}).items()},
+        )
+        try:
+            ok = send_payslip_email(p.agent, p.year, p.month, b)
+        except Exception:
+            ok = False
+        if ok:
+            Payslip.objects.filter(pk=p.pk).update(
+                sent_to_email=True, sent_at=timezone.now(), status=PayslipStatus.SENT
+            )
+            sent += 1
+        else:
+            Payslip.objects.filter(pk=p.pk).update(status=PayslipStatus.FAILED)
+
+    run.emailed_count = (run.emailed_count or 0) + sent
+    fields = ["emailed_count"]
+    if not queued.exists():
+        run.status = PayrollRunStatus.DONE
+        run.finished_at = timezone.now()
+        fields += ["status", "finished_at"]
+    run.save(update_fields=fields)
+    return sent
+
+
+def run_summary(run: PayrollRun) -> dict:
+    """Per-agent result rows in the shape bulk_issue_payslips always returned."""
+    nets = dict(Payslip.objects.filter(payroll_run=run).values_list("agent_id", "net"))
+    failed = {e.get("agent_id") for e in (run.errors or []) if e.get("agent_id")}
+    results: list[dict] = []
+    for aid in run.agent_ids or []:
+        if aid in nets:
+            results.append({"agent_id": aid, "net": nets[aid], "emailed": False, "queued": run.email, "ok": True})
+        else:
+            err = "Not issued." if aid not in failed else "User not found."
+            results.append({"agent_id": aid, "error": err, "ok": False})
+    ok = sum(1 for r in results if r["ok"])
+    return {"run_id": run.pk, "status": run.status, "count": len(results), "ok": ok, "results": results}
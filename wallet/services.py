@@ -11,11 +11,13 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import EmailMultiAlternatives
 from django.db import transaction
-from django.db.models import Q, Sum
+from django.db.models import Sum
 from django.template.loader import render_to_string
 from django.utils import timezone
 
+from .balances import balance_row, summary_from_row
 from .models import (
+    AgentWalletBalance,
     WalletTransaction,
     TxnType,
     Ledger,
@@ -179,7 +181,13 @@ def apply_monthly_target_bonus(agent, year: int, month: int, *, created_by=None)
 
 # --- Aggregations for the UI ---
 def agent_wallet_summary(agent, *, today=None):
-    today = today or timezone.localdate()
+    """
+    Wallet headline numbers for one agent. For the current day this is a single
+    AgentWalletBalance row read; any other `today` falls back to summing history.
+    """
+    if today is None or today == timezone.localdate():
+        return summary_from_row(balance_row(agent.id))
+
     start_month = today.replace(day=1)
 
     qs_all = WalletTransaction.objects.filter(ledger=Ledger.AGENT, agent=agent)
@@ -200,21 +208,55 @@ def agent_wallet_summary(agent, *, today=None):
     }
 
 
-def ranking(period: str = "month"):
+def ranking(period: str = "month", business=None):
+    """
+    Top 20 agents by wallet total for the month (or all time). A business's
+    month comes from its leaderboard (sales.leaderboard); the rest is read
+    from AgentWalletBalance, limited to the business's active members.
+    """
     today = timezone.localdate()
+    if business is not None and period != "all":
+        from sales.leaderboard import Board
+
+        board = [r for r in Board(business.pk, "month", today, metric="wallet").top(20) if r["wallet"]]
+        names = {
+            u["id"]: u
+            for u in get_user_model().objects.filter(pk__in=[r["agent_id"] for r in board]).values("id", "first_name", "last_name")
+        }
+        return [
+            {
+                "agent__id": r["agent_id"],
+                "agent__first_name": names.get(r["agent_id"], {}).get("first_name", ""),
+                "agent__last_name": names.get(r["agent_id"], {}).get("last_name", ""),
+                "total": r["wallet"],
+            }
+            for r in board
+        ]
+
+    qs = AgentWalletBalance.objects.all()
     if period == "all":
-        filt = Q()
+        total_field = "balance"
     else:
-        start = today.replace(day=1)
-        filt = Q(effective_date__gte=start, effective_date__lte=today)
-    rows = (
-        WalletTransaction.objects.filter(ledger=Ledger.AGENT)
-        .filter(filt)
-        .values("agent__id", "agent__first_name", "agent__last_name")
-        .annotate(total=Sum("amount"))
-        .order_by("-total")[:20]
-    )
-    return list(rows)
+        total_field = "month_total"
+        qs = qs.filter(month_start=today.replace(day=1))
+    if business is not None:
+        from tenants.models import Membership
+
+        members = Membership.objects.filter(business=business, status="ACTIVE").values("user_id")
+        qs = qs.filter(agent_id__in=members)
+
+    rows = qs.order_by(f"-{total_field}").values(
+        "agent__id", "agent__first_name", "agent__last_name", total_field
+    )[:20]
+    return [
+        {
+            "agent__id": r["agent__id"],
+            "agent__first_name": r["agent__first_name"],
+            "agent__last_name": r["agent__last_name"],
+            "total": r[total_field],
+        }
+        for r in rows
+    ]
 
 
 # ---------------------------------------------------------------------
@@ -361,30 +403,26 @@ def bulk_issue_payslips(
     created_by=None,
     email: bool = True,
     post_wallet_payout: bool = True,
+    schedule=None,
 ) -> dict:
     """
-    Issues payslips for a set of agents. Returns a summary dict.
+    Issues payslips for a set of agents through a PayrollRun (see wallet/payroll.py).
+    Breakdowns come from one grouped query and writes are bulk; emails are queued
+    for `manage.py process_payroll_runs`. Returns a summary dict (incl. run_id).
     """
-    results: list[dict] = []
-    ok = 0
-    for agent in agents:
-        try:
-            p, b = create_and_post_payslip(
-                agent, year, month, created_by=created_by, post_wallet_payout=post_wallet_payout
-            )
-            emailed = False
-            if email:
-                emailed = send_payslip_email(agent, year, month, b)
-                # Best-effort flag for convenience in UI
-                try:
-                    type(p).objects.filter(id=p.id).update(sent_to_email=bool(emailed))
-                except Exception:
-                    pass
-            results.append({"agent_id": agent.id, "net": b.net, "emailed": bool(emailed), "ok": True})
-            ok += 1
-        except Exception as e:  # keep going on errors
-            results.append({"agent_id": getattr(agent, "id", None), "error": str(e), "ok": False})
-    return {"count": len(results), "ok": ok, "results": results}
+    from .payroll import process_payroll_run, run_summary, start_payroll_run
+
+    run = start_payroll_run(
+        agents,
+        year,
+        month,
+        created_by=created_by,
+        email=email,
+        post_wallet_payout=post_wallet_payout,
+        schedule=schedule,
+    )
+    process_payroll_run(run)
+    return run_summary(run)
 
 
 # ---------------------------------------------------------------------
@@ -409,6 +447,7 @@ def run_monthly_schedule(schedule, *, when: date | None = None, created_by=None)
         created_by=created_by,
         email=True,
         post_wallet_payout=True,
+        schedule=schedule,
     )
 
     schedule.last_run_at = timezone.now()
@@ -0,0 +1,58 @@
+# wallet/tests/test_balances.py
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from wallet.balances import rebuild_balances
+from wallet.models import AgentWalletBalance, Ledger, TxnType, WalletTransaction
+from wallet.services import add_txn, agent_wallet_summary, ranking
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+def test_add_txn_maintains_balance_row():
+    agent = User.objects.create_user("a1", password="x")
+    today = timezone.localdate()
+    add_txn(agent=agent, amount=Decimal("1000"), type=TxnType.COMMISSION)
+    add_txn(agent=agent, amount=Decimal("-250"), type=TxnType.PENALTY)
+    add_txn(agent=agent, amount=Decimal("400"), type=TxnType.BONUS, effective_date=today.replace(day=1) - timedelta(days=1))
+
+    row = AgentWalletBalance.objects.get(agent=agent)
+    assert row.balance == Decimal("1150.00")
+    assert row.txn_count == 3
+
+    s = agent_wallet_summary(agent)
+    assert s["balance"] == Decimal("1150.00")
+    assert s["all_time_deductions"] == Decimal("250.00")
+    assert s["month_total"] == Decimal("750.00")
+    assert s["today_earnings"] == Decimal("1000.00")
+    assert s["today_deductions"] == Decimal("250.00")
+
+
+def test_company_ledger_is_ignored_and_reconcile_fixes_drift():
+    agent = User.objects.create_user("a2", password="x")
+    add_txn(agent=agent, amount=Decimal("500"), type=TxnType.BONUS)
+    WalletTransaction.objects.create(ledger=Ledger.COMPANY, agent=agent, amount=Decimal("900"), type=TxnType.PAYSLIP)
+    assert AgentWalletBalance.objects.get(agent=agent).balance == Decimal("500.00")
+
+    AgentWalletBalance.objects.filter(agent=agent).update(balance=Decimal("1"))
+    res = rebuild_balances()
+    assert res["fixed"] == [agent.id]
+    assert AgentWalletBalance.objects.get(agent=agent).balance == Decimal("500.00")
+
+
+def test_ranking_reads_balance_rows(django_assert_num_queries):
+    a = User.objects.create_user("r1", password="x")
+    b = User.objects.create_user("r2", password="x")
+    add_txn(agent=a, amount=Decimal("100"), type=TxnType.COMMISSION)
+    add_txn(agent=b, amount=Decimal("300"), type=TxnType.COMMISSION)
+
+    with django_assert_num_queries(1):
+        rows = ranking("month")
+    assert [r["agent__id"] for r in rows] == [b.id, a.id]
+    assert rows[0]["total"] == Decimal("300.00")
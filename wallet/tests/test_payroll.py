@@ -0,0 +1,81 @@
+# wallet/tests/test_payroll.py
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+
+from wallet.models import Ledger, Payslip, PayrollRun, PayrollRunStatus, TxnType, WalletTransaction
+from wallet.payroll import compute_payroll, deliver_payroll_emails, process_payroll_run, start_payroll_run
+from wallet.services import bulk_issue_payslips, compute_monthly_payslip
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+def _agents(n=3):
+    return [User.objects.create_user(f"agent{i}", email=f"agent{i}@test.com", password="x") for i in range(n)]
+
+
+def _txn(agent, amount, type, day=10):
+    WalletTransaction.objects.create(
+        ledger=Ledger.AGENT, agent=agent, amount=Decimal(amount), type=type,
+        effective_date=date(2025, 5, day),
+    )
+
+
+def test_grouped_breakdown_matches_per_agent_computation():
+    a, b, c = _agents()
+    _txn(a, "1000", TxnType.COMMISSION)
+    _txn(a, "500", TxnType.BONUS)
+    _txn(a, "-200", TxnType.PENALTY)
+    _txn(b, "-300", TxnType.ADVANCE)
+    _txn(b, "50", TxnType.COMMISSION, day=1)
+    _txn(b, "999", TxnType.COMMISSION, day=1)
+
+    grouped = compute_payroll([a.id, b.id, c.id], 2025, 5)
+    for agent in (a, b, c):
+        assert grouped[agent.id] == compute_monthly_payslip(agent, 2025, 5)
+
+
+def test_bulk_issue_is_batched_and_queues_emails(django_assert_max_num_queries):
+    agents = _agents(5)
+    for ag in agents:
+        _txn(ag, "1000", TxnType.COMMISSION)
+
+    # Query count does not grow with the number of agents
+    with django_assert_max_num_queries(20):
+        res = bulk_issue_payslips(agents, 2025, 5)
+
+    assert res["ok"] == 5
+    assert res["status"] == PayrollRunStatus.EMAILING
+    assert Payslip.objects.filter(year=2025, month=5, net=Decimal("1000.00")).count() == 5
+    assert WalletTransaction.objects.filter(type=TxnType.PAYSLIP).count() == 10
+    assert len(mail.outbox) == 0
+
+    run = PayrollRun.objects.get(pk=res["run_id"])
+    assert deliver_payroll_emails(run, limit=3) == 3
+    assert deliver_payroll_emails(run) == 2
+    run.refresh_from_db()
+    assert run.status == PayrollRunStatus.DONE
+    assert len(mail.outbox) == 5
+
+
+def test_resume_skips_agents_already_issued():
+    agents = _agents(4)
+    for ag in agents:
+        _txn(ag, "100", TxnType.BONUS)
+
+    run = start_payroll_run(agents, 2025, 5, email=False)
+    run.done_agent_ids = [agents[0].id]  # pretend the first batch committed before a crash
+    run.save()
+
+    process_payroll_run(run, batch_size=2)
+    run.refresh_from_db()
+
+    assert run.status == PayrollRunStatus.DONE
+    assert sorted(run.done_agent_ids) == sorted(a.id for a in agents)
+    assert not Payslip.objects.filter(agent=agents[0]).exists()
+    assert Payslip.objects.filter(payroll_run=run).count() == 3